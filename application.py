@@ -10,15 +10,92 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     ApplicationBuilder, CommandHandler, CallbackQueryHandler,
-    MessageHandler, filters, ContextTypes, ConversationHandler
+    MessageHandler, InlineQueryHandler, filters, ContextTypes, ConversationHandler
 )
+from telegram.request import HTTPXRequest
+from utils.callback_router import CallbackRouter
+from utils.update_processor import PerChatUpdateProcessor
 
 logger = logging.getLogger(__name__)
 
+async def post_init(application):
+    """Start background work that needs the running event loop"""
+    try:
+        from services.broadcast_service import resume_broadcasts
+        await resume_broadcasts(application)
+    except Exception as e:
+        logger.error(f"Could not resume broadcasts: {e}", exc_info=True)
+    
+    try:
+        from services.currency_service import rate_refresher
+        rate_refresher.start(application)
+    except Exception as e:
+        logger.error(f"Could not start exchange rate refresh: {e}", exc_info=True)
+    
+    try:
+        from services.outbox import outbox_dispatcher
+        outbox_dispatcher.start(application.bot)
+    except Exception as e:
+        logger.error(f"Could not start notification outbox: {e}", exc_info=True)
+    
+    try:
+        from config import METRICS_HOST, METRICS_PORT
+        from services.metrics import metrics_server
+        if METRICS_PORT:
+            await metrics_server.start(METRICS_HOST, METRICS_PORT)
+    except Exception as e:
+        logger.error(f"Could not start metrics endpoint: {e}", exc_info=True)
+    
+    try:
+        from services.backup_service import schedule_backups
+        schedule_backups(application)
+    except Exception as e:
+        logger.error(f"Could not schedule database backups: {e}", exc_info=True)
+    
+    try:
+        from order_management import start_refund_checker
+        start_refund_checker(application)
+        print("✅ Automatic refund scheduler started successfully")
+    except Exception as e:
+        logger.error(f"Could not start refund scheduler: {e}", exc_info=True)
+        print("⚠️ Automatic refunds will not be available")
+
+async def post_shutdown(application):
+    """Release shared clients when the bot stops"""
+    try:
+        from services.paystack_service import async_paystack
+        await async_paystack.aclose()
+    except Exception as e:
+        logger.error(f"Error closing Paystack client: {e}")
+    
+    try:
+        from services.currency_service import rate_refresher
+        await rate_refresher.stop()
+    except Exception as e:
+        logger.error(f"Error stopping exchange rate refresh: {e}")
+    
+    try:
+        from services.outbox import outbox_dispatcher
+        await outbox_dispatcher.stop()
+    except Exception as e:
+        logger.error(f"Error stopping notification outbox: {e}")
+    
+    try:
+        from services.metrics import metrics_server
+        await metrics_server.stop()
+    except Exception as e:
+        logger.error(f"Error stopping metrics endpoint: {e}")
+    
+    try:
+        from database.db import shutdown_db_executor
+        shutdown_db_executor()
+    except Exception as e:
+        logger.error(f"Error stopping database workers: {e}")
+
 def create_application():
     """Create and configure the Telegram application"""
     try:
-        from config import TELEGRAM_TOKEN
+        from config import TELEGRAM_TOKEN, TELEGRAM_API_URL, CONCURRENT_UPDATES
 
         if not TELEGRAM_TOKEN or TELEGRAM_TOKEN == "YOUR_BOT_TOKEN_HERE":
             print("❌ ERROR: Please set your Telegram bot token in .env file")
@@ -30,17 +107,26 @@ def create_application():
 
         print(f"✅ Using bot token: {TELEGRAM_TOKEN[:10]}...")
 
+        # user_data, chat_data and conversation states survive restarts
+        from services.persistence import SQLPersistence
+        # Bot API calls are timed per method
+        from services.metrics import InstrumentedRequest, instrument_handlers
+
         application = (
             ApplicationBuilder()
             .token(TELEGRAM_TOKEN)
-            .read_timeout(30)
-            .write_timeout(30)
-            .connect_timeout(30)
-            .pool_timeout(30)
-            .get_updates_read_timeout(30)
-            .get_updates_write_timeout(30)
-            .get_updates_connect_timeout(30)
-            .get_updates_pool_timeout(30)
+            .base_url(TELEGRAM_API_URL)
+            .request(InstrumentedRequest(
+                connection_pool_size=256, read_timeout=30, write_timeout=30, connect_timeout=30, pool_timeout=30
+            ))
+            # Long polls aren't timed - they'd only show the poll timeout
+            .get_updates_request(HTTPXRequest(
+                connection_pool_size=1, read_timeout=30, write_timeout=30, connect_timeout=30, pool_timeout=30
+            ))
+            .concurrent_updates(PerChatUpdateProcessor(CONCURRENT_UPDATES))
+            .persistence(SQLPersistence())
+            .post_init(post_init)
+            .post_shutdown(post_shutdown)
             .build()
         )
 
@@ -134,6 +220,15 @@ def create_application():
             handle_dev_available_orders
         )
 
+        # Search
+        from handlers.search import (
+            ADMIN_SEARCH_COMMANDS, SEARCH_NAMESPACE, admin_search_command, admin_search_page, inline_search
+        )
+
+        # Metrics
+        from handlers.metrics import admin_metrics_command
+        from handlers.backup import admin_backup_command
+
         # ========== BASIC COMMAND HANDLERS ==========
         print("DEBUG: Adding basic command handlers...")
         application.add_handler(CommandHandler("start", start_command))
@@ -146,6 +241,14 @@ def create_application():
         application.add_handler(CommandHandler("verify", verify_command))
         # /verify_deposit REMOVED – no longer needed for jobs
         application.add_handler(CommandHandler("refund", manual_refund_command))
+        application.add_handler(CommandHandler(list(ADMIN_SEARCH_COMMANDS), admin_search_command))
+        application.add_handler(InlineQueryHandler(inline_search))
+        application.add_handler(CommandHandler("metrics", admin_metrics_command))
+        application.add_handler(CommandHandler("backup", admin_backup_command))
+
+        # Plain callback buttons are resolved by one router (dict/prefix-trie lookup)
+        # added near the end; conversation handlers stay ahead of it
+        router = CallbackRouter()
 
         # ========== CONVERSATION HANDLERS ==========
         # 1. Job posting conversation (FREE, no deposit)
@@ -185,7 +288,9 @@ def create_application():
                         CallbackQueryHandler(confirm_job_post, pattern="^confirm_job_post$"),
                         CommandHandler("cancel", cancel_job_posting)
                     ],
-                    allow_reentry=True
+                    allow_reentry=True,
+                    name="job_posting",
+                    persistent=True
                 )
                 application.add_handler(job_posting_conv_handler)
                 print("✅ Job posting conversation handler registered")
@@ -224,7 +329,9 @@ def create_application():
                 CallbackQueryHandler(handle_submit_with_deposit, pattern="^submit_with_deposit$"),
                 CommandHandler("cancel", cancel_custom_request)
             ],
-            allow_reentry=True
+            allow_reentry=True,
+            name="custom_request",
+            persistent=True
         )
         application.add_handler(custom_request_conv_handler)
         print("✅ Custom request conversation handler registered")
@@ -260,10 +367,12 @@ def create_application():
                     CallbackQueryHandler(cancel_developer_application, pattern="^menu_main$"),
                     CommandHandler("cancel", cancel_developer_application)
                 ],
-                allow_reentry=True
+                allow_reentry=True,
+                name="developer_application",
+                persistent=True
             )
             application.add_handler(dev_application_conv_handler)
-            application.add_handler(CallbackQueryHandler(dev_application_status, pattern="^dev_application_status$"))
+            router.exact("dev_application_status", dev_application_status)
             print("✅ Developer application handlers registered")
         except ImportError as e:
             print(f"⚠️ Could not import developer_handlers: {e}")
@@ -280,10 +389,10 @@ def create_application():
         # ========== PAYMENT CALLBACK HANDLERS ==========
         # These are for bot purchases and custom request deposits – NOT for jobs
         print("DEBUG: Adding payment callback handlers...")
-        application.add_handler(CallbackQueryHandler(handle_paystack_payment, pattern="^paystack_bot_"))
-        application.add_handler(CallbackQueryHandler(handle_bank_transfer, pattern="^bank_transfer_"))
-        application.add_handler(CallbackQueryHandler(handle_pay_deposit_callback, pattern="^pay_deposit_"))
-        application.add_handler(CallbackQueryHandler(handle_submit_with_deposit, pattern="^submit_with_deposit$"))
+        router.prefix("paystack_bot_", handle_paystack_payment)
+        router.prefix("bank_transfer_", handle_bank_transfer)
+        router.prefix("pay_deposit_", handle_pay_deposit_callback)
+        router.exact("submit_with_deposit", handle_submit_with_deposit)
         # NOTE: verify_deposit_command callback ("^vd_") and job deposit handlers are REMOVED
 
         async def handle_payment_email_only(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -309,72 +418,79 @@ def create_application():
         ))
 
         # ========== CURRENCY HANDLERS ==========
-        application.add_handler(CallbackQueryHandler(handle_country_selection, pattern="^country_"))
-        application.add_handler(CallbackQueryHandler(handle_change_currency, pattern="^change_currency$"))
-        application.add_handler(CallbackQueryHandler(handle_set_currency, pattern="^set_currency_"))
+        router.prefix("country_", handle_country_selection)
+        router.exact("change_currency", handle_change_currency)
+        router.prefix("set_currency_", handle_set_currency)
 
         # ========== JOB MARKETPLACE CALLBACK HANDLERS ==========
         print("DEBUG: Adding job marketplace callback handlers...")
         if show_job_board:
-            application.add_handler(CallbackQueryHandler(show_job_board, pattern="^job_board$"))
-            application.add_handler(CallbackQueryHandler(show_job_board, pattern="^job_board_"))
+            router.paged("job_board", show_job_board)
+            router.prefix("job_board_", show_job_board)
         if view_job_details:
-            application.add_handler(CallbackQueryHandler(view_job_details, pattern="^view_job_"))
+            router.prefix("view_job_", view_job_details)
         if show_my_jobs:
-            application.add_handler(CallbackQueryHandler(show_my_jobs, pattern="^my_jobs$"))
+            router.exact("my_jobs", show_my_jobs)
         if my_job_details:
-            application.add_handler(CallbackQueryHandler(my_job_details, pattern="^my_job_"))
+            router.prefix("my_job_", my_job_details)
         if cancel_my_job:
-            application.add_handler(CallbackQueryHandler(cancel_my_job, pattern="^cancel_job_"))
+            router.prefix("cancel_job_", cancel_my_job)
         if handle_job_board_navigation:
-            application.add_handler(CallbackQueryHandler(handle_job_board_navigation, pattern="^job_board_page_"))
+            router.prefix("job_board_page_", handle_job_board_navigation)
         if confirm_job_post:
-            application.add_handler(CallbackQueryHandler(confirm_job_post, pattern="^confirm_job_post$"))
+            router.exact("confirm_job_post", confirm_job_post)
 
         # NEW: Contact poster handler – replaces claim_job
         if contact_poster:
-            application.add_handler(CallbackQueryHandler(contact_poster, pattern="^contact_poster_"))
+            router.prefix("contact_poster_", contact_poster)
             print("✅ Contact poster handler registered")
 
         # ========== OTHER CALLBACK HANDLERS ==========
         print("DEBUG: Adding other callback handlers...")
-        application.add_handler(CallbackQueryHandler(handle_menu_main, pattern="^menu_main$"))
-        application.add_handler(CallbackQueryHandler(handle_buy_bot, pattern="^buy_bot$"))
-        application.add_handler(CallbackQueryHandler(show_bot_categories, pattern="^category_"))
-        application.add_handler(CallbackQueryHandler(show_bot_details, pattern="^view_bot_"))
-        application.add_handler(CallbackQueryHandler(show_buy_options, pattern="^buy_options_"))
-        application.add_handler(CallbackQueryHandler(show_featured_bots, pattern="^featured_bots$"))
-        application.add_handler(CallbackQueryHandler(show_user_orders, pattern="^my_orders$"))
-        application.add_handler(CallbackQueryHandler(show_order_details, pattern="^order_"))
-        application.add_handler(CallbackQueryHandler(show_my_requests, pattern="^my_requests$"))
-        application.add_handler(CallbackQueryHandler(show_custom_request_details, pattern="^request_"))
-        application.add_handler(CallbackQueryHandler(show_support, pattern="^support$"))
-        application.add_handler(CallbackQueryHandler(show_about, pattern="^about$"))
+        router.exact("menu_main", handle_menu_main)
+        router.exact("buy_bot", handle_buy_bot)
+        router.prefix("category_", show_bot_categories)
+        router.prefix("view_bot_", show_bot_details)
+        router.prefix("buy_options_", show_buy_options)
+        router.exact("featured_bots", show_featured_bots)
+        router.paged("my_orders", show_user_orders)
+        router.prefix("order_", show_order_details)
+        router.exact("my_requests", show_my_requests)
+        router.prefix("request_", show_custom_request_details)
+        router.exact("support", show_support)
+        router.exact("about", show_about)
 
         # ========== DEVELOPER DASHBOARD HANDLERS ==========
         print("DEBUG: Registering developer dashboard handlers...")
-        application.add_handler(CallbackQueryHandler(developer_dashboard, pattern="^dev_dashboard$"))
-        application.add_handler(CallbackQueryHandler(dev_my_orders, pattern="^dev_my_orders$"))
-        application.add_handler(CallbackQueryHandler(dev_order_detail, pattern="^dev_order_detail_"))
-        application.add_handler(CallbackQueryHandler(dev_start_order, pattern="^dev_start_order_"))
-        application.add_handler(CallbackQueryHandler(dev_complete_order, pattern="^dev_complete_order_"))
-        application.add_handler(CallbackQueryHandler(dev_edit_profile_start, pattern="^dev_edit_profile_start$"))
-        application.add_handler(CallbackQueryHandler(dev_earnings, pattern="^dev_earnings$"))
-        application.add_handler(CallbackQueryHandler(dev_toggle_availability, pattern="^dev_toggle_availability$"))
-        application.add_handler(CallbackQueryHandler(dev_request_payout, pattern="^dev_request_payout$"))
-        application.add_handler(CallbackQueryHandler(dev_update_email_start, pattern="^dev_update_email_"))
-        application.add_handler(CallbackQueryHandler(handle_dev_available_orders, pattern="^dev_available_orders$"))
+        router.exact("dev_dashboard", developer_dashboard)
+        router.exact("dev_my_orders", dev_my_orders)
+        router.prefix("dev_order_detail_", dev_order_detail)
+        router.prefix("dev_start_order_", dev_start_order)
+        router.prefix("dev_complete_order_", dev_complete_order)
+        router.exact("dev_edit_profile_start", dev_edit_profile_start)
+        router.exact("dev_earnings", dev_earnings)
+        router.exact("dev_toggle_availability", dev_toggle_availability)
+        router.exact("dev_request_payout", dev_request_payout)
+        router.prefix("dev_update_email_", dev_update_email_start)
+        router.paged("dev_available_orders", handle_dev_available_orders)
 
         # ========== ADMIN PANEL ==========
-        application.add_handler(CallbackQueryHandler(full_admin_panel, pattern="^admin_panel$"))
-        application.add_handler(CallbackQueryHandler(debug_command, pattern="^admin_debug$"))
+        router.exact("admin_panel", full_admin_panel)
+        router.exact("admin_debug", debug_command)
 
         # ========== REFUND CONFIRMATION ==========
-        application.add_handler(CallbackQueryHandler(confirm_refund_callback, pattern="^confirm_refund_"))
-        application.add_handler(CallbackQueryHandler(confirm_refund_callback, pattern="^cancel_refund$"))
+        router.route("refund", "confirm", confirm_refund_callback)
+        router.route("refund", "cancel", confirm_refund_callback)
+        # Buttons sent before the structured format
+        router.prefix("confirm_refund_", confirm_refund_callback)
+        router.exact("cancel_refund", confirm_refund_callback)
+
+        # ========== SEARCH RESULT PAGES ==========
+        for kind in set(ADMIN_SEARCH_COMMANDS.values()):
+            router.route(SEARCH_NAMESPACE, kind, admin_search_page)
 
         # ========== VERIFY PAYMENT HANDLERS ==========
-        application.add_handler(CallbackQueryHandler(verify_command, pattern="^verify_payment_"))
+        router.prefix("verify_payment_", verify_command)
 
         # ========== ADMIN CALLBACKS – FULLY REGISTERED ==========
         print("DEBUG: Registering ALL admin callbacks...")
@@ -528,11 +644,18 @@ def create_application():
             ('admin_reject_job_', admin_reject_job),
         ]
 
+        # List screens that accept a keyset cursor (<name>:<cursor>)
+        paged_callbacks = {
+            'admin_view_orders', 'admin_view_bots', 'admin_view_users', 'admin_jobs_pending_list'
+        }
+
         for pattern, handler in admin_callbacks:
-            if pattern.endswith('_'):
-                application.add_handler(CallbackQueryHandler(handler, pattern=f"^{pattern}"))
+            if pattern in paged_callbacks:
+                router.paged(pattern, handler)
+            elif pattern.endswith('_'):
+                router.prefix(pattern, handler)
             else:
-                application.add_handler(CallbackQueryHandler(handler, pattern=f"^{pattern}$"))
+                router.exact(pattern, handler)
 
         print("✅ ALL admin callbacks registered successfully!")
 
@@ -550,6 +673,10 @@ def create_application():
             )
         application.add_handler(CommandHandler("testjobs", test_jobs_command))
 
+        # ========== CALLBACK ROUTER ==========
+        application.add_handler(router)
+        print(f"✅ Callback router registered with {len(router.registrations)} routes")
+
         # ========== FALLBACK HANDLER – MUST BE ABSOLUTELY LAST ==========
         print("DEBUG: Adding fallback handler (generic_callback) – LAST")
         application.add_handler(CallbackQueryHandler(generic_callback))
@@ -590,7 +717,10 @@ def create_application():
                 logger.error(f"Error in error handler: {e}")
         application.add_error_handler(error_handler)
 
-        print("✅ All handlers registered successfully!")
+        # ========== INSTRUMENTATION – AFTER EVERY HANDLER ==========
+        instrumented = instrument_handlers(application)
+
+        print(f"✅ All handlers registered successfully! ({instrumented} instrumented)")
         return application
 
     except Exception as e:
@@ -0,0 +1,3 @@
+"""
+Local benchmarks - run from the project root, e.g. `python -m benchmarks.broadcast_bench`
+"""
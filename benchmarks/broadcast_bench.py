@@ -0,0 +1,73 @@
+"""
+Broadcast throughput benchmark against a local fake Bot API.
+
+    python -m benchmarks.broadcast_bench --users 2000 --rate 1000 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=1000.0, help="global messages/second limit")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake API latency (seconds)")
+    parser.add_argument("--flood-every", type=int, default=0, help="answer every Nth send with 429")
+    return parser.parse_args()
+
+
+async def run(args, api):
+    from telegram import Bot
+    from telegram.request import HTTPXRequest
+    from database.db import Base, engine, create_session
+    from database.models import User
+    from services.broadcast_service import ChatRateLimiter, create_broadcast, run_broadcast
+
+    Base.metadata.create_all(bind=engine)
+    db = create_session()
+    try:
+        db.bulk_insert_mappings(User, [
+            {"telegram_id": str(100000 + i), "first_name": f"User {i}"} for i in range(args.users)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    # Same pool sizing as ApplicationBuilder's shared bot
+    request = HTTPXRequest(connection_pool_size=256)
+    bot = Bot(token="123:FAKE", base_url=f"{api.url}/bot", request=request)
+    async with bot:
+        job_id = create_broadcast("Benchmark message", created_by="bench", parse_mode=None)
+        limiter = ChatRateLimiter(global_rate=args.rate)
+
+        started = time.perf_counter()
+        state = await run_broadcast(bot, job_id, concurrency=args.concurrency, limiter=limiter)
+        elapsed = time.perf_counter() - started
+
+    print(f"users:        {args.users}")
+    print(f"sent/failed:  {state['sent_count']}/{state['failed_count']}")
+    print(f"elapsed:      {elapsed:.2f}s")
+    print(f"throughput:   {state['sent_count'] / elapsed:.1f} msg/s")
+    print(f"api calls:    {dict(api.calls)}")
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="broadcast_bench_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    from benchmarks.fake_bot_api import FakeBotAPI
+
+    with FakeBotAPI(latency=args.latency, flood_every=args.flood_every) as api:
+        asyncio.run(run(args, api))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Dispatch cost per callback query: one regex CallbackQueryHandler per route
+(tried in registration order, as PTB does) versus the CallbackRouter.
+
+Builds the real application, takes its router, and replays one callback per
+registered route plus an unrouted one. Also lists every callback the two
+strategies send to different handlers - that only happens where a short
+prefix used to shadow a longer one registered after it.
+
+    python -m benchmarks.callback_dispatch_bench --rounds 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def sample_callbacks(router):
+    from utils.callback_router import EXACT, PREFIX, callback_data
+
+    samples = []
+    for kind, key, _ in router.registrations:
+        if kind == EXACT:
+            samples.append(key)
+        elif kind == PREFIX:
+            samples.append(key + ("n1a2b3c.9z" if key.endswith(":") else "ORD20240101120000AB12CD34"))
+        else:
+            samples.append(callback_data(key[0], key[1], 42))
+    samples.append("no_such_button")
+    return samples
+
+
+def as_update(data):
+    from telegram import CallbackQuery, Update, User
+
+    user = User(id=1, first_name="Bench", is_bot=False)
+    return Update(update_id=1, callback_query=CallbackQuery(id="1", from_user=user, chat_instance="1", data=data))
+
+
+def linear_dispatch(handlers, update):
+    for handler in handlers:
+        check = handler.check_update(update)
+        if check is not None and check is not False:
+            return handler.callback
+    return None
+
+
+def routed_dispatch(router, update):
+    resolved = router.check_update(update)
+    return resolved[0] if resolved else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200, help="passes over the sample callbacks")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='callback_bench_')}/bench.db"
+    os.environ["TELEGRAM_TOKEN"] = "123456:benchmark"
+
+    import contextlib
+    import io
+    import warnings
+
+    from application import create_application
+    from utils.callback_router import CallbackRouter
+
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        app = create_application()
+    router = next(h for h in app.handlers[0] if isinstance(h, CallbackRouter))
+    handlers = router.as_pattern_handlers()
+    updates = [(as_update(data), data) for data in sample_callbacks(router)]
+
+    mismatches = []
+    for update, data in updates:
+        old, new = linear_dispatch(handlers, update), routed_dispatch(router, update)
+        if old is not new:
+            mismatches.append((data, getattr(old, "__name__", None), getattr(new, "__name__", None)))
+
+    timings = {}
+    for name, dispatch, target in (("regex handlers", linear_dispatch, handlers),
+                                   ("router", routed_dispatch, router)):
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            for update, _ in updates:
+                dispatch(target, update)
+        timings[name] = (time.perf_counter() - started) / (args.rounds * len(updates)) * 1e6
+
+    worst = updates[-2][0]  # last registered route: every regex before it is tried
+    for name, dispatch, target in (("regex handlers", linear_dispatch, handlers),
+                                   ("router", routed_dispatch, router)):
+        started = time.perf_counter()
+        for _ in range(args.rounds * 10):
+            dispatch(target, worst)
+        timings[name + " (last route)"] = (time.perf_counter() - started) / (args.rounds * 10) * 1e6
+
+    print(f"{len(router.registrations)} routes, {len(updates)} sample callbacks\n")
+    for name, micros in timings.items():
+        print(f"{name:<30}{micros:8.2f} µs/update")
+
+    if mismatches:
+        print("\nRouted differently (longest prefix now wins):")
+        for data, old, new in mismatches:
+            print(f"  {data:<45} {old} -> {new}")
+
+
+if __name__ == "__main__":
+    main()
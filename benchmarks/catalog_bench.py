@@ -0,0 +1,115 @@
+"""
+Catalog browsing cost: the per-click queries the browse screens used to run
+versus the in-process catalog snapshot.
+
+Seeds bots across categories and replays browse sessions (category menu ->
+category page -> details -> buy options -> featured). Reports the time per
+session and the SQL statements each one sends, then how long the first
+session after an admin edit takes while the snapshot is rebuilt.
+
+    python -m benchmarks.catalog_bench --bots 300 --categories 12 --sessions 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def seed_bots(engine, count, categories, seed=7):
+    from database.models import Bot
+
+    rng = random.Random(seed)
+    rows = [{
+        "name": f"Bot {i:05d}", "slug": f"bot-{i}", "description": "Automates things. " * 8,
+        "features": "Feature one\nFeature two\nFeature three", "price": round(rng.uniform(10, 500), 2),
+        "category": f"category-{rng.randrange(categories)}", "delivery_time": "48 hours",
+        "is_available": rng.random() > 0.1, "is_featured": rng.random() < 0.05,
+    } for i in range(count)]
+    with engine.begin() as conn:
+        conn.execute(Bot.__table__.insert(), rows)
+
+
+def legacy_session(category, bot_id):
+    """What the handlers queried per click before the snapshot"""
+    from database.db import create_session
+    from database.models import Bot
+
+    db = create_session()
+    try:
+        categories = [c for (c,) in db.query(Bot.category).distinct().filter(Bot.is_available == True) if c]
+        for name in categories:
+            db.query(Bot).filter(Bot.category == name, Bot.is_available == True).count()
+        db.query(Bot).filter(Bot.category == category, Bot.is_available == True).all()
+        db.query(Bot).filter(Bot.id == bot_id).first()
+        db.query(Bot).filter(Bot.id == bot_id).first()
+        db.query(Bot).filter(Bot.is_featured == True, Bot.is_available == True).order_by(Bot.created_at.desc()).all()
+    finally:
+        db.close()
+
+
+def snapshot_session(category, bot_id, currency):
+    from services.bot_catalog import catalog_cache
+
+    view = catalog_cache.get().view(currency)
+    view.category_menu()
+    view.category_page(category)
+    view.details(bot_id)
+    view.buy_options(bot_id)
+    view.featured()
+
+
+def measure(label, sessions, run, statements):
+    before = len(statements)
+    started = time.perf_counter()
+    for args in sessions:
+        run(*args)
+    elapsed = time.perf_counter() - started
+    per_session = (len(statements) - before) / len(sessions)
+    print(f"{label:<22}{elapsed / len(sessions) * 1e6:>12.0f}us{per_session:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bots", type=int, default=300)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--sessions", type=int, default=2000, help="browse sessions per mode")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='catalog_bench_')}/bench.db"
+
+    from sqlalchemy import event
+    from database.db import Base, create_session, engine
+    from database.models import Bot
+    from services.bot_catalog import catalog_cache
+
+    Base.metadata.create_all(bind=engine)
+    seed_bots(engine, args.bots, args.categories)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    rng = random.Random(1)
+    currencies = ["USD", "GHS", "NGN", "KES"]
+    sessions = [(f"category-{rng.randrange(args.categories)}", rng.randint(1, args.bots), rng.choice(currencies))
+                for _ in range(args.sessions)]
+
+    print(f"{args.bots} bots in {args.categories} categories, {args.sessions} sessions\n")
+    print(f"{'mode':<22}{'per session':>14}{'statements':>14}")
+    measure("per-click queries", sessions, lambda c, b, _: legacy_session(c, b), statements)
+    catalog_cache.get()
+    measure("snapshot (warm)", sessions, snapshot_session, statements)
+
+    # An admin edit invalidates the snapshot; the next session rebuilds it
+    db = create_session()
+    db.query(Bot).filter(Bot.id == 1).first().is_featured = True
+    db.commit()
+    db.close()
+    measure("snapshot (after edit)", sessions[:1], snapshot_session, statements)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Concurrent writers against the engine profiles in database.db.make_engine.
+
+Each profile gets a fresh SQLite file seeded with users. Then --threads
+threads run for --seconds, each one a transaction after another the way
+the DB pool does: a read (the /start lookup and order count) or, for
+--write-ratio of them, a write (an order insert and the user's total_orders
+update). It reports committed transactions per second, p50/p95/p99
+latency, and how many failed with "database is locked".
+
+- default: SQLAlchemy's defaults - rollback journal, pysqlite's 5s busy wait
+- sqlite: the bot's profile - WAL, synchronous=NORMAL, busy_timeout, mmap, a sized pool
+
+With --postgres-url the same workload runs on that (empty, scratch)
+database with the default and postgresql profiles; its tables are dropped
+and recreated.
+
+    python -m benchmarks.db_profile_bench --threads 16 --seconds 10
+    python -m benchmarks.db_profile_bench --postgres-url postgresql+psycopg://bench@localhost/bench_scratch
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16, help="concurrent worker threads")
+    parser.add_argument("--seconds", type=float, default=10.0, help="run time per profile")
+    parser.add_argument("--users", type=int, default=5000, help="users to seed")
+    parser.add_argument("--write-ratio", type=float, default=0.3, help="share of transactions that write")
+    parser.add_argument("--postgres-url", help="also run on this scratch PostgreSQL database")
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+def seed(engine, users):
+    from database.models import Base, User
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"telegram_id": str(10_000_000 + i), "first_name": f"User {i}", "currency": "USD", "balance": 0.0,
+             "total_orders": 0}
+            for i in range(users)
+        ])
+
+
+def read(session, telegram_id):
+    from sqlalchemy import func
+    from database.models import Order, User
+
+    user = session.query(User).filter(User.telegram_id == telegram_id).first()
+    return session.query(func.count(Order.id)).filter(Order.user_id == user.id).scalar()
+
+
+def write(session, telegram_id, order_id):
+    from database.models import Order, User
+
+    user = session.query(User).filter(User.telegram_id == telegram_id).first()
+    session.add(Order(order_id=order_id, user_id=user.id, amount=9.99, status="pending_payment"))
+    user.total_orders = (user.total_orders or 0) + 1
+
+
+def worker(number, session_factory, args, stop, results):
+    from sqlalchemy.exc import OperationalError
+
+    rng = random.Random(number)
+    latencies, locked, errors, sequence = [], 0, 0, 0
+    while not stop.is_set():
+        telegram_id = str(10_000_000 + rng.randrange(args.users))
+        started = time.perf_counter()
+        session = session_factory()
+        try:
+            if rng.random() < args.write_ratio:
+                sequence += 1
+                write(session, telegram_id, f"BENCH-{number}-{sequence}")
+            else:
+                read(session, telegram_id)
+            session.commit()
+            latencies.append(time.perf_counter() - started)
+        except OperationalError as e:
+            session.rollback()
+            if "locked" in str(e) or "busy" in str(e):
+                locked += 1
+            else:
+                errors += 1
+        finally:
+            session.close()
+    results[number] = (latencies, locked, errors)
+
+
+def run_profile(url, profile, args):
+    from sqlalchemy.orm import sessionmaker
+    from database.db import make_engine
+
+    engine = make_engine(url, profile)
+    seed(engine, args.users)
+    engine.dispose()  # Start the run with an empty pool, as the bot does
+    session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    stop, results = threading.Event(), {}
+    threads = [threading.Thread(target=worker, args=(number, session_factory, args, stop, results))
+               for number in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    latencies = [latency for result in results.values() for latency in result[0]]
+    locked = sum(result[1] for result in results.values())
+    errors = sum(result[2] for result in results.values())
+    print(f"{profile:<12}{len(latencies) / elapsed:>10.0f}/s{percentile(latencies, 50):>10.1f}ms"
+          f"{percentile(latencies, 95):>10.1f}ms{percentile(latencies, 99):>10.1f}ms{locked:>10}{errors:>8}")
+
+
+def main():
+    args = parse_args()
+    print(f"{args.threads} threads, {args.write_ratio:.0%} writes, {args.seconds:.0f}s per profile\n")
+    header = f"{'profile':<12}{'commits':>12}{'p50':>12}{'p95':>12}{'p99':>12}{'locked':>10}{'other':>8}"
+
+    directory = tempfile.mkdtemp(prefix="db_profile_bench_")
+    print(f"SQLite ({directory})\n{header}")
+    for profile in ("default", "sqlite"):
+        run_profile(f"sqlite:///{directory}/{profile}.db", profile, args)
+
+    if args.postgres_url:
+        print(f"\nPostgreSQL\n{header}")
+        for profile in ("default", "postgresql"):
+            run_profile(args.postgres_url, profile, args)
+
+
+if __name__ == "__main__":
+    main()
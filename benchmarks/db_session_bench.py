@@ -0,0 +1,158 @@
+"""
+Handler latency with queries on the event loop vs on the DB thread pool.
+
+Fires a burst of simulated updates through the bot's update processor. Most
+of them load a "My Orders" page (user lookup, order count, keyset page) and
+then wait on a fake Telegram API call; the rest are light updates that never
+touch the database. A background writer keeps SQLite busy with short write
+transactions, and a heartbeat measures how long the event loop stalls.
+
+    python -m benchmarks.db_session_bench --updates 500 --orders 50000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=500, help="simulated updates per burst")
+    parser.add_argument("--orders", type=int, default=50000, help="orders to seed")
+    parser.add_argument("--light-every", type=int, default=5, help="every Nth update does no database work")
+    parser.add_argument("--api-latency", type=float, default=0.03, help="fake Telegram API call (seconds)")
+    parser.add_argument("--no-writer", action="store_true", help="don't run the background writer")
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+def load_orders(session, telegram_id):
+    from sqlalchemy import func
+    from sqlalchemy.orm import joinedload
+    from database.models import Order, User
+    from utils.pagination import paginate
+
+    user = session.query(User).filter(User.telegram_id == telegram_id).first()
+    total = session.query(func.count(Order.id)).filter(Order.user_id == user.id).scalar()
+    page = paginate(session.query(Order).options(joinedload(Order.bot)).filter(Order.user_id == user.id), Order)
+    return total, [order.order_id for order in page.items]
+
+
+async def inline_handler(telegram_id, api_latency):
+    """Before: the handler queries on the event loop"""
+    from database.db import create_session
+
+    db = create_session()
+    try:
+        load_orders(db, telegram_id)
+    finally:
+        db.close()
+    await asyncio.sleep(api_latency)
+
+
+async def pooled_handler(telegram_id, api_latency):
+    """After: the same queries through a request-scoped session on the DB pool"""
+    from database.db import db_session
+
+    async with db_session() as db:
+        await db.run(load_orders, telegram_id)
+    await asyncio.sleep(api_latency)
+
+
+async def light_handler(api_latency):
+    await asyncio.sleep(api_latency)
+
+
+async def burst(args, handler, users):
+    from config import CONCURRENT_UPDATES
+    from utils.update_processor import PerChatUpdateProcessor
+
+    processor = PerChatUpdateProcessor(CONCURRENT_UPDATES)
+    rng = random.Random(7)
+    latencies = {"db": [], "light": []}
+    lag = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lag.append(time.perf_counter() - started - 0.005)
+
+    async def timed(kind, coroutine, arrived):
+        await coroutine
+        latencies[kind].append(time.perf_counter() - arrived)
+
+    monitor = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.05)
+    arrived = time.perf_counter()
+    tasks = []
+    for i in range(args.updates):
+        if args.light_every and i % args.light_every == 0:
+            work = timed("light", light_handler(args.api_latency), arrived)
+        else:
+            work = timed("db", handler(str(rng.randint(10_000_000, 10_000_000 + users - 1)), args.api_latency), arrived)
+        tasks.append(asyncio.create_task(processor.process_update(None, work)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - arrived
+    done.set()
+    await monitor
+    return latencies, lag, elapsed
+
+
+def writer(engine, stop):
+    """Short write transactions on random orders, like payments and status changes"""
+    from sqlalchemy import update
+    from database.models import Order
+
+    rng = random.Random(11)
+    table = Order.__table__
+    while not stop.is_set():
+        with engine.begin() as conn:
+            conn.execute(update(table).where(table.c.id == rng.randint(1, 1000)).values(admin_notes="touched"))
+        time.sleep(0.002)
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='db_session_bench_')}/bench.db"
+
+    from benchmarks.query_plans import seed
+    from database.db import engine, shutdown_db_executor
+    from database.models import Base  # Through models, so every table is declared
+
+    Base.metadata.create_all(bind=engine)
+    seed(engine, args.orders)
+    users = max(1, args.orders // 10)
+
+    stop = threading.Event()
+    if not args.no_writer:
+        threading.Thread(target=writer, args=(engine, stop), daemon=True).start()
+
+    print(f"{'mode':<8}{'kind':<7}{'p50':>10}{'p99':>10}{'max':>10}   loop lag p99 / max    wall")
+    try:
+        for mode, handler in (("inline", inline_handler), ("pooled", pooled_handler)):
+            latencies, lag, elapsed = asyncio.run(burst(args, handler, users))
+            for kind, values in latencies.items():
+                if not values:
+                    continue
+                print(f"{mode:<8}{kind:<7}{percentile(values, 50):>8.1f}ms{percentile(values, 99):>8.1f}ms"
+                      f"{max(values) * 1000:>8.1f}ms   {percentile(lag, 99):>7.1f}ms / {max(lag) * 1000:>6.1f}ms"
+                      f"  {elapsed:5.2f}s")
+    finally:
+        stop.set()
+        shutdown_db_executor()
+
+
+if __name__ == "__main__":
+    main()
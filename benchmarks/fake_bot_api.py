@@ -0,0 +1,130 @@
+"""
+Minimal fake Telegram Bot API server for local benchmarks.
+
+Point a bot at it with `base_url=f"{api.url}/bot"`. Every method succeeds
+with a plausible payload; `latency` adds a per-request delay and
+`flood_every` answers every Nth sendMessage with a 429 RetryAfter.
+With `record_replies` it keeps the last text and inline keyboard sent to each
+chat, so a scripted user can press the buttons it was shown.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    # Default backlog of 5 drops connections under benchmark concurrency
+    request_queue_size = 1024
+    daemon_threads = True
+from urllib.parse import parse_qs
+
+
+class FakeBotAPI:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 flood_every: int = 0, retry_after: int = 1, record_replies: bool = False):
+        self.latency = latency
+        self.flood_every = flood_every
+        self.retry_after = retry_after
+        self.record_replies = record_replies
+        # chat_id -> (text, [callback_data of each inline button]) of the last message sent or edited
+        self.replies = {}
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.server = _Server((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _respond(self, method: str, params: dict):
+        with self.lock:
+            self.calls[method] += 1
+            count = self.calls[method]
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if method == "getMe":
+            return 200, {"id": 1, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+
+        if method == "sendMessage" and self.flood_every and count % self.flood_every == 0:
+            return 429, {
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }
+
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = params.get("chat_id", 0)
+            if self.record_replies:
+                self._record_reply(str(chat_id), params)
+            return 200, {
+                "message_id": count,
+                "date": int(time.time()),
+                "chat": {"id": int(chat_id) if str(chat_id).lstrip("-").isdigit() else 0, "type": "private"},
+                "text": params.get("text", ""),
+            }
+
+        return 200, True
+
+    def _record_reply(self, chat_id: str, params: dict):
+        markup = params.get("reply_markup") or {}
+        if isinstance(markup, str):
+            markup = json.loads(markup)
+        buttons = [
+            button["callback_data"]
+            for row in markup.get("inline_keyboard", [])
+            for button in row
+            if "callback_data" in button
+        ]
+        self.replies[chat_id] = (params.get("text", ""), buttons)
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                content_type = self.headers.get("Content-Type", "")
+                if "json" in content_type:
+                    params = json.loads(body or b"{}")
+                else:
+                    params = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+
+                method = self.path.rsplit("/", 1)[-1]
+                status, result = api._respond(method, params)
+                payload = result if status != 200 else {"ok": True, "result": result}
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,70 @@
+"""
+Minimal keep-alive HTTP/1.1 load client for the webhook benchmarks.
+
+httpx tops out at a few hundred requests/second per process, which would
+measure the client rather than the server. `post_many` keeps `concurrency`
+connections open and pipelines nothing: one request in flight per
+connection, like Telegram's and Paystack's webhook senders.
+
+Run it in a child process (`run_in_child`) so it doesn't share the GIL with
+the server under test. Timestamps are time.perf_counter(), which is the same
+monotonic clock in every process on Linux and macOS.
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# (path, body, headers, tag) - tag (e.g. an update_id) is echoed back with the send time
+Request = Tuple[str, bytes, Dict[str, str], Optional[object]]
+
+
+async def _read_response(reader: asyncio.StreamReader) -> int:
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    if length:
+        await reader.readexactly(length)
+    return status
+
+
+async def post_many(host: str, port: int, requests: List[Request], concurrency: int):
+    """POST every request; returns (latencies, statuses, {tag: send time})"""
+    pending = list(reversed(requests))
+    latencies, statuses, sent_at = [], [], {}
+
+    async def connection():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while pending:
+                path, body, headers, tag = pending.pop()
+                head = f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n"
+                head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+                started = time.perf_counter()
+                if tag is not None:
+                    sent_at[tag] = started
+                writer.write(head.encode() + b"\r\n" + body)
+                statuses.append(await _read_response(reader))
+                latencies.append(time.perf_counter() - started)
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(connection() for _ in range(min(concurrency, len(requests)))))
+    return latencies, statuses, sent_at
+
+
+def _post_many_sync(host, port, requests, concurrency):
+    return asyncio.run(post_many(host, port, requests, concurrency))
+
+
+async def run_in_child(host: str, port: int, requests: List[Request], concurrency: int):
+    """post_many() in a separate process, awaited from the server's loop"""
+    with ProcessPoolExecutor(1) as executor:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, _post_many_sync, host, port, requests, concurrency)
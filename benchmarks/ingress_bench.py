@@ -0,0 +1,186 @@
+"""
+Webhook ingress benchmark: replays Telegram updates and signed Paystack
+events over HTTP into the real application, as in webhook mode.
+
+Telegram updates are menu button presses from seeded users (or the updates
+recorded in --updates-file, one JSON update per line); Paystack events are
+charge.success for seeded orders. Reports the HTTP acknowledgement latency,
+the time until the application has finished handling each update, and the
+overall throughput. Bot API calls go to a local fake.
+
+    python -m benchmarks.ingress_bench --updates 2000 --paystack 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SECRET_TOKEN = "bench-secret"
+PAYSTACK_SECRET = "sk_test_bench"
+CALLBACKS = ("menu_main", "my_orders", "job_board", "featured_bots", "about")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=2000, help="Telegram updates to replay")
+    parser.add_argument("--paystack", type=int, default=200, help="Paystack events to replay")
+    parser.add_argument("--orders", type=int, default=20000, help="orders to seed")
+    parser.add_argument("--concurrency", type=int, default=50, help="requests in flight")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake Bot API latency (seconds)")
+    parser.add_argument("--updates-file", help="JSONL of recorded Telegram updates to replay instead")
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+def synthetic_updates(count, users):
+    rng = random.Random(3)
+    now = int(time.time())
+    for i in range(count):
+        user_id = 10_000_000 + rng.randrange(users)
+        user = {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"}
+        yield {
+            "update_id": i + 1,
+            "callback_query": {
+                "id": str(i + 1), "from": user, "chat_instance": str(user_id), "data": rng.choice(CALLBACKS),
+                "message": {"message_id": 1, "date": now, "chat": {"id": user_id, "type": "private"},
+                            "from": {"id": 1, "is_bot": True, "first_name": "FakeBot"}, "text": "Menu"},
+            },
+        }
+
+
+def recorded_updates(path, count):
+    with open(path) as f:
+        updates = [json.loads(line) for line in f if line.strip()]
+    for i in range(count):
+        update = dict(updates[i % len(updates)])
+        update["update_id"] = i + 1
+        yield update
+
+
+def paystack_events(count, orders):
+    rng = random.Random(5)
+    for _ in range(count):
+        reference = f"ORD{rng.randrange(orders)}"
+        body = json.dumps({"event": "charge.success",
+                           "data": {"reference": reference, "amount": 150000, "status": "success"}}).encode()
+        signature = hmac.new(PAYSTACK_SECRET.encode(), body, hashlib.sha512).hexdigest()
+        yield body, signature
+
+
+async def replay(args, users):
+    import contextlib
+    import io
+    import warnings
+
+    from telegram import Update
+    from telegram.ext import TypeHandler
+
+    from application import create_application
+    from benchmarks.http_client import run_in_child
+    from config import TELEGRAM_WEBHOOK_PATH, PAYSTACK_WEBHOOK_PATH
+    from ingress import IngressServer
+    from services.inbound_events import inbound_consumer
+
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        application = create_application()
+
+    if args.updates_file:
+        updates = list(recorded_updates(args.updates_file, args.updates))
+    else:
+        updates = list(synthetic_updates(args.updates, users))
+    events = list(paystack_events(args.paystack, args.orders))
+
+    handled = {}
+    all_handled = asyncio.Event()
+
+    async def record(update, context):
+        handled[update.update_id] = time.perf_counter()
+        if len(handled) == len(updates):
+            all_handled.set()
+
+    # Last group: runs once the update's real handler has finished
+    application.add_handler(TypeHandler(Update, record), group=99)
+
+    await application.initialize()
+    await application.start()
+    inbound_consumer.start()
+    server = await IngressServer(application.bot, application.update_queue, SECRET_TOKEN).start("127.0.0.1", 0)
+
+    requests = [
+        (TELEGRAM_WEBHOOK_PATH, json.dumps(update).encode(),
+         {"X-Telegram-Bot-Api-Secret-Token": SECRET_TOKEN, "Content-Type": "application/json"},
+         ("telegram", update["update_id"]))
+        for update in updates
+    ] + [
+        (PAYSTACK_WEBHOOK_PATH, body, {"X-Paystack-Signature": signature, "Content-Type": "application/json"},
+         ("paystack", i))
+        for i, (body, signature) in enumerate(events)
+    ]
+    random.Random(9).shuffle(requests)
+
+    started = time.perf_counter()
+    latencies, statuses, sent = await run_in_child("127.0.0.1", server.port, requests, args.concurrency)
+    acked = time.perf_counter() - started
+    failures = [status for status in statuses if status != 200]
+    try:
+        await asyncio.wait_for(all_handled.wait(), 120)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - started
+
+    await server.stop()
+    await inbound_consumer.stop()
+    await application.stop()
+    await application.shutdown()
+
+    sent_at = {tag[1]: when for tag, when in sent.items() if tag[0] == "telegram"}
+    to_handled = [handled[i] - sent_at[i] for i in handled if i in sent_at]
+    print(f"telegram updates: {len(updates)} ({len(handled)} handled), paystack events: {len(events)}, "
+          f"non-200: {len(failures)}\n")
+    print(f"{'':<22}{'p50':>10}{'p99':>10}{'max':>10}")
+    for name, values in (("ack", latencies), ("update handled", to_handled)):
+        if values:
+            print(f"{name:<22}{percentile(values, 50):>8.1f}ms{percentile(values, 99):>8.1f}ms"
+                  f"{max(values) * 1000:>8.1f}ms")
+    total = len(updates) + len(events)
+    print(f"\nall acknowledged in {acked:.2f}s ({total / acked:.0f} req/s), "
+          f"all handled in {elapsed:.2f}s ({len(handled) / elapsed:.0f} updates/s)")
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='ingress_bench_')}/bench.db"
+    os.environ["TELEGRAM_TOKEN"] = "123456:benchmark"
+    os.environ["PAYSTACK_SECRET_KEY"] = PAYSTACK_SECRET
+    os.environ["SUPER_ADMIN_ID"] = "1"
+
+    from benchmarks.fake_bot_api import FakeBotAPI
+
+    with FakeBotAPI(latency=args.latency) as api:
+        os.environ["TELEGRAM_API_URL"] = f"{api.url}/bot"
+
+        from benchmarks.query_plans import seed
+        from database.db import engine
+        from database.models import Base  # Through models, so every table is declared
+
+        Base.metadata.create_all(bind=engine)
+        seed(engine, args.orders)
+        asyncio.run(replay(args, max(1, args.orders // 10)))
+        print(f"api calls: {dict(api.calls)}")
+
+
+if __name__ == "__main__":
+    main()
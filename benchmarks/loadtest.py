@@ -0,0 +1,526 @@
+"""
+Synthetic-traffic load test of the whole bot.
+
+Builds the real application (application.create_application: every handler,
+the per-chat update processor, persistence, outbox, metrics), points it at the
+fake Bot API and the Paystack stub, and has --users virtual users replay
+scripted journeys against it. Each step is an Update injected the way polling
+or the webhook would hand it over; buttons are pressed from the keyboard the
+bot last sent to that chat, so a journey only gets as far as the bot lets it.
+
+Journeys (weights set with --mix):
+  onboarding       /start as a new user, pick a currency, open the main menu
+  browse           catalog -> category -> bot details
+  buy              catalog -> bot -> Paystack checkout -> verify payment
+  post_job         the job posting conversation, through to confirmation
+  developer_claim  /developer, available orders, /claim an approved order
+  admin_approval   /admin -> pending jobs -> review -> approve
+
+Reports updates/s, p50/p95/p99 update latency, SQL statements and latency per
+journey, the handlers that cost the most and peak RSS. The JSON result
+(--output, by default benchmarks/results/) carries the commit it was run on;
+pass an earlier result to --compare to print the differences.
+
+    python -m benchmarks.loadtest --duration 30 --users 50 --rate 200
+    python -m benchmarks.loadtest --compare benchmarks/results/loadtest-<commit>-<time>.json
+"""
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import io
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO)
+
+TOKEN = "123456:loadtest"
+SUPER_ADMIN = 900_000
+CUSTOMER_BASE = 1_000_000
+ADMIN_BASE = 2_000_000
+DEVELOPER_BASE = 3_000_000
+NEW_USER_BASE = 5_000_000
+
+DEFAULT_MIX = "onboarding=15,browse=30,buy=20,post_job=15,developer_claim=10,admin_approval=10"
+
+# [SQL statements, updates] of the journey in progress
+_journey = contextvars.ContextVar('journey', default=None)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000 if values else 0.0
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class ErrorCounter(logging.Handler):
+    """Errors the bot logged, per logger - the details go to the run's log file"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.counts = Counter()
+
+    def emit(self, record):
+        self.counts[record.name] += 1
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+# ---------- test data ----------
+
+def seed(args):
+    """Catalog, users with a role each, and pools of work for the admin and developer journeys"""
+    from database.db import create_session
+    from database.models import (
+        Bot, Developer, DeveloperStatus, Job, JobStatus, Order, OrderStatus, PaymentMethod,
+        PaymentStatus, User,
+    )
+
+    rng = random.Random(21)
+    categories = ["Telegram Bots", "Trading Bots", "E-commerce", "Customer Support", "Automation"]
+    db = create_session()
+    try:
+        bots = [
+            Bot(name=f"{category} Bot {i}", slug=f"loadtest-{n}", category=category, price=round(rng.uniform(50, 900), 2),
+                description=f"Ready-made {category.lower()} bot number {i}", features="Dashboard\nPayments\nReports",
+                delivery_time="3-5 days", is_available=True)
+            for n, (category, i) in enumerate((c, i) for c in categories for i in range(args.bots // len(categories)))
+        ]
+        db.add_all(bots)
+
+        def user(telegram_id, name, **flags):
+            return User(telegram_id=str(telegram_id), username=name, first_name=name,
+                        email=f"{name}@loadtest.example", country='US', currency='USD', currency_symbol='$', **flags)
+
+        customers = [user(CUSTOMER_BASE + i, f"customer{i}") for i in range(args.users)]
+        admins = [user(ADMIN_BASE + i, f"admin{i}", is_admin=True) for i in range(args.users)]
+        developers = [user(DEVELOPER_BASE + i, f"developer{i}", is_developer=True) for i in range(args.users)]
+        db.add_all(customers + admins + developers)
+        db.flush()
+
+        db.add_all(Developer(user_id=dev.id, developer_id=f"LTDEV{i:05d}", status=DeveloperStatus.ACTIVE,
+                             is_available=True, skills="python, telegram")
+                   for i, dev in enumerate(developers))
+        db.add_all(Job(job_id=f"LTJOB{i:06d}", user_id=rng.choice(customers).id, status=JobStatus.PENDING_APPROVAL,
+                       title=f"Inventory bot for shop {i}", category="Telegram Bot Development",
+                       description="Track stock levels, alert on low inventory and export weekly reports.",
+                       budget=round(rng.uniform(100, 2000), 2), is_public=False)
+                   for i in range(args.pool))
+        db.add_all(Order(order_id=f"LTORD{i:06d}", user_id=rng.choice(customers).id, bot_id=rng.choice(bots).id,
+                         amount=round(rng.uniform(50, 900), 2), status=OrderStatus.APPROVED,
+                         payment_method=PaymentMethod.PAYSTACK, payment_status=PaymentStatus.VERIFIED)
+                   for i in range(args.pool))
+        db.commit()
+    finally:
+        db.close()
+
+
+# ---------- traffic ----------
+
+class JourneyFailed(Exception):
+    pass
+
+
+class Harness:
+    """Turns journey steps into Updates and feeds them to the application"""
+
+    def __init__(self, application, api, args):
+        from services.broadcast_service import TokenBucket
+
+        self.application = application
+        self.api = api
+        self.bucket = TokenBucket(args.rate, max(1, args.rate // 10)) if args.rate else None
+        self.update_id = 0
+        self.next_new_user = NEW_USER_BASE
+        self.latencies = []
+        self.jobs = [f"LTJOB{i:06d}" for i in range(args.pool)]
+        self.orders = [f"LTORD{i:06d}" for i in range(args.pool)]
+
+    def _user(self, uid):
+        return {"id": uid, "is_bot": False, "first_name": f"User {uid}", "username": f"user{uid}"}
+
+    def _message(self, uid, text):
+        message = {"message_id": self.update_id, "date": int(time.time()), "text": text,
+                   "chat": {"id": uid, "type": "private"}, "from": self._user(uid)}
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+        return message
+
+    async def send(self, uid, payload):
+        from telegram import Update
+
+        if self.bucket:
+            await self.bucket.acquire()
+        self.update_id += 1
+        update = Update.de_json({"update_id": self.update_id, **payload}, self.application.bot)
+        started = time.perf_counter()
+        await self.application.update_processor.process_update(update, self.application.process_update(update))
+        self.latencies.append(time.perf_counter() - started)
+        _journey.get()[1] += 1
+
+    async def message(self, uid, text):
+        await self.send(uid, {"message": self._message(uid, text)})
+
+    async def callback(self, uid, data):
+        message = self._message(uid, self.reply(uid)[0] or "menu")
+        message["from"] = {"id": 1, "is_bot": True, "first_name": "FakeBot"}
+        await self.send(uid, {"callback_query": {"id": str(self.update_id), "from": self._user(uid),
+                                                 "chat_instance": str(uid), "data": data, "message": message}})
+
+    async def press(self, uid, prefix, rng):
+        """Press a button the bot last showed this chat whose callback data starts with prefix"""
+        text, buttons = self.reply(uid)
+        matching = [data for data in buttons if data.startswith(prefix)]
+        if not matching:
+            raise JourneyFailed(f"no '{prefix}' button after: {text[:60]!r} {buttons[:8]}")
+        await self.callback(uid, rng.choice(matching))
+
+    def reply(self, uid):
+        return self.api.replies.get(str(uid), ("", []))
+
+    def expect(self, uid, *fragments):
+        text = self.reply(uid)[0]
+        if not any(fragment in text for fragment in fragments):
+            raise JourneyFailed(f"expected {fragments[0]!r}, got: {text[:80]!r}")
+
+
+async def onboarding(h, vu, rng):
+    uid = h.next_new_user
+    h.next_new_user += 1
+    await h.message(uid, "/start")
+    await h.press(uid, "country_US_USD", rng)
+    await h.press(uid, "menu_main", rng)
+
+
+async def browse(h, vu, rng):
+    uid = CUSTOMER_BASE + vu
+    await h.message(uid, "/menu")
+    await h.press(uid, "buy_bot", rng)
+    await h.press(uid, "category_", rng)
+    await h.press(uid, "view_bot_", rng)
+
+
+async def buy(h, vu, rng):
+    uid = CUSTOMER_BASE + vu
+    await h.message(uid, "/menu")
+    await h.press(uid, "buy_bot", rng)
+    await h.press(uid, "category_", rng)
+    await h.press(uid, "view_bot_", rng)
+    await h.press(uid, "buy_options_", rng)
+    await h.press(uid, "paystack_bot_", rng)
+    await h.press(uid, "verify_payment_", rng)
+
+
+async def post_job(h, vu, rng):
+    uid = CUSTOMER_BASE + vu
+    await h.message(uid, "/menu")
+    await h.press(uid, "post_job", rng)
+    await h.message(uid, f"Telegram bot for my bakery #{rng.randint(1, 9999)}")
+    await h.message(uid, "Customers order cakes in chat, pay a deposit and get reminders the day before pickup.")
+    await h.message(uid, "Fewer missed pickups and no more phone orders")
+    await h.message(uid, str(rng.randint(150, 1500)))
+    await h.message(uid, "2 weeks")
+    await h.press(uid, "job_category_", rng)
+    await h.press(uid, "confirm_job_post", rng)
+
+
+async def developer_claim(h, vu, rng):
+    if not h.orders:
+        return False
+    uid = DEVELOPER_BASE + vu
+    await h.message(uid, "/developer")
+    await h.press(uid, "dev_available_orders", rng)
+    order_id = h.orders.pop()
+    await h.message(uid, f"/claim {order_id}")
+    h.expect(uid, "claimed successfully")
+
+
+async def admin_approval(h, vu, rng):
+    if not h.jobs:
+        return False
+    uid = ADMIN_BASE + vu
+    await h.message(uid, "/admin")
+    await h.press(uid, "admin_job_management", rng)
+    await h.press(uid, "admin_jobs_pending_list", rng)
+    await h.callback(uid, f"admin_review_job_{h.jobs.pop()}")
+    await h.press(uid, "admin_approve_job_", rng)
+
+
+JOURNEYS = {
+    'onboarding': onboarding,
+    'browse': browse,
+    'buy': buy,
+    'post_job': post_job,
+    'developer_claim': developer_claim,
+    'admin_approval': admin_approval,
+}
+
+
+class JourneyStats:
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.durations = []
+        self.statements = []
+        self.updates = []
+        self.errors = Counter()
+
+    def summary(self):
+        runs = len(self.durations) or 1
+        return {
+            'completed': self.completed, 'failed': self.failed, 'skipped': self.skipped,
+            'p50_ms': round(percentile(self.durations, 50), 1), 'p95_ms': round(percentile(self.durations, 95), 1),
+            'sql_per_journey': round(sum(self.statements) / runs, 1),
+            'updates_per_journey': round(sum(self.updates) / runs, 1),
+            'errors': dict(self.errors.most_common(5)),
+        }
+
+
+async def virtual_user(h, vu, mix, stats, deadline):
+    rng = random.Random(vu)
+    names, weights = zip(*mix.items())
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        counter = [0, 0]
+        token = _journey.set(counter)
+        started = time.perf_counter()
+        try:
+            if await JOURNEYS[name](h, vu, rng) is False:
+                stats[name].skipped += 1
+                await asyncio.sleep(0)
+                continue
+            stats[name].completed += 1
+        except JourneyFailed as e:
+            stats[name].failed += 1
+            stats[name].errors[str(e)] += 1
+        finally:
+            _journey.reset(token)
+        stats[name].durations.append(time.perf_counter() - started)
+        stats[name].statements.append(counter[0])
+        stats[name].updates.append(counter[1])
+
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _journey.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+async def run(args, api, stub, mix, errors):
+    from sqlalchemy import event
+
+    import application as bot_app
+    from database.db import engine
+    from services.metrics import metrics
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        app = bot_app.create_application()
+        await app.initialize()
+        await app.post_init(app)
+        await app.start()
+
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    harness = Harness(app, api, args)
+    stats = defaultdict(JourneyStats)
+    api.calls.clear()
+    print(f"{args.users} virtual users for {args.duration:.0f}s, "
+          f"{f'{args.rate} updates/s' if args.rate else 'unpaced'}, "
+          f"Bot API {args.api_latency * 1000:.0f}ms, Paystack {args.paystack_latency * 1000:.0f}ms\n")
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(virtual_user(harness, vu, mix, stats, deadline) for vu in range(args.users)))
+    elapsed = time.perf_counter() - started
+    event.remove(engine, 'before_cursor_execute', count_statement)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        await app.stop()
+        await app.shutdown()
+        await app.post_shutdown(app)
+
+    latencies = harness.latencies
+    handlers = sorted(metrics.handlers.items(), key=lambda item: item[1].latency.sum, reverse=True)
+    return {
+        'commit': git_commit(),
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'args': {name: value for name, value in vars(args).items() if name not in ('output', 'compare')},
+        'elapsed_s': round(elapsed, 2),
+        'updates': len(latencies),
+        'updates_per_s': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 1), 'p95': round(percentile(latencies, 95), 1),
+            'p99': round(percentile(latencies, 99), 1), 'max': round(max(latencies, default=0) * 1000, 1),
+        },
+        'journeys': {name: stats[name].summary() for name in mix if name in stats},
+        'handlers': [
+            {
+                'handler': name, 'count': totals.latency.count,
+                'mean_ms': round(totals.latency.mean * 1000, 1),
+                'p95_ms': round(totals.latency.quantile(0.95) * 1000, 1),
+                'sql_per_update': round(totals.statements / max(totals.latency.count, 1), 1),
+                'api_per_update': round(totals.api_calls / max(totals.latency.count, 1), 1),
+                'errors': totals.errors,
+            }
+            for name, totals in handlers[:15]
+        ],
+        'bot_api_calls': dict(api.calls.most_common()),
+        'paystack_calls': dict(stub.calls),
+        'logged_errors': dict(errors.counts.most_common()),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+# ---------- reporting ----------
+
+def print_report(result):
+    latency = result['latency_ms']
+    print(f"{result['updates']} updates in {result['elapsed_s']}s: {result['updates_per_s']} updates/s")
+    print(f"update latency p50 {latency['p50']}ms · p95 {latency['p95']}ms · p99 {latency['p99']}ms"
+          f" · max {latency['max']}ms")
+    print(f"peak RSS {result['peak_rss_mb']} MB\n")
+
+    print(f"{'journey':<18}{'done':>7}{'failed':>8}{'skipped':>9}{'p50':>10}{'p95':>10}{'SQL':>8}{'updates':>9}")
+    for name, journey in result['journeys'].items():
+        print(f"{name:<18}{journey['completed']:>7}{journey['failed']:>8}{journey['skipped']:>9}"
+              f"{journey['p50_ms']:>8.0f}ms{journey['p95_ms']:>8.0f}ms{journey['sql_per_journey']:>8.1f}"
+              f"{journey['updates_per_journey']:>9.1f}")
+        for error, count in journey['errors'].items():
+            print(f"   ❌ {count}× {error}")
+
+    print(f"\n{'handler (by total time)':<58}{'count':>7}{'mean':>9}{'p95':>9}{'SQL':>6}{'API':>6}")
+    for handler in result['handlers'][:10]:
+        name = handler['handler'][len("handlers."):] if handler['handler'].startswith("handlers.") else handler['handler']
+        print(f"{name[:57]:<58}{handler['count']:>7}{handler['mean_ms']:>7.1f}ms{handler['p95_ms']:>7.0f}ms"
+              f"{handler['sql_per_update']:>6.1f}{handler['api_per_update']:>6.1f}"
+              + (f"  ❌ {handler['errors']}" if handler['errors'] else ""))
+
+    print("\nBot API calls: " + ", ".join(f"{method} {count}" for method, count in result['bot_api_calls'].items()))
+    if result['paystack_calls']:
+        print("Paystack calls: " + ", ".join(f"{path} {count}" for path, count in result['paystack_calls'].items()))
+    if result['logged_errors']:
+        print("⚠️ Errors logged: " + ", ".join(f"{name} {count}" for name, count in result['logged_errors'].items()))
+
+
+def _delta(label, before, after, unit="", lower_is_better=True):
+    if not before:
+        return f"{label:<34}{before:>10}{unit}{after:>10}{unit}"
+    change = (after - before) / before * 100
+    better = change < 0 if lower_is_better else change > 0
+    mark = "" if abs(change) < 5 else (" ✅" if better else " ⚠️")
+    return f"{label:<34}{before:>10}{unit}{after:>10}{unit}{change:>+9.1f}%{mark}"
+
+
+def print_comparison(baseline, result):
+    print(f"\ncompared with {baseline['commit']} ({baseline['started_at']})")
+    print(f"{'':<34}{'before':>10}{'after':>10}{'change':>10}")
+    print(_delta("updates/s", baseline['updates_per_s'], result['updates_per_s'], lower_is_better=False))
+    for pct in ('p50', 'p95', 'p99'):
+        print(_delta(f"update latency {pct} (ms)", baseline['latency_ms'][pct], result['latency_ms'][pct]))
+    print(_delta("peak RSS (MB)", baseline['peak_rss_mb'], result['peak_rss_mb']))
+    for name, journey in result['journeys'].items():
+        before = baseline['journeys'].get(name)
+        if before:
+            print(_delta(f"{name} SQL/journey", before['sql_per_journey'], journey['sql_per_journey']))
+            print(_delta(f"{name} p95 (ms)", before['p95_ms'], journey['p95_ms']))
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in JOURNEYS:
+            raise argparse.ArgumentTypeError(f"unknown journey '{name}' (one of {', '.join(JOURNEYS)})")
+        mix[name.strip()] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of traffic")
+    parser.add_argument("--users", type=int, default=50, help="virtual users running journeys at once")
+    parser.add_argument("--rate", type=int, default=200, help="updates per second across all users (0: unpaced)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"journey weights (default {DEFAULT_MIX})")
+    parser.add_argument("--api-latency", type=float, default=0.02, help="seconds per fake Bot API call")
+    parser.add_argument("--paystack-latency", type=float, default=0.05, help="seconds per Paystack stub call")
+    parser.add_argument("--bots", type=int, default=100, help="bots in the catalog")
+    parser.add_argument("--pool", type=int, default=5000, help="pending jobs and approved orders to work through")
+    parser.add_argument("--output", help="where to save the JSON result")
+    parser.add_argument("--compare", help="an earlier JSON result to compare with")
+    args = parser.parse_args()
+    if isinstance(args.mix, str):
+        args.mix = parse_mix(args.mix)
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    # Some handlers open "software_marketplace.db" relative to the working directory
+    workdir = tempfile.mkdtemp(prefix='loadtest_')
+    os.chdir(workdir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/software_marketplace.db"
+    os.environ["TELEGRAM_TOKEN"] = TOKEN
+    os.environ["SUPER_ADMIN_ID"] = str(SUPER_ADMIN)
+    os.environ["METRICS_PORT"] = "0"
+    os.environ["PAYSTACK_SECRET_KEY"] = "sk_test_loadtest"
+    os.environ.setdefault("BROADCAST_GLOBAL_RATE", "1000")
+    errors = ErrorCounter()
+    logging.basicConfig(filename=os.path.join(workdir, "bot.log"), level=logging.WARNING,
+                        format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    logging.getLogger().addHandler(errors)
+
+    from benchmarks.fake_bot_api import FakeBotAPI
+    from benchmarks.paystack_stub import PaystackStub
+
+    with FakeBotAPI(latency=args.api_latency, record_replies=True) as api, \
+            PaystackStub(latency=args.paystack_latency) as stub:
+        os.environ["TELEGRAM_API_URL"] = f"{api.url}/bot"
+        os.environ["PAYSTACK_BASE_URL"] = stub.url
+
+        from database.db import Base, engine
+
+        Base.metadata.create_all(bind=engine)
+        seed(args)
+        mix = args.mix
+        args.mix = ",".join(f"{name}={weight:g}" for name, weight in mix.items())
+        result = asyncio.run(run(args, api, stub, mix, errors))
+
+    print_report(result)
+    if baseline:
+        print_comparison(baseline, result)
+
+    if not output:
+        results = os.path.join(REPO, "benchmarks", "results")
+        os.makedirs(results, exist_ok=True)
+        output = os.path.join(results, f"loadtest-{result['commit']}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nsaved {output} (bot log: {os.path.join(workdir, 'bot.log')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Notification cost inside handlers: sending inline versus queueing in the outbox.
+
+Simulates handlers that commit a state change and notify the admin (and a
+customer) against a fake Bot API with per-call latency. Inline, the handler
+waits for each sendMessage; with the outbox it only adds rows to its
+transaction, and the dispatcher sends them afterwards, merging what piles up
+for one chat into digests. Reports handler latency, the time until every
+message was delivered and the number of Bot API calls.
+
+    python -m benchmarks.outbox_bench --handlers 500 --concurrency 50 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ADMIN_CHAT = "1"
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000 if values else 0.0
+
+
+def commit_change(i, queue: bool):
+    """A handler's DB work: one row changed, plus the notifications when queueing"""
+    from database.db import create_session
+    from database.models import User
+    from services.outbox import enqueue
+
+    db = create_session()
+    try:
+        db.add(User(telegram_id=f"bench-{queue}-{i}", first_name=f"Customer {i}"))
+        if queue:
+            enqueue(db, ADMIN_CHAT, f"💰 Payment verified for order {i}")
+            enqueue(db, str(1000 + i), f"✅ Your order {i} is confirmed")
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run_mode(mode, bot, api, args):
+    from database.db import run_sync
+    from services.outbox import outbox_dispatcher, queue_stats
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    calls_before = api.calls["sendMessage"]
+
+    async def handler(i):
+        async with semaphore:
+            started = time.perf_counter()
+            if mode == "inline":
+                await run_sync(commit_change, i, False)
+                await bot.send_message(chat_id=ADMIN_CHAT, text=f"💰 Payment verified for order {i}")
+                await bot.send_message(chat_id=str(1000 + i), text=f"✅ Your order {i} is confirmed")
+            else:
+                await run_sync(commit_change, i, True)
+            latencies.append(time.perf_counter() - started)
+
+    if mode == "outbox":
+        outbox_dispatcher.start(bot)
+    started = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(args.handlers)))
+    handled = time.perf_counter() - started
+    if mode == "outbox":
+        while (await run_sync(queue_stats))['pending']:
+            await asyncio.sleep(0.01)
+        await outbox_dispatcher.stop()
+    delivered = time.perf_counter() - started
+
+    print(f"{mode:<8}{percentile(latencies, 50):>10.1f}ms{percentile(latencies, 99):>10.1f}ms"
+          f"{handled:>10.2f}s{delivered:>11.2f}s{api.calls['sendMessage'] - calls_before:>10}")
+
+
+async def run(args, api):
+    from telegram import Bot
+    from telegram.request import HTTPXRequest
+
+    bot = Bot("123456:benchmark", base_url=f"{api.url}/bot",
+              request=HTTPXRequest(connection_pool_size=args.concurrency))
+    async with bot:
+        print(f"{args.handlers} handlers, 2 notifications each, {args.latency * 1000:.0f}ms per Bot API call\n")
+        print(f"{'mode':<8}{'handler p50':>12}{'handler p99':>12}{'handled':>11}{'delivered':>12}{'API calls':>10}")
+        for mode in ("inline", "outbox"):
+            await run_mode(mode, bot, api, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--handlers", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50, help="handlers running at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake Bot API call")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='outbox_bench_')}/bench.db"
+    # Per-chat spacing isn't what is measured here
+    os.environ.setdefault("BROADCAST_GLOBAL_RATE", "1000")
+
+    from benchmarks.fake_bot_api import FakeBotAPI
+    from database.db import Base, engine, shutdown_db_executor
+
+    Base.metadata.create_all(bind=engine)
+    with FakeBotAPI(latency=args.latency) as api:
+        asyncio.run(run(args, api))
+    shutdown_db_executor()
+
+
+if __name__ == "__main__":
+    main()
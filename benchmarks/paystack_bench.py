@@ -0,0 +1,83 @@
+"""
+Event-loop latency while 100 Paystack verifications run concurrently.
+
+Compares the blocking PaystackService (called directly in a coroutine, as
+the handlers used to) with AsyncPaystackService, for distinct references
+and for 100 `/verify` calls on the same reference (single-flight).
+
+    python -m benchmarks.paystack_bench --concurrency 100 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005):
+    """Sample how late a 5ms sleep wakes up - i.e. how long the loop was blocked"""
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+    return lags
+
+
+async def run_case(name, verify, references):
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(measure_loop_lag(stop))
+    await asyncio.sleep(0.02)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify(ref) for ref in references))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    lags = sorted(await monitor)
+    ok = sum(1 for success, _ in results if success)
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+    print(f"{name:<28} ok={ok:<4} wall={elapsed * 1000:8.1f}ms  "
+          f"loop lag max={max(lags or [0]) * 1000:8.1f}ms p99={p99 * 1000:7.1f}ms "
+          f"mean={statistics.mean(lags or [0]) * 1000:6.2f}ms")
+
+
+async def main_async(args, stub):
+    from services.paystack_service import PaystackService, AsyncPaystackService
+
+    sync_client = PaystackService()
+    async_client = AsyncPaystackService(pool_size=args.concurrency)
+
+    async def blocking_verify(reference):
+        return sync_client.verify_transaction(reference)
+
+    distinct = [f"REF{i}" for i in range(args.concurrency)]
+    same = ["REFSAME"] * args.concurrency
+
+    await run_case("blocking (requests)", blocking_verify, distinct)
+    await run_case("async, distinct refs", async_client.verify_transaction, distinct)
+    before = stub.calls["transaction"]
+    await run_case("async, same ref", async_client.verify_transaction, same)
+    print(f"upstream calls for {args.concurrency} same-ref verifies: {stub.calls['transaction'] - before}")
+    await async_client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub response latency (seconds)")
+    args = parser.parse_args()
+
+    from benchmarks.paystack_stub import PaystackStub
+
+    with PaystackStub(latency=args.latency) as stub:
+        os.environ["PAYSTACK_BASE_URL"] = stub.url
+        os.environ.setdefault("PAYSTACK_SECRET_KEY", "sk_test_benchmark")
+        asyncio.run(main_async(args, stub))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Paystack webhook throughput: applying each event inside the request versus
+storing it in the inbox and applying it in batches afterwards.
+
+Generates signed charge.success payloads for seeded orders, resends a share
+of them the way Paystack retries a delivery, and posts them all over HTTP.
+Reports the acknowledgement latency, request throughput, and the time until
+every event has been applied to the orders. Notifications go to a local
+fake Bot API.
+
+    python -m benchmarks.paystack_inbox_bench --events 2000 --duplicates 0.3 --concurrency 50
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAYSTACK_SECRET = "sk_test_bench"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000, help="distinct events to deliver")
+    parser.add_argument("--duplicates", type=float, default=0.3, help="share of events delivered twice")
+    parser.add_argument("--orders", type=int, default=20000, help="orders to seed")
+    parser.add_argument("--concurrency", type=int, default=50, help="requests in flight")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake Bot API latency (seconds)")
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+def signed_payloads(count, duplicates, orders, first_id, seed=1):
+    """(body, signature) pairs for `count` charge.success events, a share of them resent"""
+    rng = random.Random(seed)
+    payloads = []
+    for i, order in enumerate(rng.sample(range(orders), count)):
+        body = json.dumps({
+            "event": "charge.success",
+            "data": {"id": first_id + i, "reference": f"ORD{order}", "amount": 150000,
+                     "currency": "NGN", "status": "success", "paid_at": "2024-01-01T12:00:00.000Z"},
+        }).encode()
+        payloads.append((body, hmac.new(PAYSTACK_SECRET.encode(), body, hashlib.sha512).hexdigest()))
+    retries = rng.sample(payloads, int(count * duplicates))
+    deliveries = payloads + retries
+    rng.shuffle(deliveries)
+    return deliveries
+
+
+def unapplied(references):
+    from database.db import create_session
+    from database.models import Order, OrderStatus
+
+    db = create_session()
+    try:
+        return db.query(Order).filter(
+            Order.order_id.in_(references), Order.status != OrderStatus.PENDING_REVIEW
+        ).count()
+    finally:
+        db.close()
+
+
+async def run_mode(mode, bot, deliveries, args):
+    from benchmarks.http_client import run_in_child
+    from config import PAYSTACK_WEBHOOK_PATH
+    from database.db import run_sync
+    from ingress import IngressServer
+    from services.inbound_events import inbound_consumer
+    from services.outbox import outbox_dispatcher
+    from services.paystack_service import paystack
+    from services.paystack_webhook import apply_paystack_event
+
+    class InlineIngress(IngressServer):
+        """Before: every delivery, retries included, is applied and notified inside the request"""
+
+        async def _paystack_event(self, request):
+            if not paystack.validate_webhook(request.body, request.headers.get('x-paystack-signature', '')):
+                return 401, None
+            notification = await run_sync(apply_paystack_event, json.loads(request.body))
+            if notification:
+                await self.bot.send_message(chat_id="1", text=notification)
+            return 200, {"status": "success"}
+
+    references = {json.loads(body)["data"]["reference"] for body, _ in deliveries}
+    server_class = InlineIngress if mode == "inline" else IngressServer
+    if mode == "inbox":
+        inbound_consumer.start()
+        outbox_dispatcher.start(bot)
+    server = await server_class(bot).start("127.0.0.1", 0)
+
+    requests = [
+        (PAYSTACK_WEBHOOK_PATH, body, {"X-Paystack-Signature": signature, "Content-Type": "application/json"}, None)
+        for body, signature in deliveries
+    ]
+    started = time.perf_counter()
+    latencies, statuses, _ = await run_in_child("127.0.0.1", server.port, requests, args.concurrency)
+    acked = time.perf_counter() - started
+    deadline = time.perf_counter() + 120
+    while await run_sync(unapplied, references) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    applied = time.perf_counter() - started
+
+    await server.stop()
+    if mode == "inbox":
+        await inbound_consumer.stop()
+        await outbox_dispatcher.stop()
+
+    failures = sum(1 for status in statuses if status != 200)
+    print(f"{mode:<8}{percentile(latencies, 50):>8.1f}ms{percentile(latencies, 99):>8.1f}ms"
+          f"{len(deliveries) / acked:>10.0f}{applied:>10.2f}s{failures:>8}")
+
+
+async def run(args):
+    from telegram import Bot
+    from telegram.request import HTTPXRequest
+
+    bot = Bot("123456:benchmark", base_url=os.environ["TELEGRAM_API_URL"],
+              request=HTTPXRequest(connection_pool_size=args.concurrency))
+    async with bot:
+        print(f"{len(signed_payloads(args.events, args.duplicates, args.orders, 0))} deliveries "
+              f"({args.events} events, {args.duplicates:.0%} resent)\n")
+        print(f"{'mode':<8}{'ack p50':>10}{'ack p99':>10}{'req/s':>10}{'applied':>11}{'non-200':>8}")
+        # Different orders and event ids per mode, so each run starts from unpaid orders
+        for offset, mode in enumerate(("inline", "inbox")):
+            deliveries = signed_payloads(args.events, args.duplicates, args.orders, offset * 10**6, seed=offset + 1)
+            await run_mode(mode, bot, deliveries, args)
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='paystack_inbox_bench_')}/bench.db"
+    os.environ["PAYSTACK_SECRET_KEY"] = PAYSTACK_SECRET
+
+    from benchmarks.fake_bot_api import FakeBotAPI
+
+    with FakeBotAPI(latency=args.latency) as api:
+        os.environ["TELEGRAM_API_URL"] = f"{api.url}/bot"
+
+        from sqlalchemy import update
+        from benchmarks.query_plans import seed
+        from database.db import Base, engine, shutdown_db_executor
+        from database.models import Order, OrderStatus
+
+        Base.metadata.create_all(bind=engine)
+        seed(engine, args.orders)
+        with engine.begin() as conn:
+            conn.execute(update(Order.__table__).values(status=OrderStatus.PENDING_PAYMENT.name))
+        try:
+            asyncio.run(run(args))
+        finally:
+            shutdown_db_executor()
+
+
+if __name__ == "__main__":
+    main()
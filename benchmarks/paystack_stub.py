@@ -0,0 +1,127 @@
+"""
+Local Paystack API stub for benchmarks and manual testing.
+
+Run standalone with `python -m benchmarks.paystack_stub --port 8765` and set
+PAYSTACK_BASE_URL=http://127.0.0.1:8765 plus any PAYSTACK_SECRET_KEY.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    # Default backlog of 5 drops connections under benchmark concurrency
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class PaystackStub:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05,
+                 fail_every: int = 0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.server = _Server((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _respond(self, method: str, path: str, body: dict):
+        with self.lock:
+            self.calls[path.split("/")[1] if "/" in path else path] += 1
+            count = sum(self.calls.values())
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.fail_every and count % self.fail_every == 0:
+            return 503, {"status": False, "message": "Service unavailable"}
+
+        if path.startswith("/transaction/verify/"):
+            reference = path.rsplit("/", 1)[-1]
+            return 200, {
+                "status": True,
+                "message": "Verification successful",
+                "data": {
+                    "id": count, "status": "success", "reference": reference,
+                    "amount": 100000, "currency": "USD", "gateway_response": "Successful",
+                },
+            }
+        if path == "/transaction/initialize":
+            reference = body.get("reference")
+            return 200, {
+                "status": True,
+                "message": "Authorization URL created",
+                "data": {
+                    "authorization_url": f"https://checkout.paystack.com/{reference}",
+                    "access_code": f"access_{reference}", "reference": reference,
+                },
+            }
+        if path == "/refund":
+            return 200, {
+                "status": True,
+                "message": "Refund has been queued for processing",
+                "data": {"transaction": {"reference": body.get("transaction")}, "status": "pending"},
+            }
+        return 404, {"status": False, "message": "Not found"}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                body = json.loads(raw) if raw else {}
+                status, payload = stub._respond(method, self.path.split("?")[0], body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Paystack API stub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    stub = PaystackStub(port=args.port, latency=args.latency)
+    print(f"Paystack stub listening on {stub.url}")
+    stub.server.serve_forever()
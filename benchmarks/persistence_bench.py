@@ -0,0 +1,159 @@
+"""
+Bot state persistence cost with many active conversations.
+
+Holds --users users mid-way through the job posting conversation (a
+user_data dict plus a conversation state each) and drives SQLPersistence the
+way Application.update_persistence does: update_user_data and
+update_conversation for every key touched since the last run, then waits for
+the write to land. Reports, per scenario, the handover on the event loop
+(PTB's deep copies and the update_* calls, which pickle each value), the
+write itself (skipping unchanged values and SQL, on the DB thread pool), the longest
+event-loop stall during the write, and the rows written, skipped and deleted.
+
+Scenarios: the first flush (every row new), a flush where every user was
+touched but only --changed of them changed anything, one where only the
+changed users were touched, conversations ending, then a restart
+(get_conversations) and the first refresh of one user's data.
+
+    python -m benchmarks.persistence_bench --users 100000 --changed 0.05
+"""
+import argparse
+import asyncio
+import copy
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONVERSATION = "job_posting"
+
+
+def make_user_data(rng, uid):
+    return {
+        'job_flow': {
+            'title': f"Telegram bot for store {uid}",
+            'description': " ".join(rng.choice(("inventory", "orders", "payments", "alerts", "reports"))
+                                    for _ in range(40)),
+            'budget': round(rng.uniform(50, 5000), 2),
+            'category': "Telegram Bot Development",
+        },
+        'currency': "USD",
+        'last_menu': "post_job",
+    }
+
+
+class LoopMonitor:
+    """Longest gap between 1 ms ticks on the event loop"""
+
+    def __init__(self):
+        self.max_stall = 0.0
+        self.task = None
+
+    async def _tick(self):
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            self.max_stall = max(self.max_stall, now - last - 0.001)
+            last = now
+
+    def __enter__(self):
+        self.max_stall = 0.0
+        self.task = asyncio.get_running_loop().create_task(self._tick())
+        return self
+
+    def __exit__(self, *exc):
+        self.task.cancel()
+
+
+async def ptb_update(persistence, user_data, conversations, users):
+    """What Application.update_persistence hands the persistence for these users"""
+    await asyncio.gather(
+        *(persistence.update_user_data(uid, copy.deepcopy(user_data[uid])) for uid in users),
+        *(persistence.update_conversation(CONVERSATION, (uid, uid), conversations[(uid, uid)]) for uid in users),
+    )
+
+
+async def timed(label, persistence, work):
+    before = dict(persistence.totals)
+    started = time.perf_counter()
+    await work()
+    handed_over = time.perf_counter()
+    with LoopMonitor() as monitor:
+        await persistence.flush()
+    stored = time.perf_counter()
+    counts = {name: persistence.totals[name] - before[name] for name in ('written', 'unchanged', 'deleted')}
+    print(f"{label:<30}{(handed_over - started) * 1000:>10.0f}ms{(stored - handed_over) * 1000:>10.0f}ms"
+          f"{monitor.max_stall * 1000:>10.1f}ms{counts['written']:>9}{counts['unchanged']:>11}{counts['deleted']:>9}")
+
+
+async def run(args):
+    from services.persistence import SQLPersistence
+
+    rng = random.Random(7)
+    users = list(range(1_000_000, 1_000_000 + args.users))
+    user_data = {uid: make_user_data(rng, uid) for uid in users}
+    conversations = {(uid, uid): rng.randint(0, 5) for uid in users}
+
+    persistence = SQLPersistence()
+    await persistence.get_conversations(CONVERSATION)
+    # Everyone has already been seen since the start, so their (empty) rows were read
+    await asyncio.gather(*(persistence.refresh_user_data(uid, {}) for uid in users))
+
+    print(f"{args.users} active conversations, {args.changed:.0%} changed between flushes\n")
+    print(f"{'flush':<30}{'handover':>12}{'write':>12}{'stall':>12}{'written':>9}{'unchanged':>11}{'deleted':>9}")
+    await timed("first flush (all new)", persistence,
+                lambda: ptb_update(persistence, user_data, conversations, users))
+
+    changed = rng.sample(users, int(len(users) * args.changed))
+    for uid in changed:
+        user_data[uid]['job_flow']['budget'] += 1
+        conversations[(uid, uid)] += 1
+    await timed(f"all touched, {args.changed:.0%} changed", persistence,
+                lambda: ptb_update(persistence, user_data, conversations, users))
+    for uid in changed:
+        user_data[uid]['job_flow']['budget'] += 1
+        conversations[(uid, uid)] += 1
+    await timed("only changed users touched", persistence,
+                lambda: ptb_update(persistence, user_data, conversations, changed))
+
+    ended = changed[: len(changed) // 2]
+    for uid in ended:
+        conversations.pop((uid, uid))
+
+    async def end_conversations():
+        await asyncio.gather(*(persistence.update_conversation(CONVERSATION, (uid, uid), None) for uid in ended))
+    await timed(f"{len(ended)} conversations ended", persistence, end_conversations)
+
+    # A restart: conversation states up front, user_data on first use
+    restarted = SQLPersistence()
+    started = time.perf_counter()
+    restored = await restarted.get_conversations(CONVERSATION)
+    print(f"\nrestart: {len(restored)} conversation states read in {(time.perf_counter() - started) * 1000:.0f}ms")
+    refreshed = {}
+    started = time.perf_counter()
+    await restarted.refresh_user_data(users[-1], refreshed)
+    print(f"first refresh of one user's data: {(time.perf_counter() - started) * 1000:.2f}ms "
+          f"({'matches' if refreshed == user_data[users[-1]] else 'MISMATCH'})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000, help="users with an active conversation")
+    parser.add_argument("--changed", type=float, default=0.05, help="share of users that changed between flushes")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='persistence_bench_')}/bench.db"
+
+    from database.db import Base, engine, shutdown_db_executor
+
+    Base.metadata.create_all(bind=engine)
+    asyncio.run(run(args))
+    shutdown_db_executor()
+
+
+if __name__ == "__main__":
+    main()
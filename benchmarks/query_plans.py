@@ -0,0 +1,162 @@
+"""
+Query-plan regression check and timing benchmark for the hot lookups.
+
+Runs EXPLAIN QUERY PLAN on every query in HOT_QUERIES and exits non-zero if
+any of them falls back to a full table scan. With --orders it first seeds
+that many orders with database.seed (every other table in proportion) and
+times each query.
+
+    python -m benchmarks.query_plans                  # plan check on an empty schema
+    python -m benchmarks.query_plans --orders 1000000 # seed 1M orders and time queries
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# "SCAN orders" is a full scan; "SCAN orders USING INDEX ..." walks an index in order
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def hot_queries(db):
+    from sqlalchemy import and_, func, or_
+    from database.models import (
+        Order, OrderStatus, PaymentStatus, User, Transaction, CustomRequest, RequestStatus,
+        Job, JobMessage, RefundDeadline, DeadlineStatus, RevenueRollup
+    )
+    from utils.helpers import day_bounds
+
+    now = datetime.now()
+    day_start, day_end = day_bounds(now.date())
+
+    return {
+        "webhook: order by order_id": db.query(Order).filter(Order.order_id == "ORD1"),
+        "verify: order by payment_reference": db.query(Order).filter(Order.payment_reference == "BOT_1"),
+        "verify: transaction by reference": db.query(Transaction).filter(Transaction.reference == "BOT_1"),
+        "verify: transaction by order": db.query(Transaction).filter(Transaction.order_id == 1),
+        "deposit: request by payment_reference": db.query(CustomRequest).filter(
+            CustomRequest.payment_reference == "DEP_1"),
+        "refunds: unclaimed approved orders": db.query(Order).filter(
+            Order.status == OrderStatus.APPROVED,
+            Order.approved_at != None,
+            Order.approved_at <= now - timedelta(hours=48),
+            Order.assigned_developer_id == None,
+            Order.refunded_at == None,
+            Order.payment_status == PaymentStatus.VERIFIED),
+        "refunds: unapproved custom requests": db.query(CustomRequest).filter(
+            CustomRequest.status.in_([RequestStatus.NEW, RequestStatus.IN_REVIEW]),
+            CustomRequest.is_deposit_paid == True),
+        "refunds: next due deadline": db.query(func.min(RefundDeadline.due_at)).filter(
+            RefundDeadline.status == DeadlineStatus.PENDING),
+        "stats: orders today": db.query(func.count(Order.id)).filter(
+            Order.created_at >= day_start, Order.created_at < day_end),
+        "stats: users today": db.query(func.count(User.id)).filter(
+            User.created_at >= day_start, User.created_at < day_end),
+        "stats: revenue today": db.query(func.sum(Order.amount)).filter(
+            Order.status == OrderStatus.COMPLETED,
+            Order.created_at >= day_start, Order.created_at < day_end),
+        "stats: revenue since day": db.query(func.sum(RevenueRollup.revenue)).filter(
+            RevenueRollup.day >= now.date() - timedelta(days=30)),
+        "stats: pending review orders": db.query(func.count(Order.id)).filter(
+            Order.status == OrderStatus.PENDING_REVIEW),
+        "stats: new custom requests": db.query(func.count(CustomRequest.id)).filter(
+            CustomRequest.status == RequestStatus.NEW),
+        "lists: recent orders": db.query(Order).order_by(Order.created_at.desc()).limit(20),
+        "lists: user orders": db.query(Order).filter(Order.user_id == 1).order_by(Order.created_at.desc()),
+        "lists: keyset page seek": db.query(Order).filter(
+            Order.created_at <= now, or_(Order.created_at < now, and_(Order.created_at == now, Order.id < 100))
+        ).order_by(Order.created_at.desc(), Order.id.desc()).limit(11),
+        "lists: available orders": db.query(Order).filter(
+            Order.status == OrderStatus.APPROVED,
+            Order.assigned_developer_id == None).order_by(Order.created_at.desc()).limit(10),
+        "lists: developer orders": db.query(Order).filter(
+            Order.assigned_developer_id == 1,
+            Order.status.in_([OrderStatus.ASSIGNED, OrderStatus.IN_PROGRESS])),
+        "jobs: public board": db.query(Job).filter(Job.is_public == True).order_by(Job.created_at.desc()).limit(20),
+        "jobs: messages for job": db.query(JobMessage).filter(JobMessage.job_id == 1).order_by(JobMessage.created_at),
+    }
+
+
+def explain(engine, query):
+    """Run `query` with EXPLAIN QUERY PLAN prepended and return the plan detail lines"""
+    from sqlalchemy import event
+
+    plan = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        return "EXPLAIN QUERY PLAN " + statement, parameters
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        plan.extend(row[3] for row in cursor.fetchall())
+
+    event.listen(engine, "before_cursor_execute", before, retval=True)
+    event.listen(engine, "after_cursor_execute", after)
+    try:
+        with engine.connect() as conn:
+            conn.execute(query.statement)
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+        event.remove(engine, "after_cursor_execute", after)
+    return plan
+
+
+def seed(orders: int):
+    """Seed `orders` orders with database.seed, every other table in proportion"""
+    from database.seed import VOLUMES, scaled_volumes, seed_database
+
+    started = time.perf_counter()
+    counts = seed_database(scaled_volumes(orders / VOLUMES['orders'], orders=orders))
+    print(f"Seeded {', '.join(f'{count} {table}' for table, count in counts.items())}"
+          f" in {time.perf_counter() - started:.1f}s\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=0, help="seed this many orders and time each query")
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per query")
+    parser.add_argument("--database-url", help="check an existing database instead of a temporary one")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='query_plans_')}/plans.db"
+
+    from database.db import engine, create_session
+    from database.models import Base  # Through models, so every table is declared
+
+    Base.metadata.create_all(bind=engine)
+    if args.orders:
+        seed(args.orders)
+
+    db = create_session()
+    failures = 0
+    try:
+        for name, query in hot_queries(db).items():
+            plan = explain(engine, query)
+            scans = [line for line in plan if FULL_SCAN.match(line)]
+            failures += bool(scans)
+            timing = ""
+            if args.orders:
+                started = time.perf_counter()
+                for _ in range(args.runs):
+                    db.execute(query.statement).fetchall()
+                timing = f"{(time.perf_counter() - started) / args.runs * 1000:9.2f}ms"
+            status = "FULL SCAN" if scans else "ok"
+            print(f"{status:<10}{timing} {name:<40} {' | '.join(plan)}")
+    finally:
+        db.close()
+
+    if failures:
+        print(f"\n❌ {failures} hot queries fall back to a full table scan")
+        sys.exit(1)
+    print("\n✅ All hot queries use an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Job search cost: LIKE scans versus the FTS5 index.
+
+Seeds jobs with generated titles and descriptions (the FTS triggers index
+them as they are inserted), then times a first and a later result page for
+common, rare, multi-word, prefix, job-ID and no-match queries both ways. LIKE
+is what an ad-hoc search over jobs would have to run; FTS is
+database.search.search().
+
+LIKE returns newest-first, so it stops early when a term is in most rows and
+scans the whole table when it is rare or absent. FTS reads only the matching
+postings and ranks at most SEARCH_MAX_CANDIDATES of them, so its cost stays
+flat as the table grows.
+
+    python -m benchmarks.search_bench --jobs 500000 --repeat 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = (
+    "telegram bot crypto trading wallet shopify store inventory scraper dashboard analytics "
+    "payment invoice booking restaurant delivery tracker discord moderation game quiz survey "
+    "crm leads email newsletter automation scheduler reminder calendar portfolio website api "
+    "integration mobile android ios flutter react django flask fastapi postgres mongodb excel "
+    "report pdf export import sync notifications alerts signals forex stocks nft marketplace "
+    "chat support ticket helpdesk school attendance gym membership hotel reservation salon"
+).split()
+# A long tail of made-up words behind the common ones, so word frequencies fall off like real text
+VOCABULARY = WORDS + [f"term{n}" for n in range(5000)]
+RARE = "quokka"
+
+
+def seed_jobs(engine, count, seed=11, batch=5000):
+    from database.models import Job, JobStatus, User
+
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]  # Zipf
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"telegram_id": "1", "username": "bench", "first_name": "Bench"}])
+
+    statuses = list(JobStatus)
+    for start in range(0, count, batch):
+        rows = []
+        for i in range(start, min(start + batch, count)):
+            title = " ".join(rng.choices(VOCABULARY, weights, k=rng.randint(3, 6)))
+            description = " ".join(rng.choices(VOCABULARY, weights, k=rng.randint(20, 60)))
+            if i % 50000 == 0:
+                description += f" {RARE}"
+            rows.append({
+                "job_id": f"JOB{i:08d}{rng.getrandbits(24):06X}", "user_id": 1,
+                "title": title.capitalize(), "description": description,
+                "budget": round(rng.uniform(50, 5000), 2), "status": rng.choice(statuses),
+                "is_public": rng.random() < 0.7, "expected_timeline": "1 week",
+            })
+        with engine.begin() as conn:
+            conn.execute(Job.__table__.insert(), rows)
+
+
+def like_search(db, text, page, page_size):
+    """Every term somewhere in title, description or job ID - a full scan per query"""
+    from sqlalchemy import and_, or_
+    from database.models import Job
+
+    terms = text.split()
+    rows = db.query(Job).filter(and_(*(
+        or_(Job.title.ilike(f"%{t}%"), Job.description.ilike(f"%{t}%"), Job.job_id.ilike(f"%{t}%"))
+        for t in terms
+    ))).order_by(Job.id.desc()).offset(page * page_size).limit(page_size + 1).all()
+    return rows[:page_size]
+
+
+def fts_search(db, text, page, page_size):
+    from database.search import search
+
+    return search(db, "jobs", text, page, page_size).items
+
+
+def timed(run, db, text, page, repeat):
+    run(db, text, page, 10)  # warm the page cache
+    started = time.perf_counter()
+    for _ in range(repeat):
+        found = run(db, text, page, 10)
+    return (time.perf_counter() - started) / repeat * 1000, len(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query and mode")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='search_bench_')}/bench.db"
+
+    from database.db import Base, create_session, engine
+
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    seed_jobs(engine, args.jobs)
+    print(f"Seeded and indexed {args.jobs} jobs in {time.perf_counter() - started:.1f}s, "
+          f"database {os.path.getsize(engine.url.database) / 2**20:.0f} MB\n")
+
+    queries = [
+        ("common word", "telegram", 0),
+        ("common word, page 50", "telegram", 50),
+        ("uncommon word", "term300", 0),
+        ("rare word", RARE, 0),
+        ("two words", "shopify inventory", 0),
+        ("prefix", "rese", 0),
+        ("job ID", "JOB00250000", 0),
+        ("no match", "shopfy", 0),
+    ]
+    db = create_session()
+    try:
+        print(f"{'query':<24}{'LIKE ms':>10}{'FTS5 ms':>10}{'speedup':>10}")
+        for label, text, page in queries:
+            like_ms, like_found = timed(like_search, db, text, page, args.repeat)
+            fts_ms, fts_found = timed(fts_search, db, text, page, args.repeat)
+            note = "" if like_found == fts_found else f"  ({like_found} vs {fts_found} rows)"
+            print(f"{label:<24}{like_ms:>10.2f}{fts_ms:>10.2f}{like_ms / fts_ms:>9.1f}x{note}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
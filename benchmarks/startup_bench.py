@@ -0,0 +1,107 @@
+"""
+Startup cost against database size: the migration check vs the old drop_all/create_all.
+
+Seeds a database with database.seed, one --scale round at a time, until the
+file reaches --size-gb (or takes an existing file with --db). Then each
+startup runs in a fresh interpreter, so imports and the first connection
+count, and reports the wall time of init_db() and of the whole process:
+
+- first start: a seeded database has no alembic_version yet, so this is the
+  one-off adoption (backup copy, missing indexes, stamp)
+- warm starts (--runs of them): the revision check on an up-to-date database
+- with --legacy, the old startup last: shutil.copy2 of the file, then
+  drop_all/create_all. That wipes the data, so it never runs without the flag.
+
+    python -m benchmarks.startup_bench --size-gb 5
+    python -m benchmarks.startup_bench --db /data/marketplace.db --runs 10 --legacy
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+STARTUP = """
+import time
+started = time.perf_counter()
+from database.db import init_db
+imported = time.perf_counter()
+assert init_db()
+print(imported - started, time.perf_counter() - imported)
+"""
+
+LEGACY_STARTUP = """
+import shutil, time
+from config import DATABASE_URL
+from database.db import Base, engine
+import database
+db_file = DATABASE_URL.replace('sqlite:///', '')
+started = time.perf_counter()
+shutil.copy2(db_file, f"{db_file}.backup")
+copied = time.perf_counter()
+Base.metadata.drop_all(bind=engine)
+Base.metadata.create_all(bind=engine)
+print(copied - started, time.perf_counter() - copied)
+"""
+
+
+def run_python(code, env):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    first, second = map(float, result.stdout.strip().splitlines()[-1].split())
+    return first, second, time.perf_counter() - started
+
+
+def seed_to_size(db_file, size_gb, scale, env):
+    """Seed rounds with different --seed values until the file is big enough"""
+    target = size_gb * 1024 ** 3
+    round_number = 0
+    while not os.path.exists(db_file) or os.path.getsize(db_file) < target:
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "database.seed", "--scale", str(scale),
+                        "--seed", str(round_number), "--append"], cwd=ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        round_number += 1
+        print(f"seed round {round_number}: {os.path.getsize(db_file) / 1024 ** 3:.2f} GB "
+              f"after {time.perf_counter() - started:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-gb", type=float, default=5.0, help="seed until the file is this big")
+    parser.add_argument("--scale", type=float, default=1.0, help="database.seed --scale per round")
+    parser.add_argument("--db", help="use this SQLite file instead of seeding a new one")
+    parser.add_argument("--runs", type=int, default=5, help="warm starts to time")
+    parser.add_argument("--legacy", action="store_true", help="finish with the old startup (wipes the data)")
+    args = parser.parse_args()
+
+    db_file = os.path.abspath(args.db or os.path.join(tempfile.mkdtemp(prefix="startup_bench_"), "bench.db"))
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_file}")
+    if not args.db:
+        seed_to_size(db_file, args.size_gb, args.scale, env)
+    print(f"\n{db_file}: {os.path.getsize(db_file) / 1024 ** 3:.2f} GB\n")
+    print(f"{'startup':<28}{'imports':>12}{'init_db':>12}{'process':>12}")
+
+    def report(label, imports, init, process):
+        print(f"{label:<28}{imports * 1000:>10.0f}ms{init * 1000:>10.1f}ms{process * 1000:>10.0f}ms")
+
+    report("first start", *run_python(STARTUP, env))
+    warm = [run_python(STARTUP, env) for _ in range(args.runs)]
+    report(f"warm start (median of {args.runs})", *(statistics.median(run[i] for run in warm) for i in range(3)))
+
+    if args.legacy:
+        copy, reset, process = run_python(LEGACY_STARTUP, env)
+        print(f"\nold startup: copy {copy:.1f}s + drop_all/create_all {reset:.1f}s ({process:.1f}s in all)")
+    backup = f"{db_file}.backup"
+    if os.path.exists(backup):
+        os.remove(backup)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,48 @@ load_dotenv()
 # ========== TELEGRAM BOT CONFIG ==========
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN", "YOUR_BOT_TOKEN_HERE")
 SUPER_ADMIN_ID = os.getenv("SUPER_ADMIN_ID", "YOUR_TELEGRAM_ID_HERE")
+# Bot API endpoint (point at a local Bot API server or a test double)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org/bot")
+# Updates handled at once; updates from the same chat still run one at a time
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "64"))
 
 # ========== DATABASE CONFIG ==========
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///software_marketplace.db")
+# Threads that run blocking queries for async handlers (keep below the engine's pool size + overflow)
+DB_WORKERS = int(os.getenv("DB_WORKERS", "8"))
+# Engine profile: "auto" picks sqlite or postgresql from DATABASE_URL; "default" is SQLAlchemy's defaults
+DB_PROFILE = os.getenv("DB_PROFILE", "auto")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "12"))  # Connections kept open (DB_WORKERS + background services)
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "8"))
+DB_POOL_TIMEOUT = 30  # Seconds to wait for a free connection
+DB_POOL_RECYCLE = 1800  # Reopen server connections older than this (PostgreSQL)
+DB_QUERY_CACHE_SIZE = 1200  # Compiled SQL statements cached per engine
+# SQLite profile: WAL, synchronous=NORMAL and these per-connection pragmas
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000"))  # Wait this long for a write lock
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # Bytes of the file read through mmap
+SQLITE_CACHE_SIZE_KB = 64 * 1024  # Page cache per connection
+# PostgreSQL profile
+PG_STATEMENT_TIMEOUT_MS = int(os.getenv("PG_STATEMENT_TIMEOUT_MS", "15000"))
+PG_LOCK_TIMEOUT_MS = 5000
+PG_IDLE_IN_TRANSACTION_TIMEOUT_MS = 60000
+PG_PREPARE_THRESHOLD = 5  # psycopg 3: server-side prepare a statement after this many runs
+
+# ========== WEBHOOK CONFIG ==========
+# With WEBHOOK_URL set (public https base URL) the bot receives updates by
+# webhook and serves Telegram and Paystack from one process instead of polling
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "5000"))
+# Telegram echoes this in X-Telegram-Bot-Api-Secret-Token on every update; updates
+# without it are rejected. Unset, webhook mode generates a random one per run.
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+TELEGRAM_WEBHOOK_PATH = "/webhook/telegram"
+PAYSTACK_WEBHOOK_PATH = "/webhook/paystack"
+# Paystack events are stored on arrival and applied in batches by one consumer
+INBOUND_BATCH_SIZE = 100
+INBOUND_MAX_ATTEMPTS = 5
+# Safety poll for events stored by another process (e.g. the replay tool)
+INBOUND_POLL_INTERVAL = 5
 
 # ========== PAYMENT CONFIG ==========
 DEFAULT_CURRENCY = "USD"
@@ -20,6 +59,10 @@ DEFAULT_CURRENCY_SYMBOL = "$"
 
 # Developer payout threshold
 DEVELOPER_PAYOUT_THRESHOLD = 50.0
+# Developer's share of an order amount / job budget
+DEVELOPER_SHARE = 0.7
+# Window for "recent earnings" on the developer earnings screen
+DEVELOPER_EARNINGS_WINDOW_DAYS = 30
 
 # Payment Methods Configuration
 PAYMENT_METHODS = {
@@ -82,14 +125,96 @@ LOG_FILE = "software_marketplace.log"
 # ========== SECURITY CONFIG ==========
 MAX_LOGIN_ATTEMPTS = 5
 SESSION_TIMEOUT = 3600
+# Admin/developer roles are cached this long per user (role changes invalidate early)
+ROLE_CACHE_TTL = 300
 
 # ========== API CONFIG ==========
 API_TIMEOUT = 30
 API_RETRY_ATTEMPTS = 3
+PAYSTACK_BASE_URL = os.getenv("PAYSTACK_BASE_URL", "https://api.paystack.co")
+PAYSTACK_POOL_SIZE = 20
+
+# ========== BROADCAST CONFIG ==========
+# Telegram allows ~30 messages/second globally and ~1 message/second per chat
+BROADCAST_GLOBAL_RATE = float(os.getenv("BROADCAST_GLOBAL_RATE", "25"))
+BROADCAST_PER_CHAT_INTERVAL = 1.0
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "20"))
+BROADCAST_BATCH_SIZE = 500
+BROADCAST_MAX_RETRIES = 3
+BROADCAST_STATUS_INTERVAL = 5
+
+# ========== REFUND POLICY CONFIG ==========
+REFUND_DEADLINE_HOURS = 48
+PAYMENT_REMINDER_HOURS = 24
+REFUND_WORKERS = 5
+REFUND_MAX_ATTEMPTS = 5
+# Safety sweep that backfills deadlines created outside the scheduler hooks
+REFUND_SWEEP_INTERVAL = 300
+
+# ========== ADMIN STATS CONFIG ==========
+# Dashboard counters are cached for this many seconds (writes invalidate early)
+STATS_CACHE_TTL = 60
+
+# ========== PAGINATION CONFIG ==========
+# Rows per page on admin, developer and customer list screens
+LIST_PAGE_SIZE = 10
+
+# ========== JOB BOARD CONFIG ==========
+JOB_BOARD_PAGE_SIZE = 10
+# Rendered board pages are cached this long (job writes invalidate early)
+JOB_BOARD_CACHE_TTL = 300
+
+# ========== CATALOG CONFIG ==========
+# Bot writes rebuild the catalog snapshot straight away; the TTL only bounds
+# how long an out-of-band edit (raw SQL, another process) stays invisible
+CATALOG_CACHE_TTL = 3600
+
+# ========== SEARCH CONFIG ==========
+SEARCH_PAGE_SIZE = 10  # Results per admin /search_* page
+INLINE_SEARCH_RESULTS = 20  # Results per inline-query page (Telegram allows 50)
+# bm25 scores only the newest N matches, so a query for a very common word
+# costs the same on 500k rows as on 5k
+SEARCH_MAX_CANDIDATES = 1000
 
 # ========== NOTIFICATION CONFIG ==========
 SEND_EMAIL_NOTIFICATIONS = True
 SEND_TELEGRAM_NOTIFICATIONS = True
+# Notifications are written to the outbox table with the change that caused
+# them and sent by one background dispatcher
+OUTBOX_BATCH_SIZE = 200
+OUTBOX_CONCURRENCY = 10  # Chats sent to at once; each chat's messages go out in order
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_RETRY_BASE = 5  # Seconds before the first retry, doubling each attempt
+OUTBOX_RETRY_MAX = 3600
+# Wait this long after a wake-up so a burst lands in one batch (and one digest per chat)
+OUTBOX_COALESCE_WINDOW = 0.5
+# Safety poll for messages written by another process or due for retry
+OUTBOX_POLL_INTERVAL = 10
+
+# ========== BOT STATE PERSISTENCE CONFIG ==========
+# user_data, chat_data and conversation states are kept in memory and written
+# to the bot_state table this often (only keys that changed since the last write)
+PERSISTENCE_FLUSH_INTERVAL = float(os.getenv("PERSISTENCE_FLUSH_INTERVAL", "10"))
+PERSISTENCE_BATCH_SIZE = 2000  # Rows per write transaction, so other writers get the lock in between
+
+# ========== METRICS CONFIG ==========
+# Prometheus text format on http://METRICS_HOST:METRICS_PORT/metrics (port 0 turns the listener off)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+
+# ========== BACKUP CONFIG ==========
+# Online snapshots of the SQLite file (sqlite3 backup API) taken by a job-queue job
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+BACKUP_INTERVAL = int(os.getenv("BACKUP_INTERVAL", "21600"))  # Seconds between snapshots (0 turns them off)
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "8"))  # Newest snapshots kept; older ones are deleted
+BACKUP_COMPRESS = os.getenv("BACKUP_COMPRESS", "True").lower() == "true"  # gzip, in a child process
+BACKUP_PAGES_PER_STEP = 1024  # Pages copied per step; the source isn't locked between steps
+BACKUP_STEP_SLEEP = 0.005  # Pause between steps so writers get the file
+BACKUP_MAX_RESTARTS = 3  # Writes from other connections restart the copy; after this many, copy the rest at once
+
+# ========== SEED DATA CONFIG ==========
+# python -m database.seed inserts this many rows per executemany transaction
+SEED_BATCH_SIZE = 20000
 
 # ========== TEST MODE ==========
 TEST_MODE = os.getenv("TEST_MODE", "False").lower() == "true"
@@ -159,7 +284,7 @@ CURRENCY_SYMBOLS = {
     "GBP": "£"
 }
 
-# Fixed exchange rates (update these regularly)
+# Fixed exchange rates (update these regularly) - used until live rates have been fetched once
 EXCHANGE_RATES = {
     "USD": 1.0,
     "GHS": 10.5,
@@ -169,8 +294,15 @@ EXCHANGE_RATES = {
     "XOF": 600.0,
     "XAF": 600.0,
     "EUR": 0.92,
-    "GBP": 0.79
+    "GBP": 0.79,
+    "INR": 83.0,
+    "CAD": 1.35,
+    "AUD": 1.51
 }
+# Live rates are fetched in the background this often (seconds)
+FX_REFRESH_INTERVAL = 3600
+# Last good live rates, loaded at startup
+FX_SNAPSHOT_FILE = os.getenv("FX_SNAPSHOT_FILE", "fx_snapshot.json")
 
 # ========== JOB MARKETPLACE CATEGORIES ==========
 JOB_CATEGORIES = [
@@ -10,6 +10,12 @@ from .db import (
     Session,
     create_session,
     close_session,
+    update_session_scope,
+    run_sync,
+    UpdateSession,
+    db_session,
+    with_db,
+    shutdown_db_executor,
     init_db,
     test_connection,
     add_initial_data
@@ -34,9 +40,32 @@ from .models import (
     PaymentStatus,
     RequestStatus,
     DeveloperStatus,
-    PaymentMethod
+    PaymentMethod,
+    BroadcastJob,
+    BroadcastStatus,
+    RefundDeadline,
+    DeadlineType,
+    DeadlineStatus,
+    RevenueRollup,
+    InboundEvent,
+    InboundEventStatus,
+    FxSnapshot,
+    DeveloperStats,
+    DeveloperEarningsDay,
+    DeveloperPayout,
+    PayoutStatus,
+    OutboxMessage,
+    OutboxStatus,
+    PersistedState
 )
 
+# Registers the flush hook that keeps revenue rollups in step with orders
+from .rollups import rebuild_revenue_rollups
+# Registers the flush hook that keeps developer stats in step with orders, claims and payouts
+from .developer_stats import rebuild_developer_stats
+# Registers the FTS5 index DDL with create_all()/drop_all()
+from .search import search, SearchPage, create_search_indexes
+
 __all__ = [
     'Base',
     'engine',
@@ -44,6 +73,12 @@ __all__ = [
     'Session',
     'create_session',
     'close_session',
+    'update_session_scope',
+    'run_sync',
+    'UpdateSession',
+    'db_session',
+    'with_db',
+    'shutdown_db_executor',
     'init_db',
     'test_connection',
     'add_initial_data',
@@ -65,5 +100,26 @@ __all__ = [
     'PaymentStatus',
     'RequestStatus',
     'DeveloperStatus',
-    'PaymentMethod'
+    'PaymentMethod',
+    'BroadcastJob',
+    'BroadcastStatus',
+    'RefundDeadline',
+    'DeadlineType',
+    'DeadlineStatus',
+    'RevenueRollup',
+    'InboundEvent',
+    'InboundEventStatus',
+    'FxSnapshot',
+    'DeveloperStats',
+    'DeveloperEarningsDay',
+    'DeveloperPayout',
+    'PayoutStatus',
+    'OutboxMessage',
+    'OutboxStatus',
+    'PersistedState',
+    'rebuild_revenue_rollups',
+    'rebuild_developer_stats',
+    'search',
+    'SearchPage',
+    'create_search_indexes'
 ]
\ No newline at end of file
@@ -0,0 +1,280 @@
+"""
+Online SQLite backups - sqlite3's backup API, a few pages at a time
+
+backup_database() copies the live file with Connection.backup in steps of
+BACKUP_PAGES_PER_STEP pages, pausing between steps, so the bot keeps
+writing while it runs (in WAL mode readers never block writers; in rollback
+mode the read lock is only held for one step). Unlike copying the file, the
+result is always a consistent database: a write from another connection
+makes SQLite restart the copy, and after BACKUP_MAX_RESTARTS restarts the
+rest is copied in one step.
+
+Each snapshot is checked with PRAGMA quick_check, renamed into BACKUP_DIR as
+marketplace-<timestamp>.db (gzipped in a child process with
+BACKUP_COMPRESS), and only the newest BACKUP_KEEP are kept.
+services.backup_service schedules it on the bot's job queue.
+
+restore_backup() verifies a snapshot (integrity_check and a schema
+revision), snapshots the current database, copies the backup over it with
+the same API and compares row counts. Stop the bot first.
+
+    python -m database.backup                        # take a snapshot now
+    python -m database.backup --list
+    python -m database.backup --restore backups/marketplace-20261017-020000-000.db.gz
+"""
+import argparse
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import (
+    DATABASE_URL, BACKUP_DIR, BACKUP_KEEP, BACKUP_PAGES_PER_STEP, BACKUP_STEP_SLEEP, BACKUP_MAX_RESTARTS,
+    BACKUP_COMPRESS,
+)
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "marketplace-"
+SUFFIXES = (".db", ".db.gz")
+
+
+class BackupError(Exception):
+    pass
+
+
+class _Restarted(Exception):
+    """The source changed under the copy too often - finish it in one step"""
+
+
+@dataclass(frozen=True)
+class BackupResult:
+    path: str
+    pages: int
+    source_bytes: int  # Size of the copied database
+    bytes: int  # Size of the snapshot on disk (after compression)
+    seconds: float
+    restarts: int
+    compressed: bool
+
+
+def sqlite_path(url: str = DATABASE_URL) -> Optional[str]:
+    """The database file behind a sqlite:/// URL (None for other databases and :memory:)"""
+    if not url.startswith('sqlite:///'):
+        return None
+    path = url[len('sqlite:///'):].split('?', 1)[0]
+    return None if path in ('', ':memory:') else path
+
+
+def list_backups(backup_dir: str = BACKUP_DIR) -> List[str]:
+    """Snapshots in backup_dir, newest first (the timestamp in the name sorts them)"""
+    if not os.path.isdir(backup_dir):
+        return []
+    names = [name for name in os.listdir(backup_dir) if name.startswith(PREFIX) and name.endswith(SUFFIXES)]
+    return [os.path.join(backup_dir, name) for name in sorted(names, reverse=True)]
+
+
+def _check(connection, pragma: str = "quick_check"):
+    problems = [row[0] for row in connection.execute(f"PRAGMA {pragma}").fetchall()]
+    if problems != ['ok']:
+        raise BackupError(f"{pragma} failed: {'; '.join(problems[:5])}")
+
+
+def _copy(source, dest, pages: int, sleep: float, max_restarts: int) -> int:
+    """source.backup(dest) in steps of `pages`; returns how often a write restarted it"""
+    restarts = copied = 0
+
+    def progress(status, remaining, total):
+        nonlocal restarts, copied
+        # A restarted copy redoes the same first step, so `remaining` stops going down
+        if copied and total - remaining <= copied:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _Restarted()
+        copied = total - remaining
+        if remaining and sleep:
+            time.sleep(sleep)  # Between steps the source isn't locked - let writers in
+
+    try:
+        source.backup(dest, pages=pages, progress=progress)
+    except _Restarted:
+        logger.info(f"Backup restarted {restarts} times by concurrent writes; copying the rest in one step")
+        source.backup(dest, pages=-1)
+    return restarts
+
+
+# Run by a child interpreter; stdlib only, so the child starts fast and
+# doesn't import the bot (or re-run its __main__, as multiprocessing would)
+_GZIP = """
+import gzip, os, shutil, sys
+path = sys.argv[1]
+with open(path, 'rb') as src, gzip.open(path + '.gz.partial', 'wb', compresslevel=6) as dst:
+    shutil.copyfileobj(src, dst, 1024 * 1024)
+os.replace(path + '.gz.partial', path + '.gz')
+os.remove(path)
+"""
+
+
+def _gzip(path: str) -> str:
+    """Compress path to path.gz in a separate process and remove it"""
+    subprocess.run([sys.executable, "-c", _GZIP, path], check=True)
+    return f"{path}.gz"
+
+
+def rotate_backups(backup_dir: str = BACKUP_DIR, keep: Optional[int] = BACKUP_KEEP) -> List[str]:
+    """Delete all but the newest `keep` snapshots; returns the deleted paths"""
+    if keep is None:
+        return []
+    stale = list_backups(backup_dir)[keep:]
+    for path in stale:
+        os.remove(path)
+    return stale
+
+
+def backup_database(backup_dir: str = BACKUP_DIR, source_path: Optional[str] = None,
+                    pages: int = BACKUP_PAGES_PER_STEP, sleep: float = BACKUP_STEP_SLEEP,
+                    compress: bool = BACKUP_COMPRESS, keep: Optional[int] = BACKUP_KEEP) -> BackupResult:
+    """Take a verified, consistent snapshot of the live SQLite database without blocking writers
+
+    Then delete all but the newest `keep` snapshots (None keeps them all).
+    """
+    source_path = source_path or sqlite_path()
+    if not source_path or not os.path.exists(source_path):
+        raise BackupError(f"No SQLite database to back up ({DATABASE_URL})")
+    os.makedirs(backup_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')[:-3]
+    path = os.path.join(backup_dir, f"{PREFIX}{stamp}.db")
+    partial = f"{path}.partial"
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    dest = sqlite3.connect(partial)
+    try:
+        restarts = _copy(source, dest, pages, sleep, BACKUP_MAX_RESTARTS)
+        page_count = dest.execute("PRAGMA page_count").fetchone()[0]
+        _check(dest)
+    except BaseException:
+        dest.close()
+        os.remove(partial)
+        raise
+    finally:
+        source.close()
+    dest.close()
+    os.replace(partial, path)
+    source_bytes = os.path.getsize(path)
+
+    if compress:
+        # gzip holds the GIL for long stretches - keep it out of the bot's process
+        path = _gzip(path)
+    rotate_backups(backup_dir, keep)
+
+    result = BackupResult(path=path, pages=page_count, source_bytes=source_bytes, bytes=os.path.getsize(path),
+                          seconds=time.perf_counter() - started, restarts=restarts, compressed=compress)
+    logger.info(f"Backed up {source_bytes / 1024 ** 2:.1f} MB to {path} ({result.bytes / 1024 ** 2:.1f} MB) "
+                f"in {result.seconds:.1f}s")
+    return result
+
+
+# ---------- restore ----------
+
+def _row_counts(connection) -> Dict[str, int]:
+    tables = [row[0] for row in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' "
+        "AND sql NOT LIKE 'CREATE VIRTUAL TABLE%' ORDER BY name")]
+    return {table: connection.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+
+
+@contextmanager
+def _open_snapshot(snapshot: str):
+    """A read-only connection to a snapshot, decompressing .gz files to a temporary copy"""
+    temp = None
+    path = snapshot
+    if snapshot.endswith('.gz'):
+        fd, temp = tempfile.mkstemp(suffix='.db', dir=os.path.dirname(os.path.abspath(snapshot)))
+        with os.fdopen(fd, 'wb') as dst, gzip.open(snapshot, 'rb') as src:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        path = temp
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        yield connection
+    finally:
+        connection.close()
+        if temp:
+            os.remove(temp)
+
+
+def verify_backup(snapshot: str) -> Dict[str, int]:
+    """Full integrity check of a snapshot (.db or .db.gz); returns its row counts per table"""
+    with _open_snapshot(snapshot) as connection:
+        _check(connection, "integrity_check")
+        revision = connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'alembic_version'").fetchone()
+        if revision is None or connection.execute("SELECT version_num FROM alembic_version").fetchone() is None:
+            raise BackupError(f"{snapshot} has no schema revision - not a marketplace database")
+        return _row_counts(connection)
+
+
+def restore_backup(snapshot: str, target_path: Optional[str] = None, backup_dir: str = BACKUP_DIR) -> BackupResult:
+    """Replace the database with a verified snapshot. The bot must be stopped.
+
+    The current database is snapshotted first, so a restore can be undone.
+    """
+    target_path = target_path or sqlite_path()
+    if not target_path:
+        raise BackupError(f"Restore needs a SQLite database ({DATABASE_URL})")
+    expected = verify_backup(snapshot)
+
+    if os.path.exists(target_path):
+        # No rotation - it could delete the snapshot being restored
+        before = backup_database(backup_dir, source_path=target_path, keep=None)
+        print(f"📦 Current database saved to {before.path}")
+
+    started = time.perf_counter()
+    with _open_snapshot(snapshot) as source:
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target)
+            restored = _row_counts(target)
+            _check(target)
+        finally:
+            target.close()
+    if restored != expected:
+        changed = sorted(table for table in set(expected) | set(restored) if expected.get(table) != restored.get(table))
+        raise BackupError(f"Restored row counts differ from the snapshot in: {', '.join(changed)}")
+    return BackupResult(path=target_path, pages=0, source_bytes=os.path.getsize(snapshot),
+                        bytes=os.path.getsize(target_path), seconds=time.perf_counter() - started,
+                        restarts=0, compressed=snapshot.endswith('.gz'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=BACKUP_DIR, help=f"snapshot directory (default {BACKUP_DIR})")
+    parser.add_argument('--list', action='store_true', help="list snapshots, newest first")
+    parser.add_argument('--verify', metavar='SNAPSHOT', help="integrity-check a snapshot")
+    parser.add_argument('--restore', metavar='SNAPSHOT', help="verify a snapshot and restore it (bot stopped)")
+    parser.add_argument('--no-compress', action='store_true', help="keep the snapshot uncompressed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.list:
+        for path in list_backups(args.dir):
+            print(f"   {path}  {os.path.getsize(path) / 1024 ** 2:>10.1f} MB")
+    elif args.verify:
+        counts = verify_backup(args.verify)
+        print(f"✅ {args.verify} is intact ({sum(counts.values()):,} rows in {len(counts)} tables)")
+    elif args.restore:
+        result = restore_backup(args.restore, backup_dir=args.dir)
+        print(f"✅ Restored {args.restore} to {result.path} in {result.seconds:.1f}s")
+    else:
+        result = backup_database(args.dir, compress=not args.no_compress)
+        print(f"✅ {result.path}: {result.source_bytes / 1024 ** 2:.1f} MB copied, "
+              f"{result.bytes / 1024 ** 2:.1f} MB on disk, {result.seconds:.1f}s")
@@ -1,22 +1,131 @@
 """
 Database initialization and connection management
 """
-import os
 import sys
+import asyncio
+import contextvars
+import functools
 import logging
-from sqlalchemy import create_engine, text
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
-from config import DATABASE_URL
+from config import (
+    DATABASE_URL, DB_WORKERS, DB_PROFILE, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_QUERY_CACHE_SIZE, SQLITE_BUSY_TIMEOUT_MS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE_KB, PG_STATEMENT_TIMEOUT_MS,
+    PG_LOCK_TIMEOUT_MS, PG_IDLE_IN_TRANSACTION_TIMEOUT_MS, PG_PREPARE_THRESHOLD
+)
 
 logger = logging.getLogger(__name__)
 
-# Create engine
-engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
+# ========== ENGINE PROFILES ==========
+PROFILES = ('sqlite', 'postgresql', 'default')
+
+
+def _sqlite_engine(url):
+    """WAL, so readers never block the writer and the writer never blocks readers
+
+    Every connection gets the pragmas on connect. busy_timeout makes a second
+    writer wait for the lock instead of failing with "database is locked";
+    synchronous=NORMAL is durable in WAL mode except for the last commits
+    before a power cut.
+    """
+    engine = create_engine(
+        url, echo=False, pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+        query_cache_size=DB_QUERY_CACHE_SIZE,
+        # pysqlite's own busy wait, in seconds; the pragma below covers raw use of the connection
+        connect_args={'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000, 'check_same_thread': False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if url.database and url.database != ':memory:':
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+            cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def _postgresql_engine(url):
+    """A sized pool, server-side timeouts so one bad query can't hold a connection, and prepared statements"""
+    options = (f"-c statement_timeout={PG_STATEMENT_TIMEOUT_MS} -c lock_timeout={PG_LOCK_TIMEOUT_MS} "
+               f"-c idle_in_transaction_session_timeout={PG_IDLE_IN_TRANSACTION_TIMEOUT_MS}")
+    connect_args = {'options': options, 'application_name': 'software_marketplace'}
+    if url.get_driver_name() == 'psycopg':
+        # psycopg 3 prepares a statement on the server once it has run this often on a connection
+        connect_args['prepare_threshold'] = PG_PREPARE_THRESHOLD
+    else:
+        logger.info("Server-side prepared statements need the psycopg 3 driver (postgresql+psycopg://)")
+    return create_engine(
+        url, echo=False, pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE, pool_use_lifo=True,  # LIFO lets idle connections above the need time out
+        query_cache_size=DB_QUERY_CACHE_SIZE,
+        connect_args=connect_args,
+    )
+
+
+def make_engine(url: str = DATABASE_URL, profile: str = DB_PROFILE):
+    """The engine for `url`, tuned by `profile` (auto picks sqlite or postgresql from the URL)"""
+    url = make_url(url)
+    if profile == 'auto':
+        profile = url.get_backend_name() if url.get_backend_name() in PROFILES else 'default'
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {profile!r}; use auto, {', '.join(PROFILES)}")
+    if profile != 'default' and url.get_backend_name() != profile:
+        raise ValueError(f"DB_PROFILE {profile!r} doesn't fit {url.get_backend_name()} URL")
+    if profile == 'sqlite':
+        return _sqlite_engine(url)
+    if profile == 'postgresql':
+        return _postgresql_engine(url)
+    return create_engine(url, echo=False, pool_pre_ping=True)
+
+
+# Create engine - every connection in the process comes from this one
+engine = make_engine()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Session = scoped_session(SessionLocal)
+
+# create_session() hands out one Session per thread - and, inside
+# update_session_scope(), per update as well. Concurrent updates run on the
+# same event loop thread, so a thread-local Session alone would be shared,
+# committed and closed by whichever update touched it last.
+_update_scope = contextvars.ContextVar('db_update_scope', default=None)
+
+
+class _UpdateScope:
+    __slots__ = ('threads', 'ended')
+
+    def __init__(self):
+        self.threads = set()  # Threads that opened a session in this scope
+        self.ended = False
+
+
+def _session_scope():
+    scope = _update_scope.get()
+    thread = threading.get_ident()
+    if scope is None or scope.ended:
+        # A task spawned during the update can outlive it - past its end it gets the thread's Session
+        return thread
+    # run_sync and to_thread carry the update's context into their threads; they get their own Session
+    scope.threads.add(thread)
+    return scope, thread
+
+
+Session = scoped_session(SessionLocal, scopefunc=_session_scope)
 
 # Create base class for models
 Base = declarative_base()
@@ -29,61 +138,105 @@ def close_session():
     """Close the current database session"""
     Session.remove()
 
+@contextmanager
+def update_session_scope():
+    """create_session() inside gets sessions of its own, closed on exit (see utils.update_processor)"""
+    scope = _UpdateScope()
+    token = _update_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _update_scope.reset(token)
+        scope.ended = True  # Before the sweep, so no session is registered under it after
+        for thread in list(scope.threads):
+            session = Session.registry.registry.pop((scope, thread), None)
+            if session is not None:
+                session.close()
+
+# ========== ASYNC ACCESS ==========
+# Handlers run on the event loop. Their queries run on this pool instead, so a
+# slow query (or a locked SQLite file) only holds up the update that issued it.
+_db_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="db")
+
+async def run_sync(fn, *args, **kwargs):
+    """Run blocking database code on the DB thread pool and await its result"""
+    loop = asyncio.get_running_loop()
+    # In a copy of the caller's context, so per-update instrumentation (services.metrics) follows the query
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_db_executor, functools.partial(context.run, fn, *args, **kwargs))
+
+def _in_transaction(fn, args, kwargs):
+    session = SessionLocal(expire_on_commit=False)
+    try:
+        result = fn(session, *args, **kwargs)
+        session.commit()
+        return result
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+class UpdateSession:
+    """Database access for a single update.
+
+    Each run() is one transaction on the DB thread pool: committed when fn
+    returns, rolled back if it raises, and closed either way, so no connection
+    (or SQLite lock) is held while the handler awaits Telegram. Returned
+    objects are detached with their columns loaded - load relationships inside
+    fn (joinedload) rather than lazily afterwards.
+    """
+
+    def __init__(self):
+        self.closed = False
+
+    async def run(self, fn, *args, **kwargs):
+        """await db.run(lambda session: session.query(...).all())"""
+        if self.closed:
+            raise RuntimeError("UpdateSession used after its update finished")
+        return await run_sync(_in_transaction, fn, args, kwargs)
+
+    def close(self):
+        self.closed = True
+
+@asynccontextmanager
+async def db_session():
+    """Request-scoped database access for handlers - see UpdateSession"""
+    db = UpdateSession()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def with_db(handler):
+    """Handler decorator that passes a request-scoped UpdateSession as `db`"""
+    @functools.wraps(handler)
+    async def wrapper(update, context, *args, **kwargs):
+        async with db_session() as db:
+            return await handler(update, context, *args, db=db, **kwargs)
+    return wrapper
+
+def shutdown_db_executor():
+    """Wait for in-flight queries and stop the DB threads"""
+    _db_executor.shutdown(wait=True)
+
 def init_db():
-    """Initialize database tables"""
-    print("🔧 Importing database models...")
+    """Bring the schema to the latest migration and add the initial data
+
+    Never drops anything: on an up-to-date database this reads one row of
+    alembic_version and returns (see database.migrate).
+    """
     try:
-        # Import all models to ensure they're registered
-        from database import models
-        print("✅ Models imported successfully")
+        from database.migrate import ensure_schema
         
-        # Check if database file exists
-        if DATABASE_URL.startswith('sqlite:///'):
-            db_file = DATABASE_URL.replace('sqlite:///', '')
-            if os.path.exists(db_file):
-                print(f"📁 Database file exists: {db_file}")
-                # Backup existing database
-                backup_file = f"{db_file}.backup"
-                if os.path.exists(db_file):
-                    import shutil
-                    try:
-                        shutil.copy2(db_file, backup_file)
-                        print(f"📦 Backed up to: {backup_file}")
-                    except Exception as e:
-                        print(f"⚠️ Could not backup: {e}")
+        if not ensure_schema():
+            print("✅ Database schema is up to date")
         
-        print("🔄 Creating fresh database...")
-        # Drop all tables and create fresh ones
-        Base.metadata.drop_all(bind=engine)
-        Base.metadata.create_all(bind=engine)
+        add_initial_data()
+        return True
         
-        print("✅ Database tables created successfully")
-        
-        # Verify tables were created
-        db = create_session()
-        try:
-            tables = db.execute(text("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' 
-                ORDER BY name
-            """)).fetchall()
-            
-            print(f"📊 Created tables: {len(tables)}")
-            for table in tables:
-                print(f"   - {table.name}")
-            
-            # Add initial data
-            add_initial_data()
-            
-            return True
-        except Exception as e:
-            logger.error(f"❌ Error listing tables: {e}", exc_info=True)
-            return False
-        finally:
-            db.close()
-            
     except Exception as e:
-        logger.error(f"❌ Error creating database tables: {e}", exc_info=True)
+        logger.error(f"❌ Error migrating the database: {e}", exc_info=True)
         return False
 
 def add_initial_data():
@@ -112,8 +265,7 @@ def add_initial_data():
             print("✅ Created super admin user")
         
         # Add some sample bots if none exist
-        bots_count = db.query(Bot).count()
-        if bots_count == 0:
+        if db.query(Bot.id).first() is None:
             sample_bots = [
                 Bot(
                     name="Telegram Marketing Bot",
@@ -0,0 +1,342 @@
+"""
+Developer statistics - one row per developer, kept in step inside the same transaction
+
+Every flush that creates, deletes or changes an order, job claim, custom
+request or payout moves its contribution between developer_stats rows and the
+daily earnings buckets, and mirrors the totals onto the Developer columns
+(completed_orders, earnings, completed_jobs_count, total_earnings). The
+developer dashboard reads one row; "last 30 days" sums at most 31 buckets.
+
+    python -m database.developer_stats     # rebuild from orders, claims and payouts
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, func, inspect, select, update
+
+from .db import SessionLocal, create_session, engine
+from .models import (
+    ClaimStatus, CustomRequest, Developer, DeveloperEarningsDay, DeveloperPayout, DeveloperStats,
+    Job, JobClaim, Order, OrderStatus, PayoutStatus, RequestStatus
+)
+from .rollups import upsert_increments
+from config import DEVELOPER_EARNINGS_WINDOW_DAYS, DEVELOPER_SHARE
+
+logger = logging.getLogger(__name__)
+
+STAT_COLUMNS = (
+    'active_orders', 'completed_orders', 'active_jobs', 'completed_jobs', 'active_custom_requests',
+    'pending_earnings', 'total_earnings', 'payout_requested', 'paid_out',
+)
+(ACTIVE_ORDERS, COMPLETED_ORDERS, ACTIVE_JOBS, COMPLETED_JOBS, ACTIVE_CUSTOM_REQUESTS,
+ PENDING_EARNINGS, TOTAL_EARNINGS, PAYOUT_REQUESTED, PAID_OUT) = range(len(STAT_COLUMNS))
+
+ACTIVE_ORDER_STATUSES = (OrderStatus.ASSIGNED, OrderStatus.IN_PROGRESS)
+ACTIVE_CLAIM_STATUSES = (ClaimStatus.CLAIMED, ClaimStatus.IN_PROGRESS, ClaimStatus.DELIVERED)
+
+# Columns that decide what a row contributes, per tracked model
+TRACKED_FIELDS = {
+    Order: ('status', 'amount', 'assigned_developer_id', 'delivered_at', 'created_at'),
+    JobClaim: ('status', 'developer_id', 'job_id', 'submitted_at', 'created_at'),
+    CustomRequest: ('status', 'assigned_to'),
+    DeveloperPayout: ('status', 'amount', 'developer_id'),
+}
+
+# (developer id, stat column index or None for a bucket, bucket day, amount)
+Contribution = Tuple[int, int, Optional[date], float]
+
+
+def _day(*moments) -> date:
+    return next((moment for moment in moments if moment is not None), datetime.now()).date()
+
+
+def order_contribution(values: dict) -> List[Contribution]:
+    developer_id = values['assigned_developer_id']
+    if developer_id is None:
+        return []
+    share = (values['amount'] or 0) * DEVELOPER_SHARE
+    if values['status'] in ACTIVE_ORDER_STATUSES:
+        return [(developer_id, ACTIVE_ORDERS, None, 1), (developer_id, PENDING_EARNINGS, None, share)]
+    if values['status'] == OrderStatus.COMPLETED:
+        day = _day(values['delivered_at'], values['created_at'])
+        return [(developer_id, COMPLETED_ORDERS, day, 1), (developer_id, TOTAL_EARNINGS, day, share)]
+    return []
+
+
+def claim_contribution(values: dict, budget: float) -> List[Contribution]:
+    developer_id = values['developer_id']
+    if developer_id is None:
+        return []
+    share = (budget or 0) * DEVELOPER_SHARE
+    if values['status'] in ACTIVE_CLAIM_STATUSES:
+        return [(developer_id, ACTIVE_JOBS, None, 1), (developer_id, PENDING_EARNINGS, None, share)]
+    if values['status'] == ClaimStatus.COMPLETED:
+        day = _day(values['submitted_at'], values['created_at'])
+        return [(developer_id, COMPLETED_JOBS, day, 1), (developer_id, TOTAL_EARNINGS, day, share)]
+    return []
+
+
+def custom_request_contribution(values: dict) -> List[Contribution]:
+    if values['assigned_to'] is None or values['status'] != RequestStatus.APPROVED:
+        return []
+    return [(values['assigned_to'], ACTIVE_CUSTOM_REQUESTS, None, 1)]
+
+
+def payout_contribution(values: dict) -> List[Contribution]:
+    amount = values['amount'] or 0
+    if values['status'] == PayoutStatus.REQUESTED:
+        return [(values['developer_id'], PAYOUT_REQUESTED, None, amount)]
+    if values['status'] == PayoutStatus.PAID:
+        return [(values['developer_id'], PAID_OUT, None, amount)]
+    return []
+
+
+class StatDeltas:
+    """Per-developer stat deltas and per-(developer, day) bucket deltas"""
+
+    def __init__(self):
+        self.stats: Dict[int, List[float]] = defaultdict(lambda: [0] * len(STAT_COLUMNS))
+        self.days: Dict[Tuple[int, date], List[float]] = defaultdict(lambda: [0, 0.0])
+
+    def add(self, contributions: List[Contribution], sign: int = 1):
+        for developer_id, column, day, amount in contributions:
+            self.stats[developer_id][column] += sign * amount
+            if day is not None:
+                # Completed work lands in that day's bucket
+                self.days[(developer_id, day)][0 if column in (COMPLETED_ORDERS, COMPLETED_JOBS) else 1] += sign * amount
+
+    def __bool__(self):
+        return any(any(delta) for delta in self.stats.values())
+
+
+def apply_deltas(connection, deltas: StatDeltas):
+    """Write `deltas` to developer_stats, the earnings buckets and the Developer columns"""
+    for developer_id, delta in deltas.stats.items():
+        if not any(delta):
+            continue
+        upsert_increments(connection, DeveloperStats.__table__, {'developer_id': developer_id},
+                          dict(zip(STAT_COLUMNS, delta)))
+        # Keep the legacy Developer columns that the admin screens list and sort by
+        developers = Developer.__table__
+        changes = {
+            'completed_orders': delta[COMPLETED_ORDERS],
+            'completed_jobs_count': delta[COMPLETED_JOBS],
+            'total_earnings': delta[TOTAL_EARNINGS],
+            'earnings': delta[TOTAL_EARNINGS] - delta[PAID_OUT],  # Balance still to be paid out
+        }
+        changes = {column: func.coalesce(developers.c[column], 0) + value
+                   for column, value in changes.items() if value}
+        if changes:
+            connection.execute(update(developers).where(developers.c.id == developer_id).values(**changes))
+
+    for (developer_id, day), (completed, earnings) in deltas.days.items():
+        if completed or earnings:
+            upsert_increments(connection, DeveloperEarningsDay.__table__,
+                              {'developer_id': developer_id, 'day': day},
+                              {'completed': completed, 'earnings': earnings}, touch=False)
+
+
+# ---------- incremental maintenance ----------
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the old value on assignment so the flush hook always sees the transition
+for _model, _fields in TRACKED_FIELDS.items():
+    for _name in _fields:
+        event.listen(getattr(_model, _name), 'set', _keep_previous_value, active_history=True, retval=True)
+
+
+def _current_values(obj) -> dict:
+    return {name: getattr(obj, name) for name in TRACKED_FIELDS[type(obj)]}
+
+
+def _previous_values(obj) -> dict:
+    state = inspect(obj)
+    values = {}
+    for name in TRACKED_FIELDS[type(obj)]:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            values[name] = getattr(obj, name)
+    return values
+
+
+def _contributions(session) -> Callable[[object, dict], List[Contribution]]:
+    budgets: Dict[int, float] = {}
+
+    def job_budget(job_id):
+        if job_id not in budgets:
+            budgets[job_id] = session.connection().execute(
+                select(Job.budget).where(Job.id == job_id)
+            ).scalar() or 0
+        return budgets[job_id]
+
+    def contributions(obj, values):
+        if isinstance(obj, Order):
+            return order_contribution(values)
+        if isinstance(obj, JobClaim):
+            return claim_contribution(values, job_budget(values['job_id']))
+        if isinstance(obj, CustomRequest):
+            return custom_request_contribution(values)
+        return payout_contribution(values)
+
+    return contributions
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _update_developer_stats(session, flush_context):
+    tracked = tuple(TRACKED_FIELDS)
+    deltas = StatDeltas()
+    contributions = _contributions(session)
+
+    for obj in session.new:
+        if isinstance(obj, tracked):
+            deltas.add(contributions(obj, _current_values(obj)))
+    for obj in session.dirty:
+        if isinstance(obj, tracked) and session.is_modified(obj):
+            deltas.add(contributions(obj, _previous_values(obj)), -1)
+            deltas.add(contributions(obj, _current_values(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, tracked):
+            deltas.add(contributions(obj, _previous_values(obj)), -1)
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+# ---------- reads ----------
+
+def get_developer_stats(db, developer_id: int) -> DeveloperStats:
+    """The developer's stats row, or an all-zero one if they have no activity yet"""
+    stats = db.get(DeveloperStats, developer_id)
+    if stats is None:
+        stats = DeveloperStats(developer_id=developer_id,
+                               **{column: 0 for column in STAT_COLUMNS})
+    return stats
+
+
+def recent_earnings(db, developer_id: int, days: int = DEVELOPER_EARNINGS_WINDOW_DAYS) -> float:
+    """Earnings from work completed in the last `days` days"""
+    since = date.today() - timedelta(days=days)
+    return db.query(func.sum(DeveloperEarningsDay.earnings)).filter(
+        DeveloperEarningsDay.developer_id == developer_id,
+        DeveloperEarningsDay.day >= since
+    ).scalar() or 0
+
+
+def available_balance(stats: DeveloperStats) -> float:
+    """Completed earnings not yet paid out or already requested"""
+    return max(0.0, stats.total_earnings - stats.paid_out - stats.payout_requested)
+
+
+# ---------- reconciliation ----------
+
+def _compute_deltas(batch_size: int) -> StatDeltas:
+    deltas = StatDeltas()
+    db = create_session()
+    try:
+        orders = db.query(*(getattr(Order, name) for name in TRACKED_FIELDS[Order])).filter(
+            Order.assigned_developer_id.isnot(None)
+        ).execution_options(yield_per=batch_size)
+        for row in orders:
+            deltas.add(order_contribution(dict(zip(TRACKED_FIELDS[Order], row))))
+
+        claims = db.query(*(getattr(JobClaim, name) for name in TRACKED_FIELDS[JobClaim]), Job.budget).outerjoin(
+            Job, Job.id == JobClaim.job_id
+        ).execution_options(yield_per=batch_size)
+        for *row, budget in claims:
+            deltas.add(claim_contribution(dict(zip(TRACKED_FIELDS[JobClaim], row)), budget))
+
+        requests = db.query(CustomRequest.status, CustomRequest.assigned_to).filter(
+            CustomRequest.assigned_to.isnot(None)
+        )
+        for row in requests:
+            deltas.add(custom_request_contribution(dict(zip(TRACKED_FIELDS[CustomRequest], row))))
+
+        for row in db.query(*(getattr(DeveloperPayout, name) for name in TRACKED_FIELDS[DeveloperPayout])):
+            deltas.add(payout_contribution(dict(zip(TRACKED_FIELDS[DeveloperPayout], row))))
+    finally:
+        db.close()
+    return deltas
+
+
+def _insert_totals(connection, deltas: StatDeltas):
+    """Write totals into emptied tables - one executemany per table instead of an upsert per row"""
+    now = datetime.now()
+    stats = [{'developer_id': developer_id, 'updated_at': now, **dict(zip(STAT_COLUMNS, delta))}
+             for developer_id, delta in deltas.stats.items() if any(delta)]
+    if stats:
+        connection.execute(DeveloperStats.__table__.insert(), stats)
+        developers = Developer.__table__
+        connection.execute(
+            update(developers).where(developers.c.id == bindparam('b_id')).values(
+                completed_orders=bindparam('b_completed_orders'), completed_jobs_count=bindparam('b_completed_jobs'),
+                total_earnings=bindparam('b_total_earnings'), earnings=bindparam('b_earnings'),
+            ),
+            [{'b_id': row['developer_id'], 'b_completed_orders': row['completed_orders'],
+              'b_completed_jobs': row['completed_jobs'], 'b_total_earnings': row['total_earnings'],
+              'b_earnings': row['total_earnings'] - row['paid_out']} for row in stats]
+        )
+    days = [{'developer_id': developer_id, 'day': day, 'completed': completed, 'earnings': earnings}
+            for (developer_id, day), (completed, earnings) in deltas.days.items() if completed or earnings]
+    if days:
+        connection.execute(DeveloperEarningsDay.__table__.insert(), days)
+
+
+def rebuild_developer_stats(batch_size: int = 5000) -> int:
+    """Recompute developer_stats, the earnings buckets and the Developer columns. Returns stats rows written."""
+    deltas = _compute_deltas(batch_size)
+
+    with engine.begin() as conn:
+        conn.execute(DeveloperStats.__table__.delete())
+        conn.execute(DeveloperEarningsDay.__table__.delete())
+        conn.execute(update(Developer.__table__).values(
+            completed_orders=0, completed_jobs_count=0, total_earnings=0, earnings=0
+        ))
+        _insert_totals(conn, deltas)
+
+    logger.info(f"Rebuilt stats for {len(deltas.stats)} developers")
+    return len(deltas.stats)
+
+
+def record_opening_payouts(batch_size: int = 5000) -> int:
+    """Record payouts made before developer_payouts existed
+
+    Admins used to pay developers and zero Developer.earnings by hand. For
+    every developer with no payout rows, whatever their completed work earned
+    beyond their current Developer.earnings is recorded as one PAID payout,
+    so a rebuild keeps today's balances. Run once, before the first rebuild.
+    """
+    deltas = _compute_deltas(batch_size)
+    db = create_session()
+    try:
+        with_payouts = {developer_id for (developer_id,) in db.query(DeveloperPayout.developer_id).distinct()}
+        recorded = 0
+        for developer_id, balance in db.query(Developer.id, Developer.earnings):
+            if developer_id in with_payouts:
+                continue
+            paid = round(deltas.stats[developer_id][TOTAL_EARNINGS] - (balance or 0), 2) \
+                if developer_id in deltas.stats else 0
+            if paid > 0:
+                db.add(DeveloperPayout(developer_id=developer_id, amount=paid, status=PayoutStatus.PAID,
+                                       reference='opening-balance', paid_at=datetime.now()))
+                recorded += 1
+        db.commit()
+        return recorded
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    for model in (DeveloperStats, DeveloperEarningsDay, DeveloperPayout):
+        model.__table__.create(bind=engine, checkfirst=True)
+    print(f"✅ Rebuilt stats for {rebuild_developer_stats()} developers")
@@ -1,56 +1,256 @@
 #!/usr/bin/env python3
 """
-Database migration script to add missing columns.
-Run this script to update your database schema.
+Schema migrations - Alembic revisions in database/migrations, applied at startup
+
+ensure_schema() reads the one-row alembic_version table and compares it with
+the head revision of the scripts. When they match - every start after the
+first - it returns without touching anything else, so startup costs the same
+on a 5 GB database as on an empty one. Otherwise it upgrades:
+
+- an empty database runs the chain from the baseline revision (0001)
+- a database from before migrations (tables, but no alembic_version) is
+  adopted: adopt_legacy_database() brings it up to the baseline schema
+  without dropping anything, it is stamped 0001, then upgraded
+
+SQLite databases are snapshotted (database.backup) before any upgrade touches them.
+
+Changing a model means adding a revision:
+
+    python -m database.migrate revision -m "add users.language"   # autogenerate, then review it
+    python -m database.migrate                                    # upgrade to head
+    python -m database.migrate current
+    python -m database.migrate downgrade -1
 """
-import sqlite3
+import argparse
+import enum
+import functools
+import glob
+import logging
 import os
-from config import DATABASE_URL
-
-def migrate_database():
-    """Add missing columns to existing database"""
-    # Extract database path from DATABASE_URL
-    # DATABASE_URL format: sqlite:///./bot_marketplace.db
-    db_path = DATABASE_URL.replace('sqlite:///', '')
-    
-    print(f"📊 Migrating database: {db_path}")
-    
-    if not os.path.exists(db_path):
-        print(f"❌ Database file not found: {db_path}")
-        return False
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
+import re
+
+from sqlalchemy import inspect
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VERSIONS_DIR = os.path.join(PROJECT_ROOT, 'database', 'migrations', 'versions')
+BASELINE = '0001'
+
+# The module-level fields every revision script has (see script.py.mako)
+_REVISION = re.compile(r"^revision = '([^']+)'$", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision = (.+)$", re.MULTILINE)
+
+
+def alembic_config(configure_logger: bool = False):
+    """alembic.ini with absolute paths, so it works from any working directory"""
+    from alembic.config import Config
+
+    cfg = Config(os.path.join(PROJECT_ROOT, 'alembic.ini'))
+    cfg.set_main_option('script_location', os.path.join(PROJECT_ROOT, 'database', 'migrations'))
+    # The bot has its own logging setup; only the CLI takes alembic.ini's
+    cfg.attributes['configure_logger'] = configure_logger
+    return cfg
+
+
+@functools.lru_cache(maxsize=1)
+def head_revision() -> str:
+    """Newest revision in database/migrations (reads the script headers, not the database)
+
+    Importing Alembic costs more than the rest of the startup check, so the
+    up-to-date path reads revision/down_revision itself and Alembic is only
+    loaded to upgrade - or here, if the chain has branched.
+    """
+    revisions, parents = set(), set()
+    for path in glob.glob(os.path.join(VERSIONS_DIR, '*.py')):
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        revision, down_revision = _REVISION.search(source), _DOWN_REVISION.search(source)
+        if revision is None or down_revision is None:
+            continue
+        revisions.add(revision.group(1))
+        parents.update(re.findall(r"'([^']+)'", down_revision.group(1)))
+    heads = revisions - parents
+    if len(heads) == 1:
+        return heads.pop()
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()  # Raises on multiple heads
+
+
+def current_revision(connection):
+    """Revision the database is at, or None if it has never been migrated"""
+    if not inspect(connection).has_table('alembic_version'):
+        return None
+    return connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+
+
+def _run(connection, fn, *args):
+    cfg = alembic_config()
+    cfg.attributes['connection'] = connection
+    fn(cfg, *args)
+
+
+def backup_database_file():
+    """Snapshot the SQLite database (database.backup) before a schema change"""
+    from database.backup import backup_database, sqlite_path
+
+    db_file = sqlite_path()
+    if not db_file or not os.path.exists(db_file):
+        return None
     try:
-        # Check if is_developer column exists
-        cursor.execute("PRAGMA table_info(users)")
-        columns = [col[1] for col in cursor.fetchall()]
-        
-        if 'is_developer' not in columns:
-            print("🔄 Adding 'is_developer' column to users table...")
-            cursor.execute("ALTER TABLE users ADD COLUMN is_developer BOOLEAN DEFAULT 0")
-            print("✅ Column added successfully!")
-        else:
-            print("✅ 'is_developer' column already exists")
-        
-        # Check if developers table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='developers'")
-        if not cursor.fetchone():
-            print("⚠️ Developers table doesn't exist. Run the bot to create tables.")
-        else:
-            print("✅ Developers table exists")
-        
-        conn.commit()
-        print("🎉 Database migration completed!")
-        return True
-        
+        result = backup_database()
+        print(f"📦 Backed up to: {result.path}")
+        return result.path
     except Exception as e:
-        print(f"❌ Migration error: {e}")
-        conn.rollback()
+        print(f"⚠️ Could not backup: {e}")
+        return None
+
+
+def ensure_schema() -> bool:
+    """Bring the database to the head revision. Returns True if anything was migrated."""
+    from database.db import engine
+
+    head = head_revision()
+    with engine.connect() as connection:
+        current = current_revision(connection)
+        legacy = current is None and inspect(connection).has_table('users')
+    if current == head:
+        logger.info(f"Database schema is at {head}")
         return False
-    finally:
-        conn.close()
+
+    from alembic import command
+
+    if current is not None or legacy:
+        backup_database_file()
+    with engine.connect() as connection:
+        if legacy:
+            print("🔄 Adopting a database created before migrations...")
+            adopt_legacy_database(connection)
+            _run(connection, command.stamp, BASELINE)
+            current = BASELINE
+        print(f"🔄 Migrating database schema {current or 'empty'} → {head}")
+        _run(connection, command.upgrade, 'head')
+        connection.commit()
+    print(f"✅ Database schema is at {head}")
+    return True
+
+
+# ---------- databases from before migrations ----------
+
+def _default_sql(column):
+    """A model's scalar default as SQL, so rows that predate the column get it too"""
+    if column.server_default is not None:
+        return str(column.server_default.arg)
+    if column.default is None or not column.default.is_scalar:
+        return None
+    value = column.default.arg
+    if isinstance(value, enum.Enum):  # Enum columns store the member name
+        value = value.name
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def add_missing_columns(connection) -> int:
+    """ALTER TABLE ... ADD COLUMN for model columns an older table lacks (is_developer, fx_version, ...)"""
+    from database.db import Base
+
+    inspector = inspect(connection)
+    added = 0
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            # Added columns are nullable: existing rows have no value to satisfy NOT NULL
+            ddl = f"{column.name} {column.type.compile(dialect=connection.dialect)}"
+            default = _default_sql(column)
+            if default is not None:
+                ddl += f" DEFAULT {default}"
+            connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+            print(f"✅ Added {table.name}.{column.name}")
+            added += 1
+    return added
+
+
+def add_performance_indexes(connection) -> int:
+    """Create the indexes declared on the models that an older table lacks"""
+    from database.db import Base
+
+    created = 0
+    for table in Base.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            index.create(bind=connection, checkfirst=True)
+            created += 1
+    print(f"✅ Checked {created} indexes")
+    return created
+
+
+def adopt_legacy_database(connection):
+    """Bring a database made by drop_all/create_all (or by hand) up to the baseline schema, keeping its rows
+
+    Missing tables are created with their indexes (create_all skips existing
+    ones), missing columns and indexes are added, the FTS indexes are built,
+    and tables that are derived from orders are rebuilt if they are new.
+    """
+    from database import models
+    from database.db import Base
+    from database.developer_stats import rebuild_developer_stats, record_opening_payouts
+    from database.rollups import rebuild_revenue_rollups
+
+    existing = set(inspect(connection).get_table_names())
+    # Also creates and fills any missing search index (the after_create hook in database.search)
+    Base.metadata.create_all(bind=connection)
+    add_missing_columns(connection)
+    add_performance_indexes(connection)
+
+    # The rebuilds open their own sessions, so this connection's DDL must be committed first
+    connection.commit()
+    if models.RevenueRollup.__tablename__ not in existing:
+        print(f"✅ Rebuilt {rebuild_revenue_rollups()} revenue rollup rows")
+    if models.DeveloperStats.__tablename__ not in existing:
+        recorded = record_opening_payouts()
+        if recorded:
+            print(f"✅ Recorded {recorded} payouts made before developer_payouts existed")
+        print(f"✅ Rebuilt stats for {rebuild_developer_stats()} developers")
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql("ANALYZE")
+        connection.commit()
+
 
 if __name__ == '__main__':
-    migrate_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('upgrade', help="migrate to head (the default), adopting a pre-migration database")
+    commands.add_parser('current', help="show the database's revision")
+    commands.add_parser('history', help="list the revisions")
+    downgrade = commands.add_parser('downgrade', help="step back, e.g. -1 or 0001")
+    downgrade.add_argument('revision')
+    stamp = commands.add_parser('stamp', help="record a revision without running it")
+    stamp.add_argument('revision')
+    revision = commands.add_parser('revision', help="write a new revision, autogenerated from the models")
+    revision.add_argument('-m', '--message', required=True)
+    revision.add_argument('--empty', action='store_true', help="don't autogenerate")
+    args = parser.parse_args()
+
+    from alembic import command
+
+    cfg = alembic_config(configure_logger=True)
+    if args.command in (None, 'upgrade'):
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        ensure_schema()
+    elif args.command == 'current':
+        command.current(cfg, verbose=True)
+    elif args.command == 'history':
+        command.history(cfg, indicate_current=True)
+    elif args.command == 'downgrade':
+        command.downgrade(cfg, args.revision)
+    elif args.command == 'stamp':
+        command.stamp(cfg, args.revision)
+    elif args.command == 'revision':
+        command.revision(cfg, message=args.message, autogenerate=not args.empty)
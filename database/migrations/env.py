@@ -0,0 +1,67 @@
+"""
+Alembic environment - runs migrations on database.db.engine
+
+database.migrate passes its own connection in config.attributes, so the bot
+migrates inside the startup transaction; the alembic CLI connects through
+the same engine (DATABASE_URL from config).
+"""
+import logging
+from logging.config import fileConfig
+
+from alembic import context
+
+from database.db import engine
+from database.models import Base  # Through models, so every table is declared
+from database.search import INDEXES  # Also registers the search index DDL
+
+config = context.config
+if config.config_file_name and config.attributes.get('configure_logger', True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+logger = logging.getLogger('alembic.env')
+
+# FTS5 tables and their shadow tables (jobs_fts_data, ...) are created by
+# database.search, not declared on the models - autogenerate leaves them alone
+FTS_TABLES = tuple(index.name for index in INDEXES.values())
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == 'table' and name and name.startswith(FTS_TABLES):
+        return False
+    return True
+
+
+def _configure(**kwargs):
+    context.configure(
+        target_metadata=Base.metadata,
+        include_object=include_object,
+        # SQLite can't ALTER most things in place; batch mode copies the table
+        render_as_batch=True,
+        compare_type=True,
+        **kwargs
+    )
+
+
+def run_migrations_offline():
+    _configure(url=str(engine.url), literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+    with engine.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,491 @@
+"""baseline schema
+
+Every table, index and FTS5 search index as of the switch from
+drop_all/create_all at startup to migrations. Databases created before then
+are brought up to this schema by database.migrate.adopt_legacy_database and
+stamped with this revision instead of running it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 02:17:02.512752
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from database.search import create_search_indexes, drop_search_indexes
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('bot_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('namespace', sa.String(length=120), nullable=False),
+    sa.Column('key', sa.String(length=200), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('namespace', 'key', name='uq_bot_state_namespace_key')
+    )
+    op.create_table('bots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('slug', sa.String(length=200), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('features', sa.Text(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('delivery_time', sa.String(length=50), nullable=True),
+    sa.Column('is_available', sa.Boolean(), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('slug')
+    )
+    op.create_table('broadcast_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('parse_mode', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'CANCELLED', 'FAILED', name='broadcaststatus'), nullable=True),
+    sa.Column('created_by', sa.String(length=100), nullable=True),
+    sa.Column('status_chat_id', sa.String(length=100), nullable=True),
+    sa.Column('status_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_user_id', sa.Integer(), nullable=True),
+    sa.Column('total_users', sa.Integer(), nullable=True),
+    sa.Column('sent_count', sa.Integer(), nullable=True),
+    sa.Column('failed_count', sa.Integer(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_broadcast_jobs_status', 'broadcast_jobs', ['status'], unique=False)
+    op.create_table('fx_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.String(length=40), nullable=False),
+    sa.Column('source', sa.String(length=30), nullable=False),
+    sa.Column('rates', sa.JSON(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('version')
+    )
+    op.create_table('inbound_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_key', sa.String(length=200), nullable=False),
+    sa.Column('source', sa.String(length=30), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=True),
+    sa.Column('reference', sa.String(length=100), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PROCESSED', 'FAILED', name='inboundeventstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_key')
+    )
+    op.create_index('ix_inbound_events_status_id', 'inbound_events', ['status', 'id'], unique=False)
+    op.create_table('outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('chat_id', sa.String(length=50), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('parse_mode', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'SENT', 'FAILED', name='outboxstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_chat_id_status', 'outbox', ['chat_id', 'status'], unique=False)
+    op.create_index('ix_outbox_status_next_attempt_at', 'outbox', ['status', 'next_attempt_at'], unique=False)
+    op.create_table('payment_method_configs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('method', sa.String(length=50), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('config_data', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('method')
+    )
+    op.create_table('refund_deadlines',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('deadline_type', sa.Enum('ORDER_REFUND', 'REQUEST_REFUND', 'PAYMENT_REMINDER', name='deadlinetype'), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PROCESSING', 'DONE', 'SKIPPED', 'FAILED', name='deadlinestatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('deadline_type', 'target_id', name='uq_refund_deadlines_target')
+    )
+    op.create_index('ix_refund_deadlines_status_due', 'refund_deadlines', ['status', 'due_at'], unique=False)
+    op.create_table('revenue_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=False),
+    sa.Column('payment_method', sa.String(length=50), nullable=False),
+    sa.Column('completed_orders', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('refunded_orders', sa.Integer(), nullable=False),
+    sa.Column('refunded_amount', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'currency', 'payment_method', name='uq_revenue_rollups_key')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('telegram_id', sa.String(length=100), nullable=False),
+    sa.Column('username', sa.String(length=100), nullable=True),
+    sa.Column('first_name', sa.String(length=100), nullable=True),
+    sa.Column('last_name', sa.String(length=100), nullable=True),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('phone', sa.String(length=50), nullable=True),
+    sa.Column('country', sa.String(length=10), nullable=True),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('currency_symbol', sa.String(length=10), nullable=True),
+    sa.Column('is_admin', sa.Boolean(), nullable=True),
+    sa.Column('is_developer', sa.Boolean(), nullable=True),
+    sa.Column('balance', sa.Float(), nullable=True),
+    sa.Column('total_orders', sa.Integer(), nullable=True),
+    sa.Column('can_resolve_disputes', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('telegram_id')
+    )
+    op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False)
+    op.create_table('developer_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('skills_experience', sa.Text(), nullable=False),
+    sa.Column('portfolio_url', sa.String(length=500), nullable=True),
+    sa.Column('github_url', sa.String(length=500), nullable=True),
+    sa.Column('hourly_rate', sa.Float(), nullable=True),
+    sa.Column('status', sa.Enum('NEW', 'IN_REVIEW', 'APPROVED', 'REJECTED', 'CANCELLED', 'REFUNDED', name='requeststatus'), nullable=True),
+    sa.Column('reviewed_by', sa.Integer(), nullable=True),
+    sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+    sa.Column('admin_notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['reviewed_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_developer_requests_status_created_at', 'developer_requests', ['status', 'created_at'], unique=False)
+    op.create_table('developers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('developer_id', sa.String(length=50), nullable=True),
+    sa.Column('status', sa.Enum('ACTIVE', 'BUSY', 'INACTIVE', name='developerstatus'), nullable=True),
+    sa.Column('is_available', sa.Boolean(), nullable=True),
+    sa.Column('skills', sa.Text(), nullable=True),
+    sa.Column('experience', sa.Text(), nullable=True),
+    sa.Column('hourly_rate', sa.Float(), nullable=True),
+    sa.Column('portfolio_url', sa.String(length=500), nullable=True),
+    sa.Column('github_url', sa.String(length=500), nullable=True),
+    sa.Column('completed_orders', sa.Integer(), nullable=True),
+    sa.Column('rating', sa.Float(), nullable=True),
+    sa.Column('earnings', sa.Float(), nullable=True),
+    sa.Column('claim_tokens_available', sa.Integer(), nullable=True),
+    sa.Column('completed_jobs_count', sa.Integer(), nullable=True),
+    sa.Column('average_rating', sa.Float(), nullable=True),
+    sa.Column('total_earnings', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('developer_id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.String(length=50), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('expected_outcome', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('budget', sa.Float(), nullable=False),
+    sa.Column('deposit_amount', sa.Float(), nullable=True),
+    sa.Column('deposit_paid', sa.Boolean(), nullable=True),
+    sa.Column('deposit_paid_at', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.Enum('DRAFT', 'AWAITING_DEPOSIT', 'PENDING_APPROVAL', 'OPEN', 'CLAIMED', 'IN_PROGRESS', 'DELIVERED', 'COMPLETED', 'CANCELLED', 'DISPUTED', 'REFUNDED', name='jobstatus'), nullable=True),
+    sa.Column('is_public', sa.Boolean(), nullable=True),
+    sa.Column('preview_description', sa.Text(), nullable=True),
+    sa.Column('expected_timeline', sa.String(length=100), nullable=True),
+    sa.Column('delivery_date', sa.DateTime(), nullable=True),
+    sa.Column('admin_notes', sa.Text(), nullable=True),
+    sa.Column('approved_by', sa.Integer(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('payment_reference', sa.String(length=200), nullable=True),
+    sa.Column('claim_token_price', sa.Float(), nullable=True),
+    sa.Column('chat_id', sa.String(length=100), nullable=True),
+    sa.Column('chat_link', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['approved_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_id')
+    )
+    op.create_index('ix_jobs_is_public_created_at', 'jobs', ['is_public', 'created_at'], unique=False)
+    op.create_index('ix_jobs_status_created_at', 'jobs', ['status', 'created_at'], unique=False)
+    op.create_index('ix_jobs_user_id_created_at', 'jobs', ['user_id', 'created_at'], unique=False)
+    op.create_table('claim_tokens',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('token_id', sa.String(length=50), nullable=False),
+    sa.Column('developer_id', sa.Integer(), nullable=True),
+    sa.Column('job_id', sa.Integer(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('payment_method', sa.Enum('PAYSTACK', 'BANK_TRANSFER', 'CARD', 'CRYPTO', name='paymentmethod'), nullable=True),
+    sa.Column('payment_reference', sa.String(length=200), nullable=True),
+    sa.Column('is_used', sa.Boolean(), nullable=True),
+    sa.Column('used_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['developer_id'], ['developers.id'], ),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('token_id')
+    )
+    op.create_table('custom_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('request_id', sa.String(length=50), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('features', sa.Text(), nullable=True),
+    sa.Column('budget_tier', sa.String(length=50), nullable=True),
+    sa.Column('estimated_price', sa.Float(), nullable=True),
+    sa.Column('deposit_paid', sa.Float(), nullable=True),
+    sa.Column('is_deposit_paid', sa.Boolean(), nullable=True),
+    sa.Column('delivery_time', sa.String(length=50), nullable=True),
+    sa.Column('timeline', sa.String(length=100), nullable=True),
+    sa.Column('status', sa.Enum('NEW', 'IN_REVIEW', 'APPROVED', 'REJECTED', 'CANCELLED', 'REFUNDED', name='requeststatus'), nullable=True),
+    sa.Column('assigned_to', sa.Integer(), nullable=True),
+    sa.Column('admin_notes', sa.Text(), nullable=True),
+    sa.Column('payment_reference', sa.String(length=200), nullable=True),
+    sa.Column('payment_metadata', sa.JSON(), nullable=True),
+    sa.Column('deposit_paid_at', sa.DateTime(), nullable=True),
+    sa.Column('refunded_at', sa.DateTime(), nullable=True),
+    sa.Column('refund_reason', sa.Text(), nullable=True),
+    sa.Column('refund_metadata', sa.JSON(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_to'], ['developers.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('request_id')
+    )
+    op.create_index('ix_custom_requests_created_at', 'custom_requests', ['created_at'], unique=False)
+    op.create_index('ix_custom_requests_payment_reference', 'custom_requests', ['payment_reference'], unique=False)
+    op.create_index('ix_custom_requests_status_created_at', 'custom_requests', ['status', 'created_at'], unique=False)
+    op.create_index('ix_custom_requests_user_id_created_at', 'custom_requests', ['user_id', 'created_at'], unique=False)
+    op.create_table('developer_earnings_days',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('developer_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('earnings', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['developer_id'], ['developers.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('developer_id', 'day', name='uq_developer_earnings_days_key')
+    )
+    op.create_table('developer_payouts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('developer_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('status', sa.Enum('REQUESTED', 'PAID', 'CANCELLED', name='payoutstatus'), nullable=False),
+    sa.Column('reference', sa.String(length=200), nullable=True),
+    sa.Column('requested_at', sa.DateTime(), nullable=True),
+    sa.Column('paid_at', sa.DateTime(), nullable=True),
+    sa.Column('paid_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['developer_id'], ['developers.id'], ),
+    sa.ForeignKeyConstraint(['paid_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_developer_payouts_developer_id_status', 'developer_payouts', ['developer_id', 'status'], unique=False)
+    op.create_table('developer_stats',
+    sa.Column('developer_id', sa.Integer(), nullable=False),
+    sa.Column('active_orders', sa.Integer(), nullable=False),
+    sa.Column('completed_orders', sa.Integer(), nullable=False),
+    sa.Column('active_jobs', sa.Integer(), nullable=False),
+    sa.Column('completed_jobs', sa.Integer(), nullable=False),
+    sa.Column('active_custom_requests', sa.Integer(), nullable=False),
+    sa.Column('pending_earnings', sa.Float(), nullable=False),
+    sa.Column('total_earnings', sa.Float(), nullable=False),
+    sa.Column('payout_requested', sa.Float(), nullable=False),
+    sa.Column('paid_out', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['developer_id'], ['developers.id'], ),
+    sa.PrimaryKeyConstraint('developer_id')
+    )
+    op.create_table('job_claims',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('claim_id', sa.String(length=50), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=True),
+    sa.Column('developer_id', sa.Integer(), nullable=False),
+    sa.Column('claim_token_paid', sa.Boolean(), nullable=True),
+    sa.Column('status', sa.Enum('CLAIMED', 'IN_PROGRESS', 'DELIVERED', 'COMPLETED', 'DISPUTED', 'REFUNDED', name='claimstatus'), nullable=True),
+    sa.Column('token_payment_reference', sa.String(length=200), nullable=True),
+    sa.Column('token_payment_method', sa.Enum('PAYSTACK', 'BANK_TRANSFER', 'CARD', 'CRYPTO', name='paymentmethod'), nullable=True),
+    sa.Column('submission_text', sa.Text(), nullable=True),
+    sa.Column('submission_files', sa.JSON(), nullable=True),
+    sa.Column('submitted_at', sa.DateTime(), nullable=True),
+    sa.Column('customer_accepted', sa.Boolean(), nullable=True),
+    sa.Column('customer_rating', sa.Integer(), nullable=True),
+    sa.Column('customer_feedback', sa.Text(), nullable=True),
+    sa.Column('final_payment_paid', sa.Boolean(), nullable=True),
+    sa.Column('final_payment_reference', sa.String(length=200), nullable=True),
+    sa.Column('final_payment_method', sa.Enum('PAYSTACK', 'BANK_TRANSFER', 'CARD', 'CRYPTO', name='paymentmethod'), nullable=True),
+    sa.Column('dispute_reason', sa.Text(), nullable=True),
+    sa.Column('dispute_resolved_by', sa.Integer(), nullable=True),
+    sa.Column('dispute_resolution', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['developer_id'], ['developers.id'], ),
+    sa.ForeignKeyConstraint(['dispute_resolved_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('claim_id'),
+    sa.UniqueConstraint('job_id')
+    )
+    op.create_table('job_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('message_type', sa.Enum('TEXT', 'FILE', 'SYSTEM', name='messagetype'), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('file_url', sa.String(length=500), nullable=True),
+    sa.Column('file_type', sa.String(length=50), nullable=True),
+    sa.Column('contains_contact_info', sa.Boolean(), nullable=True),
+    sa.Column('flagged', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_messages_job_id_created_at', 'job_messages', ['job_id', 'created_at'], unique=False)
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.String(length=50), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('bot_id', sa.Integer(), nullable=True),
+    sa.Column('assigned_developer_id', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING_PAYMENT', 'PENDING_REVIEW', 'APPROVED', 'ASSIGNED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', 'REFUNDED', name='orderstatus'), nullable=True),
+    sa.Column('payment_method', sa.Enum('PAYSTACK', 'BANK_TRANSFER', 'CARD', 'CRYPTO', name='paymentmethod'), nullable=True),
+    sa.Column('payment_status', sa.Enum('PENDING', 'VERIFIED', 'FAILED', 'REFUNDED', name='paymentstatus'), nullable=True),
+    sa.Column('payment_proof_url', sa.String(length=500), nullable=True),
+    sa.Column('payment_reference', sa.String(length=200), nullable=True),
+    sa.Column('payment_metadata', sa.JSON(), nullable=True),
+    sa.Column('admin_notes', sa.Text(), nullable=True),
+    sa.Column('developer_notes', sa.Text(), nullable=True),
+    sa.Column('delivered_at', sa.DateTime(), nullable=True),
+    sa.Column('paid_at', sa.DateTime(), nullable=True),
+    sa.Column('refunded_at', sa.DateTime(), nullable=True),
+    sa.Column('refund_reason', sa.Text(), nullable=True),
+    sa.Column('refund_metadata', sa.JSON(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_developer_id'], ['developers.id'], ),
+    sa.ForeignKeyConstraint(['bot_id'], ['bots.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_id')
+    )
+    op.create_index('ix_orders_assigned_developer_id_status', 'orders', ['assigned_developer_id', 'status'], unique=False)
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'], unique=False)
+    op.create_index('ix_orders_payment_reference', 'orders', ['payment_reference'], unique=False)
+    op.create_index('ix_orders_status_approved_at', 'orders', ['status', 'approved_at'], unique=False)
+    op.create_index('ix_orders_status_created_at', 'orders', ['status', 'created_at'], unique=False)
+    op.create_index('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at'], unique=False)
+    op.create_table('transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('transaction_id', sa.String(length=100), nullable=True),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('payment_method', sa.Enum('PAYSTACK', 'BANK_TRANSFER', 'CARD', 'CRYPTO', name='paymentmethod'), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('reference', sa.String(length=200), nullable=True),
+    sa.Column('gateway_response', sa.Text(), nullable=True),
+    sa.Column('transaction_data', sa.JSON(), nullable=True),
+    sa.Column('usd_amount', sa.Float(), nullable=True),
+    sa.Column('fx_version', sa.String(length=40), nullable=True),
+    sa.Column('refund_data', sa.JSON(), nullable=True),
+    sa.Column('verified_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('transaction_id')
+    )
+    op.create_index('ix_transactions_order_id', 'transactions', ['order_id'], unique=False)
+    op.create_index('ix_transactions_reference', 'transactions', ['reference'], unique=False)
+    # Full-text search tables and their sync triggers (SQLite only)
+    create_search_indexes(op.get_bind())
+
+
+def downgrade():
+    drop_search_indexes(op.get_bind())
+    op.drop_index('ix_transactions_reference', table_name='transactions')
+    op.drop_index('ix_transactions_order_id', table_name='transactions')
+    op.drop_table('transactions')
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_status_created_at', table_name='orders')
+    op.drop_index('ix_orders_status_approved_at', table_name='orders')
+    op.drop_index('ix_orders_payment_reference', table_name='orders')
+    op.drop_index('ix_orders_created_at', table_name='orders')
+    op.drop_index('ix_orders_assigned_developer_id_status', table_name='orders')
+    op.drop_table('orders')
+    op.drop_index('ix_job_messages_job_id_created_at', table_name='job_messages')
+    op.drop_table('job_messages')
+    op.drop_table('job_claims')
+    op.drop_table('developer_stats')
+    op.drop_index('ix_developer_payouts_developer_id_status', table_name='developer_payouts')
+    op.drop_table('developer_payouts')
+    op.drop_table('developer_earnings_days')
+    op.drop_index('ix_custom_requests_user_id_created_at', table_name='custom_requests')
+    op.drop_index('ix_custom_requests_status_created_at', table_name='custom_requests')
+    op.drop_index('ix_custom_requests_payment_reference', table_name='custom_requests')
+    op.drop_index('ix_custom_requests_created_at', table_name='custom_requests')
+    op.drop_table('custom_requests')
+    op.drop_table('claim_tokens')
+    op.drop_index('ix_jobs_user_id_created_at', table_name='jobs')
+    op.drop_index('ix_jobs_status_created_at', table_name='jobs')
+    op.drop_index('ix_jobs_is_public_created_at', table_name='jobs')
+    op.drop_table('jobs')
+    op.drop_table('developers')
+    op.drop_index('ix_developer_requests_status_created_at', table_name='developer_requests')
+    op.drop_table('developer_requests')
+    op.drop_index('ix_users_created_at', table_name='users')
+    op.drop_table('users')
+    op.drop_table('revenue_rollups')
+    op.drop_index('ix_refund_deadlines_status_due', table_name='refund_deadlines')
+    op.drop_table('refund_deadlines')
+    op.drop_table('payment_method_configs')
+    op.drop_index('ix_outbox_status_next_attempt_at', table_name='outbox')
+    op.drop_index('ix_outbox_chat_id_status', table_name='outbox')
+    op.drop_table('outbox')
+    op.drop_index('ix_inbound_events_status_id', table_name='inbound_events')
+    op.drop_table('inbound_events')
+    op.drop_table('fx_snapshots')
+    op.drop_index('ix_broadcast_jobs_status', table_name='broadcast_jobs')
+    op.drop_table('broadcast_jobs')
+    op.drop_table('bots')
+    op.drop_table('bot_state')
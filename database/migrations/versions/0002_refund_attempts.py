@@ -0,0 +1,30 @@
+"""refund attempts
+
+refund_deadlines records when a refund was sent to Paystack (committed
+before the call) and the id Paystack gave it, so a retry after a crash or a
+failed commit looks the refund up instead of refunding twice.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 02:38:31.578837
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('refund_deadlines', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('refund_requested_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('refund_id', sa.String(length=50), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('refund_deadlines', schema=None) as batch_op:
+        batch_op.drop_column('refund_id')
+        batch_op.drop_column('refund_requested_at')
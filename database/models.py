@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Date, Text, ForeignKey, Enum, JSON, Index, UniqueConstraint, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -69,9 +69,46 @@ class MessageType(str, enum.Enum):
     FILE = "file"
     SYSTEM = "system"
 
+class DeadlineType(str, enum.Enum):
+    ORDER_REFUND = "order_refund"
+    REQUEST_REFUND = "request_refund"
+    PAYMENT_REMINDER = "payment_reminder"
+
+class DeadlineStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+class BroadcastStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+class InboundEventStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+class PayoutStatus(str, enum.Enum):
+    REQUESTED = "requested"
+    PAID = "paid"
+    CANCELLED = "cancelled"
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
 # ========== MODELS ==========
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_created_at', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     telegram_id = Column(String(100), unique=True, nullable=False)
@@ -160,6 +197,14 @@ class Bot(Base):
 
 class Order(Base):
     __tablename__ = 'orders'
+    __table_args__ = (
+        Index('ix_orders_payment_reference', 'payment_reference'),
+        Index('ix_orders_status_approved_at', 'status', 'approved_at'),
+        Index('ix_orders_status_created_at', 'status', 'created_at'),
+        Index('ix_orders_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_orders_assigned_developer_id_status', 'assigned_developer_id', 'status'),
+        Index('ix_orders_created_at', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     order_id = Column(String(50), unique=True, nullable=False)
@@ -197,6 +242,12 @@ class Order(Base):
 
 class CustomRequest(Base):
     __tablename__ = 'custom_requests'
+    __table_args__ = (
+        Index('ix_custom_requests_payment_reference', 'payment_reference'),
+        Index('ix_custom_requests_status_created_at', 'status', 'created_at'),
+        Index('ix_custom_requests_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_custom_requests_created_at', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     request_id = Column(String(50), unique=True, nullable=False)
@@ -236,6 +287,9 @@ class CustomRequest(Base):
 
 class DeveloperRequest(Base):
     __tablename__ = 'developer_requests'
+    __table_args__ = (
+        Index('ix_developer_requests_status_created_at', 'status', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -257,6 +311,10 @@ class DeveloperRequest(Base):
 
 class Transaction(Base):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        Index('ix_transactions_reference', 'reference'),
+        Index('ix_transactions_order_id', 'order_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     transaction_id = Column(String(100), unique=True)
@@ -272,6 +330,8 @@ class Transaction(Base):
     
     # USD equivalent amount
     usd_amount = Column(Float)
+    # Exchange rate snapshot the amounts were converted with (fx_snapshots.version)
+    fx_version = Column(String(40))
     
     # Refund fields
     refund_data = Column(JSON)
@@ -294,6 +354,11 @@ class PaymentMethodConfig(Base):
 # ========== JOB MARKETPLACE MODELS ==========
 class Job(Base):
     __tablename__ = 'jobs'
+    __table_args__ = (
+        Index('ix_jobs_is_public_created_at', 'is_public', 'created_at'),
+        Index('ix_jobs_status_created_at', 'status', 'created_at'),
+        Index('ix_jobs_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     job_id = Column(String(50), unique=True, nullable=False)
@@ -384,6 +449,9 @@ class JobClaim(Base):
 
 class JobMessage(Base):
     __tablename__ = 'job_messages'
+    __table_args__ = (
+        Index('ix_job_messages_job_id_created_at', 'job_id', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
@@ -420,4 +488,187 @@ class ClaimToken(Base):
     
     # Relationships
     developer = relationship("Developer", back_populates="claim_tokens", foreign_keys=[developer_id])
-    job = relationship("Job", foreign_keys=[job_id])
\ No newline at end of file
+    job = relationship("Job", foreign_keys=[job_id])
+
+# ========== BROADCAST MODELS ==========
+class BroadcastJob(Base):
+    __tablename__ = 'broadcast_jobs'
+    
+    id = Column(Integer, primary_key=True)
+    message = Column(Text, nullable=False)
+    parse_mode = Column(String(20), default='Markdown')
+    status = Column(Enum(BroadcastStatus), default=BroadcastStatus.PENDING, index=True)
+    created_by = Column(String(100))
+    
+    # Admin message that receives progressive status edits
+    status_chat_id = Column(String(100))
+    status_message_id = Column(Integer)
+    
+    # Streaming cursor over users.id - everything <= last_user_id has been handled
+    last_user_id = Column(Integer, default=0)
+    total_users = Column(Integer, default=0)
+    sent_count = Column(Integer, default=0)
+    failed_count = Column(Integer, default=0)
+    last_error = Column(Text)
+    
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+# ========== REFUND SCHEDULER MODELS ==========
+class RefundDeadline(Base):
+    __tablename__ = 'refund_deadlines'
+    __table_args__ = (
+        # One deadline per target - makes scheduling idempotent across restarts
+        UniqueConstraint('deadline_type', 'target_id', name='uq_refund_deadlines_target'),
+        Index('ix_refund_deadlines_status_due', 'status', 'due_at'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    deadline_type = Column(Enum(DeadlineType), nullable=False)
+    target_id = Column(Integer, nullable=False)  # orders.id or custom_requests.id
+    due_at = Column(DateTime, nullable=False)
+    status = Column(Enum(DeadlineStatus), default=DeadlineStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text)
+    # Set (and committed) before a refund is sent to Paystack; a retry with it set looks the refund up first
+    refund_requested_at = Column(DateTime)
+    refund_id = Column(String(50))  # Paystack's id for the refund
+    processed_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.now)
+
+
+# ========== REPORTING MODELS ==========
+class RevenueRollup(Base):
+    __tablename__ = 'revenue_rollups'
+    __table_args__ = (
+        UniqueConstraint('day', 'currency', 'payment_method', name='uq_revenue_rollups_key'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)  # Order creation date, same bucket the screens report on
+    currency = Column(String(10), nullable=False)
+    payment_method = Column(String(50), nullable=False)  # PaymentMethod value or 'other'
+    completed_orders = Column(Integer, default=0, nullable=False)
+    revenue = Column(Float, default=0, nullable=False)  # Sum of Order.amount (base currency)
+    refunded_orders = Column(Integer, default=0, nullable=False)
+    refunded_amount = Column(Float, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class DeveloperStats(Base):
+    __tablename__ = 'developer_stats'
+    
+    # One row per developer, maintained by database.developer_stats
+    developer_id = Column(Integer, ForeignKey('developers.id'), primary_key=True)
+    active_orders = Column(Integer, default=0, nullable=False)  # ASSIGNED / IN_PROGRESS
+    completed_orders = Column(Integer, default=0, nullable=False)
+    active_jobs = Column(Integer, default=0, nullable=False)  # Claimed, in progress or delivered
+    completed_jobs = Column(Integer, default=0, nullable=False)
+    active_custom_requests = Column(Integer, default=0, nullable=False)  # APPROVED and assigned
+    pending_earnings = Column(Float, default=0, nullable=False)  # Developer share of active work
+    total_earnings = Column(Float, default=0, nullable=False)  # Developer share of completed work
+    payout_requested = Column(Float, default=0, nullable=False)  # Open payout requests
+    paid_out = Column(Float, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class DeveloperEarningsDay(Base):
+    __tablename__ = 'developer_earnings_days'
+    __table_args__ = (
+        UniqueConstraint('developer_id', 'day', name='uq_developer_earnings_days_key'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    developer_id = Column(Integer, ForeignKey('developers.id'), nullable=False)
+    day = Column(Date, nullable=False)  # Order delivery / job submission date
+    completed = Column(Integer, default=0, nullable=False)
+    earnings = Column(Float, default=0, nullable=False)
+
+
+# ========== DEVELOPER PAYOUT MODELS ==========
+class DeveloperPayout(Base):
+    __tablename__ = 'developer_payouts'
+    __table_args__ = (
+        Index('ix_developer_payouts_developer_id_status', 'developer_id', 'status'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    developer_id = Column(Integer, ForeignKey('developers.id'), nullable=False)
+    amount = Column(Float, nullable=False)
+    status = Column(Enum(PayoutStatus), default=PayoutStatus.REQUESTED, nullable=False)
+    reference = Column(String(200))
+    requested_at = Column(DateTime, default=datetime.now)
+    paid_at = Column(DateTime)
+    paid_by = Column(Integer, ForeignKey('users.id'))
+
+
+# ========== WEBHOOK INBOX MODELS ==========
+class InboundEvent(Base):
+    __tablename__ = 'inbound_events'
+    __table_args__ = (
+        Index('ix_inbound_events_status_id', 'status', 'id'),
+    )
+    
+    id = Column(Integer, primary_key=True)  # Arrival order - events are applied in this order
+    # Provider's identity for the event; retries of the same delivery collide here
+    event_key = Column(String(200), unique=True, nullable=False)
+    source = Column(String(30), nullable=False)  # 'paystack'
+    event_type = Column(String(100))
+    reference = Column(String(100))
+    payload = Column(Text, nullable=False)  # Raw request body, exactly as signed
+    status = Column(Enum(InboundEventStatus), default=InboundEventStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text)
+    received_at = Column(DateTime, default=datetime.now)
+    processed_at = Column(DateTime)
+
+
+# ========== EXCHANGE RATE MODELS ==========
+class FxSnapshot(Base):
+    __tablename__ = 'fx_snapshots'
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(String(40), unique=True, nullable=False)
+    source = Column(String(30), nullable=False)  # 'config', 'openexchangerates', 'fixer'
+    rates = Column(JSON, nullable=False)  # Units of each currency per USD
+    fetched_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+
+
+# ========== NOTIFICATION OUTBOX MODELS ==========
+class OutboxMessage(Base):
+    __tablename__ = 'outbox'
+    __table_args__ = (
+        Index('ix_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+        Index('ix_outbox_chat_id_status', 'chat_id', 'status'),
+    )
+    
+    id = Column(Integer, primary_key=True)  # Send order within a chat
+    chat_id = Column(String(50), nullable=False)
+    text = Column(Text, nullable=False)
+    parse_mode = Column(String(20))
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.now, nullable=False)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.now)
+    sent_at = Column(DateTime)
+
+
+# ========== BOT STATE PERSISTENCE MODELS ==========
+class PersistedState(Base):
+    """user_data, chat_data and conversation states kept across restarts (services.persistence)"""
+    __tablename__ = 'bot_state'
+    __table_args__ = (
+        UniqueConstraint('namespace', 'key', name='uq_bot_state_namespace_key'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    # 'user_data', 'chat_data', 'bot_data' or 'conversation:<handler name>'
+    namespace = Column(String(120), nullable=False)
+    key = Column(String(200), nullable=False)  # User/chat ID, or the conversation key as JSON
+    data = Column(LargeBinary, nullable=False)  # Pickled value
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
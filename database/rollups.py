@@ -0,0 +1,171 @@
+"""
+Daily revenue rollups - kept in step with orders inside the same transaction
+
+Every flush that creates, deletes or changes an order moves its contribution
+between rollup rows, so reports never have to scan the orders table.
+
+    python -m database.rollups     # rebuild all rollups from orders
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event, inspect, update
+
+from .db import SessionLocal, create_session, engine
+from .models import Order, OrderStatus, RevenueRollup
+from config import DEFAULT_CURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Order columns that decide which rollup row (if any) an order counts towards
+ROLLUP_FIELDS = ('status', 'amount', 'payment_method', 'payment_metadata', 'created_at')
+DELTA_COLUMNS = ('completed_orders', 'revenue', 'refunded_orders', 'refunded_amount')
+
+RollupKey = Tuple[object, str, str]
+
+
+def rollup_key(created_at, payment_method, payment_metadata) -> RollupKey:
+    currency = (payment_metadata or {}).get('currency') if isinstance(payment_metadata, dict) else None
+    method = payment_method.value if payment_method is not None else 'other'
+    return (created_at or datetime.now()).date(), currency or DEFAULT_CURRENCY, method
+
+
+def contribution(values: dict) -> List[Tuple[RollupKey, Tuple[int, float, int, float]]]:
+    """What a single order adds to the rollups given its column values"""
+    amount = values['amount'] or 0
+    key = rollup_key(values['created_at'], values['payment_method'], values['payment_metadata'])
+    if values['status'] == OrderStatus.COMPLETED:
+        return [(key, (1, amount, 0, 0))]
+    if values['status'] == OrderStatus.REFUNDED:
+        return [(key, (0, 0, 1, amount))]
+    return []
+
+
+def _current_values(order: Order) -> dict:
+    return {name: getattr(order, name) for name in ROLLUP_FIELDS}
+
+
+def _previous_values(order: Order) -> dict:
+    state = inspect(order)
+    values = {}
+    for name in ROLLUP_FIELDS:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            values[name] = getattr(order, name)
+    return values
+
+
+def upsert_increments(connection, table, key: dict, increments: dict, touch: bool = True):
+    """Add `increments` to the row of `table` identified by `key`, creating it if missing"""
+    dialect = connection.dialect.name
+    stamp = {'updated_at': datetime.now()} if touch else {}
+
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(**key, **stamp, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={**{column: table.c[column] + stmt.excluded[column] for column in increments}, **stamp}
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        update(table).where(*(table.c[column] == value for column, value in key.items())).values(
+            **stamp, **{column: table.c[column] + value for column, value in increments.items()}
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(**key, **stamp, **increments))
+
+
+def apply_deltas(connection, deltas: Dict[RollupKey, List[float]]):
+    """Add `deltas` to the rollup rows, creating rows that don't exist yet"""
+    for (day, currency, method), delta in deltas.items():
+        if any(delta):
+            upsert_increments(connection, RevenueRollup.__table__,
+                              {'day': day, 'currency': currency, 'payment_method': method},
+                              dict(zip(DELTA_COLUMNS, delta)))
+
+
+# ---------- incremental maintenance ----------
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the old value on assignment so the flush hook always sees the transition
+for _name in ROLLUP_FIELDS:
+    event.listen(getattr(Order, _name), 'set', _keep_previous_value, active_history=True, retval=True)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _update_revenue_rollups(session, flush_context):
+    deltas: Dict[RollupKey, List[float]] = defaultdict(lambda: [0, 0.0, 0, 0.0])
+
+    def add(values, sign):
+        for key, delta in contribution(values):
+            for i, value in enumerate(delta):
+                deltas[key][i] += sign * value
+
+    for obj in session.new:
+        if isinstance(obj, Order):
+            add(_current_values(obj), 1)
+    for obj in session.dirty:
+        if isinstance(obj, Order) and session.is_modified(obj):
+            add(_previous_values(obj), -1)
+            add(_current_values(obj), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Order):
+            add(_previous_values(obj), -1)
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+# ---------- backfill ----------
+
+def rebuild_revenue_rollups(batch_size: int = 5000) -> int:
+    """Recompute every rollup row from the orders table. Returns rows written."""
+    totals: Dict[RollupKey, List[float]] = defaultdict(lambda: [0, 0.0, 0, 0.0])
+    db = create_session()
+    try:
+        rows = db.query(
+            Order.status, Order.amount, Order.payment_method, Order.payment_metadata, Order.created_at
+        ).filter(
+            Order.status.in_([OrderStatus.COMPLETED, OrderStatus.REFUNDED])
+        ).execution_options(yield_per=batch_size)
+
+        for row in rows:
+            for key, delta in contribution(dict(zip(ROLLUP_FIELDS, row))):
+                for i, value in enumerate(delta):
+                    totals[key][i] += value
+    finally:
+        db.close()
+
+    now = datetime.now()
+    rows = [{'day': day, 'currency': currency, 'payment_method': method, 'updated_at': now,
+             **dict(zip(DELTA_COLUMNS, delta))}
+            for (day, currency, method), delta in totals.items() if any(delta)]
+    with engine.begin() as conn:
+        conn.execute(RevenueRollup.__table__.delete())
+        # The table is empty now, so one executemany instead of an upsert per row
+        if rows:
+            conn.execute(RevenueRollup.__table__.insert(), rows)
+
+    logger.info(f"Rebuilt {len(rows)} revenue rollup rows")
+    return len(rows)
+
+
+if __name__ == '__main__':
+    RevenueRollup.__table__.create(bind=engine, checkfirst=True)
+    print(f"✅ Rebuilt {rebuild_revenue_rollups()} revenue rollup rows")
@@ -0,0 +1,210 @@
+"""
+Full-text search - SQLite FTS5 indexes over jobs, bots, users, orders and custom requests
+
+Each index is an external-content FTS5 table (the text stays in the base
+table) kept in sync by insert/update/delete triggers, so every write path -
+ORM, Core or raw sqlite3 - updates it in the same transaction. Results are
+ranked with bm25 (per-column weights below) and paged with LIMIT/OFFSET.
+Scoring is linear in the number of matches, so only the newest
+SEARCH_MAX_CANDIDATES matches (FTS5 streams them in rowid order) are ranked:
+a word in half of 500k jobs costs the same as a rare one. Public searches
+drop the rows customers can't see while streaming, before the cap.
+
+Names and text use the unicode61 tokenizer with prefix indexes, so "crypt"
+finds "crypto" as it is typed. IDs and payment references use the trigram tokenizer, so
+any 3+ character fragment of "ORD20240101120000AB12CD34" finds it.
+
+Other databases fall back to case-insensitive LIKE, newest first.
+
+    python -m database.search     # create missing indexes and rebuild them all
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, event, func, literal_column, or_, select, text
+from sqlalchemy.sql import column, table
+
+from config import SEARCH_MAX_CANDIDATES
+from .db import Base, engine
+from .models import Bot, CustomRequest, Job, JobStatus, Order, User
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FtsIndex:
+    name: str  # FTS5 table
+    model: type
+    columns: Tuple[str, ...]
+    weights: Tuple[float, ...]  # bm25 weight per column - higher ranks matches there first
+    tokenize: str = "unicode61 remove_diacritics 2"
+    prefix: Optional[str] = "2 3"  # Prefix lengths indexed for "term*" queries
+
+    @property
+    def source(self) -> str:
+        return self.model.__tablename__
+
+    @property
+    def trigram(self) -> bool:
+        return self.tokenize == "trigram"
+
+
+INDEXES: Dict[str, FtsIndex] = {
+    'jobs': FtsIndex('jobs_fts', Job, ('title', 'description', 'job_id'), (10.0, 1.0, 5.0)),
+    'bots': FtsIndex('bots_fts', Bot, ('name', 'description', 'features', 'category'), (10.0, 2.0, 1.0, 3.0)),
+    'users': FtsIndex('users_fts', User, ('username', 'first_name', 'last_name', 'telegram_id'),
+                      (10.0, 5.0, 3.0, 10.0)),
+    'orders': FtsIndex('orders_fts', Order, ('order_id', 'payment_reference'), (10.0, 5.0),
+                       tokenize="trigram", prefix=None),
+    'requests': FtsIndex('custom_requests_fts', CustomRequest, ('request_id', 'payment_reference'), (10.0, 5.0),
+                         tokenize="trigram", prefix=None),
+}
+
+
+# ---------- DDL ----------
+
+def _ddl(index: FtsIndex) -> List[str]:
+    cols = ", ".join(index.columns)
+    new = ", ".join(f"new.{c}" for c in index.columns)
+    old = ", ".join(f"old.{c}" for c in index.columns)
+    options = f"content='{index.source}', content_rowid='id', tokenize='{index.tokenize}'"
+    if index.prefix:
+        options += f", prefix='{index.prefix}'"
+    delete_old = (f"INSERT INTO {index.name}({index.name}, rowid, {cols}) "
+                  f"VALUES ('delete', old.id, {old});")
+    insert_new = f"INSERT INTO {index.name}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index.name} USING fts5({cols}, {options})",
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_ai AFTER INSERT ON {index.source} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_ad AFTER DELETE ON {index.source} BEGIN {delete_old} END",
+        # Only writes to indexed columns re-index the row; status changes don't
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_au AFTER UPDATE OF {cols} ON {index.source} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def create_search_indexes(connection, rebuild: bool = False) -> int:
+    """Create any missing FTS tables and triggers (SQLite only). Returns indexes rebuilt."""
+    if connection.dialect.name != 'sqlite':
+        return 0
+    rebuilt = 0
+    for index in INDEXES.values():
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (index.name,)
+        ).first()
+        for statement in _ddl(index):
+            connection.exec_driver_sql(statement)
+        # A new index over existing rows, or an explicit rebuild, reads them all in
+        if rebuild or not exists:
+            connection.exec_driver_sql(f"INSERT INTO {index.name}({index.name}) VALUES ('rebuild')")
+            rebuilt += 1
+    return rebuilt
+
+
+def drop_search_indexes(connection):
+    if connection.dialect.name != 'sqlite':
+        return
+    for index in INDEXES.values():
+        for suffix in ('ai', 'ad', 'au'):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {index.name}_{suffix}")
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {index.name}")
+
+
+# create_all()/drop_all() manage the indexes along with their tables
+@event.listens_for(Base.metadata, "after_create")
+def _create_with_tables(target, connection, **kw):
+    create_search_indexes(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_with_tables(target, connection, **kw):
+    drop_search_indexes(connection)
+
+
+# ---------- queries ----------
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def match_expression(index: FtsIndex, query: str) -> Optional[str]:
+    """FTS5 MATCH string for free text: every term must match (a fragment, for IDs)
+
+    Only the last term matches as a prefix - it's the one still being typed,
+    and a prefix merges the postings of every word it expands to.
+    """
+    terms = _TERM.findall(query)
+    if index.trigram:
+        # Trigram terms match anywhere but need 3+ characters
+        terms = [term for term in terms if len(term) >= 3]
+        return " ".join(f'"{term}"' for term in terms) or None
+    if not terms:
+        return None
+    return " ".join([*(f'"{term}"' for term in terms[:-1]), f'"{terms[-1]}"*'])
+
+
+@dataclass
+class SearchPage:
+    items: List = field(default_factory=list)
+    page: int = 0
+    has_next: bool = False
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 0
+
+
+def _filters(kind: str, public: bool) -> list:
+    """Rows customers may see; admins see everything"""
+    if not public:
+        return []
+    if kind == 'jobs':
+        return [Job.is_public == True, Job.status != JobStatus.CANCELLED]
+    if kind == 'bots':
+        return [Bot.is_available == True]
+    raise ValueError(f"{kind} can't be searched publicly")
+
+
+def search(db, kind: str, query: str, page: int = 0, page_size: int = 10, public: bool = False) -> SearchPage:
+    """One page of `kind` rows matching `query`, best match first"""
+    index = INDEXES[kind]
+    model = index.model
+    page = max(0, page)
+
+    if db.get_bind().dialect.name == 'sqlite':
+        expression = match_expression(index, query)
+        if expression is None:
+            return SearchPage(page=page)
+        fts = table(index.name, column('rowid'))
+        candidates = select(
+            fts.c.rowid, func.bm25(literal_column(index.name), *index.weights).label('score')
+        ).where(
+            text(f"{index.name} MATCH :expression").bindparams(expression=expression)
+        )
+        filters = _filters(kind, public)
+        if filters:
+            # Filter before the cap, so hidden rows (private jobs, unavailable bots) don't use it up
+            base = model.__table__
+            candidates = candidates.select_from(fts.join(base, base.c.id == fts.c.rowid)).where(*filters)
+        candidates = candidates.order_by(fts.c.rowid.desc()).limit(SEARCH_MAX_CANDIDATES).subquery()
+        rows = db.query(model).join(candidates, candidates.c.rowid == model.id).order_by(
+            candidates.c.score, model.id.desc()
+        )
+    else:
+        terms = _TERM.findall(query)
+        if not terms:
+            return SearchPage(page=page)
+        rows = db.query(model).filter(
+            and_(*(or_(*(getattr(model, c).ilike(f"%{term}%") for c in index.columns)) for term in terms)),
+            *_filters(kind, public)
+        ).order_by(model.id.desc())
+
+    items = rows.offset(page * page_size).limit(page_size + 1).all()
+    return SearchPage(items=items[:page_size], page=page, has_next=len(items) > page_size)
+
+
+if __name__ == '__main__':
+    with engine.begin() as conn:
+        rebuilt = create_search_indexes(conn, rebuild=True)
+    print(f"✅ Rebuilt {rebuilt} search indexes")
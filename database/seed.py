@@ -0,0 +1,499 @@
+"""
+Seed data at scale - realistic volumes for benchmarks, query plans and index work
+
+Bulk-inserts users, developers, bots, orders with their transactions, custom
+requests, jobs with their claims, and job messages. Rows go in through Core
+executemany, SEED_BATCH_SIZE rows per transaction. Ids are assigned here, so
+rows can point at each other without reading anything back.
+
+- statuses follow weighted distributions over every value of the enums in
+  database.models, and the other columns agree with them (a completed order
+  was paid, approved, assigned and delivered; an open job has its deposit)
+- signups and orders grow towards the end of the --days window; later
+  timestamps (paid, approved, delivered, refunded) always follow created_at
+- a few customers and jobs account for most orders and messages
+- the same --seed and --until give the same rows
+
+What ORM flushes normally keep up to date per row (revenue rollups,
+developer stats, the search indexes) is rebuilt once at the end.
+
+    python -m database.seed                          # 200k users, 2M orders, 300k jobs, 1M messages
+    python -m database.seed --scale 0.05 --seed 7
+    python -m database.seed --orders 500000 --users 50000 --append
+"""
+import argparse
+import itertools
+import logging
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from .db import Base, engine
+from .models import (
+    Bot, ClaimStatus, CustomRequest, Developer, DeveloperStatus, Job, JobClaim, JobMessage, JobStatus,
+    MessageType, Order, OrderStatus, PaymentMethod, PaymentStatus, RequestStatus, Transaction, User,
+)
+from config import (
+    SEED_BATCH_SIZE, COUNTRY_CURRENCY_MAP, CURRENCY_SYMBOLS, EXCHANGE_RATES, JOB_CATEGORIES, SOFTWARE_CATEGORIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows per table at --scale 1
+VOLUMES = {
+    'users': 200_000,
+    'developers': 4_000,
+    'bots': 500,
+    'orders': 2_000_000,
+    'custom_requests': 50_000,
+    'jobs': 300_000,
+    'job_messages': 1_000_000,
+}
+
+# Where customers are (weights)
+COUNTRIES = {'NG': 38, 'GH': 22, 'KE': 10, 'ZA': 7, 'US': 9, 'GB': 5, 'CI': 3, 'CM': 2, 'FR': 2, 'CA': 1, 'AU': 1}
+
+ORDER_STATUSES = {
+    OrderStatus.PENDING_PAYMENT: 8, OrderStatus.PENDING_REVIEW: 3, OrderStatus.APPROVED: 2,
+    OrderStatus.ASSIGNED: 3, OrderStatus.IN_PROGRESS: 5, OrderStatus.COMPLETED: 68,
+    OrderStatus.CANCELLED: 7, OrderStatus.REFUNDED: 4,
+}
+PAYMENT_METHODS = {
+    PaymentMethod.PAYSTACK: 72, PaymentMethod.BANK_TRANSFER: 15, PaymentMethod.CARD: 9, PaymentMethod.CRYPTO: 4,
+}
+REQUEST_STATUSES = {
+    RequestStatus.NEW: 12, RequestStatus.IN_REVIEW: 8, RequestStatus.APPROVED: 55,
+    RequestStatus.REJECTED: 10, RequestStatus.CANCELLED: 10, RequestStatus.REFUNDED: 5,
+}
+JOB_STATUSES = {
+    JobStatus.DRAFT: 3, JobStatus.AWAITING_DEPOSIT: 8, JobStatus.PENDING_APPROVAL: 4, JobStatus.OPEN: 18,
+    JobStatus.CLAIMED: 7, JobStatus.IN_PROGRESS: 12, JobStatus.DELIVERED: 5, JobStatus.COMPLETED: 33,
+    JobStatus.CANCELLED: 7, JobStatus.DISPUTED: 1, JobStatus.REFUNDED: 2,
+}
+DEVELOPER_STATUSES = {DeveloperStatus.ACTIVE: 70, DeveloperStatus.BUSY: 20, DeveloperStatus.INACTIVE: 10}
+MESSAGE_TYPES = {MessageType.TEXT: 85, MessageType.FILE: 10, MessageType.SYSTEM: 5}
+
+# Jobs in these states have a claim, in the matching claim state
+CLAIM_STATUS = {
+    JobStatus.CLAIMED: ClaimStatus.CLAIMED,
+    JobStatus.IN_PROGRESS: ClaimStatus.IN_PROGRESS,
+    JobStatus.DELIVERED: ClaimStatus.DELIVERED,
+    JobStatus.COMPLETED: ClaimStatus.COMPLETED,
+    JobStatus.DISPUTED: ClaimStatus.DISPUTED,
+    JobStatus.REFUNDED: ClaimStatus.REFUNDED,
+}
+PAID_ORDER = (OrderStatus.PENDING_REVIEW, OrderStatus.APPROVED, OrderStatus.ASSIGNED, OrderStatus.IN_PROGRESS,
+              OrderStatus.COMPLETED, OrderStatus.REFUNDED)
+APPROVED_ORDER = (OrderStatus.APPROVED, OrderStatus.ASSIGNED, OrderStatus.IN_PROGRESS, OrderStatus.COMPLETED,
+                  OrderStatus.REFUNDED)
+ASSIGNED_ORDER = (OrderStatus.ASSIGNED, OrderStatus.IN_PROGRESS, OrderStatus.COMPLETED)
+DEPOSIT_PAID_JOB = (JobStatus.PENDING_APPROVAL, JobStatus.OPEN, *CLAIM_STATUS)
+APPROVED_JOB = (JobStatus.OPEN, *CLAIM_STATUS)
+TRANSACTION_STATUS = {
+    PaymentStatus.PENDING: 'pending', PaymentStatus.VERIFIED: 'successful',
+    PaymentStatus.FAILED: 'failed', PaymentStatus.REFUNDED: 'refunded',
+}
+
+FIRST_NAMES = ("Ama", "Kwame", "Chidi", "Ngozi", "Tunde", "Aisha", "Kofi", "Wanjiru", "Thabo", "Zanele", "Emeka",
+               "Fatima", "Yaw", "Adaeze", "John", "Sarah", "David", "Grace", "Ibrahim", "Esi")
+SKILLS = ("python", "django", "flask", "node.js", "react", "flutter", "kotlin", "swift", "telegram bots",
+          "postgresql", "mongodb", "aws", "docker", "ui design", "wordpress", "laravel", "web scraping")
+PRODUCTS = ("inventory", "booking", "school management", "payroll", "delivery tracking", "loyalty", "invoicing",
+            "crm", "ticketing", "POS", "hotel reservation", "gym membership", "church management", "e-learning")
+MESSAGES = ("Hi, I've started on the project.", "Can you share the logo files?", "Here is the first draft.",
+            "Please check the latest build.", "When can we schedule a call?", "I've fixed the payment issue.",
+            "Looks good, just a few changes.", "Uploading the documentation now.", "Thanks, approved!")
+
+
+def scaled_volumes(scale: float = 1.0, **overrides: Optional[int]) -> Dict[str, int]:
+    """VOLUMES times scale (at least one row each), with explicit counts taking precedence"""
+    volumes = {table: max(1, int(count * scale)) for table, count in VOLUMES.items()}
+    volumes.update({table: count for table, count in overrides.items() if count is not None})
+    return volumes
+
+
+class Seeder:
+    """Generates one consistent data set and inserts it table by table"""
+
+    def __init__(self, connection, seed: int = 42, days: int = 365, until: Optional[datetime] = None,
+                 batch_size: int = SEED_BATCH_SIZE):
+        self.connection = connection
+        self.rng = random.Random(seed)
+        self.until = until or datetime.combine(date.today(), datetime.min.time())
+        self.start = self.until - timedelta(days=days)
+        self.batch_size = batch_size
+        self.counts: Dict[str, int] = {}
+
+        # What later tables need to know about earlier ones
+        self.users: List[tuple] = []  # (id, created_at, currency)
+        self.admins: List[int] = []
+        self.developers: List[tuple] = []  # (developer id, user id)
+        self.bots: List[tuple] = []  # (id, price)
+        self.conversations: List[tuple] = []  # (job id, created_at, customer user id, developer user id)
+
+    # ---------- helpers ----------
+
+    def _next_id(self, model) -> int:
+        return (self.connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    def _choices(self, weights: dict, k: int) -> list:
+        return self.rng.choices(list(weights), list(weights.values()), k=k)
+
+    def _after(self, moment: datetime, skew: float = 0.7) -> datetime:
+        """A time between `moment` and the end of the window, more often towards the end"""
+        span = max(0.0, (self.until - moment).total_seconds())
+        return moment + timedelta(seconds=span * self.rng.random() ** skew)
+
+    def _later(self, moment: datetime, low_hours: float, high_hours: float, clamp: bool = True) -> datetime:
+        later = moment + timedelta(hours=self.rng.uniform(low_hours, high_hours))
+        return min(self.until, later) if clamp else later
+
+    def _heavy(self, size: int, power: float = 2.0) -> int:
+        """An index into a list of `size`, concentrated on the first entries"""
+        return int(size * self.rng.random() ** power)
+
+    def _insert(self, model, rows: list):
+        if not rows:
+            return
+        self.connection.execute(model.__table__.insert(), rows)
+        self.connection.commit()
+        name = model.__tablename__
+        self.counts[name] = self.counts.get(name, 0) + len(rows)
+
+    def _batches(self, count: int):
+        for start in range(0, count, self.batch_size):
+            yield start, min(self.batch_size, count - start)
+
+    # ---------- tables ----------
+
+    def seed_users(self, count: int, developers: int):
+        first_id = self._next_id(User)
+        developer_rows = set(self.rng.sample(range(count), min(developers, count)))
+        admin_rows = set(range(max(1, count // 20000)))
+        developer_users = []
+        for start, size in self._batches(count):
+            countries = self._choices(COUNTRIES, size)
+            rows = []
+            for i in range(start, start + size):
+                user_id = first_id + i
+                country = countries[i - start]
+                currency = COUNTRY_CURRENCY_MAP[country]
+                # Signups grow over the window
+                created = self._after(self.start, skew=0.6)
+                rows.append({
+                    'id': user_id, 'telegram_id': str(7_000_000_000 + user_id), 'username': f"user{user_id}",
+                    'first_name': self.rng.choice(FIRST_NAMES),
+                    'email': f"user{user_id}@example.com" if self.rng.random() < 0.75 else None,
+                    'country': country, 'currency': currency, 'currency_symbol': CURRENCY_SYMBOLS[currency],
+                    'is_admin': i in admin_rows, 'is_developer': i in developer_rows,
+                    'created_at': created, 'updated_at': created,
+                })
+                self.users.append((user_id, created, currency))
+                if i in admin_rows:
+                    self.admins.append(user_id)
+                if i in developer_rows:
+                    developer_users.append(self.users[-1])
+            self._insert(User, rows)
+        # Older accounts first, so the heavy buyers picked by _heavy() are long-standing customers
+        self.users.sort(key=lambda user: user[1])
+        self.seed_developers(developer_users)
+
+    def seed_developers(self, users: List[tuple]):
+        first_id = self._next_id(Developer)
+        statuses = self._choices(DEVELOPER_STATUSES, len(users))
+        rows = []
+        for i, (user_id, created, _) in enumerate(users):
+            developer_id = first_id + i
+            joined = self._later(created, 1, 24 * 30)
+            rows.append({
+                'id': developer_id, 'user_id': user_id, 'developer_id': f"DEV{developer_id:06d}",
+                'status': statuses[i], 'is_available': statuses[i] == DeveloperStatus.ACTIVE,
+                'skills': ", ".join(self.rng.sample(SKILLS, self.rng.randint(2, 5))),
+                'experience': f"{self.rng.randint(1, 12)} years", 'hourly_rate': float(self.rng.randrange(10, 80, 5)),
+                'rating': round(self.rng.uniform(3.2, 5.0), 1), 'created_at': joined, 'updated_at': joined,
+            })
+            self.developers.append((developer_id, user_id))
+        for start, size in self._batches(len(rows)):
+            self._insert(Developer, rows[start:start + size])
+
+    def seed_bots(self, count: int):
+        first_id = self._next_id(Bot)
+        rows = []
+        for i in range(count):
+            bot_id = first_id + i
+            category = self.rng.choice(SOFTWARE_CATEGORIES)
+            product = self.rng.choice(PRODUCTS)
+            price = round(self.rng.lognormvariate(5.6, 0.6), 2)  # Mostly $100-$600, a few in the thousands
+            created = self.start + (self.until - self.start) * self.rng.random() ** 2
+            rows.append({
+                'id': bot_id, 'name': f"{product.title()} {category} #{bot_id}", 'slug': f"seed-{bot_id}",
+                'description': f"A ready-made {product} {category.lower()} with admin dashboard and reports",
+                'features': "\n".join(self.rng.sample(("Admin dashboard", "Payments", "Reports", "Notifications",
+                                                       "Multi-language", "User roles", "Exports"), 4)),
+                'price': price, 'category': category, 'delivery_time': f"{self.rng.randint(2, 14)} days",
+                'is_available': self.rng.random() < 0.9, 'is_featured': self.rng.random() < 0.05,
+                'created_at': created, 'updated_at': created,
+            })
+            self.bots.append((bot_id, price))
+        self._insert(Bot, rows)
+
+    def seed_orders(self, count: int):
+        """Orders with one transaction each, for the payment attempt behind them"""
+        first_id = self._next_id(Order)
+        first_transaction = self._next_id(Transaction)
+        recent = self.until - timedelta(hours=47)
+        for start, size in self._batches(count):
+            statuses = self._choices(ORDER_STATUSES, size)
+            methods = self._choices(PAYMENT_METHODS, size)
+            orders, transactions = [], []
+            for k in range(size):
+                order_id = first_id + start + k
+                user_id, joined, currency = self.users[self._heavy(len(self.users))]
+                bot_id, price = self.bots[self._heavy(len(self.bots), 1.5)]
+                status, method = statuses[k], methods[k]
+                created = self._after(joined)
+                if status == OrderStatus.APPROVED:
+                    # Approved orders nobody claims are refunded after 48 hours, so the ones left are recent
+                    created = max(created, self._after(recent, skew=1.0))
+
+                paid_at = approved_at = delivered_at = refunded_at = developer_id = None
+                payment_status = PaymentStatus.PENDING
+                if status in PAID_ORDER:
+                    payment_status = PaymentStatus.VERIFIED
+                    paid_at = self._later(created, 0.01, 2)
+                elif status == OrderStatus.CANCELLED and self.rng.random() < 0.6:
+                    payment_status = PaymentStatus.FAILED
+                if status in APPROVED_ORDER:
+                    approved_at = self._later(paid_at, 0.2, 20)
+                if status in ASSIGNED_ORDER:
+                    developer_id = self.developers[self._heavy(len(self.developers), 1.5)][0] \
+                        if self.developers else None
+                # Work that would only finish after the window is still under way
+                if status == OrderStatus.COMPLETED:
+                    delivered_at = self._later(approved_at, 24, 24 * 14, clamp=False)
+                    if delivered_at > self.until:
+                        status, delivered_at = OrderStatus.IN_PROGRESS, None
+                if status == OrderStatus.REFUNDED:
+                    refunded_at = self._later(approved_at, 48, 50, clamp=False)
+                    if refunded_at > self.until:
+                        status, refunded_at = OrderStatus.APPROVED, None
+                    else:
+                        payment_status = PaymentStatus.REFUNDED
+
+                reference = f"BOT_{user_id}_{created:%Y%m%d%H%M%S}_{order_id:08X}"
+                local_amount = round(price * EXCHANGE_RATES.get(currency, 1.0), 2)
+                metadata = ({'currency': currency, 'local_amount': local_amount, 'usd_amount': price}
+                            if method == PaymentMethod.PAYSTACK else None)
+                last_change = refunded_at or delivered_at or approved_at or paid_at or created
+                orders.append({
+                    'id': order_id, 'order_id': f"ORD{created:%Y%m%d%H%M%S}{order_id:08d}", 'user_id': user_id,
+                    'bot_id': bot_id, 'assigned_developer_id': developer_id, 'amount': price, 'status': status,
+                    'payment_method': method, 'payment_status': payment_status, 'payment_reference': reference,
+                    'payment_metadata': metadata, 'paid_at': paid_at, 'approved_at': approved_at,
+                    'delivered_at': delivered_at, 'refunded_at': refunded_at,
+                    'refund_reason': "Not claimed within 48 hours" if refunded_at else None,
+                    'created_at': created, 'updated_at': last_change,
+                })
+                transactions.append({
+                    'id': first_transaction + start + k, 'transaction_id': reference, 'order_id': order_id,
+                    'user_id': user_id, 'amount': local_amount if metadata else price,
+                    'currency': currency if metadata else 'USD', 'usd_amount': price, 'payment_method': method,
+                    'status': TRANSACTION_STATUS[payment_status], 'reference': reference,
+                    'verified_at': paid_at, 'created_at': created,
+                })
+            self._insert(Order, orders)
+            self._insert(Transaction, transactions)
+
+    def seed_custom_requests(self, count: int):
+        first_id = self._next_id(CustomRequest)
+        for start, size in self._batches(count):
+            statuses = self._choices(REQUEST_STATUSES, size)
+            rows = []
+            for k in range(size):
+                request_id = first_id + start + k
+                user_id, joined, _ = self.users[self._heavy(len(self.users), 1.5)]
+                status = statuses[k]
+                created = self._after(joined)
+                tier, low, high = self.rng.choice((('basic', 100, 499), ('standard', 500, 1999),
+                                                   ('premium', 2000, 4999), ('enterprise', 5000, 20000)))
+                price = float(self.rng.randrange(low, high, 10))
+                paid = status not in (RequestStatus.NEW, RequestStatus.CANCELLED) or self.rng.random() < 0.3
+                deposit_paid_at = self._later(created, 0.05, 6) if paid else None
+                approved_at = self._later(deposit_paid_at, 1, 72) if status == RequestStatus.APPROVED else None
+                refunded_at = self._later(deposit_paid_at, 48, 96) \
+                    if status == RequestStatus.REFUNDED and deposit_paid_at else None
+                product = self.rng.choice(PRODUCTS)
+                rows.append({
+                    'id': request_id, 'request_id': f"CR{created:%Y%m%d%H%M%S}{request_id:06X}",
+                    'user_id': user_id, 'title': f"Custom {product} system",
+                    'description': f"We need a {product} system for our business with mobile access and reports.",
+                    'features': "Dashboard, payments, SMS alerts", 'budget_tier': tier, 'estimated_price': price,
+                    'deposit_paid': round(price * 0.2, 2) if paid else 0.0, 'is_deposit_paid': paid,
+                    'timeline': f"{self.rng.randint(2, 12)} weeks", 'status': status,
+                    'assigned_to': self.developers[self._heavy(len(self.developers), 1.5)][0]
+                    if approved_at and self.developers and self.rng.random() < 0.7 else None,
+                    'payment_reference': f"DEP_{user_id}_{request_id:08X}" if paid else None,
+                    'deposit_paid_at': deposit_paid_at, 'approved_at': approved_at, 'refunded_at': refunded_at,
+                    'created_at': created, 'updated_at': refunded_at or approved_at or deposit_paid_at or created,
+                })
+            self._insert(CustomRequest, rows)
+
+    def seed_jobs(self, count: int):
+        """Jobs, plus a claim by a developer for every job that got that far"""
+        first_id = self._next_id(Job)
+        first_claim = self._next_id(JobClaim)
+        claim_number = 0
+        for start, size in self._batches(count):
+            statuses = self._choices(JOB_STATUSES, size)
+            jobs, claims = [], []
+            for k in range(size):
+                job_id = first_id + start + k
+                user_id, joined, _ = self.users[self._heavy(len(self.users), 1.5)]
+                status = statuses[k]
+                created = self._after(joined)
+                budget = float(self.rng.randrange(50, 5000, 25))
+                deposit_paid_at = self._later(created, 0.05, 12) if status in DEPOSIT_PAID_JOB else None
+                approved_at = self._later(deposit_paid_at, 0.5, 48) if status in APPROVED_JOB else None
+                product = self.rng.choice(PRODUCTS)
+                jobs.append({
+                    'id': job_id, 'job_id': f"JOB{job_id:08X}", 'user_id': user_id,
+                    'title': f"{product.capitalize()} {self.rng.choice(('app', 'bot', 'website', 'dashboard'))}",
+                    'description': f"Looking for a developer to build a {product} solution. "
+                                   f"Must integrate payments and send notifications to staff.",
+                    'expected_outcome': "A working product deployed on our server", 'budget': budget,
+                    'category': self.rng.choice(JOB_CATEGORIES), 'deposit_amount': round(budget * 0.3, 2),
+                    'deposit_paid': deposit_paid_at is not None, 'deposit_paid_at': deposit_paid_at,
+                    'status': status, 'is_public': approved_at is not None,
+                    'expected_timeline': f"{self.rng.randint(1, 8)} weeks",
+                    'approved_by': self.rng.choice(self.admins) if approved_at and self.admins else None,
+                    'approved_at': approved_at, 'created_at': created, 'updated_at': approved_at or created,
+                })
+
+                claim_status = CLAIM_STATUS.get(status)
+                if claim_status is None or not self.developers or \
+                        (status == JobStatus.REFUNDED and self.rng.random() < 0.5):
+                    continue
+                developer_id, developer_user = self.developers[self._heavy(len(self.developers), 1.5)]
+                claimed = self._later(approved_at, 0.5, 72)
+                submitted = self._later(claimed, 24, 24 * 21) \
+                    if claim_status in (ClaimStatus.DELIVERED, ClaimStatus.COMPLETED, ClaimStatus.DISPUTED) else None
+                completed = claim_status == ClaimStatus.COMPLETED
+                claims.append({
+                    'id': first_claim + claim_number, 'claim_id': f"CLM{first_claim + claim_number:08X}",
+                    'job_id': job_id, 'developer_id': developer_id, 'claim_token_paid': True,
+                    'status': claim_status, 'token_payment_method': PaymentMethod.PAYSTACK,
+                    'submitted_at': submitted, 'customer_accepted': completed,
+                    'customer_rating': self.rng.choices((5, 4, 3, 2, 1), (55, 28, 10, 4, 3))[0] if completed else None,
+                    'final_payment_paid': completed, 'created_at': claimed, 'updated_at': submitted or claimed,
+                })
+                claim_number += 1
+                self.conversations.append((job_id, claimed, user_id, developer_user))
+            self._insert(Job, jobs)
+            self._insert(JobClaim, claims)
+
+    def seed_job_messages(self, count: int):
+        """Messages between customers and developers on claimed jobs; a few busy jobs get most of them"""
+        if not self.conversations:
+            return
+        first_id = self._next_id(JobMessage)
+        weights = list(itertools.accumulate(1 / rank for rank in range(1, len(self.conversations) + 1)))
+        self.rng.shuffle(self.conversations)
+        for start, size in self._batches(count):
+            picks = self.rng.choices(self.conversations, cum_weights=weights, k=size)
+            kinds = self._choices(MESSAGE_TYPES, size)
+            rows = []
+            for k, (job_id, claimed, customer, developer) in enumerate(picks):
+                kind = kinds[k]
+                leaked = kind == MessageType.TEXT and self.rng.random() < 0.01
+                rows.append({
+                    'id': first_id + start + k, 'job_id': job_id,
+                    'user_id': developer if self.rng.random() < 0.55 else customer, 'message_type': kind,
+                    'content': "Call me on +233 24 000 0000" if leaked else (
+                        "Job status updated" if kind == MessageType.SYSTEM else self.rng.choice(MESSAGES)),
+                    'file_url': f"https://files.example.com/{job_id}/{start + k}.zip"
+                    if kind == MessageType.FILE else None,
+                    'file_type': 'document' if kind == MessageType.FILE else None,
+                    'contains_contact_info': leaked, 'flagged': leaked,
+                    'created_at': self._after(claimed, skew=1.5),
+                })
+            self._insert(JobMessage, rows)
+
+    def run(self, volumes: Dict[str, int]) -> Dict[str, int]:
+        steps = (
+            ('users', lambda: self.seed_users(volumes['users'], volumes['developers'])),
+            ('bots', lambda: self.seed_bots(volumes['bots'])),
+            ('orders', lambda: self.seed_orders(volumes['orders'])),
+            ('custom_requests', lambda: self.seed_custom_requests(volumes['custom_requests'])),
+            ('jobs', lambda: self.seed_jobs(volumes['jobs'])),
+            ('job_messages', lambda: self.seed_job_messages(volumes['job_messages'])),
+        )
+        for name, step in steps:
+            started = time.perf_counter()
+            step()
+            logger.info(f"Seeded {name} in {time.perf_counter() - started:.1f}s")
+        return self.counts
+
+
+def seed_database(volumes: Dict[str, int], seed: int = 42, days: int = 365, until: Optional[datetime] = None,
+                  batch_size: int = SEED_BATCH_SIZE) -> Dict[str, int]:
+    """Insert `volumes` rows, then rebuild what is normally maintained per row. Returns rows inserted per table."""
+    from .developer_stats import rebuild_developer_stats
+    from .rollups import rebuild_revenue_rollups
+    from .search import create_search_indexes, drop_search_indexes
+
+    with engine.connect() as connection:
+        sqlite = connection.dialect.name == 'sqlite'
+        if sqlite:
+            synchronous = connection.exec_driver_sql("PRAGMA synchronous").scalar()
+            # A crash mid-seed means seeding again, not recovering the file
+            connection.exec_driver_sql("PRAGMA synchronous = OFF")
+        # Indexing each row through the FTS triggers costs more than one rebuild at the end
+        drop_search_indexes(connection)
+        connection.commit()
+        try:
+            seeder = Seeder(connection, seed=seed, days=days, until=until, batch_size=batch_size)
+            counts = seeder.run(volumes)
+        finally:
+            create_search_indexes(connection, rebuild=True)
+            connection.commit()
+            if sqlite:
+                connection.exec_driver_sql(f"PRAGMA synchronous = {synchronous}")
+
+    rebuild_revenue_rollups()
+    rebuild_developer_stats()
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    return counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply every default volume")
+    for table, count in VOLUMES.items():
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, dest=table,
+                            help=f"rows to insert (default {count:,} x scale)")
+    parser.add_argument('--seed', type=int, default=42, help="same seed, same rows")
+    parser.add_argument('--days', type=int, default=365, help="history the timestamps span")
+    parser.add_argument('--until', type=date.fromisoformat, help="end of that history (default: today)")
+    parser.add_argument('--batch-size', type=int, default=SEED_BATCH_SIZE)
+    parser.add_argument('--append', action='store_true', help="add to a database that already has users")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        existing = connection.execute(select(func.count(User.id))).scalar()
+    if existing and not args.append:
+        parser.error(f"the database already has {existing} users; pass --append to add to it")
+
+    volumes = scaled_volumes(args.scale, **{table: getattr(args, table) for table in VOLUMES})
+    started = time.perf_counter()
+    counts = seed_database(volumes, seed=args.seed, days=args.days,
+                           until=datetime.combine(args.until, datetime.min.time()) if args.until else None,
+                           batch_size=args.batch_size)
+    for table, count in counts.items():
+        print(f"   {table:<20} {count:>10,}")
+    print(f"✅ Seeded {sum(counts.values()):,} rows in {time.perf_counter() - started:.0f}s")
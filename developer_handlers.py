@@ -4,10 +4,11 @@ Developer Handlers for Software Marketplace
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CallbackQueryHandler, MessageHandler, filters, ConversationHandler, CommandHandler
 from database.db import create_session
-from database.models import User, Developer, DeveloperStatus, Order, OrderStatus, CustomRequest, RequestStatus, Bot
+from database.models import User, Developer, DeveloperStatus, Order, OrderStatus, Bot
 from config import DEVELOPER_APPLICATION
+from services.outbox import enqueue, enqueue_admin
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
 
 logger = logging.getLogger(__name__)
@@ -55,21 +56,9 @@ async def developer_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE
                     await update.message.reply_text("❌ Developer profile not found. Please contact support.")
                 return
             
-            # Get developer statistics
-            assigned_orders = db.query(Order).filter(
-                Order.assigned_developer_id == developer.id,
-                Order.status.in_([OrderStatus.ASSIGNED, OrderStatus.IN_PROGRESS])
-            ).count()
-            
-            completed_orders = db.query(Order).filter(
-                Order.assigned_developer_id == developer.id,
-                Order.status == OrderStatus.COMPLETED
-            ).count()
-            
-            pending_custom_requests = db.query(CustomRequest).filter(
-                CustomRequest.assigned_to == developer.id,
-                CustomRequest.status == RequestStatus.APPROVED
-            ).count()
+            # Get developer statistics (one row, kept current by database.developer_stats)
+            from database.developer_stats import get_developer_stats
+            stats = get_developer_stats(db, developer.id)
             
             # Get available orders (orders that are approved but not assigned)
             available_orders = db.query(Order).filter(
@@ -77,11 +66,6 @@ async def developer_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE
                 Order.assigned_developer_id == None
             ).count()
             
-            # Get recent assigned orders
-            recent_orders = db.query(Order).filter(
-                Order.assigned_developer_id == developer.id
-            ).order_by(Order.created_at.desc()).limit(5).all()
-            
             status_emoji = "🟢" if developer.status == DeveloperStatus.ACTIVE else \
                          "🟡" if developer.status == DeveloperStatus.BUSY else "🔴"
             
@@ -96,11 +80,11 @@ async def developer_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 📊 **STATISTICS:**
 ━━━━━━━━━━━━━━━━━━━━
-✅ Completed Orders: **{completed_orders}**
-📦 Assigned Orders: **{assigned_orders}**
-📝 Custom Projects: **{pending_custom_requests}**
+✅ Completed Orders: **{stats.completed_orders}**
+📦 Assigned Orders: **{stats.active_orders}**
+📝 Custom Projects: **{stats.active_custom_requests}**
 🎯 Available Orders: **{available_orders}**
-💰 Total Earnings: **${developer.earnings:.2f}**
+💰 Total Earnings: **${stats.total_earnings:.2f}**
 ⭐ Average Rating: **{developer.rating:.1f}/5.0**
 ⏱️ Hourly Rate: **${developer.hourly_rate:.2f}**
 
@@ -447,27 +431,21 @@ async def dev_earnings(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await query.edit_message_text("❌ Developer profile not found.")
                 return
             
-            # Get recent earnings (last 30 days)
-            thirty_days_ago = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
-            
-            recent_orders = db.query(Order).filter(
-                Order.assigned_developer_id == developer.id,
-                Order.status == OrderStatus.COMPLETED,
-                Order.delivered_at >= thirty_days_ago
-            ).all()
-            
-            recent_earnings = sum(order.amount * 0.7 for order in recent_orders)
+            # Stats row plus the daily buckets of the last 30 days
+            from database.developer_stats import available_balance, get_developer_stats, recent_earnings
+            stats = get_developer_stats(db, developer.id)
+            balance = available_balance(stats)
             
             # Calculate payout eligibility
             from config import DEVELOPER_PAYOUT_THRESHOLD
-            eligible_for_payout = developer.earnings >= DEVELOPER_PAYOUT_THRESHOLD
+            eligible_for_payout = balance >= DEVELOPER_PAYOUT_THRESHOLD
             
             text = f"""
 💰 **EARNINGS & PAYOUTS**
 
-**Total Earnings:** ${developer.earnings:.2f}
-**Recent Earnings (30 days):** ${recent_earnings:.2f}
-**Completed Orders:** {developer.completed_orders}
+**Total Earnings:** ${stats.total_earnings:.2f}
+**Recent Earnings (30 days):** ${recent_earnings(db, developer.id):.2f}
+**Completed Orders:** {stats.completed_orders}
 **Hourly Rate:** ${developer.hourly_rate:.2f}
 
 **Payout Information:**
@@ -477,7 +455,7 @@ async def dev_earnings(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if eligible_for_payout:
                 text += f"""
 ✅ **You are eligible for payout!**
-💰 Available for payout: ${developer.earnings:.2f}
+💰 Available for payout: ${balance:.2f}
 📋 Minimum payout: ${DEVELOPER_PAYOUT_THRESHOLD:.2f}
 
 **To request a payout:**
@@ -487,10 +465,10 @@ async def dev_earnings(update: Update, context: ContextTypes.DEFAULT_TYPE):
 4. Payout processed within 3-5 business days
 """
             else:
-                needed = DEVELOPER_PAYOUT_THRESHOLD - developer.earnings
+                needed = DEVELOPER_PAYOUT_THRESHOLD - balance
                 text += f"""
 ⏳ **Working towards payout...**
-💰 Current balance: ${developer.earnings:.2f}
+💰 Current balance: ${balance:.2f}
 🎯 Minimum required: ${DEVELOPER_PAYOUT_THRESHOLD:.2f}
 📈 Need ${needed:.2f} more to qualify
 
@@ -826,20 +804,10 @@ async def dev_start_development(update: Update, context: ContextTypes.DEFAULT_TY
             # Update order status
             order.status = OrderStatus.IN_PROGRESS
             order.developer_notes = f"Development started by developer on {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-            db.commit()
-            
             # Notify customer
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                customer = db.query(User).filter(User.id == order.user_id).first()
-                
-                try:
-                    await bot.send_message(
-                        chat_id=customer.telegram_id,
-                        text=f"""
+            customer = db.query(User).filter(User.id == order.user_id).first()
+            if customer:
+                enqueue(db, customer.telegram_id, f"""
 ⚙️ **Development Started!**
 
 Your order is now in progress:
@@ -852,11 +820,8 @@ The developer has started working on your order.
 You'll receive updates on the progress.
 
 Thank you for your patience! 🚀
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify customer: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 "⚙️ **Development Started!**\n\n"
@@ -971,29 +936,13 @@ async def dev_confirm_complete(update: Update, context: ContextTypes.DEFAULT_TYP
             order.status = OrderStatus.COMPLETED
             order.delivered_at = datetime.now()
             
-            # Update developer stats
-            developer.completed_orders += 1
-            developer.earnings += order.amount * 0.7  # Developer gets 70%
+            # Completed orders and earnings are credited by database.developer_stats
             developer.status = DeveloperStatus.ACTIVE
             developer.is_available = True
             
-            db.commit()
-            
-            # Clear context
-            context.user_data.pop('completing_order', None)
-            
             # Notify customer
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                customer = db.query(User).filter(User.id == order.user_id).first()
-                
-                try:
-                    await bot.send_message(
-                        chat_id=customer.telegram_id,
-                        text=f"""
+            customer = db.query(User).filter(User.id == order.user_id).first()
+            enqueue(db, customer.telegram_id, f"""
 🎉 **Order Completed!**
 
 Your order has been marked as completed by the developer:
@@ -1006,19 +955,10 @@ Your order has been marked as completed by the developer:
 **Please review the delivered work and provide feedback.**
 
 Thank you for choosing Software Marketplace! 🚀
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify customer: {e}")
+            """, parse_mode='Markdown')
             
             # Notify admin
-            from config import SUPER_ADMIN_ID
-            if TELEGRAM_TOKEN and SUPER_ADMIN_ID:
-                try:
-                    await bot.send_message(
-                        chat_id=SUPER_ADMIN_ID,
-                        text=f"""
+            enqueue_admin(db, f"""
 ✅ Order Completed by Developer
 
 📦 Order ID: {order.order_id}
@@ -1028,10 +968,11 @@ Thank you for choosing Software Marketplace! 🚀
 💸 Developer Earnings: ${order.amount * 0.7:.2f}
 
 Order completed successfully.
-                        """
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify admin: {e}")
+            """)
+            db.commit()
+            
+            # Clear context
+            context.user_data.pop('completing_order', None)
             
             await query.edit_message_text(
                 "🎉 **Order Completed Successfully!**\n\n"
@@ -1301,22 +1242,9 @@ async def receive_hourly_rate(update: Update, context: ContextTypes.DEFAULT_TYPE
             )
             
             db.add(dev_request)
-            db.commit()
-            
-            # Clear context
-            context.user_data.pop('dev_application', None)
             
             # Notify admin
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN, SUPER_ADMIN_ID
-            
-            if TELEGRAM_TOKEN and SUPER_ADMIN_ID:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                
-                try:
-                    await bot.send_message(
-                        chat_id=SUPER_ADMIN_ID,
-                        text=f"""
+            enqueue_admin(db, f"""
 📝 **New Developer Application**
 
 👤 Applicant: {user.first_name} (@{user.username or 'N/A'})
@@ -1328,11 +1256,11 @@ async def receive_hourly_rate(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 **To review:**
 Go to Admin Panel → Developer Applications
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify admin: {e}")
+            """, parse_mode='Markdown')
+            db.commit()
+            
+            # Clear context
+            context.user_data.pop('dev_application', None)
             
             await update.message.reply_text(
                 f"""
@@ -1717,18 +1645,11 @@ async def developer_claim_custom_request(update: Update, context: ContextTypes.D
             )
             
             db.add(order)
-            db.commit()
             
             # Notify customer
             customer = db.query(User).filter(User.id == custom_request.user_id).first()
             if customer:
-                from telegram import Bot
-                from config import TELEGRAM_TOKEN
-                
-                if TELEGRAM_TOKEN:
-                    bot = Bot(token=TELEGRAM_TOKEN)
-                    
-                    message = f"""👨‍💻 Developer Assigned!
+                message = f"""👨‍💻 Developer Assigned!
 
 📋 Request ID: {request_id}
 📝 Title: {custom_request.title}
@@ -1745,14 +1666,8 @@ What's next:
 4. Remaining balance due upon completion
 
 Thank you for your patience! 🚀"""
-                    
-                    try:
-                        await bot.send_message(
-                            chat_id=customer.telegram_id,
-                            text=message
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to notify customer: {e}")
+                enqueue(db, customer.telegram_id, message)
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ Successfully claimed request {request_id}!\n\n"
@@ -1,7 +1,7 @@
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ConversationHandler
-from database.db import create_session
+from database.db import create_session, run_sync
 from database.models import User, Order, OrderStatus, Developer, DeveloperStatus, Bot, CustomRequest, Transaction
 from database.models import DeveloperRequest, RequestStatus, PaymentMethod, PaymentStatus
 import logging
@@ -11,6 +11,11 @@ from sqlalchemy import func, desc, and_
 import json
 import traceback
 import re
+from sqlalchemy.orm import joinedload
+from utils.pagination import nav_row, page_token, paginate
+from services.auth_service import admin_only, is_admin
+from services.outbox import enqueue
+from config import LIST_PAGE_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -24,42 +29,30 @@ ADD_BOT_CATEGORY = 6
 ADD_BOT_DELIVERY = 25
 ADD_DEVELOPER = 8
 
-def check_admin_access(telegram_id):
-    """Check if user has admin access"""
-    from config import SUPER_ADMIN_ID
-    
-    # First check if user is super admin
-    if str(telegram_id) == str(SUPER_ADMIN_ID):
-        return True
-    
-    db = create_session()
+async def check_admin_access(telegram_id):
+    """Check if user has admin access (served from the role cache; a miss queries on the DB pool)"""
     try:
-        user = db.query(User).filter(User.telegram_id == telegram_id, User.is_admin == True).first()
-        return user is not None
+        return await is_admin(telegram_id)
     except Exception as e:
         logger.error(f"Error checking admin access: {e}")
         return False
-    finally:
-        db.close()
 
+@admin_only
 async def admin_jobs_pending_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show all jobs pending admin approval"""
     try:
         query = update.callback_query
         await query.answer()
 
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-
         db = create_session()
         try:
-            from database.models import Job, User
+            from database.models import Job
 
-            pending_jobs = db.query(Job).filter(
-                Job.status == 'pending_approval'
-            ).order_by(Job.created_at.desc()).all()
+            page = paginate(
+                db.query(Job).options(joinedload(Job.user)).filter(Job.status == 'pending_approval'),
+                Job, page_token(query.data, 'admin_jobs_pending_list'), LIST_PAGE_SIZE
+            )
+            pending_jobs = page.items
 
             if not pending_jobs:
                 await query.edit_message_text(
@@ -73,8 +66,8 @@ async def admin_jobs_pending_list(update: Update, context: ContextTypes.DEFAULT_
             text = "⏳ **PENDING JOBS FOR APPROVAL**\n\n"
             keyboard = []
 
-            for job in pending_jobs[:10]:  # limit to 10 per page
-                user = db.query(User).filter(User.id == job.user_id).first()
+            for job in pending_jobs:
+                user = job.user
                 username = f"@{user.username}" if user and user.username else f"ID: {user.telegram_id if user else 'Unknown'}"
                 created = job.created_at.strftime('%Y-%m-%d') if job.created_at else 'N/A'
 
@@ -92,6 +85,9 @@ async def admin_jobs_pending_list(update: Update, context: ContextTypes.DEFAULT_
                     )
                 ])
 
+            navigation = nav_row(page, 'admin_jobs_pending_list')
+            if navigation:
+                keyboard.append(navigation)
             keyboard.append([
                 InlineKeyboardButton("⬅️ Back to Job Management", callback_data="admin_job_management"),
                 InlineKeyboardButton("🏠 Admin Panel", callback_data="admin_panel")
@@ -113,15 +109,12 @@ async def admin_jobs_pending_list(update: Update, context: ContextTypes.DEFAULT_
         logger.error(f"Error in admin_jobs_pending_list: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading pending jobs.")
 
+@admin_only
 async def admin_jobs_approved(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show approved (public) jobs"""
     try:
         query = update.callback_query
         await query.answer()
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
 
         db = create_session()
         try:
@@ -141,15 +134,12 @@ async def admin_jobs_approved(update: Update, context: ContextTypes.DEFAULT_TYPE
     except Exception as e:
         logger.error(f"Error in admin_jobs_approved: {e}")
 
+@admin_only
 async def admin_jobs_active(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show active jobs (open, assigned, in_progress)"""
     try:
         query = update.callback_query
         await query.answer()
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         db = create_session()
         try:
             from database.models import Job, User
@@ -168,15 +158,12 @@ async def admin_jobs_active(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error in admin_jobs_active: {e}")
 
+@admin_only
 async def admin_jobs_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Job statistics"""
     try:
         query = update.callback_query
         await query.answer()
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         db = create_session()
         try:
             from database.models import Job
@@ -205,32 +192,13 @@ async def admin_jobs_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error in admin_jobs_stats: {e}")
 
-async def admin_jobs_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Search jobs (placeholder)"""
-    try:
-        query = update.callback_query
-        await query.answer()
-        await query.edit_message_text(
-            "🔍 **Search Jobs** – Coming soon!\n\n"
-            "Use /search_job <id> or /search_job <title> in the chat.",
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("⬅️ Back", callback_data="admin_job_management")]
-            ]),
-            parse_mode='Markdown'
-        )
-    except Exception as e:
-        logger.error(f"Error in admin_jobs_search: {e}")
-
+@admin_only
 async def admin_jobs_active(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show active jobs"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = "👨‍💻 *ACTIVE JOBS*\n\n*Feature coming soon!*\n\nThis section will show all active jobs being worked on."
         
@@ -246,16 +214,13 @@ async def admin_jobs_active(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_jobs_active: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading active jobs.")
 
+@admin_only
 async def admin_jobs_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Job statistics"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = """
 📊 *JOB STATISTICS*
@@ -277,28 +242,20 @@ This section will show detailed statistics about jobs.
         logger.error(f"Error in admin_jobs_stats: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading job statistics.")
 
+@admin_only
 async def admin_jobs_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Search jobs"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         text = """
 🔍 *SEARCH JOBS*
 
-*Feature coming soon!*
+Send `/search_job TEXT` to search job titles, descriptions and job IDs.
+Results are ranked by relevance, 10 per page.
 
-This section will allow you to search for jobs by:
-- Job ID
-- Customer name
-- Budget range
-- Status
-- Date range
+Example: `/search_job crypto trading`
 """
         
         keyboard = [
@@ -325,7 +282,7 @@ async def admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         telegram_id = update.effective_user.id
         
-        if not check_admin_access(telegram_id):
+        if not await check_admin_access(telegram_id):
             if update.callback_query:
                 await query.edit_message_text("❌ Access denied.")
             else:
@@ -367,205 +324,107 @@ Select an option:
 
 # ========== STATISTICS DASHBOARD ==========
 
+@admin_only
 async def admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Admin statistics dashboard"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
-        db = create_session()
-        try:
-            # Total counts
-            total_users = db.query(User).count()
-            total_orders = db.query(Order).count()
-            total_developers = db.query(Developer).count()
-            total_bots = db.query(Bot).count()
-            total_requests = db.query(CustomRequest).count()
-            
-            # Order status breakdown
-            order_statuses = db.query(Order.status, func.count(Order.id)).group_by(Order.status).all()
-            status_text = ""
-            for status, count in order_statuses:
-                if status:
-                    status_text += f"  • {status.value.replace('_', ' ').title()}: {count}\n"
-            
-            # Revenue calculations
-            total_revenue = db.query(func.sum(Order.amount)).filter(Order.status == OrderStatus.COMPLETED).scalar() or 0
-            today = datetime.now().date()
-            today_revenue = db.query(func.sum(Order.amount)).filter(
-                func.date(Order.created_at) == today,
-                Order.status == OrderStatus.COMPLETED
-            ).scalar() or 0
-            
-            # Today's activity
-            today_orders = db.query(Order).filter(func.date(Order.created_at) == today).count()
-            today_users = db.query(User).filter(func.date(User.created_at) == today).count()
-            today_custom_requests = db.query(CustomRequest).filter(func.date(CustomRequest.created_at) == today).count()
-            
-            # Developer stats
-            active_devs = db.query(Developer).filter(Developer.status == DeveloperStatus.ACTIVE).count()
-            busy_devs = db.query(Developer).filter(Developer.status == DeveloperStatus.BUSY).count()
-            
-            # Pending developer requests
-            pending_dev_requests = db.query(DeveloperRequest).filter(
-                DeveloperRequest.status == RequestStatus.NEW
-            ).count()
-            
-            # Pending custom requests
-            pending_custom_requests = db.query(CustomRequest).filter(
-                CustomRequest.status == RequestStatus.NEW
-            ).count()
-            
-            # Pending orders for review
-            pending_order_review = db.query(Order).filter(
-                Order.status == OrderStatus.PENDING_REVIEW
-            ).count()
-            
-            text = f"""
+        from services.stats_service import stats_service
+        stats = await run_sync(stats_service.get_dashboard)
+        
+        status_text = ""
+        for status, count in stats['order_statuses']:
+            status_text += f"  • {status.value.replace('_', ' ').title()}: {count}\n"
+        
+        text = f"""
 📊 *ADMIN STATISTICS DASHBOARD*
 
 *Overview:*
-👥 Total Users: *{total_users}*
-📦 Total Orders: *{total_orders}*
-👨‍💻 Total Developers: *{total_developers}*
-🚀 Total Software: *{total_bots}*
-📝 Total Custom Requests: *{total_requests}*
+👥 Total Users: *{stats['total_users']}*
+📦 Total Orders: *{stats['total_orders']}*
+👨‍💻 Total Developers: *{stats['total_developers']}*
+🚀 Total Software: *{stats['total_bots']}*
+📝 Total Custom Requests: *{stats['total_requests']}*
 
 *Pending Actions:*
-📋 Pending Dev Applications: *{pending_dev_requests}*
-⚙️ Pending Custom Requests: *{pending_custom_requests}*
-⏳ Orders Pending Review: *{pending_order_review}*
+📋 Pending Dev Applications: *{stats['pending_dev_requests']}*
+⚙️ Pending Custom Requests: *{stats['pending_custom_requests']}*
+⏳ Orders Pending Review: *{stats['pending_order_review']}*
 
 *Revenue:*
-💰 Total Revenue: *${total_revenue:.2f}*
-📈 Today's Revenue: *${today_revenue:.2f}*
+💰 Total Revenue: *${stats['total_revenue']:.2f}*
+📈 Today's Revenue: *${stats['today_revenue']:.2f}*
 
 *Today's Activity:*
-📊 New Orders: *{today_orders}*
-👤 New Users: *{today_users}*
-📝 New Custom Requests: *{today_custom_requests}*
+📊 New Orders: *{stats['today_orders']}*
+👤 New Users: *{stats['today_users']}*
+📝 New Custom Requests: *{stats['today_custom_requests']}*
 
 *Order Status Breakdown:*
 {status_text}
 
 *Developer Status:*
-🟢 Active Developers: *{active_devs}*
-🟡 Busy Developers: *{busy_devs}*
+🟢 Active Developers: *{stats['active_devs']}*
+🟡 Busy Developers: *{stats['busy_devs']}*
 """
-            
-            keyboard = [
-                [InlineKeyboardButton("🔄 Refresh", callback_data="admin_stats"),
-                 InlineKeyboardButton("📈 Detailed Stats", callback_data="admin_stats_detailed")],
-                [InlineKeyboardButton("📋 Dev Applications", callback_data="admin_developer_requests")],
-                [InlineKeyboardButton("⚙️ Custom Requests", callback_data="admin_custom_requests")],
-                [InlineKeyboardButton("⬅️ Back to Admin", callback_data="admin_panel")]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
-            
-        finally:
-            db.close()
-            
+        
+        keyboard = [
+            [InlineKeyboardButton("🔄 Refresh", callback_data="admin_stats"),
+             InlineKeyboardButton("📈 Detailed Stats", callback_data="admin_stats_detailed")],
+            [InlineKeyboardButton("📋 Dev Applications", callback_data="admin_developer_requests")],
+            [InlineKeyboardButton("⚙️ Custom Requests", callback_data="admin_custom_requests")],
+            [InlineKeyboardButton("⬅️ Back to Admin", callback_data="admin_panel")]
+        ]
+        
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+        
     except Exception as e:
         logger.error(f"Error in admin_stats: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading statistics.")
 
+@admin_only
 async def admin_stats_detailed(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Detailed statistics dashboard"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
-        db = create_session()
-        try:
-            # Get data for last 7 days
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=7)
-            
-            # Daily orders for last 7 days
-            daily_orders = []
-            for i in range(7):
-                date = start_date + timedelta(days=i)
-                count = db.query(Order).filter(func.date(Order.created_at) == date).count()
-                revenue = db.query(func.sum(Order.amount)).filter(
-                    func.date(Order.created_at) == date,
-                    Order.status == OrderStatus.COMPLETED
-                ).scalar() or 0
-                daily_orders.append((date, count, revenue))
-            
-            # Top selling software
-            top_bots = db.query(
-                Bot.name,
-                func.count(Order.id),
-                func.sum(Order.amount)
-            ).join(Order, Bot.id == Order.bot_id).filter(
-                Order.status == OrderStatus.COMPLETED
-            ).group_by(Bot.id).order_by(desc(func.count(Order.id))).limit(5).all()
-            
-            # Top developers by earnings
-            top_developers = db.query(
-                User.first_name,
-                Developer.developer_id,
-                Developer.completed_orders,
-                Developer.earnings,
-                Developer.rating
-            ).join(Developer, User.id == Developer.user_id).filter(
-                Developer.earnings > 0
-            ).order_by(desc(Developer.earnings)).limit(5).all()
-            
-            # Payment method breakdown
-            payment_methods = db.query(
-                Order.payment_method,
-                func.count(Order.id),
-                func.sum(Order.amount)
-            ).filter(
-                Order.status == OrderStatus.COMPLETED,
-                Order.payment_method.isnot(None)
-            ).group_by(Order.payment_method).all()
-            
-            text = "📈 *DETAILED STATISTICS*\n\n"
-            
-            text += "*Last 7 Days Activity:*\n"
-            for date, count, revenue in daily_orders:
-                text += f"  {date.strftime('%b %d')}: {count} orders (${revenue:.2f})\n"
-            
-            text += "\n*Top Selling Software:*\n"
-            for bot_name, order_count, total_revenue in top_bots:
-                text += f"  🚀 {bot_name[:20]}: {order_count} sales (${total_revenue:.2f})\n"
-            
-            text += "\n*Top Developers:*\n"
-            for first_name, dev_id, completed, earnings, rating in top_developers:
-                text += f"  👨‍💻 {first_name} ({dev_id}): ${earnings:.2f}, {completed} orders, {rating:.1f}⭐\n"
-            
-            text += "\n*Payment Methods:*\n"
-            for method, count, amount in payment_methods:
-                if method:
-                    method_name = method.value.replace('_', ' ').title()
-                    text += f"  💳 {method_name}: {count} payments (${amount:.2f})\n"
-            
-            keyboard = [
-                [InlineKeyboardButton("🔄 Refresh", callback_data="admin_stats_detailed")],
-                [InlineKeyboardButton("📊 Basic Stats", callback_data="admin_stats")],
-                [InlineKeyboardButton("⬅️ Back to Admin", callback_data="admin_panel")]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
-            
-        finally:
-            db.close()
-            
+        from services.stats_service import stats_service
+        stats = await run_sync(stats_service.get_detailed)
+        
+        text = "📈 *DETAILED STATISTICS*\n\n"
+        
+        text += "*Last 7 Days Activity:*\n"
+        for date, count, revenue in stats['daily_orders']:
+            text += f"  {date.strftime('%b %d')}: {count} orders (${revenue:.2f})\n"
+        
+        text += "\n*Top Selling Software:*\n"
+        for bot_name, order_count, total_revenue in stats['top_bots']:
+            text += f"  🚀 {bot_name[:20]}: {order_count} sales (${total_revenue:.2f})\n"
+        
+        text += "\n*Top Developers:*\n"
+        for first_name, dev_id, completed, earnings, rating in stats['top_developers']:
+            text += f"  👨‍💻 {first_name} ({dev_id}): ${earnings:.2f}, {completed} orders, {rating:.1f}⭐\n"
+        
+        text += "\n*Payment Methods:*\n"
+        for method, count, amount in stats['payment_methods']:
+            method_name = method.replace('_', ' ').title()
+            text += f"  💳 {method_name}: {count} payments (${amount:.2f})\n"
+        
+        keyboard = [
+            [InlineKeyboardButton("🔄 Refresh", callback_data="admin_stats_detailed")],
+            [InlineKeyboardButton("📊 Basic Stats", callback_data="admin_stats")],
+            [InlineKeyboardButton("⬅️ Back to Admin", callback_data="admin_panel")]
+        ]
+        
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+        
     except Exception as e:
         logger.error(f"Error in admin_stats_detailed: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading detailed statistics.")
@@ -576,32 +435,22 @@ async def admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         telegram_id = update.effective_user.id
         
         from config import SUPER_ADMIN_ID
-        from database.db import create_session
-        from database.models import User
         
-        db = create_session()
+        if not await is_admin(telegram_id):
+            await update.message.reply_text(
+                f"❌ Access denied. You are not an admin.\n\n"
+                f"Your Telegram ID: {telegram_id}\n"
+                f"Super Admin ID: {SUPER_ADMIN_ID}"
+            )
+            return
+        
+        # Try to use the full admin panel
         try:
-            user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
-            is_admin = user and (user.is_admin or str(telegram_id) == str(SUPER_ADMIN_ID))
-            
-            if not is_admin:
-                await update.message.reply_text(
-                    f"❌ Access denied. You are not an admin.\n\n"
-                    f"Your Telegram ID: {telegram_id}\n"
-                    f"Super Admin ID: {SUPER_ADMIN_ID}"
-                )
-                return
-            
-            # Try to use the full admin panel
-            try:
-                from handlers.admin import admin_panel as full_admin_panel
-                await full_admin_panel(update, context)
-            except ImportError:
-                # Fallback to simple admin panel
-                await full_admin_panel(update, context)
-                
-        finally:
-            db.close()
+            from handlers.admin import admin_panel as full_admin_panel
+            await full_admin_panel(update, context)
+        except ImportError:
+            # Fallback to simple admin panel
+            await full_admin_panel(update, context)
         
     except Exception as e:
         logger.error(f"Error in admin_command: {e}", exc_info=True)
@@ -676,16 +525,13 @@ Contact support for admin tasks."""
 
 # ========== ORDER MANAGEMENT ==========
 
+@admin_only
 async def admin_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Order management panel"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = """
 📦 *ORDER MANAGEMENT*
@@ -709,20 +555,21 @@ async def admin_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error in admin_orders: {e}", exc_info=True)
 
+@admin_only
 async def admin_view_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View all orders with filtering"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
-            orders = db.query(Order).order_by(desc(Order.created_at)).limit(20).all()
+            page = paginate(
+                db.query(Order).options(joinedload(Order.user), joinedload(Order.bot)),
+                Order, page_token(query.data, 'admin_view_orders'), LIST_PAGE_SIZE
+            )
+            orders = page.items
             
             text = "📋 *ALL ORDERS*\n\n"
             
@@ -730,12 +577,8 @@ async def admin_view_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 text += "No orders found."
             else:
                 for order in orders:
-                    user = db.query(User).filter(User.id == order.user_id).first()
-                    bot_name = "Custom Software"
-                    if order.bot_id:
-                        bot = db.query(Bot).filter(Bot.id == order.bot_id).first()
-                        if bot:
-                            bot_name = bot.name
+                    user = order.user
+                    bot_name = order.bot.name if order.bot else "Custom Software"
                     
                     status_icon = "⏳" if order.status == OrderStatus.PENDING_REVIEW else \
                                  "✅" if order.status == OrderStatus.COMPLETED else \
@@ -752,7 +595,7 @@ async def admin_view_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     text += f"   📊 {order.status.value if order.status else 'Unknown'}\n\n"
             
             keyboard = []
-            for order in orders[:10]:
+            for order in orders:
                 keyboard.append([
                     InlineKeyboardButton(
                         f"📦 {order.order_id[:8]}... - ${order.amount:.2f}",
@@ -760,6 +603,9 @@ async def admin_view_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     )
                 ])
             
+            navigation = nav_row(page, 'admin_view_orders')
+            if navigation:
+                keyboard.append(navigation)
             keyboard.append([InlineKeyboardButton("⬅️ Back to Order Management", callback_data="admin_orders")])
             
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -772,6 +618,7 @@ async def admin_view_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_view_orders: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading orders.")
 
+@admin_only
 async def admin_order_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View order details"""
     try:
@@ -780,10 +627,6 @@ async def admin_order_detail(update: Update, context: ContextTypes.DEFAULT_TYPE)
         
         order_id = int(query.data.replace('admin_order_detail_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -883,6 +726,7 @@ async def admin_order_detail(update: Update, context: ContextTypes.DEFAULT_TYPE)
         logger.error(f"Error in admin_order_detail: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading order details.")
 
+@admin_only
 async def admin_approve_payment(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Approve order payment"""
     try:
@@ -891,11 +735,6 @@ async def admin_approve_payment(update: Update, context: ContextTypes.DEFAULT_TY
         
         order_id = int(query.data.replace('admin_approve_payment_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             order = db.query(Order).filter(Order.id == order_id).first()
@@ -910,21 +749,16 @@ async def admin_approve_payment(update: Update, context: ContextTypes.DEFAULT_TY
             # Update order status
             order.status = OrderStatus.APPROVED
             order.payment_status = PaymentStatus.VERIFIED
+            order.approved_at = datetime.now()
             order.admin_notes = f"Payment approved by admin on {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-            db.commit()
             
+            # Start the 48h unclaimed-order refund clock
+            from services.refund_scheduler import schedule_order_refund
+            schedule_order_refund(db, order)
             # Notify user
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                user = db.query(User).filter(User.id == order.user_id).first()
-                
-                try:
-                    await bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"""
+            user = db.query(User).filter(User.id == order.user_id).first()
+            if user:
+                enqueue(db, user.telegram_id, f"""
 ✅ *Payment Approved!*
 
 📦 Order ID: `{order.order_id}`
@@ -939,11 +773,8 @@ Your payment has been verified and approved. Your order is now being processed.
 3. You'll receive updates on progress
 
 Thank you for your purchase! 🎉
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Payment Approved!*\n\n"
@@ -969,16 +800,13 @@ Thank you for your purchase! 🎉
         logger.error(f"Error in admin_approve_payment: {e}", exc_info=True)
         await query.edit_message_text("❌ Error processing approval.")
 
+@admin_only
 async def admin_job_management(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Main job management dashboard"""
     try:
         query = update.callback_query
         await query.answer()
 
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
 
         db = create_session()
         try:
@@ -1037,6 +865,7 @@ Select an option below:
         logger.error(f"Error in admin_job_management: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading job management.")
 
+@admin_only
 async def admin_review_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Review a specific job for approval"""
     try:
@@ -1045,10 +874,6 @@ async def admin_review_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         job_id = query.data.replace("admin_review_job_", "")
 
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
 
         db = create_session()
         try:
@@ -1116,6 +941,7 @@ Approve to make this job public, or reject with reason.
         await query.edit_message_text("❌ Error loading job details.")
 
 
+@admin_only
 async def admin_approve_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Approve job – set is_public = True, status = 'open'"""
     try:
@@ -1124,11 +950,6 @@ async def admin_approve_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         job_id = query.data.replace("admin_approve_job_", "")
 
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-
         db = create_session()
         try:
             from database.models import Job, User
@@ -1143,19 +964,11 @@ async def admin_approve_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
             job.status = 'open'
             job.is_public = True
             job.approved_at = datetime.now()
-            db.commit()
 
             # Notify the job poster
             user = db.query(User).filter(User.id == job.user_id).first()
             if user:
-                from telegram import Bot
-                from config import TELEGRAM_TOKEN
-                if TELEGRAM_TOKEN:
-                    bot = Bot(token=TELEGRAM_TOKEN)
-                    try:
-                        await bot.send_message(
-                            chat_id=user.telegram_id,
-                            text=f"""
+                enqueue(db, user.telegram_id, f"""
 ✅ **Your Job Has Been Approved!**
 
 📋 **Job ID:** `{job.job_id}`
@@ -1169,11 +982,8 @@ Developers can view the details and contact you directly via Telegram.
 🔍 **View your job:** /my_jobs
 
 Thank you for using Software Marketplace!
-                            """,
-                            parse_mode='Markdown'
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
 
             await query.edit_message_text(
                 f"✅ **Job Approved!**\n\n"
@@ -1199,6 +1009,7 @@ Thank you for using Software Marketplace!
         await query.edit_message_text("❌ Error approving job.")
 
 
+@admin_only
 async def admin_reject_payment(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Reject order payment"""
     try:
@@ -1207,11 +1018,6 @@ async def admin_reject_payment(update: Update, context: ContextTypes.DEFAULT_TYP
         
         order_id = int(query.data.replace('admin_reject_payment_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             order = db.query(Order).filter(Order.id == order_id).first()
@@ -1227,20 +1033,10 @@ async def admin_reject_payment(update: Update, context: ContextTypes.DEFAULT_TYP
             order.status = OrderStatus.CANCELLED
             order.payment_status = PaymentStatus.FAILED
             order.admin_notes = f"Payment rejected by admin on {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-            db.commit()
-            
             # Notify user
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                user = db.query(User).filter(User.id == order.user_id).first()
-                
-                try:
-                    await bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"""
+            user = db.query(User).filter(User.id == order.user_id).first()
+            if user:
+                enqueue(db, user.telegram_id, f"""
 ❌ *Payment Rejected*
 
 📦 Order ID: `{order.order_id}`
@@ -1255,11 +1051,8 @@ Your payment has been rejected. Please check the payment details and try again.
 3. Payment proof unclear
 
 If you believe this is a mistake, please contact support.
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"❌ *Payment Rejected!*\n\n"
@@ -1283,6 +1076,7 @@ If you believe this is a mistake, please contact support.
         logger.error(f"Error in admin_reject_payment: {e}", exc_info=True)
         await query.edit_message_text("❌ Error processing rejection.")
 
+@admin_only
 async def admin_assign_developer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Assign order to developer"""
     try:
@@ -1291,10 +1085,6 @@ async def admin_assign_developer(update: Update, context: ContextTypes.DEFAULT_T
         
         order_id = int(query.data.replace('admin_assign_developer_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -1374,6 +1164,7 @@ async def admin_goto_add_developer(update: Update, context: ContextTypes.DEFAULT
         logger.error(f"Error in admin_goto_add_developer: {e}", exc_info=True)
         await query.edit_message_text("❌ Error redirecting to developer management.")
 
+@admin_only
 async def admin_assign_dev_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Confirm developer assignment"""
     try:
@@ -1385,11 +1176,6 @@ async def admin_assign_dev_confirm(update: Update, context: ContextTypes.DEFAULT
         order_id = int(data[0])
         developer_id = int(data[1])
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             order = db.query(Order).filter(Order.id == order_id).first()
@@ -1409,21 +1195,11 @@ async def admin_assign_dev_confirm(update: Update, context: ContextTypes.DEFAULT
             developer.status = DeveloperStatus.BUSY
             developer.is_available = False
             
-            db.commit()
-            
             # Notify developer
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                dev_user = db.query(User).filter(User.id == developer.user_id).first()
-                customer = db.query(User).filter(User.id == order.user_id).first()
-                
-                try:
-                    await bot.send_message(
-                        chat_id=dev_user.telegram_id,
-                        text=f"""
+            dev_user = db.query(User).filter(User.id == developer.user_id).first()
+            customer = db.query(User).filter(User.id == order.user_id).first()
+            if dev_user:
+                enqueue(db, dev_user.telegram_id, f"""
 📦 *New Order Assigned!*
 
 You have been assigned a new order:
@@ -1440,18 +1216,11 @@ You have been assigned a new order:
 4. Mark as completed when done
 
 Use /developer to manage your orders.
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify developer: {e}")
+                """, parse_mode='Markdown')
             
             # Notify customer
-            if TELEGRAM_TOKEN:
-                try:
-                    await bot.send_message(
-                        chat_id=customer.telegram_id,
-                        text=f"""
+            if customer:
+                enqueue(db, customer.telegram_id, f"""
 👷 *Developer Assigned!*
 
 A developer has been assigned to your order:
@@ -1467,11 +1236,8 @@ A developer has been assigned to your order:
 4. Regular updates will be provided
 
 Thank you for your patience! 🚀
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify customer: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Developer Assigned!*\n\n"
@@ -1497,6 +1263,7 @@ Thank you for your patience! 🚀
         logger.error(f"Error in admin_assign_dev_confirm: {e}", exc_info=True)
         await query.edit_message_text("❌ Error processing assignment.")
 
+@admin_only
 async def admin_complete_order(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Mark order as completed"""
     try:
@@ -1505,11 +1272,6 @@ async def admin_complete_order(update: Update, context: ContextTypes.DEFAULT_TYP
         
         order_id = int(query.data.replace('admin_complete_order_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             order = db.query(Order).filter(Order.id == order_id).first()
@@ -1525,29 +1287,17 @@ async def admin_complete_order(update: Update, context: ContextTypes.DEFAULT_TYP
             order.status = OrderStatus.COMPLETED
             order.delivered_at = datetime.now()
             
-            # Update developer stats
+            # Completed orders and earnings are credited by database.developer_stats
             if order.assigned_developer_id:
                 developer = db.query(Developer).filter(Developer.id == order.assigned_developer_id).first()
                 if developer:
-                    developer.completed_orders += 1
-                    developer.earnings += order.amount * 0.7  # Developer gets 70%
                     developer.status = DeveloperStatus.ACTIVE
                     developer.is_available = True
             
-            db.commit()
-            
             # Notify customer
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                customer = db.query(User).filter(User.id == order.user_id).first()
-                
-                try:
-                    await bot.send_message(
-                        chat_id=customer.telegram_id,
-                        text=f"""
+            customer = db.query(User).filter(User.id == order.user_id).first()
+            if customer:
+                enqueue(db, customer.telegram_id, f"""
 🎉 *Order Completed!*
 
 Your order has been completed:
@@ -1564,11 +1314,8 @@ Your order has been completed:
 4. Contact support if any issues
 
 Thank you for choosing Software Marketplace! 🚀
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify customer: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Order Completed!*\n\n"
@@ -1593,16 +1340,13 @@ Thank you for choosing Software Marketplace! 🚀
         logger.error(f"Error in admin_complete_order: {e}", exc_info=True)
         await query.edit_message_text("❌ Error processing completion.")
 
+@admin_only
 async def admin_orders_pending(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View pending orders for review"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -1655,16 +1399,13 @@ async def admin_orders_pending(update: Update, context: ContextTypes.DEFAULT_TYP
 
 # ========== DEVELOPER MANAGEMENT ==========
 
+@admin_only
 async def admin_developers(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Developer management panel"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = """
 👨‍💻 *DEVELOPER MANAGEMENT*
@@ -1688,16 +1429,13 @@ async def admin_developers(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error in admin_developers: {e}", exc_info=True)
 
+@admin_only
 async def admin_view_developers(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View all developers"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -1743,6 +1481,7 @@ async def admin_view_developers(update: Update, context: ContextTypes.DEFAULT_TY
         logger.error(f"Error in admin_view_developers: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading developers.")
 
+@admin_only
 async def admin_developer_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View developer details"""
     try:
@@ -1751,10 +1490,6 @@ async def admin_developer_detail(update: Update, context: ContextTypes.DEFAULT_T
         
         developer_id = int(query.data.replace('admin_developer_detail_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -1845,17 +1580,13 @@ async def admin_developer_detail(update: Update, context: ContextTypes.DEFAULT_T
         logger.error(f"Error in admin_developer_detail: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading developer details.")
 
+@admin_only
 async def admin_add_developer_process(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Process adding a new developer"""
     try:
         if not update.message or not context.user_data.get('adding_developer'):
             return
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await update.message.reply_text("❌ Access denied.")
-            return
-        
         developer_telegram_id = update.message.text.strip()
         
         if not developer_telegram_id.isdigit():
@@ -1896,17 +1627,8 @@ async def admin_add_developer_process(update: Update, context: ContextTypes.DEFA
         )
             db.add(developer)
             user.is_developer = True
-            db.commit()
-            
             # Send notification to new developer
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                try:
-                    await bot.send_message(
-                        chat_id=developer_telegram_id,
-                        text=f"""
+            enqueue(db, developer_telegram_id, f"""
 🎉 *Congratulations!*
 
 You have been registered as a developer!
@@ -1922,11 +1644,8 @@ You have been registered as a developer!
 4. Build your reputation
 
 Welcome to the developer team! 🚀
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify new developer: {e}")
+            """, parse_mode='Markdown')
+            db.commit()
             
             await update.message.reply_text(
                 f"✅ *Developer Added Successfully!*\n\n"
@@ -1953,16 +1672,13 @@ Welcome to the developer team! 🚀
 
 # ========== FINANCE MANAGEMENT ==========
 
+@admin_only
 async def admin_finance(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Finance management panel"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = """
 💰 *FINANCE MANAGEMENT*
@@ -1985,42 +1701,22 @@ async def admin_finance(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error in admin_finance: {e}", exc_info=True)
 
+@admin_only
 async def admin_finance_overview(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Financial overview"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
-            # Total revenue
-            total_revenue = db.query(func.sum(Order.amount)).filter(Order.status == OrderStatus.COMPLETED).scalar() or 0
-            
-            # Today's revenue
-            today = datetime.now().date()
-            today_revenue = db.query(func.sum(Order.amount)).filter(
-                func.date(Order.created_at) == today,
-                Order.status == OrderStatus.COMPLETED
-            ).scalar() or 0
-            
-            # This week's revenue
-            week_ago = today - timedelta(days=7)
-            week_revenue = db.query(func.sum(Order.amount)).filter(
-                Order.created_at >= week_ago,
-                Order.status == OrderStatus.COMPLETED
-            ).scalar() or 0
-            
-            # This month's revenue
-            month_ago = today - timedelta(days=30)
-            month_revenue = db.query(func.sum(Order.amount)).filter(
-                Order.created_at >= month_ago,
-                Order.status == OrderStatus.COMPLETED
-            ).scalar() or 0
+            from services.stats_service import stats_service
+            finance = await run_sync(stats_service.get_finance)
+            total_revenue = finance['total_revenue']
+            today_revenue = finance['today_revenue']
+            week_revenue = finance['week_revenue']
+            month_revenue = finance['month_revenue']
             
             # Pending payments
             pending_payments = db.query(Order).filter(
@@ -2079,16 +1775,13 @@ async def admin_finance_overview(update: Update, context: ContextTypes.DEFAULT_T
         logger.error(f"Error in admin_finance_overview: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading financial overview.")
 
+@admin_only
 async def admin_pending_payments(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show pending payments"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -2140,16 +1833,13 @@ async def admin_pending_payments(update: Update, context: ContextTypes.DEFAULT_T
         logger.error(f"Error in admin_pending_payments: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading pending payments.")
 
+@admin_only
 async def admin_developer_payouts(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Manage developer payouts"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -2207,16 +1897,13 @@ async def admin_developer_payouts(update: Update, context: ContextTypes.DEFAULT_
 
 # ========== SOFTWARE MANAGEMENT ==========
 
+@admin_only
 async def admin_bots(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Software management panel"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = """
 🚀 *SOFTWARE MANAGEMENT*
@@ -2241,44 +1928,44 @@ async def admin_bots(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error in admin_bots: {e}", exc_info=True)
 
+@admin_only
 async def admin_view_bots(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View all software"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
-            bots = db.query(Bot).order_by(desc(Bot.created_at)).all()
+            page = paginate(db.query(Bot), Bot, page_token(query.data, 'admin_view_bots'), LIST_PAGE_SIZE)
+            bots = page.items
             
             text = "🚀 *ALL SOFTWARE*\n\n"
             
             if not bots:
                 text += "No software found."
             else:
-                total_sales = 0
-                total_revenue = 0
+                # Sales and revenue for the bots on this page in one grouped query
+                sales_by_bot = {
+                    bot_id: (sales, revenue or 0)
+                    for bot_id, sales, revenue in db.query(
+                        Order.bot_id, func.count(Order.id), func.sum(Order.amount)
+                    ).filter(
+                        Order.bot_id.in_([bot.id for bot in bots]),
+                        Order.status == OrderStatus.COMPLETED
+                    ).group_by(Order.bot_id)
+                }
+                total_bots, total_sales, total_revenue = db.query(
+                    func.count(func.distinct(Bot.id)),
+                    func.count(Order.id),
+                    func.coalesce(func.sum(Order.amount), 0)
+                ).select_from(Bot).outerjoin(
+                    Order, and_(Order.bot_id == Bot.id, Order.status == OrderStatus.COMPLETED)
+                ).one()
                 
                 for bot in bots:
-                    # Get sales count for this software
-                    sales = db.query(Order).filter(
-                        Order.bot_id == bot.id,
-                        Order.status == OrderStatus.COMPLETED
-                    ).count()
-                    
-                    # Get revenue for this software
-                    revenue = db.query(func.sum(Order.amount)).filter(
-                        Order.bot_id == bot.id,
-                        Order.status == OrderStatus.COMPLETED
-                    ).scalar() or 0
-                    
-                    total_sales += sales
-                    total_revenue += revenue
+                    sales, revenue = sales_by_bot.get(bot.id, (0, 0))
                     
                     status = "✅ Available" if bot.is_available else "🚫 Disabled"
                     featured = "⭐" if bot.is_featured else ""
@@ -2291,10 +1978,10 @@ async def admin_view_bots(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     text += f"   🛒 Sales: {sales}\n"
                     text += f"   💰 Revenue: ${revenue:.2f}\n\n"
                 
-                text += f"\n*Totals:* {len(bots)} software, {total_sales} sales, ${total_revenue:.2f} revenue"
+                text += f"\n*Totals:* {total_bots} software, {total_sales} sales, ${total_revenue:.2f} revenue"
             
             keyboard = []
-            for bot in bots[:10]:
+            for bot in bots:
                 status_emoji = "✅" if bot.is_available else "🚫"
                 keyboard.append([
                     InlineKeyboardButton(
@@ -2303,6 +1990,9 @@ async def admin_view_bots(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     )
                 ])
             
+            navigation = nav_row(page, 'admin_view_bots')
+            if navigation:
+                keyboard.append(navigation)
             keyboard.append([InlineKeyboardButton("⬅️ Back to Software Management", callback_data="admin_bots")])
             
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -2315,6 +2005,7 @@ async def admin_view_bots(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_view_bots: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading software.")
 
+@admin_only
 async def admin_bot_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View software details"""
     try:
@@ -2323,10 +2014,6 @@ async def admin_bot_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         bot_id = int(query.data.replace('admin_bot_detail_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -2418,16 +2105,13 @@ async def admin_bot_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_bot_detail: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading software details.")
 
+@admin_only
 async def admin_add_bot_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start adding new software"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         context.user_data['adding_bot'] = True
         context.user_data['bot_data'] = {}
@@ -2637,6 +2321,7 @@ async def admin_add_bot_delivery(update: Update, context: ContextTypes.DEFAULT_T
         logger.error(f"Error in admin_add_bot_delivery: {e}", exc_info=True)
         return ConversationHandler.END
 
+@admin_only
 async def admin_bot_disable(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Disable software"""
     try:
@@ -2645,10 +2330,6 @@ async def admin_bot_disable(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         bot_id = int(query.data.replace('admin_bot_disable_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -2681,6 +2362,7 @@ async def admin_bot_disable(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error in admin_bot_disable: {e}", exc_info=True)
 
+@admin_only
 async def admin_bot_enable(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Enable software"""
     try:
@@ -2689,10 +2371,6 @@ async def admin_bot_enable(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         bot_id = int(query.data.replace('admin_bot_enable_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -2725,6 +2403,7 @@ async def admin_bot_enable(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error in admin_bot_enable: {e}", exc_info=True)
 
+@admin_only
 async def admin_bot_feature(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Feature software"""
     try:
@@ -2733,10 +2412,6 @@ async def admin_bot_feature(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         bot_id = int(query.data.replace('admin_bot_feature_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -2769,6 +2444,7 @@ async def admin_bot_feature(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error in admin_bot_feature: {e}", exc_info=True)
 
+@admin_only
 async def admin_bot_unfeature(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Remove featured status from software"""
     try:
@@ -2777,10 +2453,6 @@ async def admin_bot_unfeature(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         bot_id = int(query.data.replace('admin_bot_unfeature_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -2814,16 +2486,13 @@ async def admin_bot_unfeature(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 # ========== USER MANAGEMENT ==========
 
+@admin_only
 async def admin_users(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """User management panel"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = """
 👥 *USER MANAGEMENT*
@@ -2846,20 +2515,17 @@ async def admin_users(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error in admin_users: {e}", exc_info=True)
 
+@admin_only
 async def admin_view_users(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View all users"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
-            users = db.query(User).order_by(desc(User.created_at)).limit(20).all()
+            page = paginate(db.query(User), User, page_token(query.data, 'admin_view_users'), LIST_PAGE_SIZE)
+            users = page.items
             
             text = "👥 *ALL USERS*\n\n"
             
@@ -2878,7 +2544,7 @@ async def admin_view_users(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     text += f"   💰 Balance: ${user.balance:.2f}\n\n"
             
             keyboard = []
-            for user in users[:10]:
+            for user in users:
                 status = ""
                 if user.is_admin:
                     status = "👑"
@@ -2892,6 +2558,9 @@ async def admin_view_users(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     )
                 ])
             
+            navigation = nav_row(page, 'admin_view_users')
+            if navigation:
+                keyboard.append(navigation)
             keyboard.append([InlineKeyboardButton("⬅️ Back to User Management", callback_data="admin_users")])
             
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -2904,6 +2573,7 @@ async def admin_view_users(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_view_users: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading users.")
 
+@admin_only
 async def admin_user_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View user details"""
     try:
@@ -2912,10 +2582,6 @@ async def admin_user_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         user_id = int(query.data.replace('admin_user_detail_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -3007,6 +2673,7 @@ async def admin_user_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_user_detail: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading user details.")
 
+@admin_only
 async def admin_user_make_admin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Make user an admin"""
     try:
@@ -3015,11 +2682,6 @@ async def admin_user_make_admin(update: Update, context: ContextTypes.DEFAULT_TY
         
         user_id = int(query.data.replace('admin_user_make_admin_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             user = db.query(User).filter(User.id == user_id).first()
@@ -3032,18 +2694,9 @@ async def admin_user_make_admin(update: Update, context: ContextTypes.DEFAULT_TY
                 return
             
             user.is_admin = True
-            db.commit()
-            
             # Notify user
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                try:
-                    await bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"""
+            if user:
+                enqueue(db, user.telegram_id, f"""
 🎉 *Admin Privileges Granted!*
 
 You have been granted admin privileges in Software Marketplace.
@@ -3057,11 +2710,8 @@ You have been granted admin privileges in Software Marketplace.
 *Admin Panel:* /admin
 
 Use your new powers responsibly! 👑
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Admin Privileges Granted!*\n\n"
@@ -3084,6 +2734,7 @@ Use your new powers responsibly! 👑
     except Exception as e:
         logger.error(f"Error in admin_user_make_admin: {e}", exc_info=True)
 
+@admin_only
 async def admin_user_remove_admin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Remove admin privileges from user"""
     try:
@@ -3092,11 +2743,6 @@ async def admin_user_remove_admin(update: Update, context: ContextTypes.DEFAULT_
         
         user_id = int(query.data.replace('admin_user_remove_admin_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             user = db.query(User).filter(User.id == user_id).first()
@@ -3109,18 +2755,9 @@ async def admin_user_remove_admin(update: Update, context: ContextTypes.DEFAULT_
                 return
             
             user.is_admin = False
-            db.commit()
-            
             # Notify user
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                try:
-                    await bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"""
+            if user:
+                enqueue(db, user.telegram_id, f"""
 ⚠️ *Admin Privileges Removed*
 
 Your admin privileges in Software Marketplace have been removed.
@@ -3131,11 +2768,8 @@ Your admin privileges in Software Marketplace have been removed.
 3. You cannot review payments or requests
 
 If you believe this is a mistake, please contact support.
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Admin Privileges Removed!*\n\n"
@@ -3160,16 +2794,13 @@ If you believe this is a mistake, please contact support.
 
 # ========== DEVELOPER REQUESTS MANAGEMENT ==========
 
+@admin_only
 async def admin_developer_requests(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Manage developer requests"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -3218,16 +2849,13 @@ async def admin_developer_requests(update: Update, context: ContextTypes.DEFAULT
         logger.error(f"Error in admin_developer_requests: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading developer requests.")
 
+@admin_only
 async def admin_dev_requests_pending(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show pending developer requests"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -3273,6 +2901,7 @@ async def admin_dev_requests_pending(update: Update, context: ContextTypes.DEFAU
         logger.error(f"Error in admin_dev_requests_pending: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading pending requests.")
 
+@admin_only
 async def admin_dev_review_request(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Review a specific developer request"""
     try:
@@ -3281,10 +2910,6 @@ async def admin_dev_review_request(update: Update, context: ContextTypes.DEFAULT
         
         request_id = int(query.data.replace('admin_dev_review_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -3347,6 +2972,7 @@ async def admin_dev_review_request(update: Update, context: ContextTypes.DEFAULT
         logger.error(f"Error in admin_dev_review_request: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading request details.")
 
+@admin_only
 async def admin_dev_approve_request(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Approve a developer request"""
     try:
@@ -3355,11 +2981,6 @@ async def admin_dev_approve_request(update: Update, context: ContextTypes.DEFAUL
         
         request_id = int(query.data.replace('admin_dev_approve_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             dev_request = db.query(DeveloperRequest).filter(DeveloperRequest.id == request_id).first()
@@ -3400,18 +3021,9 @@ async def admin_dev_approve_request(update: Update, context: ContextTypes.DEFAUL
             dev_request.reviewed_at = datetime.now()
             
             db.add(developer)
-            db.commit()
-            
             # Notify user
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                try:
-                    await bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"""
+            if user:
+                enqueue(db, user.telegram_id, f"""
 🎉 *Congratulations! Your Developer Application Has Been Approved!*
 
 👨‍💻 *Developer ID:* `{developer_id}`
@@ -3425,11 +3037,8 @@ async def admin_dev_approve_request(update: Update, context: ContextTypes.DEFAUL
 4. Build your reputation
 
 Welcome to the developer team! 🚀
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Developer Approved!*\n\n"
@@ -3455,6 +3064,7 @@ Welcome to the developer team! 🚀
         logger.error(f"Error in admin_dev_approve_request: {e}", exc_info=True)
         await query.edit_message_text("❌ Error processing approval.")
 
+@admin_only
 async def admin_dev_reject_request(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Reject a developer request"""
     try:
@@ -3463,11 +3073,6 @@ async def admin_dev_reject_request(update: Update, context: ContextTypes.DEFAULT
         
         request_id = int(query.data.replace('admin_dev_reject_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             dev_request = db.query(DeveloperRequest).filter(DeveloperRequest.id == request_id).first()
@@ -3483,18 +3088,9 @@ async def admin_dev_reject_request(update: Update, context: ContextTypes.DEFAULT
             dev_request.reviewed_by = user.id
             dev_request.reviewed_at = datetime.now()
             
-            db.commit()
-            
             # Notify user
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                try:
-                    await bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"""
+            if user:
+                enqueue(db, user.telegram_id, f"""
 ❌ *Developer Application Rejected*
 
 Your developer application has been reviewed and rejected.
@@ -3507,11 +3103,8 @@ Your developer application has been reviewed and rejected.
 3. Check our requirements at /menu → Become Developer
 
 Thank you for your interest in Software Marketplace.
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"❌ *Developer Request Rejected!*\n\n"
@@ -3537,16 +3130,13 @@ Thank you for your interest in Software Marketplace.
 
 # ========== CUSTOM REQUESTS MANAGEMENT ==========
 
+@admin_only
 async def admin_custom_requests(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Manage custom software requests"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -3603,16 +3193,13 @@ async def admin_custom_requests(update: Update, context: ContextTypes.DEFAULT_TY
         logger.error(f"Error in admin_custom_requests: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading custom requests.")
 
+@admin_only
 async def admin_custom_requests_pending(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show pending custom requests"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -3659,6 +3246,7 @@ async def admin_custom_requests_pending(update: Update, context: ContextTypes.DE
         logger.error(f"Error in admin_custom_requests_pending: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading pending custom requests.")
 
+@admin_only
 async def admin_custom_request_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View custom request details"""
     try:
@@ -3667,10 +3255,6 @@ async def admin_custom_request_detail(update: Update, context: ContextTypes.DEFA
         
         request_id = int(query.data.replace('admin_custom_request_detail_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -3766,6 +3350,7 @@ async def admin_custom_request_detail(update: Update, context: ContextTypes.DEFA
         logger.error(f"Error in admin_custom_request_detail: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading custom request details.")
 
+@admin_only
 async def admin_custom_approve(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Approve custom request"""
     try:
@@ -3774,11 +3359,6 @@ async def admin_custom_approve(update: Update, context: ContextTypes.DEFAULT_TYP
         
         request_id = int(query.data.replace('admin_custom_approve_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             request = db.query(CustomRequest).filter(CustomRequest.id == request_id).first()
@@ -3792,20 +3372,10 @@ async def admin_custom_approve(update: Update, context: ContextTypes.DEFAULT_TYP
             
             request.status = RequestStatus.APPROVED
             request.admin_notes = f"Approved by admin on {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-            db.commit()
-            
             # Notify user
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                user = db.query(User).filter(User.id == request.user_id).first()
-                
-                try:
-                    await bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"""
+            user = db.query(User).filter(User.id == request.user_id).first()
+            if user:
+                enqueue(db, user.telegram_id, f"""
 ✅ *Custom Request Approved!*
 
 Your custom software request has been approved:
@@ -3820,11 +3390,8 @@ Your custom software request has been approved:
 3. Development will begin after agreement
 
 Thank you for choosing Software Marketplace! 🚀
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Custom Request Approved!*\n\n"
@@ -3851,16 +3418,13 @@ Thank you for choosing Software Marketplace! 🚀
 
 # ========== BROADCAST MESSAGE ==========
 
+@admin_only
 async def admin_broadcast_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start broadcast message process"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = """
 📢 *BROADCAST MESSAGE*
@@ -3892,7 +3456,7 @@ async def admin_broadcast_process(update: Update, context: ContextTypes.DEFAULT_
             return BROADCAST_MESSAGE
         
         telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
+        if not await check_admin_access(telegram_id):
             await update.message.reply_text("❌ Access denied.")
             return ConversationHandler.END
         
@@ -4018,18 +3582,11 @@ async def approve_custom_request(update: Update, context: ContextTypes.DEFAULT_T
             
             # Update status
             custom_request.status = RequestStatus.APPROVED
-            db.commit()
             
             # Notify user
             user = db.query(User).filter(User.id == custom_request.user_id).first()
             if user:
-                from telegram import Bot
-                from config import TELEGRAM_TOKEN
-                
-                if TELEGRAM_TOKEN:
-                    bot = Bot(token=TELEGRAM_TOKEN)
-                    
-                    message = f"""✅ Custom Request Approved!
+                message = f"""✅ Custom Request Approved!
 
 📋 Request ID: {request_id}
 📝 Title: {custom_request.title}
@@ -4046,14 +3603,8 @@ What happens next:
 4. You'll be notified of all updates
 
 Thank you for choosing our platform! 🚀"""
-                    
-                    try:
-                        await bot.send_message(
-                            chat_id=user.telegram_id,
-                            text=message
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to notify user: {e}")
+                enqueue(db, user.telegram_id, message)
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ Request {request_id} approved and made available to developers."
@@ -4069,6 +3620,7 @@ Thank you for choosing our platform! 🚀"""
     except Exception as e:
         logger.error(f"Error in approve_custom_request: {e}", exc_info=True)
 
+@admin_only
 async def admin_broadcast_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Confirm and send broadcast"""
     try:
@@ -4076,66 +3628,31 @@ async def admin_broadcast_confirm(update: Update, context: ContextTypes.DEFAULT_
         await query.answer()
         
         telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         message = context.user_data.get('broadcast_message')
         if not message:
             await query.edit_message_text("❌ No message found. Please try again.")
             return
         
-        # Send to all users
-        db = create_session()
-        try:
-            users = db.query(User).all()
-            total_users = len(users)
-            successful = 0
-            failed = 0
-            
-            await query.edit_message_text(f"📤 Sending broadcast to {total_users} users...")
-            
-            from telegram import Bot as TelegramBot
-            from telegram.error import TelegramError
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = TelegramBot(token=TELEGRAM_TOKEN)
-                
-                for user in users:
-                    try:
-                        await bot.send_message(
-                            chat_id=user.telegram_id,
-                            text=f"📢 *Broadcast from Admin*\n\n{message}",
-                            parse_mode='Markdown'
-                        )
-                        successful += 1
-                    except TelegramError as e:
-                        logger.error(f"Failed to send to user {user.telegram_id}: {e}")
-                        failed += 1
-                    
-                    # Small delay to avoid rate limiting
-                    import asyncio
-                    await asyncio.sleep(0.1)
-            
-            # Clear context
-            context.user_data.pop('broadcast_message', None)
-            
-            await query.edit_message_text(
-                f"✅ *Broadcast Completed!*\n\n"
-                f"📤 Total Users: {total_users}\n"
-                f"✅ Successful: {successful}\n"
-                f"❌ Failed: {failed}\n\n"
-                f"Message has been sent to all users.",
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🏠 Admin Panel", callback_data="admin_panel")]
-                ])
-            )
-            
-        finally:
-            db.close()
-            
+        from services.broadcast_service import create_broadcast, start_broadcast
+        
+        # Hand the broadcast to the background engine - progress is edited into this message
+        await query.edit_message_text("📤 Preparing broadcast...")
+        job_id = create_broadcast(
+            message,
+            created_by=telegram_id,
+            status_chat_id=query.message.chat_id,
+            status_message_id=query.message.message_id
+        )
+        if not job_id:
+            await query.edit_message_text("❌ Error sending broadcast.")
+            return
+        
+        # Clear context
+        context.user_data.pop('broadcast_message', None)
+        
+        start_broadcast(context.application, job_id)
+        
     except Exception as e:
         logger.error(f"Error in admin_broadcast_confirm: {e}", exc_info=True)
         await query.edit_message_text("❌ Error sending broadcast.")
@@ -4187,6 +3704,7 @@ async def admin_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_cancel: {e}", exc_info=True)
         return ConversationHandler.END
 
+@admin_only
 async def admin_dev_approve_request(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Approve a developer request - FIXED VERSION"""
     try:
@@ -4196,9 +3714,6 @@ async def admin_dev_approve_request(update: Update, context: ContextTypes.DEFAUL
         request_id = int(query.data.replace('admin_dev_approve_', ''))
         
         telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -4242,18 +3757,9 @@ async def admin_dev_approve_request(update: Update, context: ContextTypes.DEFAUL
             dev_request.updated_at = datetime.now()
             
             db.add(developer)
-            db.commit()
-            
             # Notify user
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                try:
-                    await bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"""
+            if user:
+                enqueue(db, user.telegram_id, f"""
 🎉 *Congratulations! Your Developer Application Has Been Approved!*
 
 👨‍💻 *Developer ID:* `{developer_id}`
@@ -4272,11 +3778,8 @@ async def admin_dev_approve_request(update: Update, context: ContextTypes.DEFAUL
 *Check Available Orders:* Use the developer dashboard
 
 **Welcome to the developer team!** 🚀
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Developer Approved!*\n\n"
@@ -4308,16 +3811,13 @@ async def admin_dev_approve_request(update: Update, context: ContextTypes.DEFAUL
 
 # ========== MISSING HANDLER FUNCTIONS ==========
 
+@admin_only
 async def admin_active_developers(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show active developers"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -4359,16 +3859,13 @@ async def admin_active_developers(update: Update, context: ContextTypes.DEFAULT_
         logger.error(f"Error in admin_active_developers: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading active developers.")
 
+@admin_only
 async def admin_inactive_developers(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show inactive developers"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -4409,16 +3906,13 @@ async def admin_inactive_developers(update: Update, context: ContextTypes.DEFAUL
         logger.error(f"Error in admin_inactive_developers: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading inactive developers.")
 
+@admin_only
 async def admin_remove_developer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Remove developer interface"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = """
 ➖ *REMOVE DEVELOPER*
@@ -4456,6 +3950,7 @@ Select a developer to remove:
         logger.error(f"Error in admin_remove_developer: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading developers.")
 
+@admin_only
 async def admin_developer_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Developer statistics"""
     try:
@@ -4469,10 +3964,6 @@ async def admin_developer_stats(update: Update, context: ContextTypes.DEFAULT_TY
         
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -4558,10 +4049,83 @@ async def admin_dev_earnings(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await update.callback_query.answer("Feature coming soon!")
     await update.callback_query.edit_message_text("💰 Update developer earnings - Feature coming soon!")
 
+@admin_only
 async def admin_dev_payout(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Developer payout"""
-    await update.callback_query.answer("Feature coming soon!")
-    await update.callback_query.edit_message_text("💵 Developer payout - Feature coming soon!")
+    """Developer payout: review what is owed, then mark it paid
+
+    admin_dev_payout_<id> shows the balance and open requests;
+    admin_dev_payout_<id>_paid records the payment. Open requests are settled
+    as requested; with none open the whole balance is paid out.
+    """
+    from database.developer_stats import get_developer_stats
+    from database.models import DeveloperPayout, PayoutStatus
+
+    query = update.callback_query
+    await query.answer()
+    developer_id, _, action = query.data.replace('admin_dev_payout_', '').partition('_')
+
+    db = create_session()
+    try:
+        developer = db.query(Developer).filter(Developer.id == int(developer_id)).first()
+        if not developer:
+            await query.edit_message_text("❌ Developer not found.")
+            return
+        user = db.query(User).filter(User.id == developer.user_id).first()
+
+        open_requests = db.query(DeveloperPayout).filter(
+            DeveloperPayout.developer_id == developer.id,
+            DeveloperPayout.status == PayoutStatus.REQUESTED
+        ).order_by(DeveloperPayout.requested_at).all()
+        stats = get_developer_stats(db, developer.id)
+        balance = stats.total_earnings - stats.paid_out
+        due = sum(payout.amount for payout in open_requests) if open_requests else round(balance, 2)
+
+        if action == 'paid' and due > 0:
+            admin = db.query(User).filter(User.telegram_id == update.effective_user.id).first()
+            now = datetime.now()
+            if not open_requests:
+                open_requests = [DeveloperPayout(developer_id=developer.id, amount=due)]
+                db.add(open_requests[0])
+            for payout in open_requests:
+                payout.status = PayoutStatus.PAID
+                payout.paid_at = now
+                payout.paid_by = admin.id if admin else None
+            db.commit()
+            logger.info(f"💵 Payout of ${due:.2f} to {developer.developer_id} marked paid")
+
+            await query.edit_message_text(
+                f"✅ Payout of ${due:.2f} to {developer.developer_id} recorded.\n\n"
+                f"💰 Remaining balance: ${developer.earnings:.2f}",
+                reply_markup=InlineKeyboardMarkup([
+                    [InlineKeyboardButton("⬅️ Developer Payouts", callback_data="admin_developer_payouts")]
+                ])
+            )
+            return
+
+        text = f"""
+💵 *DEVELOPER PAYOUT*
+
+👨‍💻 *Developer:* {user.first_name if user else 'Unknown'} (`{developer.developer_id}`)
+📧 *Email:* {(user.email if user else None) or 'Not set'}
+
+💰 *Total Earned:* ${stats.total_earnings:.2f}
+✅ *Paid Out:* ${stats.paid_out:.2f}
+⏳ *Balance:* ${balance:.2f}
+📤 *Open Requests:* {len(open_requests)} (${stats.payout_requested:.2f})
+"""
+        keyboard = []
+        if due > 0:
+            keyboard.append([InlineKeyboardButton(
+                f"✅ Mark ${due:.2f} as Paid", callback_data=f"admin_dev_payout_{developer.id}_paid"
+            )])
+        keyboard.append([InlineKeyboardButton("⬅️ Developer Payouts", callback_data="admin_developer_payouts")])
+        await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+
+    except Exception as e:
+        logger.error(f"Error in admin_dev_payout: {e}", exc_info=True)
+        await query.edit_message_text("❌ Error processing developer payout.")
+    finally:
+        db.close()
 
 # Add other missing placeholder functions...
 async def admin_orders_completed(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -4579,10 +4143,33 @@ async def admin_orders_assigned(update: Update, context: ContextTypes.DEFAULT_TY
     await update.callback_query.answer("Feature coming soon!")
     await update.callback_query.edit_message_text("👷 Assigned orders - Feature coming soon!")
 
+@admin_only
 async def admin_search_order(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Search order"""
-    await update.callback_query.answer("Feature coming soon!")
-    await update.callback_query.edit_message_text("🔍 Search order - Feature coming soon!")
+    try:
+        query = update.callback_query
+        await query.answer()
+        
+        text = """
+🔍 *SEARCH ORDERS*
+
+Send `/search_order TEXT` with any part (3+ characters) of an order ID or payment reference.
+Send `/search_request TEXT` to search custom request IDs the same way.
+
+Example: `/search_order AB12CD`
+"""
+        
+        keyboard = [
+            [InlineKeyboardButton("⬅️ Back to Orders", callback_data="admin_orders")],
+            [InlineKeyboardButton("🏠 Admin Panel", callback_data="admin_panel")]
+        ]
+        
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+        
+    except Exception as e:
+        logger.error(f"Error in admin_search_order: {e}", exc_info=True)
+        await query.edit_message_text("❌ Error in search interface.")
 
 async def admin_debug(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Debug info"""
@@ -4591,16 +4178,13 @@ async def admin_debug(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 # ========== MISSING FUNCTION IMPLEMENTATIONS ==========
 
+@admin_only
 async def admin_verified_payments(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show verified payments"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -4634,16 +4218,13 @@ async def admin_verified_payments(update: Update, context: ContextTypes.DEFAULT_
         logger.error(f"Error in admin_verified_payments: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading verified payments.")
 
+@admin_only
 async def admin_rejected_payments(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show rejected payments"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -4677,16 +4258,13 @@ async def admin_rejected_payments(update: Update, context: ContextTypes.DEFAULT_
         logger.error(f"Error in admin_rejected_payments: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading rejected payments.")
 
+@admin_only
 async def admin_edit_bot(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Edit software - show list"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = "✏️ *EDIT SOFTWARE*\n\nSelect software to edit:"
         
@@ -4717,16 +4295,13 @@ async def admin_edit_bot(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_edit_bot: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading software.")
 
+@admin_only
 async def admin_disable_bot(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Disable software - show list"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = "🚫 *DISABLE SOFTWARE*\n\nSelect software to disable:"
         
@@ -4757,16 +4332,13 @@ async def admin_disable_bot(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_disable_bot: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading software.")
 
+@admin_only
 async def admin_enable_bot(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Enable software - show list"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = "✅ *ENABLE SOFTWARE*\n\nSelect software to enable:"
         
@@ -4797,16 +4369,13 @@ async def admin_enable_bot(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_enable_bot: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading software.")
 
+@admin_only
 async def admin_featured_bots(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Manage featured software"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -4847,16 +4416,13 @@ async def admin_featured_bots(update: Update, context: ContextTypes.DEFAULT_TYPE
         logger.error(f"Error in admin_featured_bots: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading featured software.")
 
+@admin_only
 async def admin_bot_analytics(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Software analytics overview"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = "📊 *SOFTWARE ANALYTICS*\n\nSelect software for detailed analytics:"
         
@@ -4893,6 +4459,7 @@ async def admin_bot_analytics(update: Update, context: ContextTypes.DEFAULT_TYPE
         logger.error(f"Error in admin_bot_analytics: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading software analytics.")
 
+@admin_only
 async def admin_bot_analytics_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Detailed software analytics"""
     try:
@@ -4901,10 +4468,6 @@ async def admin_bot_analytics_detail(update: Update, context: ContextTypes.DEFAU
         
         bot_id = int(query.data.replace('admin_bot_analytics_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -4989,16 +4552,13 @@ async def admin_bot_analytics_detail(update: Update, context: ContextTypes.DEFAU
         logger.error(f"Error in admin_bot_analytics_detail: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading detailed analytics.")
 
+@admin_only
 async def admin_make_admin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Make user admin - show list"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = "👑 *MAKE ADMIN*\n\nSelect user to make admin:"
         
@@ -5029,17 +4589,13 @@ async def admin_make_admin(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_make_admin: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading users.")
 
+@admin_only
 async def admin_remove_admin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Remove admin - show list"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         text = "👤 *REMOVE ADMIN*\n\nSelect admin to remove:"
         
         db = create_session()
@@ -5074,6 +4630,7 @@ async def admin_remove_admin(update: Update, context: ContextTypes.DEFAULT_TYPE)
         logger.error(f"Error in admin_remove_admin: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading admins.")
 
+@admin_only
 async def admin_user_activity(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """User activity overview"""
     try:
@@ -5081,78 +4638,46 @@ async def admin_user_activity(update: Update, context: ContextTypes.DEFAULT_TYPE
         await query.answer()
         
         telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
-        db = create_session()
-        try:
-            # Last 7 days activity
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=7)
-            
-            daily_activity = []
-            for i in range(7):
-                date = start_date + timedelta(days=i)
-                new_users = db.query(User).filter(func.date(User.created_at) == date).count()
-                new_orders = db.query(Order).filter(func.date(Order.created_at) == date).count()
-                daily_activity.append((date, new_users, new_orders))
-            
-            # Most active users (by order count)
-            active_users = db.query(
-                User.first_name,
-                User.username,
-                User.telegram_id,
-                func.count(Order.id).label('order_count'),
-                func.sum(Order.amount).label('total_spent')
-            ).join(Order, User.id == Order.user_id).filter(
-                Order.status == OrderStatus.COMPLETED
-            ).group_by(User.id).order_by(desc('order_count')).limit(10).all()
-            
-            text = "📊 *USER ACTIVITY*\n\n"
-            
-            text += "*Last 7 Days:*\n"
-            for date, users, orders in daily_activity:
-                text += f"  {date.strftime('%b %d')}: {users} new users, {orders} new orders\n"
-            
-            text += "\n*Most Active Users:*\n"
-            for first_name, username, telegram_id, order_count, total_spent in active_users:
-                text += f"  👤 {first_name} (@{username or 'N/A'}): {order_count} orders (${total_spent:.2f})\n"
-            
-            keyboard = [
-                [InlineKeyboardButton("⬅️ Back to User Management", callback_data="admin_users")]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
-            
-        finally:
-            db.close()
-            
+        from services.stats_service import stats_service
+        stats = await run_sync(stats_service.get_user_activity)
+        
+        text = "📊 *USER ACTIVITY*\n\n"
+        
+        text += "*Last 7 Days:*\n"
+        for date, users, orders in stats['daily_activity']:
+            text += f"  {date.strftime('%b %d')}: {users} new users, {orders} new orders\n"
+        
+        text += "\n*Most Active Users:*\n"
+        for first_name, username, telegram_id, order_count, total_spent in stats['active_users']:
+            text += f"  👤 {first_name} (@{username or 'N/A'}): {order_count} orders (${total_spent:.2f})\n"
+        
+        keyboard = [
+            [InlineKeyboardButton("⬅️ Back to User Management", callback_data="admin_users")]
+        ]
+        
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+        
     except Exception as e:
         logger.error(f"Error in admin_user_activity: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading user activity.")
 
+@admin_only
 async def admin_search_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Search user interface"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         text = """
 🔍 *SEARCH USER*
 
-Please use one of these methods:
-1. Send /search_user USERNAME to search by username
-2. Send /search_id TELEGRAM_ID to search by Telegram ID
-3. Send /search_name NAME to search by name
+Send `/search_user TEXT` to search by username, first or last name, or Telegram ID.
+Names match by prefix, so `/search_user joh` finds John.
 
-Example: `/search_user @username`
+Example: `/search_user username`
 """
         
         keyboard = [
@@ -5166,6 +4691,7 @@ Example: `/search_user @username`
         logger.error(f"Error in admin_search_user: {e}", exc_info=True)
         await query.edit_message_text("❌ Error in search interface.")
 
+@admin_only
 async def admin_user_make_dev(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Make user a developer directly"""
     try:
@@ -5174,11 +4700,6 @@ async def admin_user_make_dev(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         user_id = int(query.data.replace('admin_user_make_dev_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             user = db.query(User).filter(User.id == user_id).first()
@@ -5208,17 +4729,9 @@ async def admin_user_make_dev(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
             user.is_developer = True
             db.add(developer)
-            db.commit()
-            
             # Notify user
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                try:
-                    await bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"""
+            if user:
+                enqueue(db, user.telegram_id, f"""
 🎉 *You've been registered as a developer!*
 
 👨‍💻 *Developer ID:* `{developer_id}`
@@ -5233,11 +4746,8 @@ async def admin_user_make_dev(update: Update, context: ContextTypes.DEFAULT_TYPE
 5. Start earning money from development
 
 Welcome to the developer team! 🚀
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Developer Added!*\n\n"
@@ -5262,6 +4772,7 @@ Welcome to the developer team! 🚀
     except Exception as e:
         logger.error(f"Error in admin_user_make_dev: {e}", exc_info=True)
 
+@admin_only
 async def admin_user_add_balance(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Add balance to user"""
     try:
@@ -5270,10 +4781,6 @@ async def admin_user_add_balance(update: Update, context: ContextTypes.DEFAULT_T
         
         user_id = int(query.data.replace('admin_user_add_balance_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         context.user_data['adding_balance'] = True
         context.user_data['balance_user_id'] = user_id
@@ -5294,6 +4801,7 @@ Please send the amount to add (e.g., 100.50):
     except Exception as e:
         logger.error(f"Error in admin_user_add_balance: {e}", exc_info=True)
 
+@admin_only
 async def admin_user_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View user's orders"""
     try:
@@ -5302,10 +4810,6 @@ async def admin_user_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         user_id = int(query.data.replace('admin_user_orders_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -5361,16 +4865,13 @@ async def admin_user_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in admin_user_orders: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading user orders.")
 
+@admin_only
 async def admin_dev_requests_approved(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show approved developer requests"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -5403,16 +4904,13 @@ async def admin_dev_requests_approved(update: Update, context: ContextTypes.DEFA
         logger.error(f"Error in admin_dev_requests_approved: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading approved requests.")
 
+@admin_only
 async def admin_dev_requests_rejected(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show rejected developer requests"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -5445,16 +4943,13 @@ async def admin_dev_requests_rejected(update: Update, context: ContextTypes.DEFA
         logger.error(f"Error in admin_dev_requests_rejected: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading rejected requests.")
 
+@admin_only
 async def admin_dev_requests_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Developer requests statistics"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -5523,6 +5018,7 @@ async def admin_dev_requests_stats(update: Update, context: ContextTypes.DEFAULT
         logger.error(f"Error in admin_dev_requests_stats: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading request statistics.")
 
+@admin_only
 async def admin_dev_notes(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Add notes to developer request"""
     try:
@@ -5531,10 +5027,6 @@ async def admin_dev_notes(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         request_id = int(query.data.replace('admin_dev_notes_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         context.user_data['adding_dev_notes'] = True
         context.user_data['dev_notes_request_id'] = request_id
@@ -5555,6 +5047,7 @@ Please send your notes:
     except Exception as e:
         logger.error(f"Error in admin_dev_notes: {e}", exc_info=True)
 
+@admin_only
 async def admin_dev_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Contact developer applicant"""
     try:
@@ -5563,10 +5056,6 @@ async def admin_dev_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         request_id = int(query.data.replace('admin_dev_contact_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -5597,16 +5086,13 @@ You can contact them directly at @{user.username or 'use Telegram ID'}.
         logger.error(f"Error in admin_dev_contact: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading contact information.")
 
+@admin_only
 async def admin_custom_requests_review(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show custom requests in review"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -5649,16 +5135,13 @@ async def admin_custom_requests_review(update: Update, context: ContextTypes.DEF
         logger.error(f"Error in admin_custom_requests_review: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading requests in review.")
 
+@admin_only
 async def admin_custom_requests_approved(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show approved custom requests"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -5696,16 +5179,13 @@ async def admin_custom_requests_approved(update: Update, context: ContextTypes.D
         logger.error(f"Error in admin_custom_requests_approved: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading approved requests.")
 
+@admin_only
 async def admin_custom_requests_rejected(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show rejected custom requests"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -5739,16 +5219,13 @@ async def admin_custom_requests_rejected(update: Update, context: ContextTypes.D
         logger.error(f"Error in admin_custom_requests_rejected: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading rejected requests.")
 
+@admin_only
 async def admin_custom_requests_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Custom requests statistics"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -5812,6 +5289,7 @@ async def admin_custom_requests_stats(update: Update, context: ContextTypes.DEFA
         logger.error(f"Error in admin_custom_requests_stats: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading request statistics.")
 
+@admin_only
 async def admin_custom_review(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Mark custom request as in review"""
     try:
@@ -5820,10 +5298,6 @@ async def admin_custom_review(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         request_id = int(query.data.replace('admin_custom_review_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -5856,6 +5330,7 @@ async def admin_custom_review(update: Update, context: ContextTypes.DEFAULT_TYPE
     except Exception as e:
         logger.error(f"Error in admin_custom_review: {e}", exc_info=True)
 
+@admin_only
 async def admin_custom_reject(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Reject custom request"""
     try:
@@ -5864,11 +5339,6 @@ async def admin_custom_reject(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         request_id = int(query.data.replace('admin_custom_reject_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-        
         db = create_session()
         try:
             request = db.query(CustomRequest).filter(CustomRequest.id == request_id).first()
@@ -5878,20 +5348,10 @@ async def admin_custom_reject(update: Update, context: ContextTypes.DEFAULT_TYPE
             
             request.status = RequestStatus.REJECTED
             request.admin_notes = f"Rejected by admin on {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-            db.commit()
-            
             # Notify user
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                user = db.query(User).filter(User.id == request.user_id).first()
-                
-                try:
-                    await bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"""
+            user = db.query(User).filter(User.id == request.user_id).first()
+            if user:
+                enqueue(db, user.telegram_id, f"""
 ❌ *Custom Request Rejected*
 
 Your custom software request has been rejected:
@@ -5906,11 +5366,8 @@ Your custom software request has been rejected:
 3. Budget constraints
 
 You can submit a new request with more details.
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
             
             await query.edit_message_text(
                 f"❌ *Custom Request Rejected!*\n\n"
@@ -5933,6 +5390,7 @@ You can submit a new request with more details.
     except Exception as e:
         logger.error(f"Error in admin_custom_reject: {e}", exc_info=True)
 
+@admin_only
 async def admin_custom_assign(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Assign custom request to developer"""
     try:
@@ -5941,10 +5399,6 @@ async def admin_custom_assign(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         request_id = int(query.data.replace('admin_custom_assign_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -6007,6 +5461,7 @@ Select a developer for request:
         logger.error(f"Error in admin_custom_assign: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading developers.")
 
+@admin_only
 async def admin_custom_notes(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Add notes to custom request"""
     try:
@@ -6015,10 +5470,6 @@ async def admin_custom_notes(update: Update, context: ContextTypes.DEFAULT_TYPE)
         
         request_id = int(query.data.replace('admin_custom_notes_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         context.user_data['adding_custom_notes'] = True
         context.user_data['custom_notes_request_id'] = request_id
@@ -6039,6 +5490,7 @@ Please send your notes:
     except Exception as e:
         logger.error(f"Error in admin_custom_notes: {e}", exc_info=True)
 
+@admin_only
 async def admin_custom_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Contact custom request customer"""
     try:
@@ -6047,10 +5499,6 @@ async def admin_custom_contact(update: Update, context: ContextTypes.DEFAULT_TYP
         
         request_id = int(query.data.replace('admin_custom_contact_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -6084,6 +5532,7 @@ You can contact them directly at @{user.username or 'use Telegram ID'}.
 
 # ========== ADDITIONAL MESSAGE HANDLERS ==========
 
+@admin_only
 async def handle_add_balance_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle adding balance via message"""
     try:
@@ -6097,10 +5546,6 @@ async def handle_add_balance_message(update: Update, context: ContextTypes.DEFAU
         if not user_id:
             return
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await update.message.reply_text("❌ Access denied.")
-            return
         
         try:
             amount = float(update.message.text)
@@ -6146,6 +5591,7 @@ async def handle_add_balance_message(update: Update, context: ContextTypes.DEFAU
     except Exception as e:
         logger.error(f"Error in handle_add_balance_message: {e}", exc_info=True)
 
+@admin_only
 async def handle_dev_notes_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle developer request notes via message"""
     try:
@@ -6159,10 +5605,6 @@ async def handle_dev_notes_message(update: Update, context: ContextTypes.DEFAULT
         if not request_id:
             return
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await update.message.reply_text("❌ Access denied.")
-            return
         
         notes = update.message.text
         
@@ -6198,6 +5640,7 @@ async def handle_dev_notes_message(update: Update, context: ContextTypes.DEFAULT
     except Exception as e:
         logger.error(f"Error in handle_dev_notes_message: {e}", exc_info=True)
 
+@admin_only
 async def handle_custom_notes_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle custom request notes via message"""
     try:
@@ -6211,10 +5654,6 @@ async def handle_custom_notes_message(update: Update, context: ContextTypes.DEFA
         if not request_id:
             return
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await update.message.reply_text("❌ Access denied.")
-            return
         
         notes = update.message.text
         
@@ -6257,7 +5696,7 @@ async def admin_add_developer(update: Update, context: ContextTypes.DEFAULT_TYPE
         await query.answer()
         
         telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
+        if not await check_admin_access(telegram_id):
             await query.edit_message_text("❌ Access denied.")
             return ConversationHandler.END
         
@@ -6297,7 +5736,7 @@ async def admin_add_developer_start(update: Update, context: ContextTypes.DEFAUL
         await query.answer()
         
         telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
+        if not await check_admin_access(telegram_id):
             await query.edit_message_text("❌ Access denied.")
             return ConversationHandler.END
         
@@ -6338,7 +5777,7 @@ async def admin_add_developer_process(update: Update, context: ContextTypes.DEFA
             return ADD_DEVELOPER
         
         telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
+        if not await check_admin_access(telegram_id):
             await update.message.reply_text("❌ Access denied.")
             return ConversationHandler.END
         
@@ -6384,17 +5823,8 @@ async def admin_add_developer_process(update: Update, context: ContextTypes.DEFA
             
             db.add(developer)
             user.is_developer = True
-            db.commit()
-            
             # Send notification to new developer
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                try:
-                    await bot.send_message(
-                        chat_id=developer_telegram_id,
-                        text=f"""
+            enqueue(db, developer_telegram_id, f"""
 🎉 *Congratulations!*
 
 You have been registered as a developer!
@@ -6410,11 +5840,8 @@ You have been registered as a developer!
 4. Build your reputation
 
 Welcome to the developer team! 🚀
-                        """,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify new developer: {e}")
+            """, parse_mode='Markdown')
+            db.commit()
             
             await update.message.reply_text(
                 f"✅ *Developer Added Successfully!*\n\n"
@@ -6440,6 +5867,7 @@ Welcome to the developer team! 🚀
         return ConversationHandler.END
 
 # ========== ALSO ADD THESE PLACEHOLDER FUNCTIONS ==========
+@admin_only
 async def admin_reject_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Reject job – set status = 'rejected', is_public = False"""
     try:
@@ -6448,11 +5876,6 @@ async def admin_reject_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         job_id = query.data.replace("admin_reject_job_", "")
 
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
-
         db = create_session()
         try:
             from database.models import Job, User
@@ -6465,19 +5888,11 @@ async def admin_reject_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # Update job status
             job.status = 'rejected'
             job.is_public = False
-            db.commit()
 
             # Notify the job poster
             user = db.query(User).filter(User.id == job.user_id).first()
             if user:
-                from telegram import Bot
-                from config import TELEGRAM_TOKEN
-                if TELEGRAM_TOKEN:
-                    bot = Bot(token=TELEGRAM_TOKEN)
-                    try:
-                        await bot.send_message(
-                            chat_id=user.telegram_id,
-                            text=f"""
+                enqueue(db, user.telegram_id, f"""
 ❌ **Your Job Has Been Rejected**
 
 📋 **Job ID:** `{job.job_id}`
@@ -6495,11 +5910,8 @@ Unfortunately, your job did not meet our guidelines and has been rejected.
 You can edit and resubmit your job with more details.
 
 If you believe this is a mistake, please contact support.
-                            """,
-                            parse_mode='Markdown'
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to notify user: {e}")
+                """, parse_mode='Markdown')
+            db.commit()
 
             await query.edit_message_text(
                 f"❌ **Job Rejected!**\n\n"
@@ -6524,6 +5936,7 @@ If you believe this is a mistake, please contact support.
         await query.edit_message_text("❌ Error rejecting job.")
 
 
+@admin_only
 async def admin_remove_dev(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Remove developer"""
     try:
@@ -6532,10 +5945,6 @@ async def admin_remove_dev(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         developer_id = int(query.data.replace('admin_remove_dev_', ''))
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await query.edit_message_text("❌ Access denied.")
-            return
         
         db = create_session()
         try:
@@ -6597,19 +6006,18 @@ def get_admin_conversation_handler():
             CommandHandler('cancel', admin_cancel),
             CallbackQueryHandler(admin_panel, pattern='^admin_panel$')
         ],
-        allow_reentry=True
+        allow_reentry=True,
+        name='admin',
+        persistent=True
     )
 
+@admin_only
 async def handle_admin_workflow_messages(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle all admin workflow messages"""
     try:
         if not update.message:
             return
         
-        telegram_id = update.effective_user.id
-        if not check_admin_access(telegram_id):
-            await update.message.reply_text("❌ Access denied.")
-            return
         
         # Check which workflow we're in
         if context.user_data.get('adding_balance'):
@@ -2,6 +2,7 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from database.db import create_session
+from services.outbox import enqueue
 from database.models import User, AdminRequest, AdminRequestStatus
 from sqlalchemy import func
 import logging
@@ -57,13 +58,10 @@ async def request_admin_access(update: Update, context: ContextTypes.DEFAULT_TYP
             db.add(admin_request)
             db.commit()
             
-            # Notify super admin
-            from config import SUPER_ADMIN_ID, TELEGRAM_TOKEN
-            from telegram import Bot as TelegramBot
+            # Notify super admin - through the application's bot, as the outbox has no reply markup
+            from config import SUPER_ADMIN_ID
             
-            if TELEGRAM_TOKEN:
-                bot = TelegramBot(token=TELEGRAM_TOKEN)
-                
+            if SUPER_ADMIN_ID:
                 notification_text = f"""
 🔔 *New Admin Request*
 
@@ -84,7 +82,7 @@ async def request_admin_access(update: Update, context: ContextTypes.DEFAULT_TYP
                 ])
                 
                 try:
-                    await bot.send_message(
+                    await context.bot.send_message(
                         chat_id=SUPER_ADMIN_ID,
                         text=notification_text,
                         parse_mode='Markdown',
@@ -284,26 +282,15 @@ async def handle_request_decision(update: Update, context: ContextTypes.DEFAULT_
                 admin_request.reviewed_at = func.now()
                 admin_request.notes = "Approved by admin"
                 
-                db.commit()
-                
                 # Notify user
-                from config import TELEGRAM_TOKEN
-                from telegram import Bot as TelegramBot
+                enqueue(db, request_user.telegram_id,
+                        f"🎉 *Congratulations!*\n\n"
+                        f"Your admin request has been *approved*!\n\n"
+                        f"You now have access to the admin panel. "
+                        f"Use /menu to access admin features.",
+                        parse_mode='Markdown')
                 
-                if TELEGRAM_TOKEN:
-                    bot = TelegramBot(token=TELEGRAM_TOKEN)
-                    
-                    try:
-                        await bot.send_message(
-                            chat_id=request_user.telegram_id,
-                            text=f"🎉 *Congratulations!*\n\n"
-                                 f"Your admin request has been *approved*!\n\n"
-                                 f"You now have access to the admin panel. "
-                                 f"Use /menu to access admin features.",
-                            parse_mode='Markdown'
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to notify user: {e}", exc_info=True)
+                db.commit()
                 
                 await query.edit_message_text(
                     f"✅ *Request Approved!*\n\n"
@@ -376,26 +363,15 @@ async def handle_rejection_reason(update: Update, context: ContextTypes.DEFAULT_
             admin_request.reviewed_at = func.now()
             admin_request.notes = f"Rejected: {reason}"
             
-            db.commit()
-            
             # Notify user
-            from config import TELEGRAM_TOKEN
-            from telegram import Bot as TelegramBot
+            enqueue(db, request_user.telegram_id,
+                    f"📝 *Admin Request Update*\n\n"
+                    f"Your admin request has been *rejected*.\n\n"
+                    f"*Reason:* {reason}\n\n"
+                    f"You can submit a new request with better justification.",
+                    parse_mode='Markdown')
             
-            if TELEGRAM_TOKEN:
-                bot = TelegramBot(token=TELEGRAM_TOKEN)
-                
-                try:
-                    await bot.send_message(
-                        chat_id=request_user.telegram_id,
-                        text=f"📝 *Admin Request Update*\n\n"
-                             f"Your admin request has been *rejected*.\n\n"
-                             f"*Reason:* {reason}\n\n"
-                             f"You can submit a new request with better justification.",
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify user: {e}", exc_info=True)
+            db.commit()
             
             await update.message.reply_text(
                 f"❌ *Request Rejected!*\n\n"
@@ -438,31 +414,20 @@ async def handle_more_info_request(update: Update, context: ContextTypes.DEFAULT
             request_user = db.query(User).filter(User.id == user_id).first()
             
             # Send question to user
-            from config import TELEGRAM_TOKEN
-            from telegram import Bot as TelegramBot
+            enqueue(db, request_user.telegram_id,
+                    f"❓ *Additional Information Requested*\n\n"
+                    f"An admin needs more information about your admin request:\n\n"
+                    f"*Question:* {question}\n\n"
+                    f"Please reply to this message with your answer.",
+                    parse_mode='Markdown')
+            db.commit()
             
-            if TELEGRAM_TOKEN:
-                bot = TelegramBot(token=TELEGRAM_TOKEN)
-                
-                try:
-                    await bot.send_message(
-                        chat_id=request_user.telegram_id,
-                        text=f"❓ *Additional Information Requested*\n\n"
-                             f"An admin needs more information about your admin request:\n\n"
-                             f"*Question:* {question}\n\n"
-                             f"Please reply to this message with your answer.",
-                        parse_mode='Markdown'
-                    )
-                    
-                    # Store question in context for user's response
-                    context.user_data[f'awaiting_answer_{user_id}'] = {
-                        'admin_id': admin.id,
-                        'question': question,
-                        'request_id': request_id
-                    }
-                    
-                except Exception as e:
-                    logger.error(f"Failed to send question to user: {e}", exc_info=True)
+            # Store question in context for user's response
+            context.user_data[f'awaiting_answer_{user_id}'] = {
+                'admin_id': admin.id,
+                'question': question,
+                'request_id': request_id
+            }
             
             await update.message.reply_text(
                 f"✅ *Question Sent!*\n\n"
@@ -0,0 +1,46 @@
+"""
+Backups - admin /backup: take a database snapshot now, or list the kept ones
+"""
+import logging
+import os
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from config import BACKUP_DIR
+from database.backup import list_backups
+from services.auth_service import admin_only
+from services.backup_service import take_backup
+
+logger = logging.getLogger(__name__)
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 ** 2:.1f} MB"
+
+
+@admin_only
+async def admin_backup_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/backup - snapshot the database now; /backup list - the kept snapshots"""
+    try:
+        if context.args and context.args[0] == "list":
+            snapshots = list_backups(BACKUP_DIR)
+            if not snapshots:
+                await update.message.reply_text("📦 No backups yet.")
+                return
+            lines = ["📦 Backups (newest first)", ""]
+            lines += [f"• {os.path.basename(path)} — {_mb(os.path.getsize(path))}" for path in snapshots]
+            await update.message.reply_text("\n".join(lines))
+            return
+
+        await update.message.reply_text("📦 Backing up the database...")
+        result = await take_backup()
+        await update.message.reply_text(
+            f"✅ Backup saved: {os.path.basename(result.path)}\n"
+            f"{_mb(result.source_bytes)} copied · {_mb(result.bytes)} on disk · {result.seconds:.1f}s"
+            + (f" · restarted {result.restarts}× by writes" if result.restarts else "")
+        )
+
+    except Exception as e:
+        logger.error(f"Error in admin_backup_command: {e}", exc_info=True)
+        await update.message.reply_text(f"❌ Backup failed: {e}")
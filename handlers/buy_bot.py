@@ -16,41 +16,35 @@ async def show_bot_categories(update: Update, context: ContextTypes.DEFAULT_TYPE
         query = update.callback_query
         await query.answer()
         
-        db = create_session()
-        try:
-            # Get all categories from bots
-            categories = db.query(Bot.category).distinct().filter(Bot.is_available == True).all()
-            categories = [cat[0] for cat in categories if cat[0]]
-            
-            if not categories:
-                await query.edit_message_text(
-                    "📂 No categories available yet. Please check back later.",
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
-                    ])
-                )
-                return
-            
-            text = "📂 *Browse Categories*\n\nSelect a category to view bots:"
-            
-            keyboard = []
-            for category in categories:
-                # Count bots in category
-                count = db.query(Bot).filter(Bot.category == category, Bot.is_available == True).count()
-                keyboard.append([
-                    InlineKeyboardButton(
-                        f"📁 {category} ({count})",
-                        callback_data=f"category_{category}"
-                    )
+        from services.bot_catalog import catalog_cache
+        
+        # Category facets come precomputed with the catalog snapshot
+        categories = (await catalog_cache.fetch()).categories
+        
+        if not categories:
+            await query.edit_message_text(
+                "📂 No categories available yet. Please check back later.",
+                reply_markup=InlineKeyboardMarkup([
+                    [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
                 ])
-            
-            keyboard.append([InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
-            
-        finally:
-            db.close()
+            )
+            return
+        
+        text = "📂 *Browse Categories*\n\nSelect a category to view bots:"
+        
+        keyboard = []
+        for category, count in categories:
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"📁 {category} ({count})",
+                    callback_data=f"category_{category}"
+                )
+            ])
+        
+        keyboard.append([InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")])
+        
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
             
     except Exception as e:
         logger.error(f"Error in show_bot_categories: {e}", exc_info=True)
@@ -65,51 +59,47 @@ async def show_bots_in_category(update: Update, context: ContextTypes.DEFAULT_TY
         # Extract category from callback data (category_telegram -> telegram)
         category = query.data.replace('category_', '')
         
-        db = create_session()
-        try:
-            # Get bots in this category
-            bots = db.query(Bot).filter(
-                Bot.category == category,
-                Bot.is_available == True
-            ).order_by(Bot.name).all()
-            
-            if not bots:
-                await query.edit_message_text(
-                    f"🤖 No bots found in category: {category}",
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton("📂 Back to Categories", callback_data="buy_bot")],
-                        [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
-                    ])
-                )
-                return
-            
-            text = f"🤖 *Bots in: {category}*\n\n"
-            
-            for bot in bots:
-                text += f"*{bot.name}*\n"
-                text += f"💰 ${bot.price:.2f}\n"
-                text += f"🚀 {bot.delivery_time}\n\n"
-            
-            # Create buttons for each bot
-            keyboard = []
-            for bot in bots[:10]:  # Limit to 10 bots
-                keyboard.append([
-                    InlineKeyboardButton(
-                        f"🤖 {bot.name[:20]} - ${bot.price:.2f}",
-                        callback_data=f"bot_{bot.id}"
-                    )
+        from services.bot_catalog import catalog_cache
+        from services.currency_service import user_currency
+        
+        snapshot = await catalog_cache.fetch()
+        view = snapshot.view(await user_currency(context, update.effective_user.id))
+        bots = [snapshot.bots[bot_id] for bot_id in snapshot.by_category.get(category, ())]
+        
+        if not bots:
+            await query.edit_message_text(
+                f"🤖 No bots found in category: {category}",
+                reply_markup=InlineKeyboardMarkup([
+                    [InlineKeyboardButton("📂 Back to Categories", callback_data="buy_bot")],
+                    [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
                 ])
-            
+            )
+            return
+        
+        text = f"🤖 *Bots in: {category}*\n\n"
+        
+        for bot in bots:
+            text += f"*{bot.name}*\n"
+            text += f"💰 {view.price(bot.price)}\n"
+            text += f"🚀 {bot.delivery_time}\n\n"
+        
+        # Create buttons for each bot
+        keyboard = []
+        for bot in bots[:10]:  # Limit to 10 bots
             keyboard.append([
-                InlineKeyboardButton("📂 Back to Categories", callback_data="buy_bot"),
-                InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
+                InlineKeyboardButton(
+                    f"🤖 {bot.name[:20]} - ${bot.price:.2f}",
+                    callback_data=f"bot_{bot.id}"
+                )
             ])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
-            
-        finally:
-            db.close()
+        
+        keyboard.append([
+            InlineKeyboardButton("📂 Back to Categories", callback_data="buy_bot"),
+            InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
+        ])
+        
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
             
     except Exception as e:
         logger.error(f"Error in show_bots_in_category: {e}", exc_info=True)
@@ -124,23 +114,24 @@ async def show_bot_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Extract bot ID from callback data (bot_1 -> 1)
         bot_id = int(query.data.replace('bot_', ''))
         
-        db = create_session()
-        try:
-            bot = db.query(Bot).filter(Bot.id == bot_id).first()
-            
-            if not bot:
-                await query.edit_message_text("❌ Bot not found.")
-                return
-            
-            # Format features
-            features = ""
-            if bot.features:
-                if isinstance(bot.features, str):
-                    features_list = bot.features.split(',')
-                    for feature in features_list:
-                        features += f"✅ {feature.strip()}\n"
-            
-            text = f"""
+        from services.bot_catalog import catalog_cache
+        from services.currency_service import user_currency
+        
+        snapshot = await catalog_cache.fetch()
+        view = snapshot.view(await user_currency(context, update.effective_user.id))
+        bot = snapshot.bots.get(bot_id)
+        
+        if not bot:
+            await query.edit_message_text("❌ Bot not found.")
+            return
+        
+        # Format features
+        features = ""
+        for feature in bot.features.split(','):
+            if feature.strip():
+                features += f"✅ {feature.strip()}\n"
+        
+        text = f"""
 🤖 *{bot.name}*
 
 {bot.description or 'No description available.'}
@@ -148,24 +139,21 @@ async def show_bot_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
 ⚡ *Features:*
 {features}
 
-💰 *Price:* ${bot.price:.2f}
+💰 *Price:* {view.price(bot.price)}
 ⏱️ *Delivery:* {bot.delivery_time}
 📂 *Category:* {bot.category}
-            """
-            
-            keyboard = [
-                [InlineKeyboardButton("🛒 Buy Now", callback_data=f"buy_{bot.id}")],
-                [
-                    InlineKeyboardButton("📂 Back to Category", callback_data=f"category_{bot.category}"),
-                    InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
-                ]
+        """
+        
+        keyboard = [
+            [InlineKeyboardButton("🛒 Buy Now", callback_data=f"buy_{bot.id}")],
+            [
+                InlineKeyboardButton("📂 Back to Category", callback_data=f"category_{bot.category}"),
+                InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
             ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
-            
-        finally:
-            db.close()
+        ]
+        
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
             
     except Exception as e:
         logger.error(f"Error in show_bot_details: {e}", exc_info=True)
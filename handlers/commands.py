@@ -7,10 +7,27 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from sqlalchemy import func
+
+from database.db import db_session
+from database.models import User, Order
 import logging
 logger = logging.getLogger(__name__)
 
 
+def _sync_returning_user(session, telegram_id, username, first_name, last_name):
+    """Refresh a returning user's profile and order count; None for a new user"""
+    user = session.query(User).filter(User.telegram_id == str(telegram_id)).first()
+    if user is None:
+        return None
+    user.username, user.first_name, user.last_name = username, first_name, last_name
+    # Ensure super admin remains admin
+    if str(telegram_id) == str(SUPER_ADMIN_ID):
+        user.is_admin = True
+    user.total_orders = session.query(func.count(Order.id)).filter(Order.user_id == user.id).scalar()
+    return user
+
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start command - WITH CURRENCY SELECTION - FIXED VERSION"""
     try:
@@ -21,51 +38,9 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         logger.info(f"📱 /start command from {telegram_id} (@{username})")
         
-        # Use simple direct SQL to avoid ORM issues
-        import sqlite3
-        from config import SUPER_ADMIN_ID, DEFAULT_CURRENCY, DEFAULT_COUNTRY, CURRENCY_SYMBOLS
-        
         try:
-            # Connect to database directly
-            conn = sqlite3.connect('software_marketplace.db')
-            cursor = conn.cursor()
-            
-            # Check if users table exists
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='users'
-            """)
-            if not cursor.fetchone():
-                # Create users table if it doesn't exist (MATCHING models.py)
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        telegram_id TEXT UNIQUE NOT NULL,
-                        username TEXT,
-                        first_name TEXT,
-                        last_name TEXT,
-                        email TEXT,
-                        phone TEXT,
-                        country TEXT DEFAULT 'GH',
-                        currency TEXT DEFAULT 'USD',
-                        currency_symbol TEXT DEFAULT '$',
-                        is_admin BOOLEAN DEFAULT 0,
-                        is_developer BOOLEAN DEFAULT 0,
-                        balance REAL DEFAULT 0.0,
-                        total_orders INTEGER DEFAULT 0,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                conn.commit()
-                logger.info("✅ Created users table")
-            
-            # Check if user exists
-            cursor.execute(
-                "SELECT id, is_admin, is_developer, balance, total_orders, currency, country FROM users WHERE telegram_id = ?", 
-                (str(telegram_id),)
-            )
-            user = cursor.fetchone()
+            async with db_session() as db:
+                user = await db.run(_sync_returning_user, telegram_id, username, first_name, last_name)
             
             if not user:
                 # Check if user is super admin
@@ -101,76 +76,13 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 }
                 
                 return
-            else:
-                # Update user info if changed
-                cursor.execute("""
-                    UPDATE users 
-                    SET username = ?, first_name = ?, last_name = ?, updated_at = CURRENT_TIMESTAMP 
-                    WHERE telegram_id = ?
-                """, (username, first_name, last_name, str(telegram_id)))
-                
-                # Ensure super admin remains admin
-                if str(telegram_id) == str(SUPER_ADMIN_ID):
-                    cursor.execute("UPDATE users SET is_admin = 1 WHERE telegram_id = ?", (str(telegram_id),))
-                
-                conn.commit()
-                
-                # Get order count (handle missing table)
-                order_count = 0
-                try:
-                    cursor.execute("SELECT COUNT(*) FROM orders WHERE user_id = ?", (user[0],))
-                    result = cursor.fetchone()
-                    if result:
-                        order_count = result[0]
-                except sqlite3.OperationalError as e:
-                    if "no such table" in str(e):
-                        # Create orders table if it doesn't exist
-                        cursor.execute("""
-                            CREATE TABLE IF NOT EXISTS orders (
-                                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                                order_id TEXT UNIQUE NOT NULL,
-                                user_id INTEGER NOT NULL,
-                                bot_id INTEGER,
-                                assigned_developer_id INTEGER,
-                                amount REAL NOT NULL,
-                                status TEXT DEFAULT 'pending_payment',
-                                payment_method TEXT,
-                                payment_status TEXT DEFAULT 'pending',
-                                payment_proof_url TEXT,
-                                payment_reference TEXT,
-                                payment_metadata TEXT,
-                                admin_notes TEXT,
-                                developer_notes TEXT,
-                                delivered_at TIMESTAMP,
-                                paid_at TIMESTAMP,
-                                refunded_at TIMESTAMP,
-                                refund_reason TEXT,
-                                refund_metadata TEXT,
-                                approved_at TIMESTAMP,
-                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                                FOREIGN KEY (user_id) REFERENCES users(id),
-                                FOREIGN KEY (bot_id) REFERENCES bots(id)
-                            )
-                        """)
-                        conn.commit()
-                        order_count = 0
-                    else:
-                        order_count = 0
-                        print(f"⚠️ Error counting orders: {e}")
-                
-                # Update user's total orders
-                cursor.execute("UPDATE users SET total_orders = ? WHERE id = ?", (order_count, user[0]))
-                conn.commit()
-                
-                logger.info(f"✅ Returning user: {user[0]} ({first_name}) - Currency: {user[5]}")
-                
-                # Show welcome with user's currency
-                currency_symbol = user[6] if len(user) > 6 and user[6] else "$"  # Get currency_symbol from DB
-                if not currency_symbol:
-                    currency_symbol = CURRENCY_SYMBOLS.get(user[5], "$")  # Fallback to config
-                
-                welcome_text = f"""👋 Welcome back, {first_name}!
+            
+            logger.info(f"✅ Returning user: {user.id} ({first_name}) - Currency: {user.currency}")
+            
+            # Show welcome with user's currency
+            currency_symbol = user.currency_symbol or CURRENCY_SYMBOLS.get(user.currency, "$")
+            
+            welcome_text = f"""👋 Welcome back, {first_name}!
 
 🚀 Software Marketplace
 
@@ -181,17 +93,15 @@ What would you like to do today?
 ✅ Get developer support
 
 Your Settings:
-🌍 Country: {user[6] if len(user) > 6 and user[6] else 'Not set'}
-💰 Currency: {user[5]} ({currency_symbol})
-📦 Orders: {order_count}
-💵 Balance: {currency_symbol}{user[3]:.2f}
-👑 Admin: {'✅ Yes' if user[1] else '❌ No'}
-👨‍💻 Developer: {'✅ Yes' if user[2] else '❌ No'}
+🌍 Country: {user.country or 'Not set'}
+💰 Currency: {user.currency} ({currency_symbol})
+📦 Orders: {user.total_orders}
+💵 Balance: {currency_symbol}{user.balance or 0:.2f}
+👑 Admin: {'✅ Yes' if user.is_admin else '❌ No'}
+👨‍💻 Developer: {'✅ Yes' if user.is_developer else '❌ No'}
 
 Use /menu to access all features!"""
             
-            conn.close()
-            
             # Create main menu keyboard
             keyboard = [
                 [InlineKeyboardButton("📱 Main Menu", callback_data="menu_main")],
@@ -202,11 +112,11 @@ Use /menu to access all features!"""
             ]
             
             # Check if user is admin
-            if user and user[1]:  # is_admin
+            if user.is_admin:
                 keyboard.insert(0, [InlineKeyboardButton("👑 Admin Panel", callback_data="admin_panel")])
             
             # Check if user is developer
-            if user and user[2]:  # is_developer
+            if user.is_developer:
                 keyboard.append([InlineKeyboardButton("👨‍💻 Developer Dashboard", callback_data="dev_dashboard")])
             
             # Add currency change button
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CallbackQueryHandler, ContextTypes
 from config import CURRENCY_SYMBOLS, COUNTRY_CURRENCY_MAP
@@ -7,6 +9,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from database.db import db_session
+from database.models import User
+from services.currency_service import USER_CURRENCY_KEY
 import logging
 logger = logging.getLogger(__name__)
 
@@ -33,31 +38,21 @@ async def handle_country_selection(update: Update, context: ContextTypes.DEFAULT
         currency_symbol = CURRENCY_SYMBOLS.get(currency_code, "$")
         
         # Save user to database with selected currency
-        import sqlite3
-        conn = sqlite3.connect('software_marketplace.db')
-        cursor = conn.cursor()
-        
-        # Create user with selected currency (MATCHING models.py)
-        cursor.execute("""
-            INSERT INTO users (telegram_id, username, first_name, last_name, country, currency, currency_symbol, is_admin)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            user_data['telegram_id'],
-            user_data['username'],
-            user_data['first_name'],
-            user_data['last_name'],
-            country_code,
-            currency_code,
-            currency_symbol,
-            user_data['is_super_admin']
-        ))
-        
-        conn.commit()
-        user_id = cursor.lastrowid
-        conn.close()
+        async with db_session() as db:
+            await db.run(lambda session: session.add(User(
+                telegram_id=user_data['telegram_id'],
+                username=user_data['username'],
+                first_name=user_data['first_name'],
+                last_name=user_data['last_name'],
+                country=country_code,
+                currency=currency_code,
+                currency_symbol=currency_symbol,
+                is_admin=user_data['is_super_admin'],
+            )))
         
         # Clear context
         context.user_data.pop('new_user', None)
+        context.user_data[USER_CURRENCY_KEY] = currency_code
         
         # Show welcome message with selected currency
         text = f"""✅ **Welcome to Software Marketplace!**
@@ -150,19 +145,14 @@ async def handle_set_currency(update: Update, context: ContextTypes.DEFAULT_TYPE
         # Get currency symbol
         currency_symbol = CURRENCY_SYMBOLS.get(currency_code, "$")
         
-        # Update user in database (MATCHING models.py)
-        import sqlite3
-        conn = sqlite3.connect('software_marketplace.db')
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE users 
-            SET currency = ?, country = ?, currency_symbol = ?, updated_at = CURRENT_TIMESTAMP 
-            WHERE telegram_id = ?
-        """, (currency_code, country_code, currency_symbol, str(query.from_user.id)))
-        
-        conn.commit()
-        conn.close()
+        # Update user in database
+        async with db_session() as db:
+            await db.run(lambda session: session.query(User).filter(User.telegram_id == str(query.from_user.id)).update(
+                {User.currency: currency_code, User.country: country_code, User.currency_symbol: currency_symbol,
+                 User.updated_at: datetime.now()},
+                synchronize_session=False,
+            ))
+        context.user_data[USER_CURRENCY_KEY] = currency_code
         
         text = f"""✅ **Currency Updated!**
 
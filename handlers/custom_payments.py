@@ -8,7 +8,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from services.paystack_service import PaystackService
+from services.paystack_service import async_paystack
 from services.currency_service import currency_service
 from handlers.paystack_handler import handle_email_for_paystack
 
@@ -71,9 +71,9 @@ async def handle_pay_deposit_callback(update: Update, context: ContextTypes.DEFA
 
             # Calculate deposit amounts
             deposit_amount_usd = custom_request.estimated_price * 0.2
-            deposit_amount_ghs = currency_service.convert_usd_to_currency(deposit_amount_usd, "GHS")
             user_currency = user.currency if user.currency else "USD"
-            local_deposit_amount = currency_service.convert_usd_to_currency(deposit_amount_usd, user_currency)
+            deposits = currency_service.convert_to_currencies(deposit_amount_usd, ("GHS", user_currency))
+            deposit_amount_ghs, local_deposit_amount = deposits["GHS"], deposits[user_currency]
             local_symbol = currency_service.get_currency_symbol(user_currency)
             ghs_symbol = currency_service.get_currency_symbol("GHS")
 
@@ -137,8 +137,7 @@ async def initialize_custom_deposit_payment(query, custom_request, email,
             return
 
         deposit_amount_ghs = currency_service.convert_usd_to_currency(deposit_amount_usd, "GHS")
-        paystack = PaystackService()
-        success, result = paystack.initialize_transaction(
+        success, result = await async_paystack.initialize_transaction(
             email=email,
             amount=deposit_amount_ghs,
             reference=unique_ref,
@@ -261,7 +260,7 @@ async def handle_custom_deposit_email(update: Update, context: ContextTypes.DEFA
         # 4. Process payment in a single DB session
         from database.db import create_session
         from database.models import CustomRequest, User, Transaction
-        from services.paystack_service import PaystackService
+        from services.paystack_service import async_paystack
         from services.currency_service import currency_service
 
         db = create_session()
@@ -281,8 +280,7 @@ async def handle_custom_deposit_email(update: Update, context: ContextTypes.DEFA
             user.email = email
 
             # Initialize Paystack in GHS
-            paystack = PaystackService()
-            success, paystack_result = paystack.initialize_transaction(
+            success, paystack_result = await async_paystack.initialize_transaction(
                 email=email,
                 amount=deposit_amount_ghs,
                 reference=unique_ref,
@@ -430,9 +428,9 @@ async def show_custom_request_details(update: Update, context: ContextTypes.DEFA
         user_currency = user.currency if user and user.currency else "USD"
 
         deposit_usd = request.estimated_price * 0.2
-        deposit_local = currency_service.convert_usd_to_currency(deposit_usd, user_currency)
+        deposits = currency_service.convert_to_currencies(deposit_usd, (user_currency, "GHS"))
+        deposit_local, deposit_ghs = deposits[user_currency], deposits["GHS"]
         local_symbol = currency_service.get_currency_symbol(user_currency)
-        deposit_ghs = currency_service.convert_usd_to_currency(deposit_usd, "GHS")
         ghs_symbol = currency_service.get_currency_symbol("GHS")
 
         status_text = request.status.value.replace('_', ' ').title()
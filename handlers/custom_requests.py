@@ -178,9 +178,8 @@ async def handle_budget_input(update: Update, context: ContextTypes.DEFAULT_TYPE
                     user_currency = "USD"
                 
                 # Convert to user's currency
-                total_local = currency_service.convert_usd_to_currency(budget_amount, user_currency)
+                total_local, deposit_local = currency_service.convert_many([budget_amount, deposit_usd], user_currency)
                 total_symbol = currency_service.get_currency_symbol(user_currency)
-                deposit_local = currency_service.convert_usd_to_currency(deposit_usd, user_currency)
                 
             except Exception as e:
                 logger.error(f"Error getting currency info: {e}")
@@ -320,10 +319,10 @@ async def handle_timeline_selection(update: Update, context: ContextTypes.DEFAUL
             remaining_usd = budget_amount - deposit_usd
             
             # Convert amounts to user's currency
-            total_local = currency_service.convert_usd_to_currency(budget_amount, user_currency)
+            total_local, deposit_local, remaining_local = currency_service.convert_many(
+                [budget_amount, deposit_usd, remaining_usd], user_currency
+            )
             total_symbol = currency_service.get_currency_symbol(user_currency)
-            deposit_local = currency_service.convert_usd_to_currency(deposit_usd, user_currency)
-            remaining_local = currency_service.convert_usd_to_currency(remaining_usd, user_currency)
             
         except Exception as e:
             logger.error(f"Error getting currency info: {e}")
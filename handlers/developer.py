@@ -8,6 +8,8 @@ from database.models import User, Developer, Order, OrderStatus, DeveloperStatus
 import logging
 from datetime import datetime
 from sqlalchemy import desc
+from services.auth_service import developer_only
+from services.outbox import enqueue, enqueue_admin
 
 logger = logging.getLogger(__name__)
 
@@ -47,19 +49,8 @@ async def developer_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE
                     await update.message.reply_text("❌ Developer profile not found. Please contact admin.")
                 return
             
-            assigned_orders = db.query(Order).filter(
-                Order.assigned_developer_id == developer.id,
-                Order.status.in_([OrderStatus.ASSIGNED, OrderStatus.IN_PROGRESS])
-            ).count()
-            
-            completed_orders = developer.completed_orders
-            
-            pending_orders = db.query(Order).filter(
-                Order.assigned_developer_id == developer.id,
-                Order.status.in_([OrderStatus.ASSIGNED, OrderStatus.IN_PROGRESS])
-            ).all()
-            
-            pending_earnings = sum(order.amount * 0.7 for order in pending_orders)
+            from database.developer_stats import get_developer_stats
+            stats = get_developer_stats(db, developer.id)
             
             text = f"""
 👨‍💻 DEVELOPER DASHBOARD
@@ -70,10 +61,10 @@ async def developer_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE
 💰 Available: {'✅ Yes' if developer.is_available else '❌ No'}
 
 📊 Statistics:
-📦 Active Orders: {assigned_orders}
-✅ Completed Orders: {completed_orders}
-💰 Total Earnings: ${developer.earnings:.2f}
-⏳ Pending Earnings: ${pending_earnings:.2f}
+📦 Active Orders: {stats.active_orders}
+✅ Completed Orders: {stats.completed_orders}
+💰 Total Earnings: ${stats.total_earnings:.2f}
+⏳ Pending Earnings: ${stats.pending_earnings:.2f}
 ⭐ Rating: {developer.rating:.1f}/5.0
 💸 Hourly Rate: ${developer.hourly_rate:.2f}
 
@@ -307,19 +298,9 @@ async def dev_start_order(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
             order.status = OrderStatus.IN_PROGRESS
             developer.status = DeveloperStatus.BUSY
-            db.commit()
-            
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
             
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                customer = db.query(User).filter(User.id == order.user_id).first()
-                
-                try:
-                    await bot.send_message(
-                        chat_id=customer.telegram_id,
-                        text=f"""
+            customer = db.query(User).filter(User.id == order.user_id).first()
+            enqueue(db, customer.telegram_id, f"""
 ⚙️ *Development Started!*
 
 Your order is now in progress:
@@ -331,10 +312,8 @@ Your order is now in progress:
 The developer has started working on your order. They will keep you updated on progress.
 
 Thank you for your patience! 🚀
-                        """
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify customer: {e}")
+            """)
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Development Started!*\n\n"
@@ -397,24 +376,12 @@ async def dev_complete_order(update: Update, context: ContextTypes.DEFAULT_TYPE)
             order.status = OrderStatus.COMPLETED
             order.delivered_at = datetime.now()
             
-            developer.completed_orders += 1
-            developer.earnings += order.amount * 0.7
+            # Completed orders and earnings are credited by database.developer_stats
             developer.status = DeveloperStatus.ACTIVE
             developer.is_available = True
             
-            db.commit()
-            
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN
-            
-            if TELEGRAM_TOKEN:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                customer = db.query(User).filter(User.id == order.user_id).first()
-                
-                try:
-                    await bot.send_message(
-                        chat_id=customer.telegram_id,
-                        text=f"""
+            customer = db.query(User).filter(User.id == order.user_id).first()
+            enqueue(db, customer.telegram_id, f"""
 🎉 *Order Completed!*
 
 Your order has been completed by the developer:
@@ -431,17 +398,9 @@ Your order has been completed by the developer:
 4. Contact support if any issues
 
 Thank you for choosing Software Marketplace! 🚀
-                        """
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify customer: {e}")
-            
-            from config import SUPER_ADMIN_ID
-            if TELEGRAM_TOKEN and SUPER_ADMIN_ID:
-                try:
-                    await bot.send_message(
-                        chat_id=SUPER_ADMIN_ID,
-                        text=f"""
+            """)
+            
+            enqueue_admin(db, f"""
 ✅ Order Completed by Developer
 
 📦 Order ID: `{order.order_id}`
@@ -451,10 +410,8 @@ Thank you for choosing Software Marketplace! 🚀
 💰 Developer Earnings: ${order.amount * 0.7:.2f}
 
 Order marked as completed by developer.
-                        """
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify admin: {e}")
+            """)
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ *Order Completed!*\n\n"
@@ -500,14 +457,11 @@ async def dev_earnings(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await query.edit_message_text("❌ Developer profile not found.")
                 return
             
-            pending_orders = db.query(Order).filter(
-                Order.assigned_developer_id == developer.id,
-                Order.status.in_([OrderStatus.ASSIGNED, OrderStatus.IN_PROGRESS])
-            ).all()
-            
-            pending_earnings = sum(order.amount * 0.7 for order in pending_orders)
+            from database.developer_stats import available_balance, get_developer_stats, recent_earnings
+            stats = get_developer_stats(db, developer.id)
+            balance = available_balance(stats)
             
-            from config import DEVELOPER_PAYOUT_THRESHOLD
+            from config import DEVELOPER_PAYOUT_THRESHOLD, DEVELOPER_EARNINGS_WINDOW_DAYS
             payout_threshold = DEVELOPER_PAYOUT_THRESHOLD
             
             text = f"""
@@ -517,10 +471,12 @@ async def dev_earnings(update: Update, context: ContextTypes.DEFAULT_TYPE):
 👤 *Name:* {user.first_name}
 
 📊 *Earnings Summary:*
-💰 Available Balance: ${developer.earnings:.2f}
-⏳ Pending Earnings: ${pending_earnings:.2f}
+💰 Available Balance: ${balance:.2f}
+⏳ Pending Earnings: ${stats.pending_earnings:.2f}
+📅 Last {DEVELOPER_EARNINGS_WINDOW_DAYS} Days: ${recent_earnings(db, developer.id):.2f}
+📤 Payout Requested: ${stats.payout_requested:.2f}
 💸 Hourly Rate: ${developer.hourly_rate:.2f}
-✅ Completed Orders: {developer.completed_orders}
+✅ Completed Orders: {stats.completed_orders}
 
 🎯 *Payout Information:*
 📈 Payout Threshold: ${payout_threshold:.2f}
@@ -532,12 +488,12 @@ async def dev_earnings(update: Update, context: ContextTypes.DEFAULT_TYPE):
 3. Payouts processed weekly (Friday)
 4. Contact admin for payout requests
 
-*Current Status:* {'✅ Eligible for payout' if developer.earnings >= payout_threshold else f'❌ Need ${payout_threshold - developer.earnings:.2f} more'}
+*Current Status:* {'✅ Eligible for payout' if balance >= payout_threshold else f'❌ Need ${payout_threshold - balance:.2f} more'}
 """
             
             keyboard = []
             
-            if developer.earnings >= payout_threshold:
+            if balance >= payout_threshold:
                 keyboard.append([
                     InlineKeyboardButton("💰 Request Payout", callback_data="dev_request_payout")
                 ])
@@ -904,36 +860,42 @@ async def dev_request_payout(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 )
                 return
             
-            from telegram import Bot
-            from config import TELEGRAM_TOKEN, SUPER_ADMIN_ID
+            from config import DEVELOPER_PAYOUT_THRESHOLD
+            from database.developer_stats import available_balance, get_developer_stats
+            from database.models import DeveloperPayout
+            
+            amount = round(available_balance(get_developer_stats(db, developer.id)), 2)
+            if amount < DEVELOPER_PAYOUT_THRESHOLD:
+                await query.edit_message_text(
+                    f"❌ Minimum payout is ${DEVELOPER_PAYOUT_THRESHOLD:.2f}.\n\n"
+                    f"💰 Available: ${amount:.2f} (open payout requests are already deducted)",
+                    reply_markup=InlineKeyboardMarkup([
+                        [InlineKeyboardButton("⬅️ Back to Earnings", callback_data="dev_earnings")]
+                    ])
+                )
+                return
+            
+            # Held against the balance until an admin marks it paid
+            db.add(DeveloperPayout(developer_id=developer.id, amount=amount))
             
-            if TELEGRAM_TOKEN and SUPER_ADMIN_ID:
-                bot = Bot(token=TELEGRAM_TOKEN)
-                
-                try:
-                    await bot.send_message(
-                        chat_id=SUPER_ADMIN_ID,
-                        text=f"""
+            enqueue_admin(db, f"""
 💰 PAYOUT REQUEST
 
 👨‍💻 Developer: {user.first_name} ({developer.developer_id})
 📧 Email: {user.email}
-💰 Amount: ${developer.earnings:.2f}
+💰 Amount: ${amount:.2f}
 📊 Completed Orders: {developer.completed_orders}
 
 To process payout:
 1. Go to Admin Panel → Developer Payouts
 2. Find developer: {developer.developer_id}
-3. Click "Process Payout"
-4. Update developer earnings to $0.00 after payment
-                        """
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify admin: {e}")
+3. Pay the amount, then click "Mark as Paid"
+            """)
+            db.commit()
             
             await query.edit_message_text(
                 f"✅ Payout Request Sent!\n\n"
-                f"💰 Amount: ${developer.earnings:.2f}\n"
+                f"💰 Amount: ${amount:.2f}\n"
                 f"📧 Email: {user.email}\n\n"
                 f"Our admin team has been notified and will process your payout within 3-5 business days.\n\n"
                 f"Thank you for your work! 👨‍💻",
@@ -994,30 +956,30 @@ Please send your email address for payouts:
         logger.error(f"Error in dev_update_email_start: {e}", exc_info=True)
         await query.edit_message_text("❌ Error starting email update.")
 
+@developer_only
 async def handle_dev_available_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle developer available orders callback"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        
         from database.db import create_session
-        from database.models import User, Order, OrderStatus, Bot
+        from database.models import Order, OrderStatus
+        from sqlalchemy.orm import joinedload
+        from utils.pagination import nav_row, page_token, paginate
+        from config import LIST_PAGE_SIZE
         
         db = create_session()
         try:
-            # Check if user is developer
-            user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
-            if not user or not user.is_developer:
-                await query.edit_message_text("❌ You are not a registered developer.")
-                return
-            
             # Get available orders (approved but not assigned)
-            available_orders = db.query(Order).filter(
-                Order.status == OrderStatus.APPROVED,
-                Order.assigned_developer_id == None
-            ).order_by(Order.created_at.desc()).limit(10).all()
+            page = paginate(
+                db.query(Order).options(joinedload(Order.bot)).filter(
+                    Order.status == OrderStatus.APPROVED,
+                    Order.assigned_developer_id == None
+                ),
+                Order, page_token(query.data, 'dev_available_orders'), LIST_PAGE_SIZE
+            )
+            available_orders = page.items
             
             if not available_orders:
                 text = """📦 AVAILABLE ORDERS
@@ -1032,15 +994,11 @@ Orders will appear here when:
 Check back soon! 🚀"""
             else:
                 text = "📦 AVAILABLE ORDERS\n\n"
-                text += f"Found {len(available_orders)} orders available for claiming:\n\n"
+                text += f"Showing {len(available_orders)} orders available for claiming:\n\n"
                 
                 for order in available_orders:
                     # Get bot name
-                    bot_name = "Custom Software"
-                    if order.bot_id:
-                        bot = db.query(Bot).filter(Bot.id == order.bot_id).first()
-                        if bot:
-                            bot_name = bot.name[:30]
+                    bot_name = order.bot.name[:30] if order.bot else "Custom Software"
                     
                     # Format amount
                     amount = order.amount if order.amount else 0.0
@@ -1053,7 +1011,7 @@ Check back soon! 🚀"""
             keyboard = []
             
             # Add claim buttons for each order
-            for order in available_orders[:5]:  # Show max 5 orders
+            for order in available_orders:
                 amount = order.amount if order.amount else 0.0
                 keyboard.append([
                     InlineKeyboardButton(
@@ -1062,6 +1020,9 @@ Check back soon! 🚀"""
                     )
                 ])
             
+            navigation = nav_row(page, 'dev_available_orders')
+            if navigation:
+                keyboard.append(navigation)
             keyboard.extend([
                 [InlineKeyboardButton("🔄 Refresh", callback_data="dev_available_orders")],
                 [
@@ -1131,7 +1092,9 @@ def get_developer_conversation_handler():
             CommandHandler('cancel', dev_cancel),
             CallbackQueryHandler(developer_dashboard, pattern='^dev_dashboard$')
         ],
-        allow_reentry=True
+        allow_reentry=True,
+        name='developer_profile',
+        persistent=True
     )
 
 def register_developer_handlers(application):
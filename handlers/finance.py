@@ -4,175 +4,99 @@ from telegram.ext import ContextTypes
 from database.db import create_session
 from database.models import User, Order, PaymentStatus, Bot, OrderStatus
 from config import PAYMENT_METHODS
+from services.auth_service import admin_only
+from services.outbox import enqueue
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+@admin_only
 async def finance_panel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Finance panel for admins"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        
-        db = create_session()
-        try:
-            # Check if user is admin
-            user = db.query(User).filter(User.telegram_id == telegram_id, User.is_admin == True).first()
-            if not user:
-                await query.edit_message_text("❌ Access denied.")
-                return
-            
-            text = """
+        text = """
 💰 *Finance Panel*
 
 Manage payments, transactions, and payment methods.
 """
-            
-            keyboard = [
-                [InlineKeyboardButton("📊 Payment Statistics", callback_data="finance_stats")],
-                [InlineKeyboardButton("⏳ Pending Payments", callback_data="finance_pending")],
-                [InlineKeyboardButton("✅ Verified Payments", callback_data="finance_verified")],
-                [InlineKeyboardButton("❌ Rejected Payments", callback_data="finance_rejected")],
-                [InlineKeyboardButton("💳 Payment Methods", callback_data="finance_methods")],
-                [InlineKeyboardButton("⬅️ Back to Admin", callback_data="admin_panel")]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
-            
-        finally:
-            db.close()
+        
+        keyboard = [
+            [InlineKeyboardButton("📊 Payment Statistics", callback_data="finance_stats")],
+            [InlineKeyboardButton("⏳ Pending Payments", callback_data="finance_pending")],
+            [InlineKeyboardButton("✅ Verified Payments", callback_data="finance_verified")],
+            [InlineKeyboardButton("❌ Rejected Payments", callback_data="finance_rejected")],
+            [InlineKeyboardButton("💳 Payment Methods", callback_data="finance_methods")],
+            [InlineKeyboardButton("⬅️ Back to Admin", callback_data="admin_panel")]
+        ]
+        
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
             
     except Exception as e:
         logger.error(f"Error in finance_panel: {e}", exc_info=True)
         if update.callback_query:
             await update.callback_query.edit_message_text("❌ Error loading finance panel.")
 
+@admin_only
 async def finance_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show financial statistics"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
+        from database.db import run_sync
+        from services.stats_service import stats_service
+        stats = await run_sync(stats_service.get_finance)
         
-        db = create_session()
-        try:
-            # Check if user is admin
-            user = db.query(User).filter(User.telegram_id == telegram_id, User.is_admin == True).first()
-            if not user:
-                await query.edit_message_text("❌ Access denied.")
-                return
-            
-            # Calculate stats
-            today = datetime.now().date()
-            week_ago = today - timedelta(days=7)
-            month_ago = today - timedelta(days=30)
-            
-            # Total revenue from completed orders
-            completed_orders = db.query(Order).filter(Order.status == OrderStatus.COMPLETED).all()
-            total_revenue = sum(order.amount for order in completed_orders if order.amount)
-            
-            # Today's revenue
-            today_orders = db.query(Order).filter(
-                Order.created_at >= today,
-                Order.status == OrderStatus.COMPLETED
-            ).all()
-            today_revenue = sum(order.amount for order in today_orders if order.amount)
-            
-            # Weekly revenue
-            week_orders = db.query(Order).filter(
-                Order.created_at >= week_ago,
-                Order.status == OrderStatus.COMPLETED
-            ).all()
-            week_revenue = sum(order.amount for order in week_orders if order.amount)
-            
-            # Monthly revenue
-            month_orders = db.query(Order).filter(
-                Order.created_at >= month_ago,
-                Order.status == OrderStatus.COMPLETED
-            ).all()
-            month_revenue = sum(order.amount for order in month_orders if order.amount)
-            
-            # Pending payments
-            pending_payments = db.query(Order).filter(Order.payment_status == PaymentStatus.PENDING).count()
-            
-            # Verified payments
-            verified_payments = db.query(Order).filter(Order.payment_status == PaymentStatus.VERIFIED).count()
-            
-            # Payment method breakdown
-            payment_methods = {}
-            for order in completed_orders:
-                if order.payment_method:
-                    method = order.payment_method.value
-                    payment_methods[method] = payment_methods.get(method, 0) + (order.amount or 0)
-            
-            text = f"""
+        text = f"""
 📊 *Financial Statistics*
 
 *Revenue Overview:*
-💰 Total Revenue: ${total_revenue:.2f}
-📈 Today's Revenue: ${today_revenue:.2f}
-📅 Weekly Revenue: ${week_revenue:.2f}
-📆 Monthly Revenue: ${month_revenue:.2f}
+💰 Total Revenue: ${stats['total_revenue']:.2f}
+📈 Today's Revenue: ${stats['today_revenue']:.2f}
+📅 Weekly Revenue: ${stats['week_revenue']:.2f}
+📆 Monthly Revenue: ${stats['month_revenue']:.2f}
 
 *Payment Status:*
-⏳ Pending Payments: {pending_payments}
-✅ Verified Payments: {verified_payments}
+⏳ Pending Payments: {stats['pending_payments']}
+✅ Verified Payments: {stats['verified_payments']}
 
 *Payment Method Breakdown:*
 """
-            
-            for method, amount in payment_methods.items():
-                text += f"  • {method.replace('_', ' ').title()}: ${amount:.2f}\n"
-            
-            # Add developer earnings
-            from database.models import Developer
-            developers = db.query(User).filter(User.is_developer == True).all()
-            total_developer_earnings = 0
-            for dev_user in developers:
-                if dev_user.developer:
-                    total_developer_earnings += dev_user.developer.earnings or 0
-            
-            text += f"\n*Developer Earnings:*\n"
-            text += f"  💰 Total Paid to Developers: ${total_developer_earnings:.2f}\n"
-            text += f"  👨‍💻 Active Developers: {len(developers)}\n"
-            
-            keyboard = [
-                [InlineKeyboardButton("🔄 Refresh", callback_data="finance_stats")],
-                [InlineKeyboardButton("⬅️ Back to Finance", callback_data="finance_panel")]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
-            
-        finally:
-            db.close()
+        
+        for method, amount in stats['payment_methods']:
+            text += f"  • {method.replace('_', ' ').title()}: ${amount:.2f}\n"
+        
+        text += f"\n*Developer Earnings:*\n"
+        text += f"  💰 Total Paid to Developers: ${stats['developer_earnings']:.2f}\n"
+        text += f"  👨‍💻 Active Developers: {stats['developer_count']}\n"
+        
+        keyboard = [
+            [InlineKeyboardButton("🔄 Refresh", callback_data="finance_stats")],
+            [InlineKeyboardButton("⬅️ Back to Finance", callback_data="finance_panel")]
+        ]
+        
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
             
     except Exception as e:
         logger.error(f"Error in finance_stats: {e}", exc_info=True)
         if update.callback_query:
             await update.callback_query.edit_message_text("❌ Error loading statistics.")
 
+@admin_only
 async def finance_pending_payments(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show pending payments for review"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        
         db = create_session()
         try:
-            # Check if user is admin
-            user = db.query(User).filter(User.telegram_id == telegram_id, User.is_admin == True).first()
-            if not user:
-                await query.edit_message_text("❌ Access denied.")
-                return
-            
             # Get pending payments
             pending_orders = db.query(Order).filter(
                 Order.payment_status == PaymentStatus.PENDING,
@@ -215,6 +139,7 @@ async def finance_pending_payments(update: Update, context: ContextTypes.DEFAULT
         if update.callback_query:
             await update.callback_query.edit_message_text("❌ Error loading pending payments.")
 
+@admin_only
 async def finance_review_payment(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Review a specific payment with proof image"""
     try:
@@ -227,12 +152,6 @@ async def finance_review_payment(update: Update, context: ContextTypes.DEFAULT_T
         
         db = create_session()
         try:
-            # Check if user is admin
-            user = db.query(User).filter(User.telegram_id == telegram_id, User.is_admin == True).first()
-            if not user:
-                await query.edit_message_text("❌ Access denied.")
-                return
-            
             # Get order
             order = db.query(Order).filter(Order.order_id == order_id).first()
             if not order:
@@ -276,25 +195,19 @@ async def finance_review_payment(update: Update, context: ContextTypes.DEFAULT_T
             if order.payment_proof_url and order.payment_proof_url.startswith('telegram_file:'):
                 file_id = order.payment_proof_url.replace('telegram_file:', '')
                 
-                from config import TELEGRAM_TOKEN
-                
-                if TELEGRAM_TOKEN:
-                    from telegram import Bot as TelegramBot
-                    bot = TelegramBot(token=TELEGRAM_TOKEN)
-                    
-                    try:
-                        await bot.send_photo(
-                            chat_id=telegram_id,
-                            photo=file_id,
-                            caption=f"📸 *Payment Proof for Order {order.order_id}*\n\n"
-                                   f"Please review this payment proof and take action above.",
-                            parse_mode='Markdown'
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to send payment proof: {e}")
-                        await query.message.reply_text(
-                            f"⚠️ Could not load payment proof. Error: {str(e)[:100]}"
-                        )
+                try:
+                    await context.bot.send_photo(
+                        chat_id=telegram_id,
+                        photo=file_id,
+                        caption=f"📸 *Payment Proof for Order {order.order_id}*\n\n"
+                               f"Please review this payment proof and take action above.",
+                        parse_mode='Markdown'
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to send payment proof: {e}")
+                    await query.message.reply_text(
+                        f"⚠️ Could not load payment proof. Error: {str(e)[:100]}"
+                    )
             
         finally:
             db.close()
@@ -304,6 +217,7 @@ async def finance_review_payment(update: Update, context: ContextTypes.DEFAULT_T
         if update.callback_query:
             await update.callback_query.edit_message_text("❌ Error loading payment details.")
 
+@admin_only
 async def finance_handle_payment_action(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle payment verification actions"""
     try:
@@ -323,16 +237,8 @@ async def finance_handle_payment_action(update: Update, context: ContextTypes.DE
         else:
             return
         
-        telegram_id = update.effective_user.id
-        
         db = create_session()
         try:
-            # Check if user is admin
-            user = db.query(User).filter(User.telegram_id == telegram_id, User.is_admin == True).first()
-            if not user:
-                await query.edit_message_text("❌ Access denied.")
-                return
-            
             # Get order
             order = db.query(Order).filter(Order.order_id == order_id).first()
             if not order:
@@ -343,30 +249,21 @@ async def finance_handle_payment_action(update: Update, context: ContextTypes.DE
                 # Verify payment
                 order.payment_status = PaymentStatus.VERIFIED
                 order.status = OrderStatus.APPROVED
+                order.approved_at = datetime.now()
                 
-                db.commit()
+                from services.refund_scheduler import schedule_order_refund
+                schedule_order_refund(db, order)
                 
                 # Notify user
                 order_user = db.query(User).filter(User.id == order.user_id).first()
-                
-                from config import TELEGRAM_TOKEN
-                from telegram import Bot as TelegramBot
-                
-                if TELEGRAM_TOKEN:
-                    bot = TelegramBot(token=TELEGRAM_TOKEN)
-                    
-                    try:
-                        await bot.send_message(
-                            chat_id=order_user.telegram_id,
-                            text=f"✅ *Payment Verified!*\n\n"
-                                 f"Your payment for order `{order.order_id}` has been verified.\n\n"
-                                 f"*Amount:* ${order.amount:.2f}\n"
-                                 f"*Status:* ✅ Approved\n\n"
-                                 f"The order is now available for developers to work on.",
-                            parse_mode='Markdown'
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to notify user: {e}")
+                enqueue(db, order_user.telegram_id,
+                        f"✅ *Payment Verified!*\n\n"
+                        f"Your payment for order `{order.order_id}` has been verified.\n\n"
+                        f"*Amount:* ${order.amount:.2f}\n"
+                        f"*Status:* ✅ Approved\n\n"
+                        f"The order is now available for developers to work on.",
+                        parse_mode='Markdown')
+                db.commit()
                 
                 await query.edit_message_text(
                     f"✅ *Payment Verified!*\n\n"
@@ -406,21 +303,15 @@ async def finance_handle_payment_action(update: Update, context: ContextTypes.DE
         if update.callback_query:
             await update.callback_query.edit_message_text("❌ Error processing payment action.")
 
+@admin_only
 async def finance_verified_payments(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show verified payments"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        
         db = create_session()
         try:
-            user = db.query(User).filter(User.telegram_id == telegram_id, User.is_admin == True).first()
-            if not user:
-                await query.edit_message_text("❌ Access denied.")
-                return
-            
             # Get verified payments
             verified_orders = db.query(Order).filter(
                 Order.payment_status == PaymentStatus.VERIFIED
@@ -453,21 +344,15 @@ async def finance_verified_payments(update: Update, context: ContextTypes.DEFAUL
         logger.error(f"Error in finance_verified_payments: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading verified payments.")
 
+@admin_only
 async def finance_rejected_payments(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show rejected payments"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        
         db = create_session()
         try:
-            user = db.query(User).filter(User.telegram_id == telegram_id, User.is_admin == True).first()
-            if not user:
-                await query.edit_message_text("❌ Access denied.")
-                return
-            
             # Get rejected payments
             rejected_orders = db.query(Order).filter(
                 Order.payment_status == PaymentStatus.REJECTED
@@ -500,21 +385,15 @@ async def finance_rejected_payments(update: Update, context: ContextTypes.DEFAUL
         logger.error(f"Error in finance_rejected_payments: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading rejected payments.")
 
+@admin_only
 async def finance_methods(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Manage payment methods"""
     try:
         query = update.callback_query
         await query.answer()
         
-        telegram_id = update.effective_user.id
-        
         db = create_session()
         try:
-            user = db.query(User).filter(User.telegram_id == telegram_id, User.is_admin == True).first()
-            if not user:
-                await query.edit_message_text("❌ Access denied.")
-                return
-            
             text = "💳 *Payment Methods*\n\n"
             
             for method_key, method_info in PAYMENT_METHODS.items():
@@ -2,8 +2,11 @@
 import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database.db import create_session
-from database.models import Job, User
+from database.db import with_db
+from sqlalchemy.orm import joinedload
+from database.models import Job
+from services.job_board import BOARD_PREFIX, job_board_cache
+from utils.pagination import page_token
 
 logger = logging.getLogger(__name__)
 
@@ -12,78 +15,37 @@ async def show_job_board(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    db = create_session()
     try:
-        # Get all approved and public jobs, newest first
-        jobs = db.query(Job).filter(
-            Job.is_public == True
-        ).order_by(Job.created_at.desc()).limit(20).all()
-
-        if not jobs:
-            await query.edit_message_text(
-                "📭 No jobs available at the moment.\n\n"
-                "Be the first to post a job!",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("📝 Post a Job", callback_data="post_job")],
-                    [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
-                ])
-            )
-            return
-
-        text = "📋 <b>Available Jobs</b>\n\n"
-        for job in jobs:
-            poster = db.query(User).filter(User.id == job.user_id).first()
-            poster_name = poster.first_name if poster else "Anonymous"
-            text += (
-                f"🔹 <b>{job.title}</b>\n"
-                f"   👤 {poster_name}\n"
-                f"   💰 Budget: ${job.budget:.2f}\n"
-                f"   ⏰ Timeline: {job.expected_timeline}\n\n"
-            )
-
-        # Build keyboard with each job as a button
-        keyboard = []
-        for job in jobs:
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"💰 ${job.budget:.0f} - {job.title[:30]}",
-                    callback_data=f"view_job_{job.job_id}"
-                )
-            ])
-
-        keyboard.append([
-            InlineKeyboardButton("📝 Post a Job", callback_data="post_job"),
-            InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
-        ])
-
+        # Pages are cached until a job is published, edited or cancelled
+        text, reply_markup = await job_board_cache.fetch_page(page_token(query.data, BOARD_PREFIX))
         await query.edit_message_text(
             text,
             parse_mode='HTML',
-            reply_markup=InlineKeyboardMarkup(keyboard)
+            reply_markup=reply_markup
         )
 
     except Exception as e:
         logger.error(f"Error showing job board: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading job board.")
-    finally:
-        db.close()
 
 
-async def view_job_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@with_db
+async def view_job_details(update: Update, context: ContextTypes.DEFAULT_TYPE, db):
     """Show full job details – NO blurred content, NO claim token"""
     query = update.callback_query
     await query.answer()
 
     job_id = query.data.replace("view_job_", "")
-    db = create_session()
     try:
-        job = db.query(Job).filter(Job.job_id == job_id).first()
+        job = await db.run(
+            lambda session: session.query(Job).options(joinedload(Job.user)).filter(Job.job_id == job_id).first()
+        )
         if not job:
             await query.edit_message_text("❌ Job not found.")
             return
 
         # Get job poster info
-        poster = db.query(User).filter(User.id == job.user_id).first()
+        poster = job.user
         poster_name = poster.first_name if poster else "Anonymous"
         poster_username = f"@{poster.username}" if poster and poster.username else "Not shared"
 
@@ -109,8 +71,7 @@ async def view_job_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ]
 
         # If the current user is the job poster, show additional management options
-        current_user = db.query(User).filter(User.telegram_id == str(update.effective_user.id)).first()
-        if current_user and current_user.id == job.user_id:
+        if poster and poster.telegram_id == str(update.effective_user.id):
             keyboard.insert(0, [
                 InlineKeyboardButton("✏️ Edit Job", callback_data=f"edit_job_{job.job_id}"),
                 InlineKeyboardButton("❌ Cancel Job", callback_data=f"cancel_job_{job.job_id}")
@@ -125,15 +86,8 @@ async def view_job_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Error viewing job details: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading job details.")
-    finally:
-        db.close()
 
 
-# Optional: simple pagination (if you want to keep it, otherwise remove)
-# This is a placeholder – you can expand it later.
 async def handle_job_board_navigation(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle pagination for job board (simple implementation)"""
-    query = update.callback_query
-    await query.answer()
-    # For now, just reload the job board
+    """Handle old job_board_page_ callbacks by showing the first page"""
     await show_job_board(update, context)
\ No newline at end of file
@@ -72,56 +72,30 @@ async def handle_buy_bot(update: Update, context: ContextTypes.DEFAULT_TYPE):
         query = update.callback_query
         await query.answer()
         
-        from database.db import create_session
-        from database.models import Bot
+        from services.bot_catalog import catalog_cache
+        from services.currency_service import user_currency
         
-        db = create_session()
-        try:
-            # Get categories
-            categories = db.query(Bot.category).distinct().filter(Bot.is_available == True).all()
-            categories = [cat[0] for cat in categories if cat[0]]
-            
-            if not categories:
-                text = """🛒 BUY SOFTWARE
+        # Served from the catalog snapshot - no database round trip once warm
+        snapshot = await catalog_cache.fetch()
+        page = snapshot.view(await user_currency(context, update.effective_user.id)).category_menu()
+        
+        if page is None:
+            text = """🛒 BUY SOFTWARE
 
 No categories available yet.
 
 Please check back later or contact support."""
-                
-                await query.edit_message_text(
-                    text,
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
-                    ])
-                )
-                return
             
-            text = """🛒 BUY SOFTWARE
-
-Select a category:"""
-            
-            keyboard = []
-            for category in categories:
-                # Count software in category
-                count = db.query(Bot).filter(
-                    Bot.category == category, 
-                    Bot.is_available == True
-                ).count()
-                
-                keyboard.append([
-                    InlineKeyboardButton(
-                        f"📁 {category} ({count})",
-                        callback_data=f"category_{category}"
-                    )
+            await query.edit_message_text(
+                text,
+                reply_markup=InlineKeyboardMarkup([
+                    [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
                 ])
-            
-            keyboard.append([InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
-            
-        finally:
-            db.close()
+            )
+            return
+        
+        text, reply_markup = page
+        await query.edit_message_text(text, reply_markup=reply_markup)
             
     except Exception as e:
         logger.error(f"Error in handle_buy_bot: {e}")
@@ -135,53 +109,24 @@ async def show_bot_categories(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         category = query.data.replace('category_', '')
         
-        from database.db import create_session
-        from database.models import Bot
+        from services.bot_catalog import catalog_cache
+        from services.currency_service import user_currency
         
-        db = create_session()
-        try:
-            bots = db.query(Bot).filter(
-                Bot.category == category,
-                Bot.is_available == True
-            ).all()
-            
-            if not bots:
-                await query.edit_message_text(
-                    f"🚀 No software found in category: {category}",
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton("⬅️ Back to Categories", callback_data="buy_bot")],
-                        [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
-                    ])
-                )
-                return
-            
-            text = f"🚀 Software in {category}\n\n"
-            
-            for bot in bots:
-                text += f"{bot.name}\n"
-                text += f"💰 ${bot.price:.2f}\n"
-                text += f"🚀 {bot.delivery_time}\n\n"
-            
-            # Create buttons for each software
-            keyboard = []
-            for bot in bots[:10]:
-                keyboard.append([
-                    InlineKeyboardButton(
-                        f"🚀 {bot.name[:20]} - ${bot.price:.2f}",
-                        callback_data=f"view_bot_{bot.id}"
-                    )
+        snapshot = await catalog_cache.fetch()
+        page = snapshot.view(await user_currency(context, update.effective_user.id)).category_page(category)
+        
+        if page is None:
+            await query.edit_message_text(
+                f"🚀 No software found in category: {category}",
+                reply_markup=InlineKeyboardMarkup([
+                    [InlineKeyboardButton("⬅️ Back to Categories", callback_data="buy_bot")],
+                    [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
                 ])
-            
-            keyboard.append([
-                InlineKeyboardButton("⬅️ Back to Categories", callback_data="buy_bot"),
-                InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
-            ])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
-            
-        finally:
-            db.close()
+            )
+            return
+        
+        text, reply_markup = page
+        await query.edit_message_text(text, reply_markup=reply_markup)
             
     except Exception as e:
         logger.error(f"Error in show_bot_categories: {e}")
@@ -195,41 +140,18 @@ async def show_bot_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         bot_id = int(query.data.replace('view_bot_', ''))
         
-        from database.db import create_session
-        from database.models import Bot
+        from services.bot_catalog import catalog_cache
+        from services.currency_service import user_currency
         
-        db = create_session()
-        try:
-            bot = db.query(Bot).filter(Bot.id == bot_id).first()
-            
-            if not bot:
-                await query.edit_message_text("❌ Software not found.")
-                return
-            
-            text = f"""🚀 {bot.name}
-
-{bot.description}
-
-⚡ Features:
-{bot.features}
-
-💰 Price: ${bot.price:.2f}
-⏱️ Delivery: {bot.delivery_time}
-📂 Category: {bot.category}"""
-            
-            keyboard = [
-                [InlineKeyboardButton("🛒 Buy Now", callback_data=f"buy_options_{bot.id}")],
-                [
-                    InlineKeyboardButton("⬅️ Back to Category", callback_data=f"category_{bot.category}"),
-                    InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
-                ]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
-            
-        finally:
-            db.close()
+        snapshot = await catalog_cache.fetch()
+        page = snapshot.view(await user_currency(context, update.effective_user.id)).details(bot_id)
+        
+        if page is None:
+            await query.edit_message_text("❌ Software not found.")
+            return
+        
+        text, reply_markup = page
+        await query.edit_message_text(text, reply_markup=reply_markup)
             
     except Exception as e:
         logger.error(f"Error in show_bot_details: {e}")
@@ -243,55 +165,18 @@ async def show_buy_options(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         bot_id = int(query.data.replace('buy_options_', ''))
         
-        from database.db import create_session
-        from database.models import Bot
-        from config import PAYMENT_METHODS
+        from services.bot_catalog import catalog_cache
+        from services.currency_service import user_currency
         
-        db = create_session()
-        try:
-            bot = db.query(Bot).filter(Bot.id == bot_id).first()
-            
-            if not bot:
-                await query.edit_message_text("❌ Software not found.")
-                return
-            
-            text = f"""🛒 Buy {bot.name}
-
-💰 Price: ${bot.price:.2f}
-⏱️ Delivery: {bot.delivery_time}
-
-Select a payment method:"""
-            
-            keyboard = []
-            
-            # Add Paystack option
-            if PAYMENT_METHODS.get('paystack', {}).get('is_active', True):
-                keyboard.append([
-                    InlineKeyboardButton(
-                        "💳 Paystack (Card/Bank/USSD)",
-                        callback_data=f"paystack_bot_{bot.id}"
-                    )
-                ])
-            
-            # Add bank transfer option
-            if PAYMENT_METHODS.get('bank_transfer', {}).get('is_active', True):
-                keyboard.append([
-                    InlineKeyboardButton(
-                        "🏦 Bank Transfer",
-                        callback_data=f"bank_transfer_{bot.id}"
-                    )
-                ])
-            
-            keyboard.append([
-                InlineKeyboardButton("⬅️ Back to Software", callback_data=f"view_bot_{bot.id}"),
-                InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
-            ])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
-            
-        finally:
-            db.close()
+        snapshot = await catalog_cache.fetch()
+        page = snapshot.view(await user_currency(context, update.effective_user.id)).buy_options(bot_id)
+        
+        if page is None:
+            await query.edit_message_text("❌ Software not found.")
+            return
+        
+        text, reply_markup = page
+        await query.edit_message_text(text, reply_markup=reply_markup)
             
     except Exception as e:
         logger.error(f"Error in show_buy_options: {e}")
@@ -306,159 +191,165 @@ async def show_user_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
         telegram_id = update.effective_user.id
         logger.info(f"Getting orders for user: {telegram_id}")
         
-        from database.db import create_session
-        from database.models import User, Order, Bot, OrderStatus
+        from database.db import db_session
+        from database.models import User, Order, OrderStatus
+        from sqlalchemy import func
+        from sqlalchemy.orm import joinedload
+        from utils.pagination import nav_row, page_token, paginate
+        from config import LIST_PAGE_SIZE
         
-        db = create_session()
-        try:
-            # Get user
-            user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
-            
+        def load_orders(session):
+            user = session.query(User).filter(User.telegram_id == str(telegram_id)).first()
             if not user:
-                logger.warning(f"User not found: {telegram_id}")
-                await query.edit_message_text(
-                    "❌ Please use /start first to create your account.",
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton("⬅️ Main Menu", callback_data="menu_main")]
-                    ])
-                )
-                return
+                return None, 0, None
             
-            # Get orders
-            orders = db.query(Order).filter(
-                Order.user_id == user.id
-            ).order_by(Order.created_at.desc()).all()
+            # Get one page of orders plus the overall count
+            total_orders = session.query(func.count(Order.id)).filter(Order.user_id == user.id).scalar() or 0
+            page = paginate(
+                session.query(Order).options(joinedload(Order.bot)).filter(Order.user_id == user.id),
+                Order, page_token(query.data, 'my_orders'), LIST_PAGE_SIZE
+            )
             
-            logger.info(f"Found {len(orders)} orders for user {user.id}")
+            # Update user's total orders count (committed when load_orders returns)
+            if user.total_orders != total_orders:
+                user.total_orders = total_orders
+            return user, total_orders, page
+        
+        async with db_session() as db:
+            try:
+                user, total_orders, page = await db.run(load_orders)
+            
+                if not user:
+                    logger.warning(f"User not found: {telegram_id}")
+                    await query.edit_message_text(
+                        "❌ Please use /start first to create your account.",
+                        reply_markup=InlineKeyboardMarkup([
+                            [InlineKeyboardButton("⬅️ Main Menu", callback_data="menu_main")]
+                        ])
+                    )
+                    return
+            
+                orders = page.items
             
-            # Update user's total orders count
-            user.total_orders = len(orders)
-            db.commit()
+                logger.info(f"Found {total_orders} orders for user {user.id}")
             
-            if not orders:
-                text = """📦 My Orders
+                if not orders:
+                    text = """📦 My Orders
 
-You have no orders yet.
+    You have no orders yet.
 
-🛒 Browse our software to get started!"""
+    🛒 Browse our software to get started!"""
                 
-                keyboard = [
-                    [InlineKeyboardButton("🛒 Buy Software", callback_data="buy_bot")],
-                    [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+                    keyboard = [
+                        [InlineKeyboardButton("🛒 Buy Software", callback_data="buy_bot")],
+                        [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
+                    ]
+                    reply_markup = InlineKeyboardMarkup(keyboard)
                 
-                await query.edit_message_text(
-                    text,
-                    reply_markup=reply_markup
-                )
-                return
+                    await query.edit_message_text(
+                        text,
+                        reply_markup=reply_markup
+                    )
+                    return
+            
+                # Show orders
+                text = f"📦 My Orders\n\n"
+                text += f"Total Orders: {total_orders}\n\n"
             
-            # Show orders
-            text = f"📦 My Orders\n\n"
-            text += f"Total Orders: {len(orders)}\n\n"
-            
-            for order in orders[:10]:
-                # Get software name safely
-                bot_name = "Custom Software"
-                try:
-                    if order.bot_id:
-                        bot = db.query(Bot).filter(Bot.id == order.bot_id).first()
-                        if bot and bot.name:
-                            bot_name = bot.name[:30]
-                except Exception as e:
-                    logger.error(f"Error getting software name for order {order.order_id}: {e}")
-                    bot_name = "Custom Software"
+                for order in orders:
+                    # Get software name safely
+                    bot_name = order.bot.name[:30] if order.bot and order.bot.name else "Custom Software"
                 
-                # Status icon
-                status_icon = "⏳"
-                if order.status == OrderStatus.PENDING_PAYMENT:
-                    status_icon = "⏳"
-                    status_text = "Pending Payment"
-                elif order.status == OrderStatus.PENDING_REVIEW:
+                    # Status icon
                     status_icon = "⏳"
-                    status_text = "Pending Review"
-                elif order.status == OrderStatus.IN_PROGRESS:
-                    status_icon = "⚙️"
-                    status_text = "In Progress"
-                elif order.status == OrderStatus.COMPLETED:
-                    status_icon = "✅"
-                    status_text = "Completed"
-                elif order.status == OrderStatus.APPROVED:
-                    status_icon = "👍"
-                    status_text = "Approved"
-                elif order.status == OrderStatus.ASSIGNED:
-                    status_icon = "👷"
-                    status_text = "Assigned"
-                elif order.status == OrderStatus.CANCELLED:
-                    status_icon = "❌"
-                    status_text = "Cancelled"
-                elif order.status == OrderStatus.REFUNDED:
-                    status_icon = "💸"
-                    status_text = "Refunded"
-                else:
-                    status_icon = "❓"
-                    status_text = "Unknown"
+                    if order.status == OrderStatus.PENDING_PAYMENT:
+                        status_icon = "⏳"
+                        status_text = "Pending Payment"
+                    elif order.status == OrderStatus.PENDING_REVIEW:
+                        status_icon = "⏳"
+                        status_text = "Pending Review"
+                    elif order.status == OrderStatus.IN_PROGRESS:
+                        status_icon = "⚙️"
+                        status_text = "In Progress"
+                    elif order.status == OrderStatus.COMPLETED:
+                        status_icon = "✅"
+                        status_text = "Completed"
+                    elif order.status == OrderStatus.APPROVED:
+                        status_icon = "👍"
+                        status_text = "Approved"
+                    elif order.status == OrderStatus.ASSIGNED:
+                        status_icon = "👷"
+                        status_text = "Assigned"
+                    elif order.status == OrderStatus.CANCELLED:
+                        status_icon = "❌"
+                        status_text = "Cancelled"
+                    elif order.status == OrderStatus.REFUNDED:
+                        status_icon = "💸"
+                        status_text = "Refunded"
+                    else:
+                        status_icon = "❓"
+                        status_text = "Unknown"
                 
-                # Format amount
-                amount = order.amount if order.amount is not None else 0.0
+                    # Format amount
+                    amount = order.amount if order.amount is not None else 0.0
                 
-                # Truncate software name if too long
-                display_name = bot_name
-                if len(display_name) > 25:
-                    display_name = display_name[:22] + "..."
+                    # Truncate software name if too long
+                    display_name = bot_name
+                    if len(display_name) > 25:
+                        display_name = display_name[:22] + "..."
                 
-                text += f"{status_icon} {order.order_id[:12]}...\n"
-                text += f"  🚀 {display_name}\n"
-                text += f"  💰 ${amount:.2f}\n"
-                text += f"  📊 {status_text}\n"
+                    text += f"{status_icon} {order.order_id[:12]}...\n"
+                    text += f"  🚀 {display_name}\n"
+                    text += f"  💰 ${amount:.2f}\n"
+                    text += f"  📊 {status_text}\n"
                 
-                # Date formatting
-                if order.created_at:
-                    text += f"  📅 {order.created_at.strftime('%Y-%m-%d')}\n\n"
-                else:
-                    text += f"  📅 Unknown date\n\n"
+                    # Date formatting
+                    if order.created_at:
+                        text += f"  📅 {order.created_at.strftime('%Y-%m-%d')}\n\n"
+                    else:
+                        text += f"  📅 Unknown date\n\n"
             
-            # Create buttons for each order
-            keyboard = []
-            for order in orders[:5]:
-                amount = order.amount if order.amount is not None else 0.0
+                # Create buttons for each order
+                keyboard = []
+                for order in orders:
+                    amount = order.amount if order.amount is not None else 0.0
                 
-                button_text = f"📦 {order.order_id[:8]}..."
-                button_text += f" - ${amount:.2f}"
+                    button_text = f"📦 {order.order_id[:8]}..."
+                    button_text += f" - ${amount:.2f}"
                 
-                if len(button_text) > 40:
-                    button_text = button_text[:37] + "..."
+                    if len(button_text) > 40:
+                        button_text = button_text[:37] + "..."
                 
-                keyboard.append([
-                    InlineKeyboardButton(
-                        button_text,
-                        callback_data=f"order_{order.order_id}"
-                    )
-                ])
+                    keyboard.append([
+                        InlineKeyboardButton(
+                            button_text,
+                            callback_data=f"order_{order.order_id}"
+                        )
+                    ])
             
-            keyboard.append([InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")])
+                navigation = nav_row(page, 'my_orders')
+                if navigation:
+                    keyboard.append(navigation)
+                keyboard.append([InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")])
             
-            reply_markup = InlineKeyboardMarkup(keyboard)
+                reply_markup = InlineKeyboardMarkup(keyboard)
             
-            await query.edit_message_text(
-                text,
-                reply_markup=reply_markup
-            )
+                await query.edit_message_text(
+                    text,
+                    reply_markup=reply_markup
+                )
             
-            logger.info(f"Successfully displayed {len(orders)} orders")
+                logger.info(f"Successfully displayed {len(orders)} orders")
             
-        except Exception as e:
-            logger.error(f"Error in show_user_orders: {e}", exc_info=True)
+            except Exception as e:
+                logger.error(f"Error in show_user_orders: {e}", exc_info=True)
             
-            await query.edit_message_text(
-                f"❌ Error loading orders.\n\nPlease try again or contact support.",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
-                ])
-            )
-        finally:
-            db.close()
+                await query.edit_message_text(
+                    f"❌ Error loading orders.\n\nPlease try again or contact support.",
+                    reply_markup=InlineKeyboardMarkup([
+                        [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
+                    ])
+                )
             
     except Exception as e:
         logger.error(f"Outer error in show_user_orders: {e}", exc_info=True)
@@ -862,62 +753,30 @@ async def show_featured_bots(update: Update, context: ContextTypes.DEFAULT_TYPE)
         query = update.callback_query
         await query.answer()
         
-        from database.db import create_session
-        from database.models import Bot
+        from services.bot_catalog import catalog_cache
+        from services.currency_service import user_currency
         
-        db = create_session()
-        try:
-            # Get featured software
-            bots = db.query(Bot).filter(
-                Bot.is_featured == True,
-                Bot.is_available == True
-            ).order_by(Bot.created_at.desc()).all()
-            
-            if not bots:
-                await query.edit_message_text(
-                    "⭐ No featured software available at the moment.\n\n"
-                    "Check back soon for new featured software!",
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton("🛒 Browse All Software", callback_data="buy_bot")],
-                        [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
-                    ])
-                )
-                return
-            
-            text = "⭐ Featured Software\n\n"
-            
-            for bot in bots:
-                text += f"{bot.name}\n"
-                text += f"💰 ${bot.price:.2f}\n"
-                text += f"📦 {bot.delivery_time}\n"
-                text += f"{bot.description[:100]}...\n\n"
-            
-            # Create buttons for each software
-            keyboard = []
-            for bot in bots[:5]:
-                keyboard.append([
-                    InlineKeyboardButton(
-                        f"⭐ {bot.name[:20]} - ${bot.price:.2f}",
-                        callback_data=f"view_bot_{bot.id}"
-                    )
+        snapshot = await catalog_cache.fetch()
+        page = snapshot.view(await user_currency(context, update.effective_user.id)).featured()
+        
+        if page is None:
+            await query.edit_message_text(
+                "⭐ No featured software available at the moment.\n\n"
+                "Check back soon for new featured software!",
+                reply_markup=InlineKeyboardMarkup([
+                    [InlineKeyboardButton("🛒 Browse All Software", callback_data="buy_bot")],
+                    [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
                 ])
-            
-            keyboard.append([
-                InlineKeyboardButton("🛒 Browse All Software", callback_data="buy_bot"),
-                InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
-            ])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
-            
-        finally:
-            db.close()
+            )
+            return
+        
+        text, reply_markup = page
+        await query.edit_message_text(text, reply_markup=reply_markup)
             
     except Exception as e:
         logger.error(f"Error in show_featured_bots: {e}", exc_info=True)
         await query.edit_message_text("❌ Error loading featured software. Please try again.")
 
-
 async def generic_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Fallback handler for callback queries that no other handler processed.
@@ -0,0 +1,83 @@
+"""
+Metrics - admin /metrics: the slowest handlers, SQL per update, Bot API latency and queue depth
+
+The same numbers, unabridged, are on the local Prometheus endpoint (services.metrics).
+"""
+import logging
+import time
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from services.auth_service import admin_only
+from services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_TEXT_LIMIT = 4096
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms"
+
+
+def _uptime(seconds: float) -> str:
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h {rest // 60}m"
+
+
+def _short(name: str) -> str:
+    return name[len("handlers."):] if name.startswith("handlers.") else name
+
+
+def render_summary(limit: int = 10) -> str:
+    lines = [f"📈 Metrics — up {_uptime(time.time() - metrics.started)}", ""]
+
+    slowest = metrics.slowest_handlers(limit)
+    lines.append("⏱️ Slowest handlers (total time)")
+    if not slowest:
+        lines.append("No updates handled yet.")
+    for name, totals in slowest:
+        count = totals.latency.count
+        lines.append(
+            f"• {_short(name)}\n"
+            f"   {count}× · avg {_ms(totals.latency.mean)} · p95 ≤ {_ms(totals.latency.quantile(0.95))}"
+            f" · SQL {totals.statements / count:.1f}/update ({_ms(totals.sql_seconds / count)})"
+            f" · API {totals.api_calls / count:.1f}/update ({_ms(totals.api_seconds / count)})"
+            + (f" · ❌ {totals.errors}" if totals.errors else "")
+        )
+
+    statements = metrics.update_statements
+    lines += ["", f"🗄️ SQL per update: avg {statements.mean:.1f} · p95 ≤ {statements.quantile(0.95):.0f}"
+                  f" · {metrics.other_statements} statements outside updates"]
+
+    lines += ["", "📡 Bot API"]
+    api = sorted(metrics.api_latency.items(), key=lambda item: item[1].sum, reverse=True)[:limit]
+    if not api:
+        lines.append("No calls yet.")
+    for method, histogram in api:
+        failures = sum(count for (m, status), count in metrics.api_requests.items()
+                       if m == method and status != "200")
+        lines.append(f"• {method}: {histogram.count}× · avg {_ms(histogram.mean)}"
+                     f" · p95 ≤ {_ms(histogram.quantile(0.95))}" + (f" · ⚠️ {failures} failed" if failures else ""))
+
+    gauges = metrics.queue_gauges()
+    if gauges:
+        lines += ["", f"📥 Updates: {gauges.get('queued', 0)} queued · {gauges.get('processing', 0)} processing"
+                      f" · {gauges.get('waiting_for_chat', 0)} waiting for their chat"
+                      f" (max {gauges.get('max_concurrent', 0)} at once)"]
+
+    text = "\n".join(lines)
+    return text if len(text) <= TELEGRAM_TEXT_LIMIT else text[:TELEGRAM_TEXT_LIMIT - 1] + "…"
+
+
+@admin_only
+async def admin_metrics_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/metrics [n] - the n slowest handlers (default 10)"""
+    try:
+        limit = int(context.args[0]) if context.args and context.args[0].isdigit() else 10
+        await update.message.reply_text(render_summary(max(1, min(limit, 30))))
+
+    except Exception as e:
+        logger.error(f"Error in admin_metrics_command: {e}", exc_info=True)
+        await update.message.reply_text("❌ Could not collect metrics.")
@@ -106,10 +106,9 @@ async def handle_paystack_payment(update: Update, context: ContextTypes.DEFAULT_
             db.commit()
             
             # Initialize Paystack transaction in USER'S CURRENCY
-            from services.paystack_service import PaystackService
-            paystack = PaystackService()
+            from services.paystack_service import async_paystack
             
-            success, result = paystack.initialize_transaction(
+            success, result = await async_paystack.initialize_transaction(
                 email=user.email,
                 amount=local_price,  # Use local amount in user's currency
                 reference=unique_ref,
@@ -349,9 +348,8 @@ async def handle_email_for_paystack(update: Update, context: ContextTypes.DEFAUL
             
             # Initialize Paystack transaction with UNIQUE reference
             try:
-                from services.paystack_service import PaystackService
-                paystack = PaystackService()
-                success, result = paystack.initialize_transaction(
+                from services.paystack_service import async_paystack
+                success, result = await async_paystack.initialize_transaction(
                     email=email,
                     amount=amount,
                     reference=unique_ref,  # Use the pre-generated unique reference
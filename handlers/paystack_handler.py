@@ -3,7 +3,8 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, MessageHandler, filters
 from database.db import create_session
 from database.models import User, Order, OrderStatus, PaymentMethod, PaymentStatus, Transaction, Bot
-from services.paystack_service import PaystackService
+from services.paystack_service import async_paystack
+from services.outbox import enqueue_admin
 from utils.helpers import generate_order_id
 from config import DEFAULT_CURRENCY, DEFAULT_CURRENCY_SYMBOL
 import logging
@@ -110,10 +111,9 @@ async def handle_paystack_payment(update: Update, context: ContextTypes.DEFAULT_
             db.commit()
             
             # Initialize Paystack transaction
-            paystack = PaystackService()
             logger.info(f"Initializing Paystack transaction: email={user.email}, amount={bot.price}, ref={paystack_ref}")
             
-            success, result = paystack.initialize_transaction(
+            success, result = await async_paystack.initialize_transaction(
                 email=user.email,
                 amount=bot.price,
                 reference=paystack_ref,  # Use the unique reference
@@ -268,10 +268,9 @@ async def handle_email_for_paystack(update: Update, context: ContextTypes.DEFAUL
             db.commit()
             
             # Initialize Paystack transaction with UNIQUE reference
-            paystack = PaystackService()
             logger.info(f"Initializing Paystack transaction for email: {email}, amount: {amount}, ref: {paystack_ref}")
             
-            success, result = paystack.initialize_transaction(
+            success, result = await async_paystack.initialize_transaction(
                 email=email,
                 amount=amount,
                 reference=paystack_ref,  # Use the unique reference
@@ -435,14 +434,11 @@ Your payment has already been verified and is being processed."""
                     )
                 return
             
-            # Verify with Paystack using payment_reference
-            paystack = PaystackService()
-            
             # Use the order's payment_reference for verification
             reference_to_verify = order.payment_reference
             
             logger.info(f"Verifying Paystack transaction: {reference_to_verify}")
-            success, result = paystack.verify_transaction(reference_to_verify)
+            success, result = await async_paystack.verify_transaction(reference_to_verify)
             
             if success:
                 payment_data = result.get('data', {})
@@ -477,30 +473,14 @@ Your payment has already been verified and is being processed."""
                         transaction.transaction_data = payment_data
                         transaction.verified_at = datetime.now()
                     
-                    db.commit()
-                    
                     # Get bot info for notification
                     bot = db.query(Bot).filter(Bot.id == order.bot_id).first()
                     bot_name = bot.name if bot else "Unknown Bot"
                     
-                    # Send admin notification
-                    admin_message = f"""💰 NEW ORDER PAYMENT VERIFIED
-
-📦 Order ID: `{order.order_id}`
-🔖 Payment Ref: `{reference_to_verify}`
-👤 Customer: {user.first_name} (@{user.username or 'N/A'})
-📧 Email: {user.email or 'Not provided'}
-🤖 Bot: {bot_name}
-💰 Amount: {DEFAULT_CURRENCY_SYMBOL}{order.amount:.2f}
-💳 Method: Paystack
-📅 Time: {datetime.now().strftime('%Y-%m-%d %H:%M')}
-✅ Status: Verified
-
-⚠️ **Action Required:** Admin needs to review and assign developer
-
-Order will be automatically refunded if not assigned within 48 hours."""
+                    # Queued with the payment update, sent once it commits
+                    notify_admin_payment(db, order, user, bot_name)
                     
-                    await notify_admin_payment(order, user, bot_name)
+                    db.commit()
                     
                     # Send success message to user
                     success_text = f"""✅ Payment Verified Successfully!
@@ -637,16 +617,9 @@ Please try again or contact support."""
         elif update.message:
             await update.message.reply_text("❌ Error verifying payment.")
 
-async def notify_admin_payment(order, user, bot_name):
-    """Notify admin about successful payment"""
-    try:
-        from telegram import Bot
-        from config import TELEGRAM_TOKEN, SUPER_ADMIN_ID
-        
-        if TELEGRAM_TOKEN and SUPER_ADMIN_ID:
-            bot = Bot(token=TELEGRAM_TOKEN)
-            
-            message = f"""
+def notify_admin_payment(db, order, user, bot_name):
+    """Queue the admin notification about a successful payment in the caller's transaction"""
+    message = f"""
 💰 *New Payment Verified*
 
 📦 Order ID: `{order.order_id}`
@@ -658,17 +631,8 @@ async def notify_admin_payment(order, user, bot_name):
 🔖 Payment Ref: `{order.payment_reference}`
 
 *To review:* Go to Admin Panel → Orders
-            """
-            
-            await bot.send_message(
-                chat_id=SUPER_ADMIN_ID,
-                text=message,
-                parse_mode='Markdown'
-            )
-            
-            logger.info(f"Notified admin about payment for order {order.order_id}")
-    except Exception as e:
-        logger.error(f"Failed to notify admin: {e}", exc_info=True)
+    """
+    enqueue_admin(db, message, parse_mode='Markdown')
 
 # Command handler for /verify
 async def verify_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -0,0 +1,205 @@
+"""
+Search - admin /search_* commands and inline-mode search for customers
+
+Admins: /search_job, /search_order, /search_request, /search_user and
+/search_bot <text>. Results link to the existing admin detail screens and
+page with search:<kind>:<page> buttons; the search text is kept in user_data.
+
+Customers: "@<bot> <text>" in any chat searches the catalog and the public
+job board (inline mode must be enabled with BotFather's /setinline).
+"""
+import logging
+from typing import Tuple
+
+from telegram import (
+    InlineKeyboardButton, InlineKeyboardMarkup, InlineQueryResultArticle, InputTextMessageContent, Update
+)
+from telegram.ext import ContextTypes
+
+from database.db import create_session, run_sync
+from database.search import SearchPage, search
+from services.auth_service import admin_only
+from utils.callback_router import callback_data, parse_callback_data
+from config import INLINE_SEARCH_RESULTS, SEARCH_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+SEARCH_NAMESPACE = "search"
+
+# /command -> index searched
+ADMIN_SEARCH_COMMANDS = {
+    "search_job": "jobs",
+    "search_order": "orders",
+    "search_request": "requests",
+    "search_user": "users",
+    "search_bot": "bots",
+}
+
+TITLES = {
+    "jobs": "🎯 Jobs",
+    "orders": "📦 Orders",
+    "requests": "⚙️ Custom Requests",
+    "users": "👥 Users",
+    "bots": "🚀 Software",
+}
+
+
+def _run_search(kind: str, text: str, page: int, page_size: int, public: bool = False) -> SearchPage:
+    db = create_session()
+    try:
+        return search(db, kind, text, page, page_size, public=public)
+    finally:
+        db.close()
+
+
+def _result_line(kind: str, item) -> Tuple[str, str, str]:
+    """(line of text, button label, button callback) for one admin search result"""
+    if kind == "jobs":
+        status = item.status.value if item.status else "unknown"
+        return (f"🔹 {item.title} — ${item.budget:.2f} · {status}\n   🆔 {item.job_id}",
+                f"🎯 {item.title[:30]}", f"admin_review_job_{item.job_id}")
+    if kind == "orders":
+        status = item.status.value if item.status else "unknown"
+        return (f"📦 {item.order_id} — ${item.amount:.2f} · {status}",
+                f"📦 {item.order_id}", f"admin_order_detail_{item.id}")
+    if kind == "requests":
+        status = item.status.value if item.status else "unknown"
+        return (f"⚙️ {item.request_id} — {item.title} · {status}",
+                f"⚙️ {item.request_id}", f"admin_custom_request_detail_{item.id}")
+    if kind == "users":
+        username = f"@{item.username}" if item.username else "no username"
+        name = " ".join(filter(None, [item.first_name, item.last_name])) or "Unknown"
+        return (f"👤 {name} ({username}) · ID {item.telegram_id}",
+                f"👤 {name[:30]}", f"admin_user_detail_{item.id}")
+    availability = "✅" if item.is_available else "🚫"
+    return (f"{availability} {item.name} — ${item.price:.2f} · {item.category}",
+            f"🚀 {item.name[:30]}", f"admin_bot_detail_{item.id}")
+
+
+def render_results(kind: str, text: str, result: SearchPage) -> Tuple[str, InlineKeyboardMarkup]:
+    title = TITLES[kind]
+    if not result.items:
+        body = f"🔍 {title} matching \"{text}\"\n\nNo results."
+        return body, InlineKeyboardMarkup([[InlineKeyboardButton("👑 Admin Panel", callback_data="admin_panel")]])
+
+    lines, keyboard = [], []
+    for item in result.items:
+        line, label, target = _result_line(kind, item)
+        lines.append(line)
+        keyboard.append([InlineKeyboardButton(label, callback_data=target)])
+
+    navigation = []
+    if result.has_prev:
+        navigation.append(InlineKeyboardButton(
+            "⬅️ Previous", callback_data=callback_data(SEARCH_NAMESPACE, kind, result.page - 1)))
+    if result.has_next:
+        navigation.append(InlineKeyboardButton(
+            "Next ➡️", callback_data=callback_data(SEARCH_NAMESPACE, kind, result.page + 1)))
+    if navigation:
+        keyboard.append(navigation)
+    keyboard.append([InlineKeyboardButton("👑 Admin Panel", callback_data="admin_panel")])
+
+    body = f"🔍 {title} matching \"{text}\" — page {result.page + 1}\n\n" + "\n".join(lines)
+    return body, InlineKeyboardMarkup(keyboard)
+
+
+@admin_only
+async def admin_search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/search_job, /search_order, /search_request, /search_user, /search_bot <text>"""
+    try:
+        command = update.message.text.split()[0][1:].split('@')[0].lower()
+        kind = ADMIN_SEARCH_COMMANDS[command]
+        text = " ".join(context.args or []).strip()
+        if not text:
+            await update.message.reply_text(f"Usage: /{command} <text>\n\nExample: /{command} crypto")
+            return
+
+        context.user_data.setdefault('search', {})[kind] = text
+        result = await run_sync(_run_search, kind, text, 0, SEARCH_PAGE_SIZE)
+        body, reply_markup = render_results(kind, text, result)
+        await update.message.reply_text(body, reply_markup=reply_markup)
+
+    except Exception as e:
+        logger.error(f"Error in admin_search_command: {e}", exc_info=True)
+        await update.message.reply_text("❌ Search failed. Please try again.")
+
+
+@admin_only
+async def admin_search_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """search:<kind>:<page> buttons under admin search results"""
+    query = update.callback_query
+    try:
+        await query.answer()
+        _, kind, args = parse_callback_data(query.data)
+        page = args[0] if args else "0"
+        text = context.user_data.get('search', {}).get(kind)
+        if kind not in TITLES or not text:
+            await query.edit_message_text("⌛ This search has expired. Please run the command again.")
+            return
+
+        result = await run_sync(_run_search, kind, text, int(page), SEARCH_PAGE_SIZE)
+        body, reply_markup = render_results(kind, text, result)
+        await query.edit_message_text(body, reply_markup=reply_markup)
+
+    except Exception as e:
+        logger.error(f"Error in admin_search_page: {e}", exc_info=True)
+        await query.edit_message_text("❌ Search failed. Please try again.")
+
+
+# ========== INLINE MODE ==========
+
+def _inline_results(text: str, page: int):
+    """Public bots and jobs for one inline page - half the slots each"""
+    per_kind = max(1, INLINE_SEARCH_RESULTS // 2)
+    bots = _run_search("bots", text, page, per_kind, public=True)
+    jobs = _run_search("jobs", text, page, per_kind, public=True)
+
+    results = []
+    for bot in bots.items:
+        results.append(InlineQueryResultArticle(
+            id=f"bot_{bot.id}",
+            title=f"🚀 {bot.name} — ${bot.price:.2f}",
+            description=(bot.description or "")[:100],
+            input_message_content=InputTextMessageContent(
+                f"🚀 {bot.name}\n\n{bot.description or ''}\n\n💰 Price: ${bot.price:.2f}\n"
+                f"⏱️ Delivery: {bot.delivery_time}"
+            ),
+            reply_markup=InlineKeyboardMarkup([[
+                InlineKeyboardButton("🔍 View Software", callback_data=f"view_bot_{bot.id}")
+            ]]),
+        ))
+    for job in jobs.items:
+        results.append(InlineQueryResultArticle(
+            id=f"job_{job.id}",
+            title=f"🎯 {job.title} — ${job.budget:.2f}",
+            description=(job.description or "")[:100],
+            input_message_content=InputTextMessageContent(
+                f"🎯 {job.title}\n\n💰 Budget: ${job.budget:.2f}\n⏰ Timeline: {job.expected_timeline}"
+            ),
+            reply_markup=InlineKeyboardMarkup([[
+                InlineKeyboardButton("🔍 View Job", callback_data=f"view_job_{job.job_id}")
+            ]]),
+        ))
+    return results, bots.has_next or jobs.has_next
+
+
+async def inline_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Inline-mode search over the catalog and the public job board"""
+    inline_query = update.inline_query
+    try:
+        text = inline_query.query.strip()
+        if not text:
+            await inline_query.answer([], cache_time=300)
+            return
+
+        page = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+        results, has_next = await run_sync(_inline_results, text, page)
+        await inline_query.answer(
+            results,
+            cache_time=30,
+            is_personal=False,
+            next_offset=str(page + 1) if has_next else "",
+        )
+
+    except Exception as e:
+        logger.error(f"Error in inline_search: {e}", exc_info=True)
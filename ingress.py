@@ -0,0 +1,304 @@
+"""
+HTTP ingress - Telegram updates and Paystack webhooks on the bot's event loop
+
+In webhook mode one process serves both endpoints: Telegram updates go
+straight onto application.update_queue and Paystack events into the webhook
+inbox (services.inbound_events), so the bot, the DB workers and every cache
+are shared instead of living in a second (Flask) process.
+
+PTB's own run_webhook needs tornado; this is a small asyncio HTTP/1.1 server
+with just what the two webhooks send (Content-Length bodies, keep-alive).
+"""
+import asyncio
+import hmac
+import json
+import logging
+import re
+import secrets
+import signal
+from http import HTTPStatus
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from telegram import Update
+
+from config import WEBHOOK_SECRET, TELEGRAM_WEBHOOK_PATH, PAYSTACK_WEBHOOK_PATH
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1 << 20
+MAX_HEADERS = 100
+# Idle keep-alive connections are closed after this many seconds
+IDLE_TIMEOUT = 75
+# What Telegram accepts as a webhook secret_token
+SECRET_TOKEN_FORMAT = re.compile(r'[A-Za-z0-9_-]{1,256}')
+
+Response = Tuple[int, Optional[dict]]
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes
+    keep_alive: bool
+
+
+class BadRequest(Exception):
+    def __init__(self, status: int):
+        super().__init__(HTTPStatus(status).phrase)
+        self.status = status
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise BadRequest(400)
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise BadRequest(431)
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise BadRequest(411)
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise BadRequest(400)
+    if length > MAX_BODY_SIZE:
+        raise BadRequest(413)
+    body = await reader.readexactly(length) if length else b''
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    return Request(method.upper(), target.split('?', 1)[0], headers, body, keep_alive)
+
+
+def _encode_response(status: int, body: Optional[dict], keep_alive: bool) -> bytes:
+    payload = json.dumps(body).encode() if body is not None else b''
+    head = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + payload
+
+
+class IngressServer:
+    """Serves the Telegram and Paystack webhooks for one bot
+
+    Without an update_queue only the Paystack endpoint is served. With one,
+    secret_token is required: the Telegram endpoint is public, and only the
+    X-Telegram-Bot-Api-Secret-Token header tells Telegram from a forger.
+    """
+
+    def __init__(self, bot, update_queue: Optional[asyncio.Queue] = None, secret_token: str = WEBHOOK_SECRET):
+        if update_queue is not None and not secret_token:
+            raise ValueError("The Telegram webhook needs a secret token (WEBHOOK_SECRET)")
+        self.bot = bot
+        self.update_queue = update_queue
+        self.secret_token = secret_token
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+        self._routes = {
+            ('POST', TELEGRAM_WEBHOOK_PATH): self._telegram_update,
+            ('POST', PAYSTACK_WEBHOOK_PATH): self._paystack_event,
+            ('GET', '/health'): self._health,
+        }
+
+    async def start(self, host: str, port: int) -> 'IngressServer':
+        self._server = await asyncio.start_server(self._serve, host, port, backlog=1024)
+        logger.info(f"🌐 Webhook ingress listening on {host}:{self.port}")
+        return self
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop accepting and close every open connection"""
+        if self._server is None:
+            return
+        self._server.close()
+        handlers = list(self._connections)
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    # ---------- connection handling ----------
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), IDLE_TIMEOUT)
+                except BadRequest as e:
+                    writer.write(_encode_response(e.status, {"status": "error", "message": str(e)}, False))
+                    await writer.drain()
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        ValueError, ConnectionError):
+                    break
+                if request is None:
+                    break
+
+                status, body = await self._dispatch(request)
+                writer.write(_encode_response(status, body, request.keep_alive))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            # Client went away, or the server is stopping
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _dispatch(self, request: Request) -> Response:
+        route = self._routes.get((request.method, request.path))
+        if route is None:
+            known_path = any(path == request.path for _, path in self._routes)
+            return (405 if known_path else 404), {"status": "error", "message": "Not found"}
+        try:
+            return await route(request)
+        except Exception as e:
+            logger.error(f"Ingress error on {request.path}: {e}", exc_info=True)
+            return 500, {"status": "error", "message": "Internal error"}
+
+    # ---------- endpoints ----------
+
+    async def _health(self, request: Request) -> Response:
+        return 200, {"status": "ok"}
+
+    async def _telegram_update(self, request: Request) -> Response:
+        if self.update_queue is None:
+            return 404, {"status": "error", "message": "Not found"}
+        token = request.headers.get('x-telegram-bot-api-secret-token', '')
+        if not hmac.compare_digest(token.encode(), self.secret_token.encode()):
+            logger.warning("⚠️ Telegram webhook call with a missing or wrong secret token")
+            return 403, None
+        try:
+            update = Update.de_json(json.loads(request.body), self.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Malformed Telegram update: {e}")
+            return 400, None
+
+        # Acknowledge straight away; the application processes it from the queue
+        await self.update_queue.put(update)
+        return 200, None
+
+    async def _paystack_event(self, request: Request) -> Response:
+        from services.inbound_events import inbound_consumer
+        from services.paystack_service import paystack
+
+        signature = request.headers.get('x-paystack-signature', '')
+        if not paystack.validate_webhook(request.body, signature):
+            return 401, {"status": "error", "message": "Invalid signature"}
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return 400, {"status": "error", "message": "Invalid JSON"}
+
+        # Stored and acknowledged; the inbox consumer applies it (retries are dropped here)
+        stored = await inbound_consumer.record_paystack(data, request.body)
+        return 200, {"status": "received" if stored else "duplicate"}
+
+
+# ========== WEBHOOK MODE ==========
+
+def webhook_secret(configured: str = WEBHOOK_SECRET) -> str:
+    """WEBHOOK_SECRET, or a random one for this run when it is unset
+
+    A generated secret works because set_webhook registers it again on
+    every start; set WEBHOOK_SECRET to keep it stable across restarts.
+    """
+    if not configured:
+        logger.warning("WEBHOOK_SECRET is not set - using a random secret token for this run")
+        return secrets.token_urlsafe(32)
+    if not SECRET_TOKEN_FORMAT.fullmatch(configured):
+        raise ValueError("WEBHOOK_SECRET must be 1-256 characters of A-Z, a-z, 0-9, _ and -")
+    return configured
+
+
+def _stop_on_signals(stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+
+async def run_webhook(application, url: str, host: str, port: int, stop: Optional[asyncio.Event] = None):
+    """Run the bot on webhooks until SIGINT/SIGTERM (or `stop` is set)
+
+    Mirrors Application.run_polling's lifecycle: post_init after
+    initialize, post_shutdown after shutdown.
+    """
+    from services.inbound_events import inbound_consumer
+
+    secret_token = webhook_secret()
+    stop = stop or asyncio.Event()
+    _stop_on_signals(stop)
+
+    await application.initialize()
+    server = None
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.bot.set_webhook(
+            url=url.rstrip('/') + TELEGRAM_WEBHOOK_PATH,
+            secret_token=secret_token,
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=True,
+        )
+        await application.start()
+        inbound_consumer.start()
+        server = await IngressServer(application.bot, application.update_queue, secret_token).start(host, port)
+        await stop.wait()
+    finally:
+        if server is not None:
+            await server.stop()
+        await inbound_consumer.stop()
+        if application.running:
+            await application.stop()
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+async def run_paystack_only(host: str, port: int, stop: Optional[asyncio.Event] = None):
+    """Serve only the Paystack webhook, for deployments that still poll Telegram
+
+    No outbox dispatcher runs here: the polling bot's dispatcher is the one
+    per database, and picks up what this process queues within
+    OUTBOX_POLL_INTERVAL. A second one would send every notification twice.
+    """
+    from database.db import shutdown_db_executor
+    from services.inbound_events import inbound_consumer
+
+    stop = stop or asyncio.Event()
+    _stop_on_signals(stop)
+
+    inbound_consumer.start()
+    server = await IngressServer(None).start(host, port)
+    try:
+        await stop.wait()
+    finally:
+        await server.stop()
+        await inbound_consumer.stop()
+        shutdown_db_executor()
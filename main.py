@@ -59,6 +59,7 @@ def main():
     print("   /verify ORDER_ID - Verify Paystack payment")
     print("   /verify_deposit PAYMENT_REF - Verify custom request deposit")
     print("   /refund ORDER_ID [REASON] - Process manual refund (admin only)")
+    print("   /backup [list] - Snapshot the database now, or list backups (admin only)")
     print("\n🔄 Custom Request Payment Flow:")
     print("   1. /menu → Request Custom Software")
     print("   2. Fill out request details")
@@ -69,31 +70,31 @@ def main():
     print("\n⏰ Automatic Refund Policy:")
     print("   - Orders unclaimed by developers within 48 hours → Full refund")
     print("   - Custom requests unapproved within 48 hours → Deposit refund")
-    print("   - Refunds processed automatically every hour")
+    print("   - Refunds processed automatically when each deadline falls due")
     print("\n⚡ Starting Telegram Bot...")
-    print("🔄 Starting automatic refund checker...")
+    print("🔄 Automatic refund scheduler starts with the bot")
     
-    # Start the refund checker thread
-    try:
-        from order_management import start_refund_checker
-        start_refund_checker()
-        print("✅ Automatic refund checker started successfully")
-    except ImportError as e:
-        print(f"⚠️ Could not import order_management module: {e}")
-        print("⚠️ Automatic refunds will not be available")
-    except Exception as e:
-        print(f"⚠️ Could not start refund checker: {e}")
-        print("⚠️ Automatic refunds will not be available")
+    from config import WEBHOOK_URL, WEBHOOK_HOST, WEBHOOK_PORT, TELEGRAM_WEBHOOK_PATH, PAYSTACK_WEBHOOK_PATH
+    if WEBHOOK_URL:
+        print(f"🌐 Webhook mode: {WEBHOOK_URL.rstrip('/')}{TELEGRAM_WEBHOOK_PATH}")
+        print(f"💳 Paystack webhook: {WEBHOOK_URL.rstrip('/')}{PAYSTACK_WEBHOOK_PATH}")
+        print(f"   Listening on {WEBHOOK_HOST}:{WEBHOOK_PORT}")
     
     print("   Press Ctrl+C to stop")
     print("=" * 60)
     
     try:
         # Start the bot
-        application.run_polling(
-            allowed_updates=Update.ALL_TYPES,
-            drop_pending_updates=True
-        )
+        if WEBHOOK_URL:
+            import asyncio
+            from ingress import run_webhook
+            asyncio.run(run_webhook(application, WEBHOOK_URL, WEBHOOK_HOST, WEBHOOK_PORT))
+            print("\n👋 Bot stopped")
+        else:
+            application.run_polling(
+                allowed_updates=Update.ALL_TYPES,
+                drop_pending_updates=True
+            )
     except KeyboardInterrupt:
         print("\n👋 Bot stopped by user")
         print(f"End Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
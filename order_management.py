@@ -1,38 +1,21 @@
 """
 Order management with verification, admin notification, and refund policy
 """
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, Bot
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from database.db import create_session
 from database.models import Order, OrderStatus, PaymentStatus, User, Bot as SoftwareBot, CustomRequest, RequestStatus, Transaction
-from services.paystack_service import PaystackService
-from config import TELEGRAM_TOKEN, SUPER_ADMIN_ID, DEFAULT_CURRENCY_SYMBOL
+from services.paystack_service import async_paystack
+from services.outbox import enqueue, enqueue_admin
+from utils.callback_router import callback_data, parse_callback_data
+from config import DEFAULT_CURRENCY_SYMBOL
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
-import threading
-import time
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
-# Global instance for background tasks
-refund_checker_thread = None
-
-async def send_admin_notification(message: str):
-    """Send notification to admin"""
-    try:
-        if TELEGRAM_TOKEN and SUPER_ADMIN_ID:
-            bot = Bot(token=TELEGRAM_TOKEN)
-            await bot.send_message(
-                chat_id=SUPER_ADMIN_ID,
-                text=message
-            )
-            logger.info(f"Admin notification sent: {message[:100]}...")
-    except Exception as e:
-        logger.error(f"Failed to send admin notification: {e}")
-
-
 async def verify_order_payment(update: Update, context: ContextTypes.DEFAULT_TYPE, payment_reference: str, is_callback: bool = False):
     """Verify order payment and notify admin - UPDATED for unique payment references"""
     db = create_session()
@@ -88,14 +71,11 @@ Your payment has already been verified and is being processed."""
                 )
             return
         
-        # Verify with Paystack using payment_reference
-        paystack = PaystackService()
-        
         # Use the order's payment_reference for verification
         reference_to_verify = order.payment_reference or order.order_id
         
         logger.info(f"Verifying payment with reference: {reference_to_verify}")
-        success, result = paystack.verify_transaction(reference_to_verify)
+        success, result = await async_paystack.verify_transaction(reference_to_verify)
         
         if success:
             payment_data = result.get('data', {})
@@ -127,9 +107,7 @@ Your payment has already been verified and is being processed."""
                 transaction.transaction_data = payment_data
                 transaction.verified_at = datetime.now()
             
-            db.commit()
-            
-            # Send admin notification
+            # Queued with the payment update, sent once it commits
             admin_message = f"""💰 NEW ORDER PAYMENT VERIFIED
 
 📦 Order ID: {order.order_id}
@@ -144,8 +122,9 @@ Your payment has already been verified and is being processed."""
 ⚠️ **Action Required:** Admin needs to review and assign developer
 
 Order will be automatically refunded if not assigned within 48 hours."""
+            enqueue_admin(db, admin_message)
             
-            await send_admin_notification(admin_message)
+            db.commit()
             
             # Send success message to user
             success_text = f"""✅ Payment Verified Successfully!
@@ -260,30 +239,21 @@ async def verify_custom_request_deposit(update: Update, context: ContextTypes.DE
             return
         
         # Verify with Paystack
-        paystack = PaystackService()
-        success, result = paystack.verify_transaction(payment_reference)
+        success, result = await async_paystack.verify_transaction(payment_reference)
         
         if success:
             payment_data = result.get('data', {})
             
-            # Update custom request - Try to find the correct enum value
+            # Update custom request - now waiting for admin review
             custom_request.is_deposit_paid = True
-            
-            # Try different enum values for pending status
-            try:
-                # First try PENDING
-                custom_request.status = RequestStatus.PENDING
-            except AttributeError:
-                try:
-                    # Try PENDING_REVIEW
-                    custom_request.status = RequestStatus.PENDING_REVIEW
-                except AttributeError:
-                    # Try REVIEW_PENDING
-                    custom_request.status = RequestStatus.REVIEW_PENDING
-            
+            custom_request.status = RequestStatus.IN_REVIEW
             custom_request.payment_metadata = payment_data
             custom_request.deposit_paid_at = datetime.now()
             
+            # Start the 48h unapproved-request refund clock
+            from services.refund_scheduler import schedule_request_refund
+            schedule_request_refund(db, custom_request)
+            
             # Update transaction
             transaction = db.query(Transaction).filter(
                 Transaction.reference == payment_reference
@@ -295,12 +265,10 @@ async def verify_custom_request_deposit(update: Update, context: ContextTypes.DE
                 transaction.transaction_data = payment_data
                 transaction.verified_at = datetime.now()
             
-            db.commit()
-            
             # Get user
             user = db.query(User).filter(User.id == custom_request.user_id).first()
             
-            # Send admin notification
+            # Queued with the deposit update, sent once it commits
             admin_message = f"""💰 CUSTOM REQUEST DEPOSIT PAID
 
 📋 Request ID: {custom_request.request_id}
@@ -314,8 +282,9 @@ async def verify_custom_request_deposit(update: Update, context: ContextTypes.DE
 ⚠️ **Action Required:** Admin needs to review custom request
 
 Request will be automatically refunded if not approved within 48 hours."""
+            enqueue_admin(db, admin_message)
             
-            await send_admin_notification(admin_message)
+            db.commit()
             
             # Send success message to user
             success_text = f"""✅ Deposit Payment Verified!
@@ -370,267 +339,12 @@ If you've already paid, wait 5 minutes and try again."""
         db.close()
 
 
-def process_automatic_refunds():
-    """Process automatic refunds for unclaimed orders (runs every hour)"""
-    while True:
-        try:
-            db = create_session()
-            
-            # Get current time and 48 hours ago
-            now = datetime.now()
-            forty_eight_hours_ago = now - timedelta(hours=48)
-            
-            logger.info(f"Running automatic refund check at {now}")
-            
-            # ========== 1. Check for unassigned orders (after admin approval) ==========
-            # These are orders that have been approved by admin but no developer claimed within 48 hours
-            unassigned_orders = db.query(Order).filter(
-                Order.status == OrderStatus.APPROVED,
-                Order.approved_at != None,
-                Order.approved_at <= forty_eight_hours_ago,
-                Order.assigned_developer_id == None,
-                Order.refunded_at == None,
-                Order.payment_status == PaymentStatus.VERIFIED
-            ).all()
-            
-            for order in unassigned_orders:
-                try:
-                    logger.info(f"Processing refund for unclaimed order: {order.order_id}")
-                    
-                    # Process refund via Paystack
-                    paystack = PaystackService()
-                    success, result = paystack.refund_transaction(
-                        reference=order.payment_reference or order.order_id,
-                        amount=order.amount
-                    )
-                    
-                    if success:
-                        # Update order status
-                        order.status = OrderStatus.REFUNDED
-                        order.refunded_at = now
-                        order.refund_reason = "Automatic refund: No developer claimed within 48 hours"
-                        order.refund_metadata = result
-                        
-                        # Update transaction
-                        transaction = db.query(Transaction).filter(
-                            Transaction.reference == (order.payment_reference or order.order_id)
-                        ).first()
-                        
-                        if transaction:
-                            transaction.status = 'refunded'
-                            transaction.refund_data = result
-                        
-                        # Notify admin
-                        admin_msg = f"""⚠️ AUTOMATIC REFUND PROCESSED
-
-📦 Order ID: {order.order_id}
-💰 Amount Refunded: {DEFAULT_CURRENCY_SYMBOL}{order.amount:.2f}
-🔄 Reason: No developer claimed within 48 hours
-📅 Refund Time: {now.strftime('%Y-%m-%d %H:%M')}
-✅ Status: Refund successful
-
-The customer has been automatically refunded."""
-                        
-                        try:
-                            bot = Bot(token=TELEGRAM_TOKEN)
-                            bot.send_message(chat_id=SUPER_ADMIN_ID, text=admin_msg)
-                        except:
-                            pass
-                        
-                        # Notify user
-                        try:
-                            user = db.query(User).filter(User.id == order.user_id).first()
-                            if user and user.telegram_id:
-                                user_msg = f"""💸 Automatic Refund Processed
-
-📦 Order ID: {order.order_id}
-💰 Amount Refunded: {DEFAULT_CURRENCY_SYMBOL}{order.amount:.2f}
-🔄 Reason: No developer claimed your order within 48 hours
-📅 Refund Time: {now.strftime('%Y-%m-%d %H:%M')}
-✅ Status: Refund successful
-
-Your payment has been automatically refunded to your original payment method.
-
-Refunds usually take 3-5 business days to appear in your account.
-
-We apologize for the inconvenience. You can place a new order at any time."""
-                                
-                                bot.send_message(chat_id=user.telegram_id, text=user_msg)
-                        except:
-                            pass
-                        
-                        logger.info(f"Successfully refunded order {order.order_id}")
-                    else:
-                        logger.error(f"Failed to refund order {order.order_id}: {result}")
-                        
-                except Exception as e:
-                    logger.error(f"Error processing refund for order {order.order_id}: {e}")
-            
-            # ========== 2. Check for unapproved custom requests ==========
-            # Custom requests that haven't been approved by admin within 48 hours of deposit
-            # Try to find the correct enum value for pending status
-            try:
-                # First try to get the enum value
-                pending_status = RequestStatus.PENDING
-            except AttributeError:
-                try:
-                    pending_status = RequestStatus.PENDING_REVIEW
-                except AttributeError:
-                    try:
-                        pending_status = RequestStatus.REVIEW_PENDING
-                    except AttributeError:
-                        # If we can't find it, skip this check
-                        logger.warning("Could not find pending status enum value, skipping custom request refund check")
-                        pending_status = None
-            
-            if pending_status:
-                unapproved_requests = db.query(CustomRequest).filter(
-                    CustomRequest.status == pending_status,
-                    CustomRequest.deposit_paid_at != None,
-                    CustomRequest.deposit_paid_at <= forty_eight_hours_ago,
-                    CustomRequest.is_deposit_paid == True,
-                    CustomRequest.refunded_at == None
-                ).all()
-                
-                for request in unapproved_requests:
-                    try:
-                        logger.info(f"Processing refund for unapproved custom request: {request.request_id}")
-                        
-                        # Process refund for deposit
-                        deposit_amount = request.estimated_price * 0.2
-                        paystack = PaystackService()
-                        success, result = paystack.refund_transaction(
-                            reference=request.payment_reference,
-                            amount=deposit_amount
-                        )
-                        
-                        if success:
-                            # Update custom request
-                            request.status = RequestStatus.REFUNDED
-                            request.refunded_at = now
-                            request.refund_reason = "Automatic refund: Request not approved within 48 hours"
-                            request.refund_metadata = result
-                            
-                            # Update transaction
-                            transaction = db.query(Transaction).filter(
-                                Transaction.reference == request.payment_reference
-                            ).first()
-                            
-                            if transaction:
-                                transaction.status = 'refunded'
-                                transaction.refund_data = result
-                            
-                            # Notify admin
-                            admin_msg = f"""⚠️ CUSTOM REQUEST DEPOSIT REFUNDED
-
-📋 Request ID: {request.request_id}
-📝 Title: {request.title}
-💰 Deposit Refunded: {DEFAULT_CURRENCY_SYMBOL}{deposit_amount:.2f}
-🔄 Reason: Request not approved within 48 hours
-📅 Refund Time: {now.strftime('%Y-%m-%d %H:%M')}
-✅ Status: Refund successful
-
-Customer deposit has been automatically refunded."""
-                            
-                            try:
-                                bot = Bot(token=TELEGRAM_TOKEN)
-                                bot.send_message(chat_id=SUPER_ADMIN_ID, text=admin_msg)
-                            except:
-                                pass
-                            
-                            # Notify user
-                            try:
-                                user = db.query(User).filter(User.id == request.user_id).first()
-                                if user and user.telegram_id:
-                                    user_msg = f"""💸 Custom Request Deposit Refunded
-
-📋 Request ID: {request.request_id}
-📝 Title: {request.title}
-💰 Deposit Refunded: {DEFAULT_CURRENCY_SYMBOL}{deposit_amount:.2f}
-🔄 Reason: Your request was not approved within 48 hours
-📅 Refund Time: {now.strftime('%Y-%m-%d %H:%M')}
-✅ Status: Refund successful
-
-Your deposit has been automatically refunded to your original payment method.
-
-Refunds usually take 3-5 business days to appear in your account.
-
-You can submit a new request at any time."""
-                                    
-                                    bot.send_message(chat_id=user.telegram_id, text=user_msg)
-                            except:
-                                pass
-                            
-                            logger.info(f"Successfully refunded custom request {request.request_id}")
-                        else:
-                            logger.error(f"Failed to refund custom request {request.request_id}: {result}")
-                            
-                    except Exception as e:
-                        logger.error(f"Error processing refund for custom request {request.request_id}: {e}")
-            
-            # ========== 3. Check for abandoned orders (payment but no verification) ==========
-            # Orders that have payment reference but haven't been verified within 24 hours
-            twenty_four_hours_ago = now - timedelta(hours=24)
-            abandoned_orders = db.query(Order).filter(
-                Order.status == OrderStatus.PENDING_PAYMENT,
-                Order.payment_reference != None,
-                Order.created_at <= twenty_four_hours_ago,
-                Order.payment_status == PaymentStatus.PENDING
-            ).all()
-            
-            for order in abandoned_orders:
-                # Send reminder to user
-                try:
-                    user = db.query(User).filter(User.id == order.user_id).first()
-                    if user and user.telegram_id:
-                        reminder_msg = f"""⏰ Payment Reminder
-
-📦 Order ID: {order.order_id}
-💰 Amount: {DEFAULT_CURRENCY_SYMBOL}{order.amount:.2f}
-
-Your payment is still pending. Please complete your payment or your order will be cancelled in 24 hours.
-
-Use /verify {order.order_id} to check payment status."""
-                        
-                        bot = Bot(token=TELEGRAM_TOKEN)
-                        bot.send_message(chat_id=user.telegram_id, text=reminder_msg)
-                except:
-                    pass
-            
-            db.commit()
-            
-        except Exception as e:
-            logger.error(f"Error in automatic refund checker: {e}", exc_info=True)
-            try:
-                db.rollback()
-            except:
-                pass
-        finally:
-            try:
-                db.close()
-            except:
-                pass
-        
-        # Wait for 1 hour before next check
-        time.sleep(3600)
-
-
-def start_refund_checker():
-    """Start the automatic refund checker thread"""
-    global refund_checker_thread
+def start_refund_checker(application):
+    """Start the automatic refund scheduler on the application's event loop"""
+    from services.refund_scheduler import refund_scheduler
     
-    if refund_checker_thread and refund_checker_thread.is_alive():
-        logger.info("Refund checker already running")
-        return
-    
-    logger.info("Starting automatic refund checker...")
-    refund_checker_thread = threading.Thread(
-        target=process_automatic_refunds,
-        daemon=True,
-        name="RefundChecker"
-    )
-    refund_checker_thread.start()
-    logger.info("Automatic refund checker started successfully")
+    logger.info("Starting automatic refund scheduler...")
+    return refund_scheduler.start(application)
 
 
 async def manual_refund_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -691,8 +405,8 @@ async def manual_refund_command(update: Update, context: ContextTypes.DEFAULT_TY
                 f"**Are you sure you want to process this refund?**\n"
                 f"Reply with 'YES' to confirm or 'NO' to cancel.",
                 reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("✅ YES", callback_data=f"confirm_refund_{reference}")],
-                    [InlineKeyboardButton("❌ NO", callback_data="cancel_refund")]
+                    [InlineKeyboardButton("✅ YES", callback_data=callback_data("refund", "confirm", reference))],
+                    [InlineKeyboardButton("❌ NO", callback_data=callback_data("refund", "cancel"))]
                 ])
             )
             
@@ -719,16 +433,23 @@ async def confirm_refund_callback(update: Update, context: ContextTypes.DEFAULT_
         query = update.callback_query
         await query.answer()
         
-        if query.data == "cancel_refund":
+        # refund:confirm:<reference> / refund:cancel, or the older
+        # confirm_refund_<reference> / cancel_refund buttons
+        parsed = parse_callback_data(query.data)
+        action = parsed[1] if parsed else None
+        
+        if action == "cancel" or query.data == "cancel_refund":
             await query.edit_message_text("❌ Refund cancelled.")
             return
         
-        # Extract reference from callback data: confirm_refund_ORDER123
-        if not query.data.startswith('confirm_refund_'):
+        if action == "confirm" and parsed[2]:
+            reference = parsed[2][0]
+        elif query.data.startswith('confirm_refund_'):
+            reference = query.data.replace('confirm_refund_', '')
+        else:
             await query.edit_message_text("❌ Invalid refund request.")
             return
         
-        reference = query.data.replace('confirm_refund_', '')
         refund_data = context.user_data.get('pending_refund')
         
         if not refund_data or refund_data['reference'] != reference:
@@ -743,8 +464,6 @@ async def confirm_refund_callback(update: Update, context: ContextTypes.DEFAULT_
         # Process refund
         db = create_session()
         try:
-            paystack = PaystackService()
-            
             # Determine payment reference based on order type
             if order_type == "order":
                 order = db.query(Order).filter(Order.order_id == reference).first()
@@ -756,7 +475,7 @@ async def confirm_refund_callback(update: Update, context: ContextTypes.DEFAULT_
                 payment_reference = custom_request.payment_reference
             
             # Process refund via Paystack
-            success, result = paystack.refund_transaction(
+            success, result = await async_paystack.refund_transaction(
                 reference=payment_reference,
                 amount=amount
             )
@@ -786,12 +505,10 @@ async def confirm_refund_callback(update: Update, context: ContextTypes.DEFAULT_
                     transaction.status = 'refunded'
                     transaction.refund_data = result
                 
-                db.commit()
-                
                 # Get user for notification
                 user = db.query(User).filter(User.id == user_id).first()
                 
-                # Notify admin
+                # Notify admin and customer - queued with the refund, sent once it commits
                 admin_msg = f"""✅ MANUAL REFUND PROCESSED
 
 📋 Reference: {reference}
@@ -800,14 +517,10 @@ async def confirm_refund_callback(update: Update, context: ContextTypes.DEFAULT_
 🔄 Reason: {reason}
 📅 Refund Time: {datetime.now().strftime('%Y-%m-%d %H:%M')}
 ✅ Status: Refund successful"""
+                enqueue_admin(db, admin_msg)
                 
-                await send_admin_notification(admin_msg)
-                
-                # Notify user
                 if user and user.telegram_id:
-                    try:
-                        bot = Bot(token=TELEGRAM_TOKEN)
-                        user_msg = f"""💸 Refund Processed
+                    user_msg = f"""💸 Refund Processed
 
 📋 Reference: {reference}
 💰 Amount Refunded: {DEFAULT_CURRENCY_SYMBOL}{amount:.2f}
@@ -818,10 +531,9 @@ async def confirm_refund_callback(update: Update, context: ContextTypes.DEFAULT_
 Your refund has been processed and will be credited to your original payment method within 3-5 business days.
 
 Thank you for your understanding."""
-                        
-                        await bot.send_message(chat_id=user.telegram_id, text=user_msg)
-                    except:
-                        pass
+                    enqueue(db, user.telegram_id, user_msg)
+                
+                db.commit()
                 
                 await query.edit_message_text(
                     f"✅ Refund processed successfully!\n\n"
@@ -0,0 +1,195 @@
+"""
+Access checks - admin/developer roles cached per telegram_id
+"""
+import logging
+import threading
+import time
+from functools import wraps
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+
+from database.db import SessionLocal, create_session, run_sync
+from database.models import User
+from config import SUPER_ADMIN_ID, ROLE_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+ROLE_FIELDS = ('telegram_id', 'is_admin', 'is_developer')
+
+
+class Roles(NamedTuple):
+    is_admin: bool = False
+    is_developer: bool = False
+
+
+class RoleCache:
+    """Roles by telegram_id - unknown users are cached too, as having no roles"""
+
+    def __init__(self, ttl: float = ROLE_CACHE_TTL):
+        self.ttl = ttl
+        self._roles: Dict[str, Tuple[float, Roles]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self, telegram_ids: Optional[Set[str]] = None):
+        """Forget the given users, or everyone when no ids are given"""
+        with self._lock:
+            self._generation += 1
+            if telegram_ids is None:
+                self._roles.clear()
+            else:
+                for telegram_id in telegram_ids:
+                    self._roles.pop(str(telegram_id), None)
+
+    def _fresh(self, key: str, now: float) -> Optional[Roles]:
+        entry = self._roles.get(key)
+        if entry and now - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def get(self, telegram_id) -> Roles:
+        key = str(telegram_id)
+        now = time.monotonic()
+        with self._lock:
+            roles = self._fresh(key, now)
+            if roles is not None:
+                return roles
+            generation = self._generation
+
+        db = create_session()
+        try:
+            row = db.query(User.is_admin, User.is_developer).filter(User.telegram_id == key).first()
+        finally:
+            db.close()
+        roles = Roles(bool(row.is_admin), bool(row.is_developer)) if row else Roles()
+
+        with self._lock:
+            # Don't store a lookup that raced with a role change
+            if generation == self._generation:
+                self._roles[key] = (now, roles)
+        return roles
+
+    async def fetch(self, telegram_id) -> Roles:
+        """get() for handlers - hits return straight away, misses query on the DB pool"""
+        with self._lock:
+            roles = self._fresh(str(telegram_id), time.monotonic())
+        if roles is not None:
+            return roles
+        return await run_sync(self.get, telegram_id)
+
+
+role_cache = RoleCache()
+
+
+def is_super_admin(telegram_id) -> bool:
+    return str(telegram_id) == str(SUPER_ADMIN_ID)
+
+
+async def is_admin(telegram_id) -> bool:
+    """Cache hits answer straight away; a miss queries on the DB pool, never on the event loop"""
+    return is_super_admin(telegram_id) or (await role_cache.fetch(telegram_id)).is_admin
+
+
+async def is_developer(telegram_id) -> bool:
+    return (await role_cache.fetch(telegram_id)).is_developer
+
+
+# ---------- handler decorators ----------
+
+async def _deny(update, text: str):
+    try:
+        if update.callback_query:
+            await update.callback_query.answer()
+            await update.callback_query.edit_message_text(text)
+        elif update.effective_message:
+            await update.effective_message.reply_text(text)
+    except Exception as e:
+        logger.error(f"Error sending access denied message: {e}")
+
+
+def _requires(check, denied_text: str):
+    def decorator(handler):
+        @wraps(handler)
+        async def wrapper(update, context, *args, **kwargs):
+            user = update.effective_user
+            try:
+                allowed = user is not None and await check(user.id)
+            except Exception as e:
+                logger.error(f"Error checking access for {handler.__name__}: {e}", exc_info=True)
+                allowed = False
+            if not allowed:
+                await _deny(update, denied_text)
+                return None
+            return await handler(update, context, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def admin_only(handler):
+    """Run the handler for admins only; everyone else is told access is denied"""
+    return _requires(is_admin, "❌ Access denied.")(handler)
+
+
+def developer_only(handler):
+    """Run the handler for registered developers only"""
+    return _requires(is_developer, "❌ You are not a registered developer.")(handler)
+
+
+# ---------- cache invalidation ----------
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the old values on assignment so a demotion always invalidates the right user
+for _name in ROLE_FIELDS:
+    event.listen(getattr(User, _name), 'set', _keep_previous_value, active_history=True, retval=True)
+
+
+def _affected_ids(user: User, state_changed: bool) -> Set[str]:
+    attrs = inspect(user).attrs
+    if not state_changed and not any(attrs[name].history.has_changes() for name in ROLE_FIELDS):
+        return set()
+    ids = {user.telegram_id, *attrs.telegram_id.history.deleted}
+    return {str(telegram_id) for telegram_id in ids if telegram_id is not None}
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_roles_dirty(session, flush_context):
+    changed = set()
+    for obj in session.new:
+        if isinstance(obj, User):
+            changed |= _affected_ids(obj, True)
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            changed |= _affected_ids(obj, False)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed |= _affected_ids(obj, True)
+    if changed:
+        session.info.setdefault('roles_dirty', set()).update(changed)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _mark_bulk_roles_dirty(orm_execute_state):
+    # query(User).update()/.delete() could touch anyone - drop the whole cache
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, User):
+            orm_execute_state.session.info['roles_dirty_all'] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_roles(session):
+    if session.info.pop('roles_dirty_all', False):
+        session.info.pop('roles_dirty', None)
+        role_cache.invalidate()
+    elif 'roles_dirty' in session.info:
+        role_cache.invalidate(session.info.pop('roles_dirty'))
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_roles_dirty(session):
+    session.info.pop('roles_dirty', None)
+    session.info.pop('roles_dirty_all', None)
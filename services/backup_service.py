@@ -0,0 +1,61 @@
+"""
+Database backups on the bot's job queue - the snapshots themselves are database.backup
+
+schedule_backups() registers a repeating job every BACKUP_INTERVAL seconds,
+first due one interval after the newest snapshot, so frequent restarts
+don't skip backups. The copy runs in a worker thread: it reads the file a
+step at a time, so handlers keep writing, and it stays off the DB pool.
+Every run is logged and recorded in services.metrics (duration, bytes);
+admins can take one now with /backup.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from config import BACKUP_INTERVAL, BACKUP_DIR
+from database.backup import BackupResult, backup_database, list_backups, sqlite_path
+from services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "database_backup"
+MIN_FIRST_DELAY = 60  # Let startup settle before the first snapshot
+
+_running = asyncio.Lock()
+
+
+async def take_backup() -> BackupResult:
+    """One snapshot at a time; concurrent callers wait for the running one and then take their own"""
+    async with _running:
+        try:
+            result = await asyncio.to_thread(backup_database)
+        except Exception:
+            metrics.record_backup(None)
+            raise
+    metrics.record_backup(result)
+    return result
+
+
+async def backup_job(context):
+    """Job-queue callback"""
+    try:
+        await take_backup()
+    except Exception as e:
+        logger.error(f"Scheduled database backup failed: {e}", exc_info=True)
+
+
+def schedule_backups(application, interval: float = BACKUP_INTERVAL) -> Optional[object]:
+    """Add the repeating backup job; returns it, or None when backups are off"""
+    if not interval or sqlite_path() is None:
+        return None
+    if application.job_queue is None:
+        logger.warning("Database backups need the job queue: pip install 'python-telegram-bot[job-queue]'")
+        return None
+
+    newest = list_backups(BACKUP_DIR)
+    age = time.time() - os.path.getmtime(newest[0]) if newest else interval
+    first = max(MIN_FIRST_DELAY, interval - age)
+    logger.info(f"Database backups every {interval:.0f}s, next in {first:.0f}s")
+    return application.job_queue.run_repeating(backup_job, interval=interval, first=first, name=JOB_NAME)
@@ -1,9 +1,31 @@
+"""
+Software catalog - the BotCatalog service and the in-process catalog snapshot
+
+Browsing (categories, category pages, details, featured, buy options) is
+served from an immutable snapshot of the bots table with its category facets
+and featured list precomputed. Each screen is rendered once per currency and
+exchange-rate version. Any bot write rebuilds the snapshot on the next read.
+"""
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import event
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from database.db import SessionLocal, create_session, run_sync
 from database.models import Bot
-from typing import List, Optional, Dict
+from config import CATALOG_CACHE_TTL, DEFAULT_CURRENCY, PAYMENT_METHODS
 import logging
 
 logger = logging.getLogger(__name__)
 
+Page = Tuple[str, InlineKeyboardMarkup]
+
 class BotCatalog:
     def __init__(self, db_session):
         self.db = db_session
@@ -32,15 +54,7 @@ class BotCatalog:
     def get_categories(self) -> Dict[str, int]:
         """Get list of all categories with bot counts"""
         try:
-            categories = {}
-            bots = self.get_all_bots()
-            
-            for bot in bots:
-                if bot.category not in categories:
-                    categories[bot.category] = 0
-                categories[bot.category] += 1
-            
-            return categories
+            return dict(catalog_cache.get().categories)
         except Exception as e:
             logger.error(f"Error getting categories: {e}")
             return {}
@@ -109,6 +123,302 @@ class BotCatalog:
             self.db.rollback()
             return None
 
+# ========== CATALOG SNAPSHOT ==========
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    id: int
+    name: str
+    description: str
+    features: str
+    price: float  # DEFAULT_CURRENCY
+    category: Optional[str]
+    delivery_time: Optional[str]
+    is_available: bool
+    is_featured: bool
+    created_at: datetime
+
+    @classmethod
+    def from_bot(cls, bot: Bot) -> 'CatalogEntry':
+        return cls(
+            id=bot.id, name=bot.name, description=bot.description or '', features=bot.features or '',
+            price=bot.price or 0.0, category=bot.category, delivery_time=bot.delivery_time,
+            is_available=bool(bot.is_available), is_featured=bool(bot.is_featured),
+            created_at=bot.created_at or datetime.min,
+        )
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Every bot, with the facets the browse screens need"""
+    version: int
+    bots: Mapping[int, CatalogEntry]  # Unavailable bots too, so old detail links still open
+    categories: Tuple[Tuple[str, int], ...]  # (category, available bots), alphabetical
+    by_category: Mapping[str, Tuple[int, ...]]  # Available bot ids, by name
+    featured: Tuple[int, ...]  # Available featured bot ids, newest first
+    _views: Dict[str, 'CatalogView'] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def build(cls, bots: List[Bot], version: int) -> 'CatalogSnapshot':
+        entries = {bot.id: CatalogEntry.from_bot(bot) for bot in bots}
+        available = sorted((entry for entry in entries.values() if entry.is_available), key=lambda e: e.name)
+
+        by_category: Dict[str, List[int]] = {}
+        for entry in available:
+            if entry.category:
+                by_category.setdefault(entry.category, []).append(entry.id)
+        featured = sorted((entry for entry in available if entry.is_featured),
+                          key=lambda e: e.created_at, reverse=True)
+
+        return cls(
+            version=version,
+            bots=MappingProxyType(entries),
+            categories=tuple((category, len(ids)) for category, ids in sorted(by_category.items())),
+            by_category=MappingProxyType({category: tuple(ids) for category, ids in by_category.items()}),
+            featured=tuple(entry.id for entry in featured),
+        )
+
+    def view(self, currency: str) -> 'CatalogView':
+        """Screens in `currency`, re-rendered when the exchange rates change"""
+        from services.currency_service import currency_service
+
+        rates = currency_service.snapshot()
+        view = self._views.get(currency)
+        if view is None or view.rates.version != rates.version:
+            view = self._views[currency] = CatalogView(self, currency, rates)
+        return view
+
+
+class CatalogView:
+    """The browse screens of one snapshot for one currency, rendered on first use"""
+
+    def __init__(self, snapshot: CatalogSnapshot, currency: str, rates):
+        self.snapshot = snapshot
+        self.currency = currency
+        self.rates = rates
+        self._pages: Dict[tuple, Optional[Page]] = {}
+
+    def _cached(self, key: tuple, render) -> Optional[Page]:
+        if key not in self._pages:
+            self._pages[key] = render()
+        return self._pages[key]
+
+    def price(self, amount: float) -> str:
+        from services.currency_service import currency_service
+
+        text = f"${amount:.2f}"
+        if self.currency != DEFAULT_CURRENCY:
+            local = self.rates.convert(amount, DEFAULT_CURRENCY, self.currency)
+            text += f" (≈ {currency_service.format_currency(local, self.currency)})"
+        return text
+
+    def category_menu(self) -> Optional[Page]:
+        """Category list with counts; None when nothing is for sale"""
+        return self._cached(('menu',), self._render_category_menu)
+
+    def category_page(self, category: str) -> Optional[Page]:
+        return self._cached(('category', category), lambda: self._render_category_page(category))
+
+    def details(self, bot_id: int) -> Optional[Page]:
+        return self._cached(('details', bot_id), lambda: self._render_details(bot_id))
+
+    def buy_options(self, bot_id: int) -> Optional[Page]:
+        return self._cached(('buy', bot_id), lambda: self._render_buy_options(bot_id))
+
+    def featured(self) -> Optional[Page]:
+        return self._cached(('featured',), self._render_featured)
+
+    # ---------- rendering ----------
+
+    def _render_category_menu(self) -> Optional[Page]:
+        if not self.snapshot.categories:
+            return None
+        keyboard = [
+            [InlineKeyboardButton(f"📁 {category} ({count})", callback_data=f"category_{category}")]
+            for category, count in self.snapshot.categories
+        ]
+        keyboard.append([InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")])
+        return "🛒 BUY SOFTWARE\n\nSelect a category:", InlineKeyboardMarkup(keyboard)
+
+    def _render_category_page(self, category: str) -> Optional[Page]:
+        bots = [self.snapshot.bots[bot_id] for bot_id in self.snapshot.by_category.get(category, ())]
+        if not bots:
+            return None
+
+        text = f"🚀 Software in {category}\n\n"
+        for bot in bots:
+            text += f"{bot.name}\n"
+            text += f"💰 {self.price(bot.price)}\n"
+            text += f"🚀 {bot.delivery_time}\n\n"
+
+        keyboard = [
+            [InlineKeyboardButton(f"🚀 {bot.name[:20]} - ${bot.price:.2f}", callback_data=f"view_bot_{bot.id}")]
+            for bot in bots[:10]
+        ]
+        keyboard.append([
+            InlineKeyboardButton("⬅️ Back to Categories", callback_data="buy_bot"),
+            InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
+        ])
+        return text, InlineKeyboardMarkup(keyboard)
+
+    def _render_details(self, bot_id: int) -> Optional[Page]:
+        bot = self.snapshot.bots.get(bot_id)
+        if bot is None:
+            return None
+
+        text = f"""🚀 {bot.name}
+
+{bot.description}
+
+⚡ Features:
+{bot.features}
+
+💰 Price: {self.price(bot.price)}
+⏱️ Delivery: {bot.delivery_time}
+📂 Category: {bot.category}"""
+
+        keyboard = [
+            [InlineKeyboardButton("🛒 Buy Now", callback_data=f"buy_options_{bot.id}")],
+            [
+                InlineKeyboardButton("⬅️ Back to Category", callback_data=f"category_{bot.category}"),
+                InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
+            ]
+        ]
+        return text, InlineKeyboardMarkup(keyboard)
+
+    def _render_buy_options(self, bot_id: int) -> Optional[Page]:
+        bot = self.snapshot.bots.get(bot_id)
+        if bot is None:
+            return None
+
+        text = f"""🛒 Buy {bot.name}
+
+💰 Price: {self.price(bot.price)}
+⏱️ Delivery: {bot.delivery_time}
+
+Select a payment method:"""
+
+        keyboard = []
+        if PAYMENT_METHODS.get('paystack', {}).get('is_active', True):
+            keyboard.append([
+                InlineKeyboardButton("💳 Paystack (Card/Bank/USSD)", callback_data=f"paystack_bot_{bot.id}")
+            ])
+        if PAYMENT_METHODS.get('bank_transfer', {}).get('is_active', True):
+            keyboard.append([
+                InlineKeyboardButton("🏦 Bank Transfer", callback_data=f"bank_transfer_{bot.id}")
+            ])
+        keyboard.append([
+            InlineKeyboardButton("⬅️ Back to Software", callback_data=f"view_bot_{bot.id}"),
+            InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
+        ])
+        return text, InlineKeyboardMarkup(keyboard)
+
+    def _render_featured(self) -> Optional[Page]:
+        bots = [self.snapshot.bots[bot_id] for bot_id in self.snapshot.featured]
+        if not bots:
+            return None
+
+        text = "⭐ Featured Software\n\n"
+        for bot in bots:
+            text += f"{bot.name}\n"
+            text += f"💰 {self.price(bot.price)}\n"
+            text += f"📦 {bot.delivery_time}\n"
+            text += f"{bot.description[:100]}...\n\n"
+
+        keyboard = [
+            [InlineKeyboardButton(f"⭐ {bot.name[:20]} - ${bot.price:.2f}", callback_data=f"view_bot_{bot.id}")]
+            for bot in bots[:5]
+        ]
+        keyboard.append([
+            InlineKeyboardButton("🛒 Browse All Software", callback_data="buy_bot"),
+            InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
+        ])
+        return text, InlineKeyboardMarkup(keyboard)
+
+
+class CatalogCache:
+    """The current CatalogSnapshot, rebuilt after bot writes"""
+
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL):
+        self.ttl = ttl
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._versions = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def _fresh(self, now: float) -> Optional[CatalogSnapshot]:
+        if self._snapshot is not None and now - self._loaded_at < self.ttl:
+            return self._snapshot
+        return None
+
+    def get(self) -> CatalogSnapshot:
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._fresh(now)
+            if snapshot is not None:
+                return snapshot
+            generation = self._generation
+
+        db = create_session()
+        try:
+            snapshot = CatalogSnapshot.build(db.query(Bot).all(), next(self._versions))
+        finally:
+            db.close()
+
+        with self._lock:
+            # Don't publish a snapshot that raced with a bot write
+            if generation == self._generation:
+                self._snapshot, self._loaded_at = snapshot, now
+        logger.debug(f"Catalog snapshot v{snapshot.version}: {len(snapshot.bots)} bots")
+        return snapshot
+
+    async def fetch(self) -> CatalogSnapshot:
+        """get() for handlers - hits return straight away, misses load on the DB pool"""
+        with self._lock:
+            snapshot = self._fresh(time.monotonic())
+        if snapshot is not None:
+            return snapshot
+        return await run_sync(self.get)
+
+
+catalog_cache = CatalogCache()
+
+
+# ---------- cache invalidation ----------
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_catalog_dirty(session, flush_context):
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Bot):
+            session.info['catalog_dirty'] = True
+            return
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _mark_bulk_catalog_dirty(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, Bot):
+            orm_execute_state.session.info['catalog_dirty'] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_catalog(session):
+    if session.info.pop('catalog_dirty', False):
+        catalog_cache.invalidate()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_catalog_dirty(session):
+    session.info.pop('catalog_dirty', None)
+
+
 def initialize_sample_bots(db):
     """Initialize sample bots if database is empty"""
     try:
@@ -0,0 +1,309 @@
+"""
+Broadcast engine - concurrent, rate-limit-aware delivery of admin broadcasts
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+
+from database.db import create_session
+from database.models import BroadcastJob, BroadcastStatus, User
+from config import (
+    BROADCAST_GLOBAL_RATE, BROADCAST_PER_CHAT_INTERVAL, BROADCAST_CONCURRENCY,
+    BROADCAST_BATCH_SIZE, BROADCAST_MAX_RETRIES, BROADCAST_STATUS_INTERVAL
+)
+
+logger = logging.getLogger(__name__)
+
+# Broadcasts currently running in this process, keyed by BroadcastJob.id
+_running: Dict[int, asyncio.Task] = {}
+
+
+class TokenBucket:
+    """Async token bucket - `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Drain the bucket so nobody sends for `seconds` (used on RetryAfter)"""
+        self.tokens = -seconds * self.rate
+        self.updated = time.monotonic()
+
+
+class ChatRateLimiter:
+    """Global token bucket plus a minimum interval between sends to the same chat"""
+
+    def __init__(self, global_rate: float = BROADCAST_GLOBAL_RATE,
+                 per_chat_interval: float = BROADCAST_PER_CHAT_INTERVAL):
+        self.bucket = TokenBucket(global_rate)
+        self.per_chat_interval = per_chat_interval
+        self.last_sent: Dict[str, float] = {}
+
+    async def acquire(self, chat_id: str):
+        last = self.last_sent.get(chat_id)
+        if last is not None:
+            wait = self.per_chat_interval - (time.monotonic() - last)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        await self.bucket.acquire()
+        self.last_sent[chat_id] = time.monotonic()
+
+    def forget(self, chat_ids):
+        """Drop per-chat state once a batch is done so memory stays bounded"""
+        for chat_id in chat_ids:
+            self.last_sent.pop(chat_id, None)
+
+
+def create_broadcast(message: str, created_by, status_chat_id=None, status_message_id=None,
+                     parse_mode: str = 'Markdown') -> Optional[int]:
+    """Persist a new broadcast job and return its id"""
+    db = create_session()
+    try:
+        job = BroadcastJob(
+            message=message,
+            parse_mode=parse_mode,
+            status=BroadcastStatus.PENDING,
+            created_by=str(created_by),
+            status_chat_id=str(status_chat_id) if status_chat_id else None,
+            status_message_id=status_message_id,
+            total_users=db.query(func.count(User.id)).scalar() or 0
+        )
+        db.add(job)
+        db.commit()
+        return job.id
+    except Exception as e:
+        logger.error(f"Error creating broadcast: {e}", exc_info=True)
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
+
+def fetch_user_batch(after_id: int, limit: int = BROADCAST_BATCH_SIZE) -> List[Tuple[int, str]]:
+    """Keyset cursor over users - returns (id, telegram_id) with id > after_id"""
+    db = create_session()
+    try:
+        return [
+            (row.id, row.telegram_id)
+            for row in db.query(User.id, User.telegram_id)
+            .filter(User.id > after_id)
+            .order_by(User.id)
+            .limit(limit)
+        ]
+    finally:
+        db.close()
+
+
+def _load_job(job_id: int) -> Optional[dict]:
+    db = create_session()
+    try:
+        job = db.query(BroadcastJob).filter(BroadcastJob.id == job_id).first()
+        if not job:
+            return None
+        return {
+            'message': job.message,
+            'parse_mode': job.parse_mode,
+            'status': job.status,
+            'status_chat_id': job.status_chat_id,
+            'status_message_id': job.status_message_id,
+            'last_user_id': job.last_user_id or 0,
+            'total_users': job.total_users or 0,
+            'sent_count': job.sent_count or 0,
+            'failed_count': job.failed_count or 0,
+        }
+    finally:
+        db.close()
+
+
+def _save_progress(job_id: int, **fields):
+    db = create_session()
+    try:
+        db.query(BroadcastJob).filter(BroadcastJob.id == job_id).update(fields)
+        db.commit()
+    except Exception as e:
+        logger.error(f"Error saving broadcast {job_id} progress: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+async def send_with_retry(bot, limiter: ChatRateLimiter, chat_id: str, text: str,
+                          parse_mode: Optional[str] = None,
+                          max_retries: int = BROADCAST_MAX_RETRIES) -> bool:
+    """Send one message, honouring RetryAfter and retrying transient errors"""
+    for attempt in range(max_retries + 1):
+        await limiter.acquire(chat_id)
+        try:
+            await bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+            return True
+        except RetryAfter as e:
+            retry_after = float(e.retry_after)
+            logger.warning(f"Flood control hit, pausing broadcast for {retry_after}s")
+            limiter.bucket.pause(retry_after)
+            await asyncio.sleep(retry_after)
+        except (Forbidden, BadRequest) as e:
+            # Blocked bot, deleted account, bad chat id - retrying won't help
+            logger.debug(f"Broadcast to {chat_id} rejected: {e}")
+            return False
+        except (TimedOut, NetworkError) as e:
+            logger.debug(f"Transient error sending to {chat_id}: {e}")
+            await asyncio.sleep(min(2 ** attempt, 30))
+        except Exception as e:
+            logger.error(f"Failed to send broadcast to {chat_id}: {e}")
+            return False
+    return False
+
+
+def format_progress(state: dict, finished: bool = False) -> str:
+    done = state['sent_count'] + state['failed_count']
+    total = max(state['total_users'], done)
+    percent = (done / total * 100) if total else 100
+    title = "✅ *Broadcast Completed!*" if finished else "📤 *Broadcast in progress...*"
+    return (
+        f"{title}\n\n"
+        f"📤 Total Users: {total}\n"
+        f"✅ Successful: {state['sent_count']}\n"
+        f"❌ Failed: {state['failed_count']}\n"
+        f"📊 Progress: {percent:.0f}%"
+    )
+
+
+async def _edit_status(bot, state: dict, finished: bool = False):
+    if not state.get('status_chat_id') or not state.get('status_message_id'):
+        return
+    try:
+        reply_markup = None
+        if finished:
+            reply_markup = InlineKeyboardMarkup([
+                [InlineKeyboardButton("🏠 Admin Panel", callback_data="admin_panel")]
+            ])
+        await bot.edit_message_text(
+            chat_id=state['status_chat_id'],
+            message_id=state['status_message_id'],
+            text=format_progress(state, finished),
+            parse_mode='Markdown',
+            reply_markup=reply_markup
+        )
+    except BadRequest as e:
+        if 'not modified' not in str(e).lower():
+            logger.debug(f"Could not edit broadcast status: {e}")
+    except Exception as e:
+        logger.debug(f"Could not edit broadcast status: {e}")
+
+
+async def run_broadcast(bot, job_id: int, concurrency: int = BROADCAST_CONCURRENCY,
+                        batch_size: int = BROADCAST_BATCH_SIZE,
+                        limiter: Optional[ChatRateLimiter] = None) -> Optional[dict]:
+    """Deliver a broadcast job, resuming from its persisted cursor"""
+    state = _load_job(job_id)
+    if not state or state['status'] in (BroadcastStatus.COMPLETED, BroadcastStatus.CANCELLED):
+        return state
+
+    limiter = limiter or ChatRateLimiter()
+    semaphore = asyncio.Semaphore(concurrency)
+    text = f"📢 *Broadcast from Admin*\n\n{state['message']}"
+    parse_mode = state['parse_mode'] or None
+    last_status_edit = 0.0
+
+    _save_progress(job_id, status=BroadcastStatus.RUNNING, started_at=datetime.now())
+
+    async def deliver(chat_id):
+        async with semaphore:
+            return await send_with_retry(bot, limiter, chat_id, text, parse_mode)
+
+    try:
+        while True:
+            batch = await asyncio.to_thread(fetch_user_batch, state['last_user_id'], batch_size)
+            if not batch:
+                break
+
+            chat_ids = [telegram_id for _, telegram_id in batch]
+            results = await asyncio.gather(*(deliver(chat_id) for chat_id in chat_ids))
+            limiter.forget(chat_ids)
+
+            sent = sum(1 for ok in results if ok)
+            state['sent_count'] += sent
+            state['failed_count'] += len(results) - sent
+            state['last_user_id'] = batch[-1][0]
+
+            # Advance the cursor only after the whole batch is done so a restart
+            # never skips anyone (at worst a partial batch is re-sent)
+            _save_progress(
+                job_id,
+                last_user_id=state['last_user_id'],
+                sent_count=state['sent_count'],
+                failed_count=state['failed_count']
+            )
+
+            if time.monotonic() - last_status_edit >= BROADCAST_STATUS_INTERVAL:
+                last_status_edit = time.monotonic()
+                await _edit_status(bot, state)
+
+        _save_progress(job_id, status=BroadcastStatus.COMPLETED, completed_at=datetime.now())
+        await _edit_status(bot, state, finished=True)
+        logger.info(
+            f"Broadcast {job_id} completed: {state['sent_count']} sent, {state['failed_count']} failed"
+        )
+        return state
+
+    except asyncio.CancelledError:
+        # Shutdown - leave the job RUNNING so it resumes on next start
+        logger.info(f"Broadcast {job_id} interrupted at user {state['last_user_id']}")
+        raise
+    except Exception as e:
+        logger.error(f"Broadcast {job_id} failed: {e}", exc_info=True)
+        _save_progress(job_id, status=BroadcastStatus.FAILED, last_error=str(e)[:500])
+        return state
+
+
+def start_broadcast(application, job_id: int) -> asyncio.Task:
+    """Run a broadcast in the background on the application's shared bot"""
+    task = application.create_task(run_broadcast(application.bot, job_id))
+    _running[job_id] = task
+    task.add_done_callback(lambda _: _running.pop(job_id, None))
+    return task
+
+
+def is_broadcast_running() -> bool:
+    return bool(_running)
+
+
+async def resume_broadcasts(application):
+    """Restart broadcasts that were pending or interrupted by a restart"""
+    db = create_session()
+    try:
+        job_ids = [
+            job.id for job in db.query(BroadcastJob.id).filter(
+                BroadcastJob.status.in_([BroadcastStatus.PENDING, BroadcastStatus.RUNNING])
+            ).order_by(BroadcastJob.id)
+        ]
+    except Exception as e:
+        logger.error(f"Could not load unfinished broadcasts: {e}")
+        return
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        logger.info(f"Resuming broadcast {job_id}")
+        start_broadcast(application, job_id)
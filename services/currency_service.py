@@ -1,32 +1,91 @@
 """
 Currency conversion service for multi-currency support
+
+Rates live in immutable snapshots. Readers take the current snapshot
+reference and never lock or touch the network; a background task fetches
+fresh rates and swaps in a new snapshot. The last good snapshot is kept on
+disk so a restart converts with it straight away, and config.EXCHANGE_RATES
+is the snapshot of last resort. Every transaction records the version of
+the snapshot its amounts were converted with (see fx_snapshots).
 """
+import asyncio
+import hashlib
 import requests
 import logging
-from typing import Dict, Tuple, Optional
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional
+from datetime import datetime
 import json
 import os
+import threading
+
+from sqlalchemy import event
+
+from config import EXCHANGE_RATES, FX_REFRESH_INTERVAL, FX_SNAPSHOT_FILE
+from database.models import Transaction
 
 logger = logging.getLogger(__name__)
 
-class CurrencyService:
-    def __init__(self):
-        # Currency exchange rates (fallback rates)
-        # Updated with realistic rates
-        self.fallback_rates = {
-            'USD': 1.0,
-            'GHS': 12.0,  # 1 USD = 12 GHS (Ghanaian Cedi)
-            'NGN': 1500.0,  # 1 USD = 1500 NGN (Nigerian Naira)
-            'KES': 150.0,  # 1 USD = 150 KES (Kenyan Shilling)
-            'ZAR': 18.0,  # 1 USD = 18 ZAR (South African Rand)
-            'EUR': 0.92,  # 1 USD = 0.92 EUR
-            'GBP': 0.79,  # 1 USD = 0.79 GBP
-            'INR': 83.0,  # 1 USD = 83 INR (Indian Rupee)
-            'CAD': 1.35,  # 1 USD = 1.35 CAD
-            'AUD': 1.51,  # 1 USD = 1.51 AUD
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    """USD-based rates at one point in time - never mutated, replaced as a whole"""
+    rates: Mapping[str, float]
+    source: str
+    fetched_at: datetime
+    version: str = field(default='')
+
+    @classmethod
+    def create(cls, rates: Dict[str, float], source: str, fetched_at: Optional[datetime] = None) -> 'RateSnapshot':
+        rates = {code.upper(): float(rate) for code, rate in rates.items() if rate}
+        rates['USD'] = 1.0
+        fetched_at = fetched_at or datetime.now()
+        digest = hashlib.sha256(json.dumps(rates, sort_keys=True).encode()).hexdigest()[:8]
+        version = f"{source}-{digest}" if source == 'config' else f"{fetched_at:%Y%m%d%H%M}-{digest}"
+        return cls(MappingProxyType(rates), source, fetched_at, version)
+
+    def rate(self, currency: str) -> float:
+        return self.rates.get(currency.upper(), 1.0)
+
+    def from_usd(self, usd_amount: float, currency: str) -> float:
+        return usd_amount * self.rate(currency)
+
+    def to_usd(self, amount: float, currency: str) -> float:
+        rate = self.rate(currency)
+        return amount / rate if rate != 0 else amount
+
+    def convert(self, amount: float, source: str, target: str) -> float:
+        return self.from_usd(self.to_usd(amount, source), target)
+
+    def convert_many(self, usd_amounts: Iterable[float], currency: str) -> List[float]:
+        """Many USD amounts into one currency (a page of prices)"""
+        rate = self.rate(currency)
+        return [amount * rate for amount in usd_amounts]
+
+    def convert_to_currencies(self, usd_amount: float, currencies: Iterable[str]) -> Dict[str, float]:
+        """One USD amount into several currencies"""
+        return {currency: usd_amount * self.rate(currency) for currency in currencies}
+
+    def to_json(self) -> dict:
+        return {
+            'rates': dict(self.rates),
+            'source': self.source,
+            'fetched_at': self.fetched_at.isoformat(),
+            'version': self.version,
         }
-        
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'RateSnapshot':
+        snapshot = cls.create(data['rates'], data['source'], datetime.fromisoformat(data['fetched_at']))
+        if snapshot.version != data.get('version'):
+            raise ValueError("snapshot version doesn't match its rates")
+        return snapshot
+
+
+class CurrencyService:
+    def __init__(self, snapshot_file: str = FX_SNAPSHOT_FILE):
+        self.snapshot_file = snapshot_file
         self.currency_symbols = {
             'USD': '$',
             'GHS': 'GH₵',
@@ -38,103 +97,132 @@ class CurrencyService:
             'INR': '₹',
             'CAD': 'CA$',
             'AUD': 'A$',
+            'XOF': 'CFA',
+            'XAF': 'FCFA',
         }
-        
-        # Cache for exchange rates
-        self.rates_cache = {}
-        self.cache_expiry = datetime.now()
-        self.cache_duration = timedelta(hours=1)  # Cache rates for 1 hour
-    
-    def get_exchange_rates(self, force_refresh: bool = False) -> Dict[str, float]:
-        """Get exchange rates from API with fallback"""
-        
-        # Check cache first
-        if not force_refresh and self.rates_cache and datetime.now() < self.cache_expiry:
-            logger.info("Using cached exchange rates")
-            return self.rates_cache
-        
+
+        # Only refreshes take this lock; readers just read self._snapshot
+        self._refresh_lock = threading.Lock()
+        self._snapshot = self._load_snapshot()
+
+    # ---------- snapshots ----------
+
+    def snapshot(self) -> RateSnapshot:
+        """The current rates - hold on to it to convert a whole screen with the same rates"""
+        return self._snapshot
+
+    def _load_snapshot(self) -> RateSnapshot:
+        """Last good snapshot from disk, or the configured rates"""
+        try:
+            with open(self.snapshot_file) as f:
+                snapshot = RateSnapshot.from_json(json.load(f))
+            logger.info(f"Loaded exchange rates {snapshot.version} from {self.snapshot_file}")
+            return snapshot
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable exchange rate snapshot {self.snapshot_file}: {e}")
+        return RateSnapshot.create(EXCHANGE_RATES, 'config', datetime.now())
+
+    def _save_snapshot(self, snapshot: RateSnapshot):
+        # Write then rename, so a crash never leaves half a file behind
+        tmp_path = f"{self.snapshot_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot.to_json(), f)
+        os.replace(tmp_path, self.snapshot_file)
+
+    def publish(self, snapshot: RateSnapshot):
+        """Make `snapshot` current, keep it on disk and in fx_snapshots"""
+        self._snapshot = snapshot
         try:
-            # Try to get rates from Open Exchange Rates (free tier)
-            api_key = os.getenv('OPEN_EXCHANGE_RATES_API_KEY', '')
-            if api_key:
-                response = requests.get(
-                    f"https://openexchangerates.org/api/latest.json?app_id={api_key}&base=USD",
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    rates = data.get('rates', {})
-                    
-                    # Add USD rate
-                    rates['USD'] = 1.0
-                    
-                    # Update cache
-                    self.rates_cache = rates
-                    self.cache_expiry = datetime.now() + self.cache_duration
-                    
-                    logger.info(f"Successfully fetched exchange rates for {len(rates)} currencies")
-                    return rates
-                else:
-                    logger.warning(f"Failed to fetch exchange rates: {response.status_code}")
-            
-            # Try Fixer.io as backup
-            api_key = os.getenv('FIXER_API_KEY', '')
-            if api_key:
-                response = requests.get(
-                    f"http://data.fixer.io/api/latest?access_key={api_key}&base=EUR&symbols=USD,GHS,NGN,KES,ZAR,GBP,INR,CAD,AUD",
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('success'):
-                        # Convert from EUR base to USD base
-                        eur_rates = data.get('rates', {})
-                        usd_to_eur = 1 / eur_rates.get('USD', 0.92)
-                        
-                        rates = {'USD': 1.0}
-                        for currency, rate in eur_rates.items():
-                            if currency != 'USD':
-                                rates[currency] = rate * usd_to_eur
-                        
-                        # Update cache
-                        self.rates_cache = rates
-                        self.cache_expiry = datetime.now() + self.cache_duration
-                        
-                        logger.info(f"Successfully fetched exchange rates from Fixer for {len(rates)} currencies")
-                        return rates
-                    
+            self._save_snapshot(snapshot)
         except Exception as e:
-            logger.error(f"Error fetching exchange rates: {e}")
-        
-        # Fallback to hardcoded rates
-        logger.info("Using fallback exchange rates")
-        return self.fallback_rates
-    
+            logger.error(f"Could not save exchange rate snapshot: {e}")
+        record_snapshot(snapshot)
+
+    def refresh(self) -> Optional[RateSnapshot]:
+        """Fetch rates now (blocking) and publish them; None if every provider failed"""
+        with self._refresh_lock:
+            providers = (('openexchangerates', self._fetch_open_exchange_rates), ('fixer', self._fetch_fixer))
+            for source, fetch in providers:
+                try:
+                    rates = fetch()
+                except Exception as e:
+                    logger.error(f"Error fetching exchange rates: {e}")
+                    continue
+                if rates:
+                    # A currency the provider left out keeps its previous rate
+                    snapshot = RateSnapshot.create({**self._snapshot.rates, **rates}, source)
+                    self.publish(snapshot)
+                    logger.info(f"Exchange rates {snapshot.version} from {snapshot.source} "
+                                f"({len(snapshot.rates)} currencies)")
+                    return snapshot
+        return None
+
+    def _fetch_open_exchange_rates(self) -> Optional[Dict[str, float]]:
+        api_key = os.getenv('OPEN_EXCHANGE_RATES_API_KEY', '')
+        if not api_key:
+            return None
+        response = requests.get(
+            f"https://openexchangerates.org/api/latest.json?app_id={api_key}&base=USD",
+            timeout=10
+        )
+        if response.status_code != 200:
+            logger.warning(f"Failed to fetch exchange rates: {response.status_code}")
+            return None
+        return response.json().get('rates', {})
+
+    def _fetch_fixer(self) -> Optional[Dict[str, float]]:
+        api_key = os.getenv('FIXER_API_KEY', '')
+        if not api_key:
+            return None
+        symbols = ','.join(sorted(set(EXCHANGE_RATES) | set(self.currency_symbols)))
+        response = requests.get(
+            f"http://data.fixer.io/api/latest?access_key={api_key}&base=EUR&symbols={symbols}",
+            timeout=10
+        )
+        data = response.json() if response.status_code == 200 else {}
+        if not data.get('success'):
+            logger.warning(f"Failed to fetch exchange rates from Fixer: {response.status_code}")
+            return None
+        # Convert from EUR base to USD base
+        eur_rates = data.get('rates', {})
+        usd_to_eur = 1 / eur_rates.get('USD', 0.92)
+        return {currency: rate * usd_to_eur for currency, rate in eur_rates.items()}
+
+    # ---------- conversion ----------
+
+    def get_exchange_rates(self, force_refresh: bool = False) -> Mapping[str, float]:
+        """Current USD-based rates (force_refresh fetches them first - blocking)"""
+        if force_refresh:
+            self.refresh()
+        return self._snapshot.rates
+
     def convert_usd_to_currency(self, usd_amount: float, target_currency: str) -> float:
         """Convert USD to target currency"""
-        try:
-            from config import EXCHANGE_RATES
-            rate = EXCHANGE_RATES.get(target_currency.upper(), 1.0)
-            return usd_amount * rate
-        except:
-            return usd_amount
-    
+        return self._snapshot.from_usd(usd_amount, target_currency)
+
     def convert_currency_to_usd(self, amount: float, source_currency: str) -> float:
         """Convert from any currency to USD"""
-        try:
-            from config import EXCHANGE_RATES
-            rate = EXCHANGE_RATES.get(source_currency.upper(), 1.0)
-            return amount / rate if rate != 0 else amount
-        except:
-            return amount
-    
+        return self._snapshot.to_usd(amount, source_currency)
+
+    def convert(self, amount: float, source_currency: str, target_currency: str) -> float:
+        """Convert between any two currencies"""
+        return self._snapshot.convert(amount, source_currency, target_currency)
+
+    def convert_many(self, usd_amounts: Iterable[float], target_currency: str) -> List[float]:
+        """Convert many USD amounts with one snapshot (catalog and list screens)"""
+        return self._snapshot.convert_many(usd_amounts, target_currency)
+
+    def convert_to_currencies(self, usd_amount: float, currencies: Iterable[str]) -> Dict[str, float]:
+        """Convert one USD amount into several currencies with one snapshot"""
+        return self._snapshot.convert_to_currencies(usd_amount, currencies)
+
     def get_currency_symbol(self, currency_code: str) -> str:
         """Get symbol for currency code"""
         currency_code = currency_code.upper()
         return self.currency_symbols.get(currency_code, '$')
-    
+
     def get_country_currency(self, country_code: str) -> str:
         """Get currency for country code"""
         country_currencies = {
@@ -150,11 +238,11 @@ class CurrencyService:
             'DE': 'EUR', 'FR': 'EUR', 'IT': 'EUR', 'ES': 'EUR', 'NL': 'EUR',
         }
         return country_currencies.get(country_code.upper(), 'USD')
-    
+
     def format_currency(self, amount: float, currency_code: str) -> str:
         """Format amount with currency symbol"""
         symbol = self.get_currency_symbol(currency_code)
-        
+
         if currency_code == 'GHS':
             return f"GH₵{amount:,.2f}"
         elif currency_code == 'NGN':
@@ -178,4 +266,101 @@ class CurrencyService:
 
 
 # Global instance
-currency_service = CurrencyService()
\ No newline at end of file
+currency_service = CurrencyService()
+
+
+# ========== USER CURRENCY ==========
+
+# user_data key holding the user's display currency
+USER_CURRENCY_KEY = 'currency'
+
+
+def lookup_user_currency(telegram_id) -> str:
+    from config import DEFAULT_CURRENCY
+    from database.db import create_session
+    from database.models import User
+
+    db = create_session()
+    try:
+        row = db.query(User.currency).filter(User.telegram_id == str(telegram_id)).first()
+    finally:
+        db.close()
+    return (row.currency if row else None) or DEFAULT_CURRENCY
+
+
+async def user_currency(context, telegram_id) -> str:
+    """The user's display currency - looked up once, then kept in user_data"""
+    currency = context.user_data.get(USER_CURRENCY_KEY)
+    if currency is None:
+        from database.db import run_sync
+        currency = context.user_data[USER_CURRENCY_KEY] = await run_sync(lookup_user_currency, telegram_id)
+    return currency
+
+
+# ========== AUDIT TRAIL ==========
+
+def record_snapshot(snapshot: RateSnapshot):
+    """Keep the rates behind a version in fx_snapshots (no-op if already there)"""
+    from database.db import create_session
+    from database.models import FxSnapshot
+
+    db = create_session()
+    try:
+        if not db.query(FxSnapshot.id).filter(FxSnapshot.version == snapshot.version).first():
+            db.add(FxSnapshot(
+                version=snapshot.version,
+                source=snapshot.source,
+                rates=dict(snapshot.rates),
+                fetched_at=snapshot.fetched_at
+            ))
+            db.commit()
+    except Exception as e:
+        logger.error(f"Could not record exchange rate snapshot {snapshot.version}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+@event.listens_for(Transaction, 'before_insert')
+def _stamp_fx_version(mapper, connection, transaction):
+    if transaction.fx_version is None:
+        transaction.fx_version = currency_service.snapshot().version
+
+
+# ========== BACKGROUND REFRESH ==========
+
+class RateRefresher:
+    """Refreshes the rates every FX_REFRESH_INTERVAL seconds on the bot's event loop"""
+
+    def __init__(self, service: CurrencyService = currency_service, interval: float = FX_REFRESH_INTERVAL):
+        self.service = service
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self, application):
+        if self.task and not self.task.done():
+            return self.task
+        self.task = application.create_task(self.run())
+        return self.task
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self):
+        # The snapshot we started with may be the one transactions get stamped with
+        await asyncio.to_thread(record_snapshot, self.service.snapshot())
+        while True:
+            age = (datetime.now() - self.service.snapshot().fetched_at).total_seconds()
+            if self.service.snapshot().source == 'config' or age >= self.interval:
+                # The fetch uses blocking requests - keep it off the loop and off the DB pool
+                await asyncio.to_thread(self.service.refresh)
+                age = (datetime.now() - self.service.snapshot().fetched_at).total_seconds()
+            await asyncio.sleep(max(60.0, self.interval - age))
+
+
+rate_refresher = RateRefresher()
@@ -218,9 +218,8 @@ class DeveloperService:
             if developer_notes:
                 order.developer_notes = developer_notes
             
-            # Update developer
+            # Update developer (completed orders are counted by database.developer_stats)
             developer.is_available = True
-            developer.completed_orders += 1
             
             self.db.commit()
             logger.info(f"Order {order_id} completed by developer {developer.developer_id}")
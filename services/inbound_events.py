@@ -0,0 +1,376 @@
+"""
+Webhook inbox - Paystack events are stored on arrival and applied later
+
+The endpoint only checks the signature, inserts the raw body into
+`inbound_events` under the event's key and answers. Paystack retries collide
+on the unique key and are dropped (recent keys without even a query), and a
+burst of deliveries is stored with one commit. One consumer applies pending events in arrival order, a batch per transaction,
+and queues the admin notifications in the outbox within that transaction.
+
+    python -m services.inbound_events --status
+    python -m services.inbound_events --import events.jsonl --apply
+    python -m services.inbound_events --retry-failed --apply
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from database.db import create_session, run_sync
+from database.models import InboundEvent, InboundEventStatus
+from services.outbox import enqueue_admin
+from config import INBOUND_BATCH_SIZE, INBOUND_MAX_ATTEMPTS, INBOUND_POLL_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+def paystack_event_key(data: dict, body: bytes) -> str:
+    """Paystack resends the same payload on retry: the event plus its transaction id (or reference) identify it"""
+    payment_data = data.get('data') or {}
+    identity = payment_data.get('id') or payment_data.get('reference')
+    if identity is None:
+        identity = hashlib.sha256(body).hexdigest()
+    return f"paystack:{data.get('event')}:{identity}"
+
+
+class _RecentKeys:
+    """The last `size` event keys stored, so retries are answered without a round trip"""
+
+    def __init__(self, size: int = 10000):
+        self.size = size
+        self._keys: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._keys
+
+    def add(self, key: str):
+        with self._lock:
+            self._keys[key] = None
+            if len(self._keys) > self.size:
+                self._keys.popitem(last=False)
+
+
+_recent_keys = _RecentKeys()
+
+
+# ========== INBOX ==========
+
+def _new_event(source: str, event_key: str, data: dict, body: bytes) -> InboundEvent:
+    return InboundEvent(
+        event_key=event_key,
+        source=source,
+        event_type=data.get('event'),
+        reference=(data.get('data') or {}).get('reference'),
+        payload=body.decode('utf-8'),
+        status=InboundEventStatus.PENDING
+    )
+
+
+def record_event(source: str, event_key: str, data: dict, body: bytes) -> bool:
+    """Store a verified event; False if it was already stored (a retry)"""
+    if event_key in _recent_keys:
+        return False
+
+    db = create_session()
+    try:
+        db.add(_new_event(source, event_key, data, body))
+        db.commit()
+        stored = True
+    except IntegrityError:
+        db.rollback()
+        stored = False
+    finally:
+        db.close()
+
+    _recent_keys.add(event_key)
+    return stored
+
+
+def record_events(source: str, events: List[Tuple[str, dict, bytes]]) -> List[bool]:
+    """record_event() for many (event_key, data, body) at once, in one transaction"""
+    stored = []
+    batch = {}
+    for event_key, data, body in events:
+        is_new = event_key not in _recent_keys and event_key not in batch
+        if is_new:
+            batch[event_key] = (data, body)
+        stored.append(is_new)
+    if not batch:
+        return stored
+
+    db = create_session()
+    try:
+        existing = {
+            event_key for (event_key,) in
+            db.query(InboundEvent.event_key).filter(InboundEvent.event_key.in_(list(batch)))
+        }
+        db.add_all([
+            _new_event(source, event_key, data, body)
+            for event_key, (data, body) in batch.items() if event_key not in existing
+        ])
+        db.commit()
+    except IntegrityError:
+        # Another process stored one of them in the meantime - settle them one at a time
+        db.rollback()
+        db.close()
+        results = {event_key: record_event(source, event_key, data, body) for event_key, (data, body) in batch.items()}
+        return [is_new and results[event_key] for is_new, (event_key, _, _) in zip(stored, events)]
+    finally:
+        db.close()
+
+    for event_key in batch:
+        _recent_keys.add(event_key)
+    return [is_new and event_key not in existing for is_new, (event_key, _, _) in zip(stored, events)]
+
+
+def _finish(db, events: List[InboundEvent], status: InboundEventStatus, error: Optional[str] = None):
+    now = datetime.now()
+    for event in events:
+        event.attempts = (event.attempts or 0) + 1
+        event.last_error = error
+        if status == InboundEventStatus.PROCESSED:
+            event.status = status
+            event.processed_at = now
+        elif event.attempts >= INBOUND_MAX_ATTEMPTS:
+            event.status = InboundEventStatus.FAILED
+
+
+def _apply_one(event_id: int):
+    """Apply one event in its own transaction, recording the failure if it can't be applied"""
+    from services.paystack_webhook import apply_events
+
+    db = create_session()
+    try:
+        event = db.get(InboundEvent, event_id)
+        if event is None or event.status != InboundEventStatus.PENDING:
+            return
+        try:
+            for text in apply_events(db, [json.loads(event.payload)]):
+                enqueue_admin(db, text)
+            _finish(db, [event], InboundEventStatus.PROCESSED)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Inbound event {event_id} failed: {e}", exc_info=True)
+            db.rollback()
+            event = db.get(InboundEvent, event_id)
+            _finish(db, [event], InboundEventStatus.FAILED, str(e))
+            db.commit()
+    finally:
+        db.close()
+
+
+def process_pending(limit: int = INBOUND_BATCH_SIZE) -> int:
+    """Apply up to `limit` pending events in arrival order; returns the number handled"""
+    from services.paystack_webhook import apply_events
+
+    db = create_session()
+    try:
+        events = db.query(InboundEvent).filter(
+            InboundEvent.status == InboundEventStatus.PENDING
+        ).order_by(InboundEvent.id).limit(limit).all()
+        if not events:
+            return 0
+
+        try:
+            for text in apply_events(db, [json.loads(event.payload) for event in events]):
+                enqueue_admin(db, text)
+            _finish(db, events, InboundEventStatus.PROCESSED)
+            db.commit()
+            return len(events)
+        except Exception as e:
+            logger.warning(f"Inbound batch of {len(events)} failed ({e}), applying one by one")
+            db.rollback()
+            event_ids = [event.id for event in events]
+    finally:
+        db.close()
+
+    for event_id in event_ids:
+        _apply_one(event_id)
+    return len(event_ids)
+
+
+def requeue(event_keys: Optional[Set[str]] = None, failed: bool = False) -> int:
+    """Put events back to PENDING: the given keys, and/or every FAILED event"""
+    db = create_session()
+    try:
+        query = db.query(InboundEvent)
+        if event_keys and failed:
+            query = query.filter(
+                (InboundEvent.event_key.in_(event_keys)) | (InboundEvent.status == InboundEventStatus.FAILED)
+            )
+        elif event_keys:
+            query = query.filter(InboundEvent.event_key.in_(event_keys))
+        elif failed:
+            query = query.filter(InboundEvent.status == InboundEventStatus.FAILED)
+        else:
+            return 0
+        count = query.update({
+            InboundEvent.status: InboundEventStatus.PENDING,
+            InboundEvent.attempts: 0,
+            InboundEvent.last_error: None,
+        }, synchronize_session=False)
+        db.commit()
+        return count
+    finally:
+        db.close()
+
+
+# ========== CONSUMER ==========
+
+class InboundEventConsumer:
+    """Applies stored events on the bot's event loop - run exactly one per database"""
+
+    def __init__(self, batch_size: int = INBOUND_BATCH_SIZE, poll_interval: float = INBOUND_POLL_INTERVAL):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.task: Optional[asyncio.Task] = None
+        self.totals = {'received': 0, 'duplicates': 0, 'processed': 0}
+        self._wake: Optional[asyncio.Event] = None
+        self._pending_writes: list = []
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.task and not self.task.done():
+            return self.task
+        self._wake = asyncio.Event()
+        self.task = asyncio.get_running_loop().create_task(self.run())
+        return self.task
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def record_paystack(self, data: dict, body: bytes) -> bool:
+        """Store a verified Paystack event and wake the consumer; False for a retry
+
+        Events arriving while a write is in flight are stored together in the
+        next one, so a burst costs a few commits instead of one per request.
+        """
+        event_key = paystack_event_key(data, body)
+        if event_key in _recent_keys:
+            self.totals['duplicates'] += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_writes.append((event_key, data, body, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+        stored = await future
+
+        if stored:
+            self.totals['received'] += 1
+            if self._wake:
+                self._wake.set()
+        else:
+            self.totals['duplicates'] += 1
+        return stored
+
+    async def _write_pending(self):
+        while self._pending_writes:
+            batch, self._pending_writes = self._pending_writes, []
+            try:
+                results = await run_sync(record_events, 'paystack', [item[:3] for item in batch])
+            except Exception as e:
+                for *_, future in batch:
+                    future.set_exception(e)
+                continue
+            for (*_, future), stored in zip(batch, results):
+                future.set_result(stored)
+
+    async def run(self):
+        logger.info("📥 Inbound event consumer started")
+        while True:
+            self._wake.clear()
+            try:
+                handled = await run_sync(process_pending, self.batch_size)
+            except Exception as e:
+                logger.error(f"Error processing inbound events: {e}", exc_info=True)
+                handled = 0
+            self.totals['processed'] += handled
+
+            if handled >= self.batch_size:
+                continue  # more may be waiting
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+inbound_consumer = InboundEventConsumer()
+
+
+# ========== REPLAY TOOL ==========
+
+def _import_events(path: str) -> Tuple[int, int]:
+    """Store the Paystack payloads in a JSONL file (one webhook body per line)"""
+    stored = duplicates = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            body = line.strip()
+            if not body:
+                continue
+            data = json.loads(body)
+            if record_event('paystack', paystack_event_key(data, body), data, body):
+                stored += 1
+            else:
+                duplicates += 1
+    return stored, duplicates
+
+
+def _print_status():
+    from sqlalchemy import func
+
+    db = create_session()
+    try:
+        counts = dict(db.query(InboundEvent.status, func.count(InboundEvent.id)).group_by(InboundEvent.status).all())
+        for status in InboundEventStatus:
+            print(f"   {status.value:<10} {counts.get(status, 0)}")
+        for event in db.query(InboundEvent).filter(
+            InboundEvent.status == InboundEventStatus.FAILED
+        ).order_by(InboundEvent.id.desc()).limit(10):
+            print(f"   ❌ {event.event_key} ({event.attempts} attempts): {event.last_error}")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect, import and replay stored webhook events")
+    parser.add_argument('--status', action='store_true', help="event counts and the latest failures")
+    parser.add_argument('--import', dest='import_file', metavar='FILE', help="store Paystack bodies from a JSONL file")
+    parser.add_argument('--retry-failed', action='store_true', help="put FAILED events back in the queue")
+    parser.add_argument('--reprocess', nargs='+', metavar='EVENT_KEY', help="apply these events again")
+    parser.add_argument('--apply', action='store_true', help="apply every pending event now")
+    args = parser.parse_args()
+
+    from database.db import engine
+
+    InboundEvent.__table__.create(bind=engine, checkfirst=True)
+    if args.import_file:
+        stored, duplicates = _import_events(args.import_file)
+        print(f"📥 Stored {stored} events, skipped {duplicates} duplicates")
+    if args.retry_failed or args.reprocess:
+        print(f"🔄 Requeued {requeue(set(args.reprocess or ()), failed=args.retry_failed)} events")
+    if args.apply:
+        total = 0
+        while True:
+            handled = process_pending()
+            if not handled:
+                break
+            total += handled
+        print(f"✅ Applied {total} events")
+    if args.status or not (args.import_file or args.retry_failed or args.reprocess or args.apply):
+        _print_status()
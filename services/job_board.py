@@ -0,0 +1,165 @@
+"""
+Public job board - keyset-paginated pages rendered once and served from cache
+"""
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, event, inspect
+from sqlalchemy.orm import joinedload
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from database.db import SessionLocal, create_session, run_sync
+from database.models import Job, JobStatus
+from utils.pagination import nav_row, paginate
+from config import JOB_BOARD_PAGE_SIZE, JOB_BOARD_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+BOARD_PREFIX = "job_board"
+
+Page = Tuple[str, InlineKeyboardMarkup]
+
+
+def _on_board():
+    return and_(Job.is_public == True, Job.status != JobStatus.CANCELLED)
+
+
+def render_page(db, token: Optional[str] = None, page_size: int = JOB_BOARD_PAGE_SIZE) -> Page:
+    """Build the board text and keyboard for the page addressed by `token`"""
+    query = db.query(Job).options(joinedload(Job.user)).filter(_on_board())
+    page = paginate(query, Job, token, page_size)
+    jobs = page.items
+
+    if not jobs:
+        return (
+            "📭 No jobs available at the moment.\n\n"
+            "Be the first to post a job!",
+            InlineKeyboardMarkup([
+                [InlineKeyboardButton("📝 Post a Job", callback_data="post_job")],
+                [InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")]
+            ])
+        )
+
+    text = "📋 <b>Available Jobs</b>\n\n"
+    for job in jobs:
+        poster_name = job.user.first_name if job.user else "Anonymous"
+        text += (
+            f"🔹 <b>{job.title}</b>\n"
+            f"   👤 {poster_name}\n"
+            f"   💰 Budget: ${job.budget:.2f}\n"
+            f"   ⏰ Timeline: {job.expected_timeline}\n\n"
+        )
+
+    # Build keyboard with each job as a button
+    keyboard = [
+        [InlineKeyboardButton(f"💰 ${job.budget:.0f} - {job.title[:30]}", callback_data=f"view_job_{job.job_id}")]
+        for job in jobs
+    ]
+
+    navigation = nav_row(page, BOARD_PREFIX)
+    if navigation:
+        keyboard.append(navigation)
+
+    keyboard.append([
+        InlineKeyboardButton("📝 Post a Job", callback_data="post_job"),
+        InlineKeyboardButton("🏠 Main Menu", callback_data="menu_main")
+    ])
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+class JobBoardCache:
+    """Rendered board pages keyed by cursor token"""
+
+    def __init__(self, ttl: float = JOB_BOARD_CACHE_TTL, page_size: int = JOB_BOARD_PAGE_SIZE):
+        self.ttl = ttl
+        self.page_size = page_size
+        self._pages: Dict[Optional[str], Tuple[float, Page]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._pages.clear()
+
+    def _fresh(self, token: Optional[str], now: float) -> Optional[Page]:
+        entry = self._pages.get(token)
+        if entry and now - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def get_page(self, token: Optional[str] = None) -> Page:
+        now = time.monotonic()
+        with self._lock:
+            page = self._fresh(token, now)
+            if page is not None:
+                return page
+            generation = self._generation
+
+        db = create_session()
+        try:
+            page = render_page(db, token, self.page_size)
+        finally:
+            db.close()
+
+        with self._lock:
+            if generation == self._generation:
+                self._pages[token] = (now, page)
+        return page
+
+    async def fetch_page(self, token: Optional[str] = None) -> Page:
+        """get_page for handlers - hits return straight away, misses render on the DB pool"""
+        with self._lock:
+            page = self._fresh(token, time.monotonic())
+        if page is not None:
+            return page
+        return await run_sync(self.get_page, token)
+
+
+job_board_cache = JobBoardCache()
+
+
+# ---------- cache invalidation ----------
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the old visibility on assignment so unpublishing is always noticed
+event.listen(Job.is_public, 'set', _keep_previous_value, active_history=True, retval=True)
+
+
+def _was_or_is_public(job: Job) -> bool:
+    history = inspect(job).attrs.is_public.history
+    return bool(job.is_public) or any(history.deleted)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_board_dirty(session, flush_context):
+    # A job going public, being edited while public, or leaving the board
+    dirty = [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    for obj in list(session.new) + dirty + list(session.deleted):
+        if isinstance(obj, Job) and _was_or_is_public(obj):
+            session.info['job_board_dirty'] = True
+            return
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _mark_bulk_board_dirty(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, Job):
+            orm_execute_state.session.info['job_board_dirty'] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_board(session):
+    if session.info.pop('job_board_dirty', False):
+        job_board_cache.invalidate()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_board_dirty(session):
+    session.info.pop('job_board_dirty', None)
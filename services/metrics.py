@@ -0,0 +1,400 @@
+"""
+Instrumentation - where handler time goes: the handler itself, its SQL and its Bot API calls
+
+instrument_handlers() wraps the callback of every registered handler
+(conversation steps and callback-router targets included). Each handled
+update records:
+
+- handler latency, as a histogram per handler
+- the SQL statements it issued, and the time they took, counted by the
+  engine's cursor events (run_sync carries the update's context onto the DB
+  threads)
+- its Bot API calls, timed by InstrumentedRequest, which also times every
+  other call the bot makes, per API method
+
+Update queue depth and the updates running or waiting for their chat are
+read when the metrics are collected.
+
+Everything is exposed in Prometheus text format on
+http://METRICS_HOST:METRICS_PORT/metrics, and summarised for admins by /metrics.
+
+    curl -s http://127.0.0.1:9464/metrics
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import chain
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from telegram.ext import ConversationHandler
+from telegram.request import HTTPXRequest
+
+from database.db import engine
+from utils.callback_router import CallbackRouter
+from config import METRICS_HOST, METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+OTHER = "other"  # SQL issued outside a handled update (background services)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the largest bound if beyond it)"""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+@dataclass
+class UpdateStats:
+    """What one handled update cost, filled in while its handler runs"""
+    handler: str
+    statements: int = 0
+    sql_seconds: float = 0.0
+    api_calls: int = 0
+    api_seconds: float = 0.0
+    done: bool = False
+
+
+@dataclass
+class HandlerTotals:
+    latency: Histogram
+    errors: int = 0
+    statements: int = 0
+    sql_seconds: float = 0.0
+    api_calls: int = 0
+    api_seconds: float = 0.0
+
+
+_current: contextvars.ContextVar[Optional[UpdateStats]] = contextvars.ContextVar('update_stats', default=None)
+
+
+class Metrics:
+    """Process-wide counters; updated from the event loop and the DB threads"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.application = None  # Set by instrument_handlers, for the queue gauges
+        self._lock = threading.Lock()
+        self.handlers: Dict[str, HandlerTotals] = {}
+        self.update_statements = Histogram(STATEMENT_BUCKETS)
+        self.other_statements = 0
+        self.other_sql_seconds = 0.0
+        self.api_latency: Dict[str, Histogram] = {}
+        self.api_requests: Dict[Tuple[str, str], int] = {}
+        self.backups: Dict[str, int] = {}  # Snapshots taken, by "ok"/"failed"
+        self.last_backup = None  # database.backup.BackupResult of the last good one
+        self.last_backup_at = 0.0
+
+    def record_update(self, stats: UpdateStats, seconds: float, failed: bool):
+        with self._lock:
+            totals = self.handlers.get(stats.handler)
+            if totals is None:
+                totals = self.handlers[stats.handler] = HandlerTotals(Histogram())
+            totals.latency.observe(seconds)
+            totals.errors += failed
+            totals.statements += stats.statements
+            totals.sql_seconds += stats.sql_seconds
+            totals.api_calls += stats.api_calls
+            totals.api_seconds += stats.api_seconds
+            self.update_statements.observe(stats.statements)
+
+    def record_sql(self, seconds: float):
+        stats = _current.get()
+        if stats is not None and not stats.done:
+            stats.statements += 1
+            stats.sql_seconds += seconds
+            return
+        with self._lock:
+            self.other_statements += 1
+            self.other_sql_seconds += seconds
+
+    def record_api(self, method: str, status: str, seconds: float):
+        stats = _current.get()
+        if stats is not None and not stats.done:
+            stats.api_calls += 1
+            stats.api_seconds += seconds
+        with self._lock:
+            histogram = self.api_latency.get(method)
+            if histogram is None:
+                histogram = self.api_latency[method] = Histogram()
+            histogram.observe(seconds)
+            self.api_requests[(method, status)] = self.api_requests.get((method, status), 0) + 1
+
+    def record_backup(self, result=None):
+        """A finished database snapshot (None when it failed)"""
+        with self._lock:
+            status = "failed" if result is None else "ok"
+            self.backups[status] = self.backups.get(status, 0) + 1
+            if result is not None:
+                self.last_backup = result
+                self.last_backup_at = time.time()
+
+    def queue_gauges(self) -> Dict[str, int]:
+        application = self.application
+        if application is None:
+            return {}
+        gauges = {'queued': application.update_queue.qsize()}
+        processor = application.update_processor
+        gauges['max_concurrent'] = processor.max_concurrent_updates
+        if hasattr(processor, 'queue_depth'):
+            gauges.update(processor.queue_depth())
+        return gauges
+
+    def slowest_handlers(self, limit: int = 10) -> List[Tuple[str, HandlerTotals]]:
+        """Handlers by total time spent in them"""
+        with self._lock:
+            ranked = sorted(self.handlers.items(), key=lambda item: item[1].latency.sum, reverse=True)
+        return ranked[:limit]
+
+    # ---------- Prometheus text format ----------
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def header(name, kind, text):
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, labels: str, h: Histogram):
+            seen = 0
+            for bound, count in zip(h.buckets, h.counts):
+                seen += count
+                lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {seen}')
+            lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="+Inf"}} {h.count}')
+            lines.append(f"{name}_sum{{{labels}}} {h.sum:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+        with self._lock:
+            handlers = sorted(self.handlers.items())
+            header("bot_handler_duration_seconds", "histogram", "Time to handle one update, per handler")
+            for name, totals in handlers:
+                histogram("bot_handler_duration_seconds", f'handler="{name}"', totals.latency)
+            for metric, field, text in (
+                ("bot_handler_errors_total", "errors", "Updates whose handler raised"),
+                ("bot_handler_sql_statements_total", "statements", "SQL statements issued by the handler"),
+                ("bot_handler_sql_seconds_total", "sql_seconds", "Time spent in those statements"),
+                ("bot_handler_api_calls_total", "api_calls", "Bot API calls made by the handler"),
+                ("bot_handler_api_seconds_total", "api_seconds", "Time spent waiting on those calls"),
+            ):
+                header(metric, "counter", text)
+                for name, totals in handlers:
+                    value = getattr(totals, field)
+                    lines.append(f'{metric}{{handler="{name}"}} {value:.6f}' if isinstance(value, float)
+                                 else f'{metric}{{handler="{name}"}} {value}')
+
+            header("bot_update_sql_statements", "histogram", "SQL statements per handled update")
+            histogram("bot_update_sql_statements", "", self.update_statements)
+            header("bot_other_sql_statements_total", "counter", "SQL statements outside handled updates")
+            lines.append(f"bot_other_sql_statements_total {self.other_statements}")
+            header("bot_other_sql_seconds_total", "counter", "Time spent in SQL outside handled updates")
+            lines.append(f"bot_other_sql_seconds_total {self.other_sql_seconds:.6f}")
+
+            header("bot_api_request_duration_seconds", "histogram", "Bot API call latency, per method")
+            for method, h in sorted(self.api_latency.items()):
+                histogram("bot_api_request_duration_seconds", f'method="{method}"', h)
+            header("bot_api_requests_total", "counter", "Bot API calls by method and HTTP status")
+            for (method, status), count in sorted(self.api_requests.items()):
+                lines.append(f'bot_api_requests_total{{method="{method}",status="{status}"}} {count}')
+
+            header("bot_backups_total", "counter", "Database snapshots taken, by result")
+            for status, count in sorted(self.backups.items()):
+                lines.append(f'bot_backups_total{{result="{status}"}} {count}')
+            backup = self.last_backup
+            if backup is not None:
+                for name, kind, text, value in (
+                    ("bot_backup_last_success_timestamp_seconds", "gauge", "When the last snapshot finished",
+                     f"{self.last_backup_at:.0f}"),
+                    ("bot_backup_duration_seconds", "gauge", "Time the last snapshot took", f"{backup.seconds:.3f}"),
+                    ("bot_backup_source_bytes", "gauge", "Size of the database the last snapshot copied",
+                     backup.source_bytes),
+                    ("bot_backup_bytes", "gauge", "Size of the last snapshot on disk", backup.bytes),
+                ):
+                    header(name, kind, text)
+                    lines.append(f"{name} {value}")
+
+        gauges = self.queue_gauges()
+        for name, text in (
+            ('queued', "Updates received but not yet picked up"),
+            ('processing', "Updates being handled"),
+            ('waiting_for_chat', "Updates waiting behind another update from the same chat"),
+            ('max_concurrent', "Updates handled at once at most"),
+        ):
+            if name in gauges:
+                header(f"bot_updates_{name}", "gauge", text)
+                lines.append(f"bot_updates_{name} {gauges[name]}")
+        header("bot_uptime_seconds", "gauge", "Seconds since the process started")
+        lines.append(f"bot_uptime_seconds {time.time() - self.started:.0f}")
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+metrics = Metrics()
+
+
+# ---------- SQL ----------
+
+@event.listens_for(engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['metrics_query_started'].pop()
+    metrics.record_sql(time.perf_counter() - started)
+
+
+# ---------- handlers ----------
+
+def handler_name(callback: Callable) -> str:
+    module = getattr(callback, '__module__', None) or ''
+    name = getattr(callback, '__qualname__', None) or type(callback).__name__
+    return f"{module}.{name}" if module else name
+
+
+def instrument(callback: Callable, name: Optional[str] = None) -> Callable:
+    """Wrap a handler callback so each update it handles is measured"""
+    if getattr(callback, '__instrumented__', False):
+        return callback
+    name = name or handler_name(callback)
+
+    @functools.wraps(callback)
+    async def wrapper(update, context, *args, **kwargs):
+        stats = UpdateStats(name)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await callback(update, context, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            stats.done = True  # Tasks the handler spawned keep its context; their SQL isn't its cost
+            _current.reset(token)
+            metrics.record_update(stats, time.perf_counter() - started, failed)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def _instrument_handler(handler) -> int:
+    if isinstance(handler, ConversationHandler):
+        steps = chain(handler.entry_points, chain.from_iterable(handler.states.values()), handler.fallbacks)
+        return sum(_instrument_handler(step) for step in steps)
+    if isinstance(handler, CallbackRouter):
+        return handler.wrap_handlers(instrument)
+    handler.callback = instrument(handler.callback)
+    return 1
+
+
+def instrument_handlers(application) -> int:
+    """Instrument everything registered so far - call once all handlers are added"""
+    metrics.application = application
+    return sum(
+        _instrument_handler(handler)
+        for handlers in application.handlers.values()
+        for handler in handlers
+    )
+
+
+# ---------- Bot API ----------
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest that times every Bot API call by method"""
+
+    async def do_request(self, url, method, request_data=None, *args, **kwargs):
+        api_method = url.rsplit('/', 1)[-1]
+        started = time.perf_counter()
+        status = "error"
+        try:
+            code, payload = await super().do_request(url, method, request_data, *args, **kwargs)
+            status = str(code)
+            return code, payload
+        finally:
+            metrics.record_api(api_method, status, time.perf_counter() - started)
+
+
+# ---------- HTTP endpoint ----------
+
+class MetricsServer:
+    """GET /metrics in Prometheus text format - bind it to a local interface only"""
+
+    def __init__(self):
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = METRICS_HOST, port: int = METRICS_PORT) -> 'MetricsServer':
+        self._server = await asyncio.start_server(self._serve, host, port)
+        logger.info(f"📈 Metrics on http://{host}:{self.port}/metrics")
+        return self
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        from ingress import BadRequest, _read_request
+
+        try:
+            request = await asyncio.wait_for(_read_request(reader), 10)
+            if request is None:
+                return
+            if (request.method, request.path) == ('GET', '/metrics'):
+                status, body = "200 OK", metrics.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+        except (BadRequest, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"Error serving metrics: {e}", exc_info=True)
+        finally:
+            writer.close()
+
+
+# Global instance
+metrics_server = MetricsServer()
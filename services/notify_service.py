@@ -1,56 +1,34 @@
-from telegram import Bot
-from config import TELEGRAM_TOKEN, ADMIN_IDS
+from config import SUPER_ADMIN_ID
+from database.db import create_session, run_sync
+from services.outbox import enqueue
 import logging
 
 logger = logging.getLogger(__name__)
 
 class NotificationService:
-    def __init__(self):
+    """Queues notifications in the outbox; the dispatcher sends them (see services/outbox.py)"""
+    
+    def _queue(self, chat_ids, message: str, parse_mode: str) -> bool:
+        db = create_session()
         try:
-            self.bot = Bot(token=TELEGRAM_TOKEN)
+            for chat_id in chat_ids:
+                enqueue(db, chat_id, message, parse_mode)
+            db.commit()
+            return True
         except Exception as e:
-            logger.error(f"Failed to create bot instance: {e}")
-            self.bot = None
+            logger.error(f"Failed to queue notification: {e}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
     
     async def notify_admin(self, message: str, parse_mode: str = "Markdown") -> bool:
-        """Send notification to all admins"""
-        if not self.bot:
-            logger.error("Bot instance not available")
-            return False
-        
-        success = True
-        for admin_id in ADMIN_IDS:
-            try:
-                await self.bot.send_message(
-                    chat_id=admin_id,
-                    text=message[:4000],  # Telegram message limit
-                    parse_mode=parse_mode,
-                    disable_web_page_preview=True
-                )
-                logger.debug(f"Notified admin {admin_id}")
-            except Exception as e:
-                logger.error(f"Failed to notify admin {admin_id}: {e}")
-                success = False
-        
-        return success
+        """Send notification to the admin"""
+        return await run_sync(self._queue, [SUPER_ADMIN_ID], message, parse_mode)
     
     async def notify_user(self, user_id: int, message: str, parse_mode: str = "Markdown") -> bool:
         """Send notification to a specific user"""
-        if not self.bot:
-            return False
-        
-        try:
-            await self.bot.send_message(
-                chat_id=user_id,
-                text=message[:4000],
-                parse_mode=parse_mode,
-                disable_web_page_preview=True
-            )
-            logger.debug(f"Notified user {user_id}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to notify user {user_id}: {e}")
-            return False
+        return await run_sync(self._queue, [user_id], message, parse_mode)
     
     async def notify_new_order(self, order) -> bool:
         """Notify admin about new order"""
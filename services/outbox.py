@@ -0,0 +1,474 @@
+"""
+Notification outbox - Telegram messages are stored with the change that causes them
+
+enqueue() adds the message to the caller's session, so it commits or rolls
+back together with the state change: a crash after the commit can't lose it
+and a rolled-back change never announces itself. One dispatcher on the bot's
+event loop drains the `outbox` table:
+
+- chats are served concurrently under the broadcast rate limiter, and each
+  chat's messages go out strictly in the order they were written
+- several messages waiting for one chat go out as one digest message
+- failures retry with exponential backoff, and later messages for that chat
+  wait behind the failed one
+- delivery is at-least-once: a crash between sending and marking re-sends
+
+Run exactly one dispatcher per database.
+
+    python -m services.outbox --status
+    python -m services.outbox --retry-failed
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func
+from telegram.error import BadRequest, Forbidden, RetryAfter
+
+from database.db import SessionLocal, create_session, run_sync
+from database.models import OutboxMessage, OutboxStatus
+from services.broadcast_service import ChatRateLimiter
+from config import (
+    SUPER_ADMIN_ID, OUTBOX_BATCH_SIZE, OUTBOX_CONCURRENCY, OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_BASE,
+    OUTBOX_RETRY_MAX, OUTBOX_COALESCE_WINDOW, OUTBOX_POLL_INTERVAL
+)
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_TEXT_LIMIT = 4096
+DIGEST_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+DIGEST_HEADER = "📬 {count} notifications\n\n"
+SENT_RETENTION = timedelta(days=7)
+
+
+def enqueue(db, chat_id, text: str, parse_mode: Optional[str] = None) -> Optional[OutboxMessage]:
+    """Queue a message in the caller's transaction - it is sent once that commits"""
+    if not chat_id or not text:
+        return None
+    message = OutboxMessage(chat_id=str(chat_id), text=text[:TELEGRAM_TEXT_LIMIT], parse_mode=parse_mode)
+    db.add(message)
+    return message
+
+
+def enqueue_admin(db, text: str, parse_mode: Optional[str] = None) -> Optional[OutboxMessage]:
+    return enqueue(db, SUPER_ADMIN_ID, text, parse_mode)
+
+
+def send_later(chat_id, text: str, parse_mode: Optional[str] = None) -> bool:
+    """Queue a message in a transaction of its own, for callers with no change to commit"""
+    db = create_session()
+    try:
+        enqueue(db, chat_id, text, parse_mode)
+        db.commit()
+        return True
+    except Exception as e:
+        logger.error(f"Could not queue notification for {chat_id}: {e}", exc_info=True)
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+# ---------- wake the dispatcher when queued messages commit ----------
+
+@event.listens_for(SessionLocal, "after_flush")
+def _note_enqueued(session, flush_context):
+    if any(isinstance(obj, OutboxMessage) for obj in session.new):
+        session.info['outbox_enqueued'] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _wake_after_commit(session):
+    if session.info.pop('outbox_enqueued', False):
+        outbox_dispatcher.wake()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_wake(session):
+    session.info.pop('outbox_enqueued', None)
+
+
+# ---------- queue access (DB thread) ----------
+
+@dataclass
+class Digest:
+    """One send: a chat's consecutive queued messages that fit in a single Telegram message"""
+    ids: List[int] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    parse_mode: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        if len(self.texts) == 1:
+            return self.texts[0]
+        return DIGEST_HEADER.format(count=len(self.texts)) + DIGEST_SEPARATOR.join(self.texts)
+
+    def fits(self, text: str, parse_mode: Optional[str]) -> bool:
+        # Markdown and plain text never share a message
+        if parse_mode != self.parse_mode:
+            return False
+        header = len(DIGEST_HEADER.format(count=len(self.texts) + 1))
+        body = sum(map(len, self.texts)) + len(text) + len(DIGEST_SEPARATOR) * len(self.texts)
+        return header + body <= TELEGRAM_TEXT_LIMIT
+
+
+def build_digests(messages: List[Tuple[int, str, Optional[str]]]) -> List[Digest]:
+    """Pack one chat's (id, text, parse_mode) messages, in order, into as few sends as possible"""
+    digests: List[Digest] = []
+    for message_id, text, parse_mode in messages:
+        if not digests or not digests[-1].fits(text, parse_mode):
+            digests.append(Digest(parse_mode=parse_mode))
+        digests[-1].ids.append(message_id)
+        digests[-1].texts.append(text)
+    return digests
+
+
+def fetch_due(limit: int = OUTBOX_BATCH_SIZE) -> Dict[str, List[Tuple[int, str, Optional[str]]]]:
+    """Due messages grouped by chat, oldest first
+
+    A chat with a message backing off is skipped entirely, so nothing
+    overtakes it.
+    """
+    now = datetime.now()
+    db = create_session()
+    try:
+        backing_off = db.query(OutboxMessage.chat_id).filter(
+            OutboxMessage.status == OutboxStatus.PENDING,
+            OutboxMessage.next_attempt_at > now
+        )
+        rows = db.query(
+            OutboxMessage.id, OutboxMessage.chat_id, OutboxMessage.text, OutboxMessage.parse_mode
+        ).filter(
+            OutboxMessage.status == OutboxStatus.PENDING,
+            OutboxMessage.next_attempt_at <= now,
+            ~OutboxMessage.chat_id.in_(backing_off)
+        ).order_by(OutboxMessage.id).limit(limit).all()
+
+        chats: Dict[str, List[Tuple[int, str, Optional[str]]]] = {}
+        for message_id, chat_id, text, parse_mode in rows:
+            chats.setdefault(chat_id, []).append((message_id, text, parse_mode))
+        return chats
+    finally:
+        db.close()
+
+
+def next_retry_at() -> Optional[datetime]:
+    """When the earliest backed-off message becomes due (rows queued behind it wait for it too)"""
+    db = create_session()
+    try:
+        return db.query(func.min(OutboxMessage.next_attempt_at)).filter(
+            OutboxMessage.status == OutboxStatus.PENDING,
+            OutboxMessage.next_attempt_at > datetime.now()
+        ).scalar()
+    finally:
+        db.close()
+
+
+def retry_delay(attempts: int) -> float:
+    """5s, 10s, 20s, ... capped at OUTBOX_RETRY_MAX"""
+    return min(OUTBOX_RETRY_BASE * 2 ** max(0, attempts - 1), OUTBOX_RETRY_MAX)
+
+
+def record_results(sent: List[int], retry: List[Tuple[List[int], Optional[float], str]],
+                   failed: List[Tuple[List[int], str]]) -> int:
+    """Mark sent rows, schedule retries (or give up) and fail rows; returns rows given up on"""
+    now = datetime.now()
+    gave_up = 0
+    db = create_session()
+    try:
+        if sent:
+            db.query(OutboxMessage).filter(OutboxMessage.id.in_(sent)).update({
+                OutboxMessage.status: OutboxStatus.SENT,
+                OutboxMessage.sent_at: now,
+            }, synchronize_session=False)
+        for ids, error in failed:
+            db.query(OutboxMessage).filter(OutboxMessage.id.in_(ids)).update({
+                OutboxMessage.status: OutboxStatus.FAILED,
+                OutboxMessage.attempts: func.coalesce(OutboxMessage.attempts, 0) + 1,
+                OutboxMessage.last_error: error[:500],
+            }, synchronize_session=False)
+        for ids, delay, error in retry:
+            for message in db.query(OutboxMessage).filter(OutboxMessage.id.in_(ids)):
+                message.attempts = (message.attempts or 0) + 1
+                message.last_error = error[:500]
+                if message.attempts >= OUTBOX_MAX_ATTEMPTS:
+                    message.status = OutboxStatus.FAILED
+                    gave_up += 1
+                else:
+                    message.next_attempt_at = now + timedelta(seconds=delay or retry_delay(message.attempts))
+        db.commit()
+        return gave_up
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def queue_stats() -> dict:
+    """Queue depth and lag: pending rows, how many are due, and the age of the oldest"""
+    now = datetime.now()
+    db = create_session()
+    try:
+        pending, oldest = db.query(func.count(OutboxMessage.id), func.min(OutboxMessage.created_at)).filter(
+            OutboxMessage.status == OutboxStatus.PENDING
+        ).one()
+        due = db.query(func.count(OutboxMessage.id)).filter(
+            OutboxMessage.status == OutboxStatus.PENDING,
+            OutboxMessage.next_attempt_at <= now
+        ).scalar()
+        failed = db.query(func.count(OutboxMessage.id)).filter(
+            OutboxMessage.status == OutboxStatus.FAILED
+        ).scalar()
+        return {
+            'pending': pending or 0,
+            'due': due or 0,
+            'failed': failed or 0,
+            'oldest_pending_age_s': round((now - oldest).total_seconds(), 3) if oldest else 0.0,
+        }
+    finally:
+        db.close()
+
+
+def purge_sent(older_than: timedelta = SENT_RETENTION) -> int:
+    db = create_session()
+    try:
+        count = db.query(OutboxMessage).filter(
+            OutboxMessage.status == OutboxStatus.SENT,
+            OutboxMessage.sent_at < datetime.now() - older_than
+        ).delete(synchronize_session=False)
+        db.commit()
+        return count
+    finally:
+        db.close()
+
+
+def requeue_failed() -> int:
+    db = create_session()
+    try:
+        count = db.query(OutboxMessage).filter(OutboxMessage.status == OutboxStatus.FAILED).update({
+            OutboxMessage.status: OutboxStatus.PENDING,
+            OutboxMessage.attempts: 0,
+            OutboxMessage.next_attempt_at: datetime.now(),
+            OutboxMessage.last_error: None,
+        }, synchronize_session=False)
+        db.commit()
+        return count
+    finally:
+        db.close()
+
+
+# ========== DISPATCHER ==========
+
+SENT, RETRY, FAILED = 'sent', 'retry', 'failed'
+
+
+class OutboxDispatcher:
+    """Drains the outbox on the bot's event loop - run exactly one per database"""
+
+    def __init__(self, batch_size: int = OUTBOX_BATCH_SIZE, concurrency: int = OUTBOX_CONCURRENCY,
+                 coalesce_window: float = OUTBOX_COALESCE_WINDOW, poll_interval: float = OUTBOX_POLL_INTERVAL):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.coalesce_window = coalesce_window
+        self.poll_interval = poll_interval
+        self.bot = None
+        self.limiter: Optional[ChatRateLimiter] = None
+        self.task: Optional[asyncio.Task] = None
+        self.last_batch: dict = {}
+        self.totals = {'sent': 0, 'sends': 0, 'digests': 0, 'retries': 0, 'failed': 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def start(self, bot):
+        if self.task and not self.task.done():
+            return self.task
+        self.bot = bot
+        self.limiter = ChatRateLimiter()
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.task = self._loop.create_task(self.run())
+        return self.task
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self._loop = None
+
+    def wake(self):
+        """Called from any thread once queued messages have committed"""
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None:
+            return  # Not running in this process - the poll (or the next start) picks them up
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    async def _send(self, chat_id: str, digest: Digest) -> Tuple[str, Optional[float], str]:
+        """(outcome, retry delay or None for backoff, error)"""
+        await self.limiter.acquire(chat_id)
+        parse_mode = digest.parse_mode
+        for _ in range(2):
+            try:
+                await self.bot.send_message(
+                    chat_id=chat_id, text=digest.text, parse_mode=parse_mode, disable_web_page_preview=True
+                )
+                return SENT, None, ""
+            except RetryAfter as e:
+                retry_after = float(e.retry_after)
+                logger.warning(f"Flood control hit, pausing notifications for {retry_after}s")
+                self.limiter.bucket.pause(retry_after)
+                return RETRY, retry_after, str(e)
+            except BadRequest as e:
+                if parse_mode and "parse entities" in str(e).lower():
+                    # Names with stray Markdown characters - send the text as it is
+                    parse_mode = None
+                    continue
+                return FAILED, None, str(e)
+            except Forbidden as e:
+                return FAILED, None, str(e)  # Blocked the bot or deleted the account
+            except Exception as e:
+                return RETRY, None, str(e)  # Timeouts, network errors, Telegram hiccups
+        return FAILED, None, "unparseable message"
+
+    async def _send_chat(self, semaphore: asyncio.Semaphore, chat_id: str, messages) -> list:
+        results = []
+        async with semaphore:
+            for digest in build_digests(messages):
+                outcome, delay, error = await self._send(chat_id, digest)
+                results.append((digest, outcome, delay, error))
+                if outcome == RETRY:
+                    break  # The rest of this chat waits behind it
+        return results
+
+    async def dispatch_once(self) -> int:
+        """Send one batch of due messages; returns the number of messages taken"""
+        chats = await run_sync(fetch_due, self.batch_size)
+        if not chats:
+            return 0
+
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        per_chat = await asyncio.gather(*(
+            self._send_chat(semaphore, chat_id, messages) for chat_id, messages in chats.items()
+        ))
+        self.limiter.forget(chats)
+
+        sent, retry, failed = [], [], []
+        for results in per_chat:
+            for digest, outcome, delay, error in results:
+                self.totals['sends'] += 1
+                if outcome == SENT:
+                    sent.extend(digest.ids)
+                    if len(digest.ids) > 1:
+                        self.totals['digests'] += 1
+                elif outcome == RETRY:
+                    retry.append((digest.ids, delay, error))
+                else:
+                    failed.append((digest.ids, error))
+                    logger.warning(f"Dropping {len(digest.ids)} notification(s): {error}")
+        gave_up = await run_sync(record_results, sent, retry, failed)
+        if gave_up:
+            logger.error(f"Gave up on {gave_up} notification(s) after {OUTBOX_MAX_ATTEMPTS} attempts")
+
+        taken = sum(len(messages) for messages in chats.values())
+        self.totals['sent'] += len(sent)
+        self.totals['retries'] += sum(len(ids) for ids, _, _ in retry) - gave_up
+        self.totals['failed'] += sum(len(ids) for ids, _ in failed) + gave_up
+        self.last_batch = {
+            'at': datetime.now().isoformat(),
+            'chats': len(chats),
+            'messages': taken,
+            'sent': len(sent),
+            'duration_s': round(time.perf_counter() - started, 3),
+        }
+        return taken
+
+    async def run(self):
+        logger.info("📤 Outbox dispatcher started")
+        last_purge = 0.0
+        while True:
+            self._wake.clear()
+            try:
+                taken = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error dispatching notifications: {e}", exc_info=True)
+                taken = 0
+
+            if time.monotonic() - last_purge >= 3600:
+                last_purge = time.monotonic()
+                try:
+                    await run_sync(purge_sent)
+                except Exception as e:
+                    logger.error(f"Could not purge sent notifications: {e}")
+
+            if taken >= self.batch_size:
+                continue  # More are waiting
+            timeout = self.poll_interval
+            try:
+                retry_at = await run_sync(next_retry_at)
+                if retry_at:
+                    timeout = min(timeout, max(0.0, (retry_at - datetime.now()).total_seconds()))
+            except Exception as e:
+                logger.error(f"Could not read the next notification retry: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+                # Let the rest of a burst commit so it goes out as one digest per chat
+                await asyncio.sleep(self.coalesce_window)
+            except asyncio.TimeoutError:
+                pass
+
+    async def get_metrics(self) -> dict:
+        """Queue depth and lag from the table, plus this process's send totals"""
+        return {
+            **await run_sync(queue_stats),
+            'running': bool(self.task and not self.task.done()),
+            'last_batch': self.last_batch,
+            'totals': dict(self.totals),
+        }
+
+
+# Global instance
+outbox_dispatcher = OutboxDispatcher()
+
+
+def _print_status():
+    stats = queue_stats()
+    print(f"   pending    {stats['pending']} ({stats['due']} due)")
+    print(f"   failed     {stats['failed']}")
+    print(f"   oldest     {stats['oldest_pending_age_s']:.0f}s")
+    db = create_session()
+    try:
+        for message in db.query(OutboxMessage).filter(
+            OutboxMessage.status == OutboxStatus.FAILED
+        ).order_by(OutboxMessage.id.desc()).limit(10):
+            print(f"   ❌ #{message.id} to {message.chat_id} ({message.attempts} attempts): {message.last_error}")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect the notification outbox")
+    parser.add_argument('--status', action='store_true', help="queue depth, lag and the latest failures")
+    parser.add_argument('--retry-failed', action='store_true', help="queue FAILED messages again")
+    args = parser.parse_args()
+
+    from database.db import engine
+
+    OutboxMessage.__table__.create(bind=engine, checkfirst=True)
+    if args.retry_failed:
+        print(f"🔄 Requeued {requeue_failed()} messages")
+    if args.status or not args.retry_failed:
+        _print_status()
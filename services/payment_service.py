@@ -11,7 +11,7 @@ class PaymentService:
         
         if currency and currency != "GHS":
             # Convert to GHS (base currency)
-            amount_in_ghs = currency_service.convert_to_base(amount, currency)
+            amount_in_ghs = currency_service.convert(amount, currency, "GHS")
             currency = "GHS"
             amount = amount_in_ghs * 100  # Paystack uses kobo/pesewas
         else:
@@ -4,21 +4,32 @@ Paystack payment service - REAL IMPLEMENTATION
 import requests
 import json
 import logging
+import asyncio
+import random
 from datetime import datetime
-from config import PAYMENT_METHODS
+from typing import Dict, Optional, Tuple
+from config import PAYMENT_METHODS, PAYSTACK_BASE_URL, API_TIMEOUT, API_RETRY_ATTEMPTS, PAYSTACK_POOL_SIZE
 import uuid
+import httpx
 from services.currency_service import currency_service
 
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive connection pool shared by every synchronous PaystackService
+_session = requests.Session()
+_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=PAYSTACK_POOL_SIZE))
+_session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=PAYSTACK_POOL_SIZE))
+
 class PaystackService:
     def __init__(self):
         # Get Paystack credentials from config
         paystack_config = PAYMENT_METHODS.get('paystack', {})
         self.public_key = paystack_config.get('public_key', '')
         self.secret_key = paystack_config.get('secret_key', '')
-        self.base_url = "https://api.paystack.co"
+        self.base_url = PAYSTACK_BASE_URL
+        self.session = _session
+        self.timeout = API_TIMEOUT
         
         # Validate keys
         if not self.secret_key or self.secret_key == "":
@@ -55,10 +66,11 @@ class PaystackService:
             }
             
             # Make API request
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/transaction/initialize",
                 headers=self.headers,
-                json=data
+                json=data,
+                timeout=self.timeout
             )
             
             # Parse response
@@ -85,9 +97,10 @@ class PaystackService:
         
         try:
             # Make API request to verify transaction
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/transaction/verify/{reference}",
-                headers=self.headers
+                headers=self.headers,
+                timeout=self.timeout
             )
             
             # Parse response
@@ -123,10 +136,11 @@ class PaystackService:
                 "currency": currency
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/transferrecipient",
                 headers=self.headers,
-                json=data
+                json=data,
+                timeout=self.timeout
             )
             
             result = response.json()
@@ -153,10 +167,11 @@ class PaystackService:
                 "reason": reason
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/transfer",
                 headers=self.headers,
-                json=data
+                json=data,
+                timeout=self.timeout
             )
             
             result = response.json()
@@ -172,10 +187,11 @@ class PaystackService:
     def list_banks(self, country="nigeria", currency="NGN"):
         """List available banks for transfer"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/bank",
                 headers=self.headers,
-                params={"country": country, "currency": currency}
+                params={"country": country, "currency": currency},
+                timeout=self.timeout
             )
             
             result = response.json()
@@ -200,10 +216,11 @@ class PaystackService:
                 "card": card_details
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/charge",
                 headers=self.headers,
-                json=data
+                json=data,
+                timeout=self.timeout
             )
             
             result = response.json()
@@ -241,6 +258,44 @@ class PaystackService:
         unique_id = uuid.uuid4().hex[:8].upper()
         return f"{prefix}{timestamp}{unique_id}"
     
+    def build_initialize_data(self, email, amount, reference, currency="USD", callback_url=None):
+        """Build the /transaction/initialize payload with multi-currency support"""
+        # Paystack requires amount in kobo (for NGN) or cents (for other currencies)
+        # Conversion based on currency
+        if currency == "NGN":
+            # For NGN, multiply by 100 (kobo)
+            amount_in_smallest_unit = int(amount * 100)
+        elif currency == "GHS":
+            # For GHS, multiply by 100 (pesewas)
+            amount_in_smallest_unit = int(amount * 100)
+        elif currency in ["USD", "EUR", "GBP"]:
+            # For major currencies, multiply by 100 (cents/pence)
+            amount_in_smallest_unit = int(amount * 100)
+        elif currency == "KES":
+            # For KES, multiply by 100 (cents)
+            amount_in_smallest_unit = int(amount * 100)
+        elif currency == "ZAR":
+            # For ZAR, multiply by 100 (cents)
+            amount_in_smallest_unit = int(amount * 100)
+        else:
+            # Default to cents
+            amount_in_smallest_unit = int(amount * 100)
+        
+        # Check if currency is supported by Paystack
+        supported_currencies = ["NGN", "USD", "GHS", "ZAR", "KES"]
+        if currency not in supported_currencies:
+            logger.warning(f"Currency {currency} might not be supported by Paystack. Using USD instead.")
+            currency = "USD"
+            amount_in_smallest_unit = int(amount * 100)
+        
+        return {
+            "email": email,
+            "amount": amount_in_smallest_unit,
+            "reference": reference,
+            "currency": currency,
+            "callback_url": callback_url or f"https://t.me/your_bot_username?start=verify_{reference}"
+        }
+    
     def initialize_transaction(self, email, amount, reference, currency="USD", callback_url=None):
         """Initialize real Paystack transaction with multi-currency support"""
         
@@ -249,58 +304,24 @@ class PaystackService:
             return self._dummy_initialize_transaction(email, amount, reference, currency, callback_url)
         
         try:
-            # Paystack requires amount in kobo (for NGN) or cents (for other currencies)
-            # Conversion based on currency
-            if currency == "NGN":
-                # For NGN, multiply by 100 (kobo)
-                amount_in_smallest_unit = int(amount * 100)
-            elif currency == "GHS":
-                # For GHS, multiply by 100 (pesewas)
-                amount_in_smallest_unit = int(amount * 100)
-            elif currency in ["USD", "EUR", "GBP"]:
-                # For major currencies, multiply by 100 (cents/pence)
-                amount_in_smallest_unit = int(amount * 100)
-            elif currency == "KES":
-                # For KES, multiply by 100 (cents)
-                amount_in_smallest_unit = int(amount * 100)
-            elif currency == "ZAR":
-                # For ZAR, multiply by 100 (cents)
-                amount_in_smallest_unit = int(amount * 100)
-            else:
-                # Default to cents
-                amount_in_smallest_unit = int(amount * 100)
-            
-            # Check if currency is supported by Paystack
-            supported_currencies = ["NGN", "USD", "GHS", "ZAR", "KES"]
-            if currency not in supported_currencies:
-                logger.warning(f"Currency {currency} might not be supported by Paystack. Using USD instead.")
-                currency = "USD"
-                amount_in_smallest_unit = int(amount * 100)
-            
             # Prepare request data
-            data = {
-                "email": email,
-                "amount": amount_in_smallest_unit,
-                "reference": reference,
-                "currency": currency,
-                "callback_url": callback_url or f"https://t.me/your_bot_username?start=verify_{reference}"
-            }
+            data = self.build_initialize_data(email, amount, reference, currency, callback_url)
             
             logger.info(f"Paystack transaction data: {data}")
             
             # Make API request
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/transaction/initialize",
                 headers=self.headers,
                 json=data,
-                timeout=30
+                timeout=self.timeout
             )
             
             # Parse response
             result = response.json()
             
             if response.status_code == 200 and result.get('status'):
-                logger.info(f"Paystack transaction initialized: {reference} in {currency}")
+                logger.info(f"Paystack transaction initialized: {reference} in {data['currency']}")
                 return True, result
             else:
                 error_msg = result.get('message', 'Unknown error')
@@ -384,10 +405,11 @@ class PaystackService:
                 data['amount'] = amount_in_kobo
             
             # Make API request
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/refund",
                 headers=self.headers,
-                json=data
+                json=data,
+                timeout=self.timeout
             )
             
             # Parse response
@@ -437,5 +459,200 @@ class PaystackService:
         except Exception as e:
             return False, {"status": False, "message": str(e)}
 
-# Global instance
-paystack = PaystackService()
\ No newline at end of file
+    # Refunds Paystack hasn't given up on - any of these means the money is (being) returned
+    LIVE_REFUND_STATUSES = ('pending', 'processing', 'processed', 'needs-attention')
+
+    def find_refund(self, reference: str):
+        """The refund already issued against a transaction: (True, refund), (True, None) if there is none,
+        or (False, error) if Paystack couldn't be asked - then it is unknown, so don't refund again"""
+        if self.dummy_mode or not self.secret_key:
+            return True, None  # Dummy refunds never reach Paystack
+
+        try:
+            # Refunds are listed by transaction id; the reference resolves to it (a refunded one is 'reversed')
+            response = self.session.get(f"{self.base_url}/transaction/verify/{reference}",
+                                        headers=self.headers, timeout=self.timeout)
+            result = response.json()
+            if response.status_code != 200 or not result.get('status'):
+                return False, result
+            transaction_id = result['data']['id']
+
+            response = self.session.get(f"{self.base_url}/refund", params={"transaction": transaction_id},
+                                        headers=self.headers, timeout=self.timeout)
+            result = response.json()
+            if response.status_code != 200 or not result.get('status'):
+                return False, result
+            refunds = [refund for refund in result.get('data') or [] if refund.get('status') in self.LIVE_REFUND_STATUSES]
+            return True, max(refunds, key=lambda refund: refund.get('id') or 0) if refunds else None
+        except Exception as e:
+            logger.error(f"Error looking up refunds for {reference}: {e}")
+            return False, {"status": False, "message": str(e)}
+
+
+
+class AsyncPaystackService:
+    """
+    Non-blocking Paystack client for use inside async handlers.
+    
+    One httpx.AsyncClient (keep-alive pool) is shared per instance, transient
+    failures are retried with exponential backoff, and concurrent
+    verify_transaction calls for the same reference share a single request.
+    
+    Only GETs are retried on any transient failure. A POST (refund,
+    initialize) may already have been applied when its response is lost or
+    is a 5xx, so it is only retried when Paystack provably didn't act on it:
+    the connection was never made, or it answered 429.
+    """
+    
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    IDEMPOTENT_METHODS = {"GET", "HEAD"}
+    # Raised before any of the request was sent
+    UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+    
+    def __init__(self, base_url: str = None, secret_key: str = None, timeout: float = API_TIMEOUT,
+                 max_retries: int = API_RETRY_ATTEMPTS, pool_size: int = PAYSTACK_POOL_SIZE,
+                 backoff: float = 0.5):
+        self.sync = PaystackService()
+        if secret_key is not None:
+            self.sync.secret_key = secret_key
+            self.sync.dummy_mode = not secret_key
+            self.sync.headers['Authorization'] = f'Bearer {secret_key}'
+        self.base_url = base_url or self.sync.base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.backoff = backoff
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    @property
+    def dummy_mode(self) -> bool:
+        return self.sync.dummy_mode or not self.sync.secret_key
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.sync.headers,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0)),
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size
+                )
+            )
+        return self._client
+    
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _request(self, method: str, path: str, **kwargs) -> Tuple[int, dict]:
+        """Send a request with backoff retries - any transient failure for GETs, only unsent ones for POSTs"""
+        client = self._get_client()
+        idempotent = method.upper() in self.IDEMPOTENT_METHODS
+        retry_statuses = self.RETRY_STATUSES if idempotent else {429}
+        retry_errors = (httpx.TransportError, ValueError) if idempotent else self.UNSENT_ERRORS
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.request(method, path, **kwargs)
+                if response.status_code not in retry_statuses or attempt == self.max_retries:
+                    return response.status_code, response.json()
+                retry_after = response.headers.get('Retry-After')
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else None
+            except retry_errors as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Paystack {method} {path} failed ({e}), retrying")
+                delay = None
+            
+            await asyncio.sleep(delay or self.backoff * 2 ** attempt + random.uniform(0, self.backoff))
+    
+    async def initialize_transaction(self, email, amount, reference, currency="USD", callback_url=None):
+        """Initialize Paystack transaction with multi-currency support"""
+        if self.dummy_mode:
+            return self.sync._dummy_initialize_transaction(email, amount, reference, currency, callback_url)
+        
+        try:
+            data = self.sync.build_initialize_data(email, amount, reference, currency, callback_url)
+            status_code, result = await self._request("POST", "/transaction/initialize", json=data)
+            
+            if status_code == 200 and result.get('status'):
+                logger.info(f"Paystack transaction initialized: {reference} in {data['currency']}")
+                return True, result
+            
+            logger.error(f"Paystack initialization failed: {result.get('message', 'Unknown error')}")
+            return False, result
+        except Exception as e:
+            logger.error(f"Error initializing Paystack transaction: {e}")
+            return False, {"status": False, "message": str(e)}
+    
+    async def verify_transaction(self, reference):
+        """Verify Paystack transaction - concurrent calls for one reference share a request"""
+        inflight = self._inflight.get(reference)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[reference] = future
+        try:
+            result = await self._verify_transaction(reference)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited follower doesn't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(reference, None)
+    
+    async def _verify_transaction(self, reference):
+        if self.dummy_mode:
+            return self.sync._dummy_verify_transaction(reference)
+        
+        try:
+            status_code, result = await self._request("GET", f"/transaction/verify/{reference}")
+            
+            if status_code == 200 and result.get('status'):
+                if result.get('data', {}).get('status') == 'success':
+                    logger.info(f"Paystack transaction verified successfully: {reference}")
+                    return True, result
+                logger.warning(f"Paystack transaction not successful: {reference}")
+                return False, result
+            
+            logger.error(f"Paystack verification failed: {result.get('message', 'Transaction not found')}")
+            return False, result
+        except Exception as e:
+            logger.error(f"Error verifying Paystack transaction: {e}")
+            return False, {"status": False, "message": str(e)}
+    
+    async def refund_transaction(self, reference: str, amount: float = None):
+        """Process a refund for a transaction"""
+        if self.dummy_mode:
+            return self.sync._dummy_refund_transaction(reference, amount)
+        
+        try:
+            data = {"transaction": reference}
+            if amount is not None:
+                data['amount'] = int(amount * 100)
+            
+            status_code, result = await self._request("POST", "/refund", json=data)
+            
+            if status_code == 200 and result.get('status'):
+                logger.info(f"Refund successful for transaction {reference}")
+                return True, result
+            
+            logger.error(f"Refund failed for {reference}: {result.get('message', 'Unknown error')}")
+            return False, result
+        except Exception as e:
+            logger.error(f"Error refunding transaction {reference}: {e}")
+            return False, {"status": False, "message": str(e)}
+
+
+# Global instances
+paystack = PaystackService()
+async_paystack = AsyncPaystackService()
\ No newline at end of file
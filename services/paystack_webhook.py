@@ -0,0 +1,111 @@
+"""
+Paystack webhook events - the database side, shared by the inbox consumer
+and the replay tool
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from database.db import create_session
+from database.models import Order, OrderStatus, PaymentStatus, Transaction, CustomRequest, RequestStatus
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentLookup:
+    """Orders, deposits and transactions for a batch of events, loaded with one query each"""
+
+    def __init__(self, db, events: Iterable[dict]):
+        references = {
+            (event.get('data') or {}).get('reference') for event in events
+            if event.get('event') == 'charge.success'
+        }
+        references.discard(None)
+        self.orders: Dict[str, Order] = {}
+        self.requests: Dict[str, CustomRequest] = {}
+        self.transactions: Dict[str, Transaction] = {}
+        if not references:
+            return
+
+        self.orders = {
+            order.order_id: order
+            for order in db.query(Order).filter(Order.order_id.in_(references))
+        }
+        deposits = [reference for reference in references if reference.startswith('DEP_')]
+        if deposits:
+            self.requests = {
+                custom_request.payment_reference: custom_request
+                for custom_request in db.query(CustomRequest).filter(CustomRequest.payment_reference.in_(deposits))
+            }
+        self.transactions = {
+            transaction.reference: transaction
+            for transaction in db.query(Transaction).filter(Transaction.reference.in_(references))
+        }
+
+
+def _mark_transaction_successful(lookup: PaymentLookup, reference: str, data: dict, payment_data: dict):
+    transaction = lookup.transactions.get(reference)
+    if transaction:
+        transaction.status = 'successful'
+        transaction.gateway_response = json.dumps(data)
+        transaction.transaction_data = payment_data
+
+
+def apply_event(db, data: dict, lookup: PaymentLookup) -> Optional[str]:
+    """Apply one verified event in the caller's transaction; returns the admin notification, if any"""
+    event = data.get('event')
+    payment_data = data.get('data') or {}
+    reference = payment_data.get('reference')
+
+    if event != 'charge.success':
+        return None
+
+    # ===== REGULAR ORDER (BOT PURCHASE) =====
+    order = lookup.orders.get(reference)
+    if order:
+        order.status = OrderStatus.PENDING_REVIEW
+        order.payment_status = PaymentStatus.VERIFIED
+        order.paid_at = datetime.now()
+        order.payment_metadata = payment_data
+        _mark_transaction_successful(lookup, reference, data, payment_data)
+        logger.info(f"Order {reference} updated")
+        return f"💰 Payment for Order {reference}"
+
+    # ===== CUSTOM REQUEST DEPOSIT =====
+    custom_request = lookup.requests.get(reference)
+    if custom_request:
+        custom_request.is_deposit_paid = True
+        custom_request.status = RequestStatus.IN_REVIEW
+        custom_request.payment_metadata = payment_data
+        custom_request.deposit_paid_at = datetime.now()
+
+        from services.refund_scheduler import schedule_request_refund
+        schedule_request_refund(db, custom_request)
+        _mark_transaction_successful(lookup, reference, data, payment_data)
+        logger.info(f"Custom deposit {reference} updated")
+        return f"💰 Deposit paid for Custom Request {custom_request.request_id}"
+
+    # No matching record
+    logger.warning(f"No match for reference: {reference}")
+    return None
+
+
+def apply_events(db, events: List[dict]) -> List[Optional[str]]:
+    """Apply a batch of events in order in the caller's transaction"""
+    lookup = PaymentLookup(db, events)
+    return [apply_event(db, data, lookup) for data in events]
+
+
+def apply_paystack_event(data: dict) -> Optional[str]:
+    """Apply a single event in its own transaction. Blocking - call it through run_sync from async code"""
+    db = create_session()
+    try:
+        notification = apply_events(db, [data])[0]
+        db.commit()
+        return notification
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
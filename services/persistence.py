@@ -0,0 +1,363 @@
+"""
+Bot state persistence - user_data, chat_data and conversation states survive restarts
+
+SQLPersistence is a PTB BasePersistence backed by the bot_state table:
+
+- state lives in memory; PTB hands over the keys touched since the last run
+  every PERSISTENCE_FLUSH_INTERVAL seconds, they are pickled right then on the
+  event loop, and only values whose pickled form changed since they were last
+  stored are written, PERSISTENCE_BATCH_SIZE rows per transaction on the DB
+  thread pool
+- user_data and chat_data are read lazily, the first time an update for that
+  user or chat is handled, instead of all at startup
+- conversation states are read when their handler is initialized (PTB looks
+  the state up before any refresh hook runs); only in-flight conversations
+  have a row, since ending one deletes it
+
+Values are pickled, so keep user_data to plain data (dicts, strings, numbers,
+dates). Anything that can't be pickled is logged and left out; a value whose
+pickling failed for another reason is tried again with the next flush.
+
+    python -m services.persistence --status
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import pickle
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import and_, bindparam, delete, func
+from telegram.ext import BasePersistence, PersistenceInput
+
+from database.db import create_session, engine, run_sync
+from database.models import PersistedState
+from config import PERSISTENCE_FLUSH_INTERVAL, PERSISTENCE_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+USER_DATA = 'user_data'
+CHAT_DATA = 'chat_data'
+BOT_DATA = 'bot_data'
+BOT_DATA_KEY = ''
+CONVERSATION_PREFIX = 'conversation:'
+CONVERSATION = CONVERSATION_PREFIX + '{name}'
+
+Ident = Tuple[str, str]  # (namespace, key)
+DELETED = object()  # Pending value for a row to delete
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# ---------- table access (DB thread) ----------
+
+def read_one(namespace: str, key: str) -> Optional[bytes]:
+    db = create_session()
+    try:
+        row = db.query(PersistedState.data).filter(
+            PersistedState.namespace == namespace, PersistedState.key == key
+        ).first()
+        return row.data if row else None
+    finally:
+        db.close()
+
+
+def read_namespace(namespace: str) -> Dict[str, bytes]:
+    db = create_session()
+    try:
+        return dict(db.query(PersistedState.key, PersistedState.data).filter(
+            PersistedState.namespace == namespace
+        ).all())
+    finally:
+        db.close()
+
+
+def upsert_rows(connection, rows: list):
+    """Insert or replace bot_state rows ({namespace, key, data, updated_at}) in one statement"""
+    table = PersistedState.__table__
+    dialect = connection.dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['namespace', 'key'],
+            set_={'data': stmt.excluded.data, 'updated_at': stmt.excluded.updated_at}
+        )
+        connection.execute(stmt, rows)
+        return
+
+    delete_rows(connection, rows)
+    connection.execute(table.insert(), rows)
+
+
+def delete_rows(connection, rows: list):
+    table = PersistedState.__table__
+    connection.execute(
+        delete(table).where(and_(table.c.namespace == bindparam('b_namespace'), table.c.key == bindparam('b_key'))),
+        [{'b_namespace': row['namespace'], 'b_key': row['key']} for row in rows]
+    )
+
+
+def state_counts() -> Dict[str, int]:
+    """Stored rows per namespace"""
+    db = create_session()
+    try:
+        return dict(db.query(PersistedState.namespace, func.count(PersistedState.id)).group_by(
+            PersistedState.namespace
+        ).all())
+    finally:
+        db.close()
+
+
+# ---------- persistence ----------
+
+class SQLPersistence(BasePersistence):
+    """Write-behind PTB persistence on our own database - one instance per bot process"""
+
+    def __init__(self, flush_interval: float = PERSISTENCE_FLUSH_INTERVAL,
+                 batch_size: int = PERSISTENCE_BATCH_SIZE):
+        # No arbitrary callback data is used (buttons carry plain strings)
+        super().__init__(store_data=PersistenceInput(callback_data=False), update_interval=flush_interval)
+        self.batch_size = batch_size
+        self.totals = {'loaded': 0, 'written': 0, 'unchanged': 0, 'deleted': 0, 'flushes': 0, 'errors': 0}
+        self.last_flush: dict = {}
+        self._pending: Dict[Ident, Any] = {}  # Pickled value, or DELETED
+        self._unpickled: Dict[Ident, Any] = {}  # Values to pickle again with the next flush
+        self._stored: Dict[Ident, bytes] = {}  # Digest of each value as last read or written
+        self._loaded: Set[Ident] = set()
+        self._loading: Dict[Ident, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    # ----- lazy loading -----
+
+    async def _fetch(self, ident: Ident):
+        try:
+            data = await run_sync(read_one, *ident)
+        finally:
+            self._loading.pop(ident, None)
+        self._loaded.add(ident)
+        if ident in self._pending:
+            # Written while we were reading - the pending value is newer
+            value = self._pending[ident]
+            return None if value is DELETED else pickle.loads(value)
+        if data is None:
+            return None
+        self._stored[ident] = _digest(data)
+        self.totals['loaded'] += 1
+        return pickle.loads(data)
+
+    async def _load(self, ident: Ident):
+        """The stored value for one key, read at most once per process"""
+        if ident not in self._loading:
+            self._loading[ident] = asyncio.ensure_future(self._fetch(ident))
+        try:
+            return await asyncio.shield(self._loading[ident])
+        except Exception as e:
+            logger.error(f"Could not load {ident[0]} for {ident[1]}: {e}", exc_info=True)
+            return None
+
+    async def _refresh(self, ident: Ident, data: dict):
+        if ident in self._loaded:
+            return
+        stored = await self._load(ident)
+        if stored:
+            for name, value in stored.items():
+                data.setdefault(name, value)
+
+    async def get_user_data(self) -> Dict[int, Any]:
+        return {}  # Loaded per user by refresh_user_data
+
+    async def get_chat_data(self) -> Dict[int, Any]:
+        return {}  # Loaded per chat by refresh_chat_data
+
+    async def get_bot_data(self) -> Any:
+        return await self._load((BOT_DATA, BOT_DATA_KEY)) or {}
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict[tuple, object]:
+        namespace = CONVERSATION.format(name=name)
+        rows = await run_sync(read_namespace, namespace)
+        conversations = {}
+        for key, data in rows.items():
+            ident = (namespace, key)
+            self._loaded.add(ident)
+            self._stored[ident] = _digest(data)
+            conversations[tuple(json.loads(key))] = pickle.loads(data)
+        logger.info(f"💾 Restored {len(conversations)} in-flight '{name}' conversations")
+        return conversations
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        await self._refresh((USER_DATA, str(user_id)), user_data)
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        await self._refresh((CHAT_DATA, str(chat_id)), chat_data)
+
+    async def refresh_bot_data(self, bot_data: Any) -> None:
+        pass  # Read once by get_bot_data
+
+    # ----- write-behind -----
+
+    async def _update(self, ident: Ident, data: Any):
+        if data is not DELETED and ident not in self._loaded and isinstance(data, dict):
+            # Written without being read first (e.g. set outside a handler) - keep what was stored
+            stored = await self._load(ident)
+            if stored:
+                data = {**stored, **data}
+        if isinstance(data, dict) and not data and not ident[0].startswith(CONVERSATION_PREFIX):
+            data = DELETED  # Users who never stored anything don't get a row
+        self._pickle(ident, data)
+        if self._flush_task is None or self._flush_task.done():
+            # PTB calls update_* for every dirty key at once, so they land in one batch
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_pending())
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        await self._update((USER_DATA, str(user_id)), data)
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        await self._update((CHAT_DATA, str(chat_id)), data)
+
+    async def update_bot_data(self, data: Any) -> None:
+        await self._update((BOT_DATA, BOT_DATA_KEY), data)
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def update_conversation(self, name: str, key: tuple, new_state: Optional[object]) -> None:
+        ident = (CONVERSATION.format(name=name), json.dumps(list(key)))
+        await self._update(ident, DELETED if new_state is None else new_state)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        await self._update((USER_DATA, str(user_id)), DELETED)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        await self._update((CHAT_DATA, str(chat_id)), DELETED)
+
+    def _pickle(self, ident: Ident, value: Any):
+        """Queue a snapshot of the value, taken on the event loop so handlers can't change it mid-write"""
+        self._unpickled.pop(ident, None)
+        if value is DELETED:
+            self._pending[ident] = DELETED
+            return
+        try:
+            self._pending[ident] = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except pickle.PicklingError as e:
+            self._pending.pop(ident, None)
+            logger.error(f"Can't persist {ident[0]} for {ident[1]}, leaving it out: {e}")
+        except Exception as e:
+            self._pending.pop(ident, None)
+            self._unpickled[ident] = value
+            logger.warning(f"Could not pickle {ident[0]} for {ident[1]}, retrying with the next flush: {e}")
+
+    def _write(self, batch: Dict[Ident, Any], stored: Dict[Ident, bytes]) -> Tuple[dict, Dict[Ident, Optional[bytes]]]:
+        """Drop unchanged values and write the rest (DB thread)
+
+        Returns the counts and the new digest of every key written - None for a deleted row -
+        for the event loop to record.
+        """
+        now = datetime.now()
+        upserts, deletes, digests = [], [], {}
+        unchanged = 0
+        for ident, data in batch.items():
+            namespace, key = ident
+            if data is DELETED:
+                deletes.append({'namespace': namespace, 'key': key})
+                continue
+            digest = _digest(data)
+            if stored.get(ident) == digest:
+                unchanged += 1
+                continue
+            upserts.append({'namespace': namespace, 'key': key, 'data': data, 'updated_at': now})
+            digests[ident] = digest
+
+        written: Dict[Ident, Optional[bytes]] = {}
+        for start in range(0, len(upserts), self.batch_size):
+            chunk = upserts[start:start + self.batch_size]
+            with engine.begin() as connection:
+                upsert_rows(connection, chunk)
+            for row in chunk:
+                ident = (row['namespace'], row['key'])
+                written[ident] = digests[ident]
+        for start in range(0, len(deletes), self.batch_size):
+            chunk = deletes[start:start + self.batch_size]
+            with engine.begin() as connection:
+                delete_rows(connection, chunk)
+            for row in chunk:
+                written[(row['namespace'], row['key'])] = None
+
+        return {'written': len(upserts), 'unchanged': unchanged, 'deleted': len(deletes)}, written
+
+    def _record(self, written: Dict[Ident, Optional[bytes]]):
+        for ident, digest in written.items():
+            if digest is None:
+                self._stored.pop(ident, None)
+            else:
+                self._stored[ident] = digest
+
+    async def _flush_pending(self):
+        for ident, value in list(self._unpickled.items()):
+            self._pickle(ident, value)
+        while self._pending:
+            batch, self._pending = self._pending, {}
+            for ident, data in list(batch.items()):
+                if data is DELETED and ident not in self._stored and (
+                        ident in self._loaded or ident[0].startswith(CONVERSATION_PREFIX)):
+                    del batch[ident]  # Known to have no row (every conversation row is read at startup)
+            stored = {ident: self._stored[ident] for ident in batch if ident in self._stored}
+            started = asyncio.get_running_loop().time()
+            try:
+                result, written = await run_sync(self._write, batch, stored)
+            except Exception as e:
+                self.totals['errors'] += 1
+                logger.error(f"Could not write bot state ({len(batch)} keys): {e}", exc_info=True)
+                # Retried with the next write, unless a newer value arrives first
+                for ident, data in batch.items():
+                    self._pending.setdefault(ident, data)
+                return
+            self._record(written)
+            self.totals['flushes'] += 1
+            for name, count in result.items():
+                self.totals[name] += count
+            self.last_flush = {
+                **result, 'keys': len(batch), 'at': datetime.now().isoformat(timespec='seconds'),
+                'duration_ms': round((asyncio.get_running_loop().time() - started) * 1000, 1),
+            }
+
+    async def flush(self) -> None:
+        """Called by Application.shutdown after the final update - write everything still pending"""
+        if self._flush_task and not self._flush_task.done():
+            await self._flush_task
+        await self._flush_pending()
+        if self._pending or self._unpickled:
+            logger.error(f"❌ {len(self._pending) + len(self._unpickled)} bot state keys could not be written at shutdown")
+
+    def get_metrics(self) -> dict:
+        return {
+            'loaded_keys': len(self._loaded),
+            'pending': len(self._pending) + len(self._unpickled),
+            'last_flush': self.last_flush,
+            'totals': dict(self.totals),
+        }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect persisted bot state")
+    parser.add_argument('--status', action='store_true', help="stored rows per namespace")
+    parser.parse_args()
+
+    PersistedState.__table__.create(bind=engine, checkfirst=True)
+    counts = state_counts()
+    if not counts:
+        print("   no bot state stored")
+    for namespace, count in sorted(counts.items()):
+        print(f"   {namespace:<40} {count}")
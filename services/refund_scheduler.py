@@ -0,0 +1,475 @@
+"""
+Deadline scheduler for the 48h automatic refund policy.
+
+Every refundable order / custom request gets one row in `refund_deadlines`.
+The scheduler sleeps until the earliest pending `due_at`, claims the due rows
+and processes them on a bounded worker pool inside the bot's event loop.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, and_
+
+from database.db import create_session
+from database.models import (
+    Order, OrderStatus, PaymentStatus, CustomRequest, RequestStatus, Transaction, User,
+    RefundDeadline, DeadlineType, DeadlineStatus
+)
+from services.outbox import enqueue
+from config import (
+    SUPER_ADMIN_ID, DEFAULT_CURRENCY_SYMBOL, REFUND_DEADLINE_HOURS, PAYMENT_REMINDER_HOURS,
+    REFUND_WORKERS, REFUND_MAX_ATTEMPTS, REFUND_SWEEP_INTERVAL
+)
+
+logger = logging.getLogger(__name__)
+
+REFUND_DEADLINE = timedelta(hours=REFUND_DEADLINE_HOURS)
+PAYMENT_REMINDER_DELAY = timedelta(hours=PAYMENT_REMINDER_HOURS)
+
+# Custom requests still waiting for an admin decision
+UNAPPROVED_REQUEST_STATUSES = (RequestStatus.NEW, RequestStatus.IN_REVIEW)
+
+# (chat_id, text) pairs, queued in the outbox with the deadline's DB work
+Notifications = List[Tuple[str, str]]
+
+
+# ========== SCHEDULING HOOKS ==========
+
+def schedule_deadline(db, deadline_type: DeadlineType, target_id: int, due_at: datetime):
+    """Add a deadline in the caller's transaction (no-op if one already exists)"""
+    existing = db.query(RefundDeadline.id).filter(
+        RefundDeadline.deadline_type == deadline_type,
+        RefundDeadline.target_id == target_id
+    ).first()
+    if existing:
+        return
+    db.add(RefundDeadline(
+        deadline_type=deadline_type,
+        target_id=target_id,
+        due_at=due_at,
+        status=DeadlineStatus.PENDING
+    ))
+
+
+def schedule_order_refund(db, order):
+    """Call when an order is approved - refunds it if unclaimed after 48h"""
+    approved_at = order.approved_at or datetime.now()
+    schedule_deadline(db, DeadlineType.ORDER_REFUND, order.id, approved_at + REFUND_DEADLINE)
+
+
+def schedule_request_refund(db, custom_request):
+    """Call when a custom request deposit is paid - refunds it if unapproved after 48h"""
+    paid_at = custom_request.deposit_paid_at or datetime.now()
+    schedule_deadline(db, DeadlineType.REQUEST_REFUND, custom_request.id, paid_at + REFUND_DEADLINE)
+
+
+def sync_deadlines() -> int:
+    """Backfill deadlines for rows that reached a refundable state outside the hooks"""
+    db = create_session()
+    try:
+        def missing(deadline_type, id_column):
+            return ~db.query(RefundDeadline.id).filter(
+                RefundDeadline.deadline_type == deadline_type,
+                RefundDeadline.target_id == id_column
+            ).exists()
+
+        rows = []
+        for order_id, start in db.query(
+            Order.id, func.coalesce(Order.approved_at, Order.updated_at)
+        ).filter(
+            Order.status == OrderStatus.APPROVED,
+            Order.assigned_developer_id == None,
+            Order.refunded_at == None,
+            Order.payment_status == PaymentStatus.VERIFIED,
+            missing(DeadlineType.ORDER_REFUND, Order.id)
+        ):
+            rows.append((DeadlineType.ORDER_REFUND, order_id, start + REFUND_DEADLINE))
+
+        for request_id, paid_at in db.query(CustomRequest.id, CustomRequest.deposit_paid_at).filter(
+            CustomRequest.status.in_(UNAPPROVED_REQUEST_STATUSES),
+            CustomRequest.is_deposit_paid == True,
+            CustomRequest.deposit_paid_at != None,
+            CustomRequest.refunded_at == None,
+            missing(DeadlineType.REQUEST_REFUND, CustomRequest.id)
+        ):
+            rows.append((DeadlineType.REQUEST_REFUND, request_id, paid_at + REFUND_DEADLINE))
+
+        for order_id, created_at in db.query(Order.id, Order.created_at).filter(
+            Order.status == OrderStatus.PENDING_PAYMENT,
+            Order.payment_reference != None,
+            Order.payment_status == PaymentStatus.PENDING,
+            missing(DeadlineType.PAYMENT_REMINDER, Order.id)
+        ):
+            rows.append((DeadlineType.PAYMENT_REMINDER, order_id, created_at + PAYMENT_REMINDER_DELAY))
+
+        for deadline_type, target_id, due_at in rows:
+            schedule_deadline(db, deadline_type, target_id, due_at)
+        db.commit()
+
+        if rows:
+            logger.info(f"Scheduled {len(rows)} missing refund deadlines")
+        return len(rows)
+    except Exception as e:
+        logger.error(f"Error syncing refund deadlines: {e}", exc_info=True)
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+# ========== DEADLINE PROCESSING (runs in worker threads) ==========
+
+def _issue_refund(db, deadline, reference: str, amount: float, now: datetime) -> Tuple[bool, dict]:
+    """Refund `reference` at most once per deadline, across retries and crashes
+
+    The attempt is committed before Paystack is called. If the process dies
+    or the final commit fails after Paystack accepted the refund - or the
+    call timed out after reaching it - the deadline comes back with
+    refund_requested_at set, and the transaction's refunds are looked up
+    instead of refunding again. Only when Paystack has none is it re-sent.
+    """
+    from services.paystack_service import PaystackService
+    paystack = PaystackService()
+
+    if deadline.refund_requested_at:
+        ok, refund = paystack.find_refund(reference)
+        if not ok:
+            # Unknown whether the earlier attempt went through - retry the lookup later
+            return False, refund
+        if refund:
+            logger.info(f"Refund {refund.get('id')} for {reference} was already issued; not refunding again")
+            deadline.refund_id = str(refund.get('id'))
+            return True, {"status": True, "message": "Refund already issued", "data": refund}
+
+    deadline.refund_requested_at = now
+    db.commit()
+    success, result = paystack.refund_transaction(reference=reference, amount=amount)
+    if success:
+        refund_id = (result.get('data') or {}).get('id')
+        deadline.refund_id = str(refund_id) if refund_id is not None else None
+    return success, result
+
+
+def _mark_transaction_refunded(db, reference, result):
+    transaction = db.query(Transaction).filter(Transaction.reference == reference).first()
+    if transaction:
+        transaction.status = 'refunded'
+        transaction.refund_data = result
+
+
+def _refund_order(db, deadline, now: datetime) -> Tuple[DeadlineStatus, Notifications, Optional[str]]:
+    order = db.query(Order).filter(Order.id == deadline.target_id).first()
+    if not order or order.refunded_at or order.assigned_developer_id \
+            or order.status != OrderStatus.APPROVED or order.payment_status != PaymentStatus.VERIFIED:
+        return DeadlineStatus.SKIPPED, [], None
+
+    reference = order.payment_reference or order.order_id
+    success, result = _issue_refund(db, deadline, reference, order.amount, now)
+    if not success:
+        return DeadlineStatus.FAILED, [], str(result.get('message', result))[:500]
+
+    order.status = OrderStatus.REFUNDED
+    order.refunded_at = now
+    order.refund_reason = "Automatic refund: No developer claimed within 48 hours"
+    order.refund_metadata = result
+    _mark_transaction_refunded(db, reference, result)
+
+    notifications = [(SUPER_ADMIN_ID, f"""⚠️ AUTOMATIC REFUND PROCESSED
+
+📦 Order ID: {order.order_id}
+💰 Amount Refunded: {DEFAULT_CURRENCY_SYMBOL}{order.amount:.2f}
+🔄 Reason: No developer claimed within 48 hours
+📅 Refund Time: {now.strftime('%Y-%m-%d %H:%M')}
+✅ Status: Refund successful
+
+The customer has been automatically refunded.""")]
+
+    user = db.query(User).filter(User.id == order.user_id).first()
+    if user and user.telegram_id:
+        notifications.append((user.telegram_id, f"""💸 Automatic Refund Processed
+
+📦 Order ID: {order.order_id}
+💰 Amount Refunded: {DEFAULT_CURRENCY_SYMBOL}{order.amount:.2f}
+🔄 Reason: No developer claimed your order within 48 hours
+📅 Refund Time: {now.strftime('%Y-%m-%d %H:%M')}
+✅ Status: Refund successful
+
+Your payment has been automatically refunded to your original payment method.
+
+Refunds usually take 3-5 business days to appear in your account.
+
+We apologize for the inconvenience. You can place a new order at any time."""))
+
+    logger.info(f"Successfully refunded order {order.order_id}")
+    return DeadlineStatus.DONE, notifications, None
+
+
+def _refund_request(db, deadline, now: datetime) -> Tuple[DeadlineStatus, Notifications, Optional[str]]:
+    request = db.query(CustomRequest).filter(CustomRequest.id == deadline.target_id).first()
+    if not request or request.refunded_at or not request.is_deposit_paid \
+            or request.status not in UNAPPROVED_REQUEST_STATUSES:
+        return DeadlineStatus.SKIPPED, [], None
+
+    deposit_amount = request.estimated_price * 0.2
+    success, result = _issue_refund(db, deadline, request.payment_reference, deposit_amount, now)
+    if not success:
+        return DeadlineStatus.FAILED, [], str(result.get('message', result))[:500]
+
+    request.status = RequestStatus.REFUNDED
+    request.refunded_at = now
+    request.refund_reason = "Automatic refund: Request not approved within 48 hours"
+    request.refund_metadata = result
+    _mark_transaction_refunded(db, request.payment_reference, result)
+
+    notifications = [(SUPER_ADMIN_ID, f"""⚠️ CUSTOM REQUEST DEPOSIT REFUNDED
+
+📋 Request ID: {request.request_id}
+📝 Title: {request.title}
+💰 Deposit Refunded: {DEFAULT_CURRENCY_SYMBOL}{deposit_amount:.2f}
+🔄 Reason: Request not approved within 48 hours
+📅 Refund Time: {now.strftime('%Y-%m-%d %H:%M')}
+✅ Status: Refund successful
+
+Customer deposit has been automatically refunded.""")]
+
+    user = db.query(User).filter(User.id == request.user_id).first()
+    if user and user.telegram_id:
+        notifications.append((user.telegram_id, f"""💸 Custom Request Deposit Refunded
+
+📋 Request ID: {request.request_id}
+📝 Title: {request.title}
+💰 Deposit Refunded: {DEFAULT_CURRENCY_SYMBOL}{deposit_amount:.2f}
+🔄 Reason: Your request was not approved within 48 hours
+📅 Refund Time: {now.strftime('%Y-%m-%d %H:%M')}
+✅ Status: Refund successful
+
+Your deposit has been automatically refunded to your original payment method.
+
+Refunds usually take 3-5 business days to appear in your account.
+
+You can submit a new request at any time."""))
+
+    logger.info(f"Successfully refunded custom request {request.request_id}")
+    return DeadlineStatus.DONE, notifications, None
+
+
+def _payment_reminder(db, deadline, now: datetime) -> Tuple[DeadlineStatus, Notifications, Optional[str]]:
+    order = db.query(Order).filter(Order.id == deadline.target_id).first()
+    if not order or order.status != OrderStatus.PENDING_PAYMENT \
+            or order.payment_status != PaymentStatus.PENDING:
+        return DeadlineStatus.SKIPPED, [], None
+
+    user = db.query(User).filter(User.id == order.user_id).first()
+    if not user or not user.telegram_id:
+        return DeadlineStatus.SKIPPED, [], None
+
+    return DeadlineStatus.DONE, [(user.telegram_id, f"""⏰ Payment Reminder
+
+📦 Order ID: {order.order_id}
+💰 Amount: {DEFAULT_CURRENCY_SYMBOL}{order.amount:.2f}
+
+Your payment is still pending. Please complete your payment or your order will be cancelled in 24 hours.
+
+Use /verify {order.order_id} to check payment status.""")], None
+
+
+DEADLINE_HANDLERS = {
+    DeadlineType.ORDER_REFUND: _refund_order,
+    DeadlineType.REQUEST_REFUND: _refund_request,
+    DeadlineType.PAYMENT_REMINDER: _payment_reminder,
+}
+
+
+def process_deadline(deadline_id: int) -> Optional[DeadlineStatus]:
+    """Apply one claimed deadline; target row, deadline row and notifications commit together
+
+    (A refund's attempt is committed on its own first - see _issue_refund.)
+    """
+    db = create_session()
+    try:
+        deadline = db.query(RefundDeadline).filter(RefundDeadline.id == deadline_id).first()
+        if not deadline or deadline.status != DeadlineStatus.PROCESSING:
+            return None
+
+        now = datetime.now()
+        try:
+            status, notifications, error = DEADLINE_HANDLERS[deadline.deadline_type](db, deadline, now)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error processing deadline {deadline_id}: {e}", exc_info=True)
+            status, notifications, error = DeadlineStatus.FAILED, [], str(e)[:500]
+
+        if status == DeadlineStatus.FAILED and (deadline.attempts or 0) < REFUND_MAX_ATTEMPTS:
+            # Retry with exponential backoff: 5m, 10m, 20m, ... capped at 6h
+            delay = min(300 * 2 ** ((deadline.attempts or 1) - 1), 6 * 3600)
+            deadline.status = DeadlineStatus.PENDING
+            deadline.due_at = now + timedelta(seconds=delay)
+        else:
+            deadline.status = status
+            deadline.processed_at = now
+        deadline.last_error = error
+
+        if status == DeadlineStatus.FAILED and deadline.status == DeadlineStatus.FAILED:
+            notifications = [(SUPER_ADMIN_ID, (
+                f"❌ Automatic refund gave up after {deadline.attempts} attempts\n\n"
+                f"Type: {deadline.deadline_type.value}\n"
+                f"Target ID: {deadline.target_id}\n"
+                f"Error: {error}"
+            ))]
+        for chat_id, text in notifications:
+            enqueue(db, chat_id, text)
+        db.commit()
+        return status
+    except Exception as e:
+        logger.error(f"Error finishing deadline {deadline_id}: {e}", exc_info=True)
+        db.rollback()
+        return DeadlineStatus.FAILED
+    finally:
+        db.close()
+
+
+# ========== SCHEDULER ==========
+
+class RefundScheduler:
+    def __init__(self, workers: int = REFUND_WORKERS, sweep_interval: float = REFUND_SWEEP_INTERVAL):
+        self.workers = workers
+        self.sweep_interval = sweep_interval
+        self.task: Optional[asyncio.Task] = None
+        self.last_run: dict = {}
+        self.totals = {'runs': 0, 'done': 0, 'skipped': 0, 'failed': 0}
+
+    def start(self, application):
+        if self.task and not self.task.done():
+            return self.task
+        self.task = application.create_task(self.run())
+        return self.task
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    def _recover(self):
+        """Rows left PROCESSING by a crash go back to the queue
+
+        Handlers re-check the target's state, and a refund that was already
+        sent is looked up with Paystack before it is re-issued (_issue_refund).
+        """
+        db = create_session()
+        try:
+            db.query(RefundDeadline).filter(
+                RefundDeadline.status == DeadlineStatus.PROCESSING
+            ).update({RefundDeadline.status: DeadlineStatus.PENDING}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _next_due(self) -> Optional[datetime]:
+        db = create_session()
+        try:
+            return db.query(func.min(RefundDeadline.due_at)).filter(
+                RefundDeadline.status == DeadlineStatus.PENDING
+            ).scalar()
+        finally:
+            db.close()
+
+    def _claim_due(self, now: datetime) -> List[Tuple[int, datetime]]:
+        """Atomically move due PENDING rows to PROCESSING and return (id, due_at)"""
+        db = create_session()
+        try:
+            due = db.query(RefundDeadline.id, RefundDeadline.due_at).filter(
+                RefundDeadline.status == DeadlineStatus.PENDING,
+                RefundDeadline.due_at <= now
+            ).order_by(RefundDeadline.due_at).all()
+
+            claimed = []
+            for deadline_id, due_at in due:
+                updated = db.query(RefundDeadline).filter(
+                    and_(RefundDeadline.id == deadline_id, RefundDeadline.status == DeadlineStatus.PENDING)
+                ).update({
+                    RefundDeadline.status: DeadlineStatus.PROCESSING,
+                    RefundDeadline.attempts: func.coalesce(RefundDeadline.attempts, 0) + 1
+                }, synchronize_session=False)
+                if updated:
+                    claimed.append((deadline_id, due_at))
+            db.commit()
+            return claimed
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def run_once(self) -> dict:
+        """Process everything due right now and return the run's metrics"""
+        started = time.perf_counter()
+        now = datetime.now()
+        claimed = await asyncio.to_thread(self._claim_due, now)
+        semaphore = asyncio.Semaphore(self.workers)
+        counts = {DeadlineStatus.DONE: 0, DeadlineStatus.SKIPPED: 0, DeadlineStatus.FAILED: 0}
+
+        async def work(deadline_id):
+            async with semaphore:
+                status = await asyncio.to_thread(process_deadline, deadline_id)
+            if status in counts:
+                counts[status] += 1
+
+        await asyncio.gather(*(work(deadline_id) for deadline_id, _ in claimed))
+
+        duration = time.perf_counter() - started
+        lags = [(now - due_at).total_seconds() for _, due_at in claimed]
+        metrics = {
+            'started_at': now.isoformat(),
+            'processed': len(claimed),
+            'done': counts[DeadlineStatus.DONE],
+            'skipped': counts[DeadlineStatus.SKIPPED],
+            'failed': counts[DeadlineStatus.FAILED],
+            'duration_s': round(duration, 3),
+            'throughput_per_s': round(len(claimed) / duration, 2) if duration else 0.0,
+            'max_lag_s': round(max(lags), 3) if lags else 0.0,
+            'avg_lag_s': round(sum(lags) / len(lags), 3) if lags else 0.0,
+        }
+        if claimed:
+            self.last_run = metrics
+            self.totals['runs'] += 1
+            for key in ('done', 'skipped', 'failed'):
+                self.totals[key] += metrics[key]
+            logger.info(f"Refund run: {metrics}")
+        return metrics
+
+    async def run(self):
+        logger.info("Refund scheduler started")
+        await asyncio.to_thread(self._recover)
+        last_sweep = 0.0
+        while True:
+            try:
+                if time.monotonic() - last_sweep >= self.sweep_interval:
+                    await asyncio.to_thread(sync_deadlines)
+                    last_sweep = time.monotonic()
+
+                await self.run_once()
+
+                next_due = await asyncio.to_thread(self._next_due)
+                sleep_for = self.sweep_interval
+                if next_due:
+                    sleep_for = min(sleep_for, max(0.0, (next_due - datetime.now()).total_seconds()))
+                await asyncio.sleep(sleep_for)
+            except asyncio.CancelledError:
+                logger.info("Refund scheduler stopped")
+                raise
+            except Exception as e:
+                logger.error(f"Error in refund scheduler: {e}", exc_info=True)
+                await asyncio.sleep(30)
+
+    def get_metrics(self) -> dict:
+        return {'last_run': self.last_run, 'totals': dict(self.totals)}
+
+
+# Global instance
+refund_scheduler = RefundScheduler()
@@ -0,0 +1,328 @@
+"""
+Admin statistics - aggregated dashboard counters with a short-lived cache
+"""
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import case, desc, event, func, select
+
+from database.db import SessionLocal, create_session
+from database.models import (
+    Bot, CustomRequest, Developer, DeveloperRequest, DeveloperStatus, Order, OrderStatus,
+    PaymentStatus, RequestStatus, RevenueRollup, User
+)
+from utils.helpers import day_bounds
+from config import STATS_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Writes to any of these invalidate the cached counters
+TRACKED_MODELS = (User, Order, CustomRequest, DeveloperRequest, Developer, Bot)
+
+
+def _as_date(value) -> date:
+    """func.date() returns a string on SQLite and a date on PostgreSQL"""
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _count_if(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+
+def _sum_if(condition, column):
+    return func.sum(case((condition, column), else_=0))
+
+
+class StatsService:
+    """Computes admin dashboard numbers in a handful of grouped queries and caches them"""
+
+    def __init__(self, ttl: float = STATS_CACHE_TTL):
+        self.ttl = ttl
+        self._cache: Dict[tuple, Tuple[float, object]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def _cached(self, key: tuple, compute: Callable[[object], object], force_refresh: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and not force_refresh and now - entry[0] < self.ttl:
+                return entry[1]
+            generation = self._generation
+
+        db = create_session()
+        try:
+            value = compute(db)
+        finally:
+            db.close()
+
+        with self._lock:
+            # Don't store a result that raced with a write
+            if generation == self._generation:
+                self._cache[key] = (now, value)
+        return value
+
+    # ---------- dashboard ----------
+
+    def get_dashboard(self, force_refresh: bool = False) -> dict:
+        """Counters for the admin statistics dashboard"""
+        today = datetime.now().date()
+        return self._cached(('dashboard', today), lambda db: self._dashboard(db, today), force_refresh)
+
+    def _dashboard(self, db, today: date) -> dict:
+        day_start, day_end = day_bounds(today)
+        created_today = lambda column: (column >= day_start) & (column < day_end)
+
+        # Orders - one row per status with today's count folded in
+        order_rows = db.query(
+            Order.status,
+            func.count(Order.id),
+            _count_if(created_today(Order.created_at))
+        ).group_by(Order.status).all()
+
+        order_statuses = []
+        total_orders = today_orders = 0
+        pending_order_review = 0
+        for status, count, count_today in order_rows:
+            total_orders += count
+            today_orders += count_today or 0
+            if status:
+                order_statuses.append((status, count))
+            if status == OrderStatus.PENDING_REVIEW:
+                pending_order_review = count
+
+        revenue = self._revenue_windows(db, today=today)
+
+        # Developers by status
+        developer_rows = dict(
+            db.query(Developer.status, func.count(Developer.id)).group_by(Developer.status).all()
+        )
+
+        # Everything else as scalar subqueries in a single round trip
+        scalar = lambda *columns: select(*columns).scalar_subquery()
+        totals = db.execute(select(
+            scalar(func.count(User.id)),
+            scalar(_count_if(created_today(User.created_at))),
+            scalar(func.count(CustomRequest.id)),
+            scalar(_count_if(created_today(CustomRequest.created_at))),
+            scalar(_count_if(CustomRequest.status == RequestStatus.NEW)),
+            scalar(func.count(Bot.id)),
+            select(func.count(DeveloperRequest.id)).where(
+                DeveloperRequest.status == RequestStatus.NEW
+            ).scalar_subquery()
+        )).one()
+        (total_users, today_users, total_requests, today_custom_requests,
+         pending_custom_requests, total_bots, pending_dev_requests) = (value or 0 for value in totals)
+
+        return {
+            'total_users': total_users,
+            'total_orders': total_orders,
+            'total_developers': sum(developer_rows.values()),
+            'total_bots': total_bots,
+            'total_requests': total_requests,
+            'pending_dev_requests': pending_dev_requests,
+            'pending_custom_requests': pending_custom_requests,
+            'pending_order_review': pending_order_review,
+            'total_revenue': revenue['total'],
+            'today_revenue': revenue['today'],
+            'today_orders': today_orders,
+            'today_users': today_users,
+            'today_custom_requests': today_custom_requests,
+            'order_statuses': order_statuses,
+            'active_devs': developer_rows.get(DeveloperStatus.ACTIVE, 0),
+            'busy_devs': developer_rows.get(DeveloperStatus.BUSY, 0),
+        }
+
+    # ---------- revenue (read from the rollups) ----------
+
+    def _revenue_windows(self, db, **since: date) -> Dict[str, float]:
+        """Completed revenue overall and since each given day, in one pass over the rollups"""
+        row = db.query(
+            func.sum(RevenueRollup.revenue),
+            *(_sum_if(RevenueRollup.day >= day, RevenueRollup.revenue) for day in since.values())
+        ).one()
+        return dict(zip(('total', *since), (value or 0 for value in row)))
+
+    def _daily_revenue(self, db, start: date, end: date) -> Dict[date, float]:
+        rows = db.query(RevenueRollup.day, func.sum(RevenueRollup.revenue)).filter(
+            RevenueRollup.day >= start, RevenueRollup.day <= end
+        ).group_by(RevenueRollup.day).all()
+        return {day: revenue or 0 for day, revenue in rows}
+
+    def _payment_methods(self, db) -> List[Tuple[str, int, float]]:
+        """(method, completed orders, revenue) for orders with a known payment method"""
+        rows = db.query(
+            RevenueRollup.payment_method,
+            func.sum(RevenueRollup.completed_orders),
+            func.sum(RevenueRollup.revenue)
+        ).filter(RevenueRollup.payment_method != 'other').group_by(
+            RevenueRollup.payment_method
+        ).having(func.sum(RevenueRollup.completed_orders) > 0).all()
+        return [(method, count, amount or 0) for method, count, amount in rows]
+
+    # ---------- daily activity ----------
+
+    def _window(self, days: int) -> Tuple[List[date], datetime, datetime]:
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days)
+        dates = [start_date + timedelta(days=i) for i in range(days)]
+        return dates, day_bounds(start_date)[0], day_bounds(dates[-1])[1]
+
+    def _daily_orders(self, db, start: datetime, end: datetime) -> Dict[date, int]:
+        day = func.date(Order.created_at)
+        rows = db.query(day, func.count(Order.id)).filter(
+            Order.created_at >= start, Order.created_at < end
+        ).group_by(day).all()
+        return {_as_date(d): count for d, count in rows}
+
+    def _daily_users(self, db, start: datetime, end: datetime) -> Dict[date, int]:
+        day = func.date(User.created_at)
+        rows = db.query(day, func.count(User.id)).filter(
+            User.created_at >= start, User.created_at < end
+        ).group_by(day).all()
+        return {_as_date(d): count for d, count in rows}
+
+    def get_detailed(self, days: int = 7, force_refresh: bool = False) -> dict:
+        """Daily orders/revenue, top software, top developers and payment methods"""
+        return self._cached(('detailed', datetime.now().date(), days),
+                            lambda db: self._detailed(db, days), force_refresh)
+
+    def _detailed(self, db, days: int) -> dict:
+        dates, start, end = self._window(days)
+        orders = self._daily_orders(db, start, end)
+        revenue = self._daily_revenue(db, dates[0], dates[-1])
+
+        top_bots = db.query(
+            Bot.name,
+            func.count(Order.id),
+            func.sum(Order.amount)
+        ).join(Order, Bot.id == Order.bot_id).filter(
+            Order.status == OrderStatus.COMPLETED
+        ).group_by(Bot.id).order_by(desc(func.count(Order.id))).limit(5).all()
+
+        top_developers = db.query(
+            User.first_name,
+            Developer.developer_id,
+            Developer.completed_orders,
+            Developer.earnings,
+            Developer.rating
+        ).join(Developer, User.id == Developer.user_id).filter(
+            Developer.earnings > 0
+        ).order_by(desc(Developer.earnings)).limit(5).all()
+
+        return {
+            'daily_orders': [(d, orders.get(d, 0), revenue.get(d, 0)) for d in dates],
+            'top_bots': [tuple(row) for row in top_bots],
+            'top_developers': [tuple(row) for row in top_developers],
+            'payment_methods': self._payment_methods(db),
+        }
+
+    def get_user_activity(self, days: int = 7, force_refresh: bool = False) -> dict:
+        """New users/orders per day and the most active buyers"""
+        return self._cached(('user_activity', datetime.now().date(), days),
+                            lambda db: self._user_activity(db, days), force_refresh)
+
+    def _user_activity(self, db, days: int) -> dict:
+        dates, start, end = self._window(days)
+        users = self._daily_users(db, start, end)
+        orders = self._daily_orders(db, start, end)
+
+        active_users = db.query(
+            User.first_name,
+            User.username,
+            User.telegram_id,
+            func.count(Order.id).label('order_count'),
+            func.sum(Order.amount).label('total_spent')
+        ).join(Order, User.id == Order.user_id).filter(
+            Order.status == OrderStatus.COMPLETED
+        ).group_by(User.id).order_by(desc('order_count')).limit(10).all()
+
+        return {
+            'daily_activity': [(d, users.get(d, 0), orders.get(d, 0)) for d in dates],
+            'active_users': [tuple(row) for row in active_users],
+        }
+
+    # ---------- finance ----------
+
+    def get_finance(self, force_refresh: bool = False) -> dict:
+        """Revenue windows, payment status counts and developer earnings"""
+        today = datetime.now().date()
+        return self._cached(('finance', today), lambda db: self._finance(db, today), force_refresh)
+
+    def _finance(self, db, today: date) -> dict:
+        revenue = self._revenue_windows(
+            db,
+            today=today,
+            week=today - timedelta(days=7),
+            month=today - timedelta(days=30)
+        )
+
+        payments = db.query(
+            _count_if(Order.payment_status == PaymentStatus.PENDING),
+            _count_if(Order.payment_status == PaymentStatus.VERIFIED)
+        ).one()
+        pending_payments, verified_payments = (value or 0 for value in payments)
+
+        developer_count, developer_earnings = db.query(
+            func.count(User.id), func.sum(Developer.earnings)
+        ).outerjoin(Developer, Developer.user_id == User.id).filter(User.is_developer == True).one()
+
+        return {
+            'total_revenue': revenue['total'],
+            'today_revenue': revenue['today'],
+            'week_revenue': revenue['week'],
+            'month_revenue': revenue['month'],
+            'pending_payments': pending_payments,
+            'verified_payments': verified_payments,
+            'payment_methods': [(method, amount) for method, _, amount in self._payment_methods(db)],
+            'developer_count': developer_count or 0,
+            'developer_earnings': developer_earnings or 0,
+        }
+
+
+stats_service = StatsService()
+
+
+# ---------- cache invalidation ----------
+
+def _touches_tracked(objects) -> bool:
+    return any(isinstance(obj, TRACKED_MODELS) for obj in objects)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_stats_dirty(session, flush_context):
+    if (_touches_tracked(session.new) or _touches_tracked(session.dirty)
+            or _touches_tracked(session.deleted)):
+        session.info['stats_dirty'] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _mark_bulk_stats_dirty(orm_execute_state):
+    # query(...).update()/.delete() bypass the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, TRACKED_MODELS):
+            orm_execute_state.session.info['stats_dirty'] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_stats(session):
+    if session.info.pop('stats_dirty', False):
+        stats_service.invalidate()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_stats_dirty(session):
+    session.info.pop('stats_dirty', None)
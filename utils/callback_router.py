@@ -0,0 +1,183 @@
+"""
+Callback query routing - one handler for every button instead of one regex
+CallbackQueryHandler per callback
+
+PTB tries handlers one by one, so a button press used to cost a regex match
+against every callback registered before it, and a short prefix registered
+early silently shadowed longer ones. The router resolves callback_data with a
+dict lookup and, for plain prefixes, a longest-match trie walk.
+
+Structured callback_data is
+
+    <namespace>:<action>[:<arg>...]
+
+built with callback_data(); the target handler finds the args in
+context.args, just like a command. Existing buttons keep their plain strings
+("admin_dev_approve_12") and are matched exactly or by the longest
+registered prefix, so keyboards already sent to users keep working.
+"""
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import BaseHandler, CallbackQueryHandler
+
+from utils.pagination import CALLBACK_DATA_LIMIT
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = ':'
+EXACT, PREFIX, ROUTE = 'exact', 'prefix', 'route'
+
+Handler = Callable
+Resolved = Tuple[Handler, Optional[List[str]]]
+
+
+def callback_data(namespace: str, action: str, *args) -> str:
+    """Encode a structured callback: callback_data("admin", "dev_approve", 12) -> "admin:dev_approve:12" """
+    if SEPARATOR in namespace or SEPARATOR in action:
+        raise ValueError(f"namespace and action can't contain '{SEPARATOR}'")
+    data = SEPARATOR.join([namespace, action, *map(str, args)])
+    if len(data.encode()) > CALLBACK_DATA_LIMIT:
+        raise ValueError(f"callback_data too long for Telegram: {data}")
+    return data
+
+
+def parse_callback_data(data: str) -> Optional[Tuple[str, str, List[str]]]:
+    """(namespace, action, args) of structured callback_data, None for plain strings"""
+    parts = data.split(SEPARATOR)
+    if len(parts) < 2:
+        return None
+    return parts[0], parts[1], parts[2:]
+
+
+class _PrefixTrie:
+    """Finds the longest registered prefix of a string in O(len(string))"""
+
+    __slots__ = ('_root',)
+
+    def __init__(self):
+        self._root: dict = {}
+
+    def insert(self, prefix: str, value):
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[None] = value
+
+    def longest(self, text: str):
+        node = self._root
+        found = node.get(None)
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+
+class CallbackRouter(BaseHandler):
+    """A single handler that dispatches every routed callback query"""
+
+    def __init__(self):
+        super().__init__(self._unrouted)
+        self._exact: Dict[str, Handler] = {}
+        self._routes: Dict[Tuple[str, str], Handler] = {}
+        self._prefixes = _PrefixTrie()
+        self._prefix_keys: Dict[str, Handler] = {}
+        # Registration order, kept for diagnostics and the dispatch benchmark
+        self.registrations: List[Tuple[str, object, Handler]] = []
+
+    # ---------- registration ----------
+
+    def _register(self, table: dict, kind: str, key, handler: Handler):
+        if key in table:
+            raise ValueError(f"Callback {kind} {key!r} is already routed to {table[key].__name__}")
+        table[key] = handler
+        self.registrations.append((kind, key, handler))
+
+    def exact(self, data: str, handler: Handler):
+        """callback_data == data"""
+        self._register(self._exact, EXACT, data, handler)
+
+    def prefix(self, prefix: str, handler: Handler):
+        """callback_data starting with prefix (the longest registered prefix wins)"""
+        self._register(self._prefix_keys, PREFIX, prefix, handler)
+        self._prefixes.insert(prefix, handler)
+
+    def route(self, namespace: str, action: str, handler: Handler):
+        """Structured callback_data built with callback_data(namespace, action, ...)"""
+        self._register(self._routes, ROUTE, (namespace, action), handler)
+
+    def paged(self, name: str, handler: Handler):
+        """A keyset-paginated list: "name" and "name:<cursor>" (see utils.pagination)"""
+        self.exact(name, handler)
+        self.prefix(name + SEPARATOR, handler)
+
+    def wrap_handlers(self, wrapper: Callable[[Handler], Handler]) -> int:
+        """Replace every routed handler with wrapper(handler), e.g. for instrumentation"""
+        wrapped: Dict[Handler, Handler] = {}
+
+        def wrap(handler: Handler) -> Handler:
+            if handler not in wrapped:
+                wrapped[handler] = wrapper(handler)
+            return wrapped[handler]
+
+        self._exact = {key: wrap(handler) for key, handler in self._exact.items()}
+        self._routes = {key: wrap(handler) for key, handler in self._routes.items()}
+        self._prefix_keys = {key: wrap(handler) for key, handler in self._prefix_keys.items()}
+        self._prefixes = _PrefixTrie()
+        for prefix, handler in self._prefix_keys.items():
+            self._prefixes.insert(prefix, handler)
+        self.registrations = [(kind, key, wrap(handler)) for kind, key, handler in self.registrations]
+        return len(self.registrations)
+
+    # ---------- dispatch ----------
+
+    def resolve(self, data: str) -> Optional[Resolved]:
+        handler = self._exact.get(data)
+        if handler is not None:
+            return handler, None
+
+        if SEPARATOR in data and self._routes:
+            namespace, action, args = parse_callback_data(data)
+            handler = self._routes.get((namespace, action))
+            if handler is not None:
+                return handler, args
+
+        handler = self._prefixes.longest(data)
+        if handler is not None:
+            return handler, None
+        return None
+
+    def check_update(self, update: object) -> Optional[Resolved]:
+        if isinstance(update, Update) and update.callback_query and update.callback_query.data:
+            return self.resolve(update.callback_query.data)
+        return None
+
+    async def handle_update(self, update, application, check_result: Resolved, context):
+        handler, args = check_result
+        if args is not None:
+            context.args = args
+        return await handler(update, context)
+
+    async def _unrouted(self, update, context):
+        # Never called - handle_update dispatches to the resolved handler
+        logger.warning(f"Unrouted callback: {update.callback_query.data}")
+
+    # ---------- legacy equivalent ----------
+
+    def as_pattern_handlers(self) -> List[CallbackQueryHandler]:
+        """The same routes as one regex CallbackQueryHandler each, in registration order"""
+        import re
+
+        handlers = []
+        for kind, key, handler in self.registrations:
+            if kind == EXACT:
+                pattern = f"^{re.escape(key)}$"
+            elif kind == PREFIX:
+                pattern = f"^{re.escape(key)}"
+            else:
+                pattern = f"^{re.escape(key[0])}{SEPARATOR}{re.escape(key[1])}({SEPARATOR}|$)"
+            handlers.append(CallbackQueryHandler(handler, pattern=pattern))
+        return handlers
@@ -5,7 +5,7 @@ import random
 import string
 from datetime import datetime
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 def generate_order_id():
     """Generate unique order ID"""
@@ -19,6 +19,16 @@ def generate_request_id():
     return f"CR{timestamp}{random_part}"    # ✅ new prefix (CR)
 
 
+def day_bounds(day):
+    """Return (start, end) datetimes for a calendar day.
+    
+    Filter with `created_at >= start, created_at < end` instead of
+    `func.date(created_at) == day` so the created_at indexes can be used.
+    """
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
 def format_price(price):
     """Format price with 2 decimal places"""
     try:
@@ -0,0 +1,125 @@
+"""
+Keyset pagination for list screens
+
+Lists are ordered newest first by (created_at, id). A page is addressed by the
+row it starts after, so page 500 costs the same indexed seek as page 1. The
+cursor travels in callback_data as
+
+    <prefix>:<n|p><created_at as base36 microseconds>.<id in base36>
+
+where "n" pages towards older rows and "p" back towards newer ones.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from telegram import InlineKeyboardButton
+
+CALLBACK_DATA_LIMIT = 64  # Telegram's limit for callback_data, in bytes
+NEXT, PREV = 'n', 'p'
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def _to_base36(number: int) -> str:
+    digits = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        digits = _DIGITS[remainder] + digits
+        if not number:
+            return digits
+
+
+def encode_cursor(direction: str, created_at: datetime, row_id: int) -> str:
+    micros = (created_at - _EPOCH) // _MICROSECOND
+    return f"{direction}{_to_base36(micros)}.{_to_base36(row_id)}"
+
+
+def decode_cursor(token: str) -> Optional[Tuple[str, datetime, int]]:
+    """(direction, created_at, id) from a cursor token, or None if it is malformed"""
+    try:
+        direction, (micros, row_id) = token[0], token[1:].split('.')
+        if direction not in (NEXT, PREV):
+            return None
+        return direction, _EPOCH + int(micros, 36) * _MICROSECOND, int(row_id, 36)
+    except (IndexError, ValueError):
+        return None
+
+
+def page_token(data: Optional[str], prefix: str) -> Optional[str]:
+    """Cursor token from callback_data like "<prefix>:<token>", None for the first page"""
+    if data and data.startswith(prefix + ':'):
+        return data[len(prefix) + 1:] or None
+    return None
+
+
+def page_callback(prefix: str, token: Optional[str]) -> str:
+    data = f"{prefix}:{token}" if token else prefix
+    if len(data.encode()) > CALLBACK_DATA_LIMIT:
+        raise ValueError(f"callback_data too long for Telegram: {data}")
+    return data
+
+
+@dataclass
+class KeysetPage:
+    items: List = field(default_factory=list)
+    next_token: Optional[str] = None
+    prev_token: Optional[str] = None
+
+    @property
+    def is_first(self) -> bool:
+        return self.prev_token is None
+
+
+def paginate(query, model, token: Optional[str] = None, page_size: int = 10) -> KeysetPage:
+    """Fetch one page of `query` (unordered) newest first using a (created_at, id) seek"""
+    created_at, row_id = model.created_at, model.id
+    cursor = decode_cursor(token) if token else None
+
+    if cursor is None:
+        rows = query.order_by(created_at.desc(), row_id.desc()).limit(page_size + 1).all()
+        has_newer = False
+        has_older = len(rows) > page_size
+        rows = rows[:page_size]
+    else:
+        direction, at, seek_id = cursor
+        if direction == NEXT:
+            rows = query.filter(
+                created_at <= at, or_(created_at < at, and_(created_at == at, row_id < seek_id))
+            ).order_by(created_at.desc(), row_id.desc()).limit(page_size + 1).all()
+            if not rows:
+                # Everything after the cursor is gone - start over
+                return paginate(query, model, None, page_size)
+            has_newer = True
+            has_older = len(rows) > page_size
+            rows = rows[:page_size]
+        else:
+            rows = query.filter(
+                created_at >= at, or_(created_at > at, and_(created_at == at, row_id > seek_id))
+            ).order_by(created_at.asc(), row_id.asc()).limit(page_size + 1).all()
+            if len(rows) <= page_size:
+                # Reached the newest rows - show a full first page instead of a short one
+                return paginate(query, model, None, page_size)
+            rows = list(reversed(rows[:page_size]))
+            has_newer = True
+            has_older = True
+
+    page = KeysetPage(items=rows)
+    if rows and has_older:
+        page.next_token = encode_cursor(NEXT, rows[-1].created_at, rows[-1].id)
+    if rows and has_newer:
+        page.prev_token = encode_cursor(PREV, rows[0].created_at, rows[0].id)
+    return page
+
+
+def nav_row(page: KeysetPage, prefix: str) -> List[InlineKeyboardButton]:
+    """Previous/next buttons for a page - empty when everything fits on one page"""
+    row = []
+    if page.prev_token:
+        row.append(InlineKeyboardButton("⬅️ Previous", callback_data=page_callback(prefix, page.prev_token)))
+    if page.next_token:
+        row.append(InlineKeyboardButton("Next ➡️", callback_data=page_callback(prefix, page.next_token)))
+    return row
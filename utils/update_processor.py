@@ -0,0 +1,65 @@
+"""
+Concurrent update processing that keeps each chat in order
+
+Updates from different chats run side by side; updates from the same chat (or
+the same user, outside of chats) run one after another, so conversation state
+never sees two steps of one dialogue interleaved. Each update runs in its own
+database.db.update_session_scope(), so handlers using create_session() never
+share a Session with another update running at the same time.
+"""
+import asyncio
+from typing import Dict, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from database.db import update_session_scope
+
+
+def _update_key(update: object) -> Optional[Hashable]:
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat:
+        return ('chat', update.effective_chat.id)
+    if update.effective_user:
+        return ('user', update.effective_user.id)
+    return None
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Up to `max_concurrent_updates` at once, one at a time per chat"""
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        # key -> [lock, updates holding or waiting for it]
+        self._locks: Dict[Hashable, list] = {}
+
+    async def do_process_update(self, update: object, coroutine) -> None:
+        key = _update_key(update)
+        if key is None:
+            with update_session_scope():
+                await coroutine
+            return
+
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                with update_session_scope():
+                    await coroutine
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Updates running and updates waiting behind another update from the same chat"""
+        holding = sum(count for _, count in self._locks.values())
+        processing = sum(1 for lock, _ in self._locks.values() if lock.locked())
+        return {'processing': processing, 'waiting_for_chat': holding - processing}
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        self._locks.clear()